@@ -1,10 +1,10 @@
 __author__ = 'kiruba'
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import mpld3 as m
 from mpl_toolkits.mplot3d import axes3d, Axes3D
 from matplotlib import rc
-from scipy.interpolate import griddata
 import numpy as np
 from matplotlib import cm
 from matplotlib.path import *
@@ -13,6 +13,8 @@ import matplotlib as mpl
 from matplotlib.ticker import MultipleLocator
 from matplotlib.ticker import MaxNLocator
 import checkdam.checkdam as cd
+import checkdam.stage_area as sa
+import checkdam.gridding as gr
 import checkdam.mynormalize as mn
 
 def poly_area(xy):
@@ -31,43 +33,6 @@ def poly_area(xy):
 
 
 
-def negative_contour_area(mpl_obj):
-    """
-    Returns a array of contour levels and
-    corresponding cumulative area of contours
-    specifically used for calculating negative contour's area when the contours are depth of lake
-    # Refer: Nikolai Shokhirev http://www.numericalexpert.com/blog/area_calculation/
-
-    :param mpl_obj: Matplotlib contour object
-    :return: [(level1, area1), (level1, area1+area2)]
-    """
-    n_c = len(mpl_obj.collections)  # n_c = no of contours
-    print 'No. of contours = {0}'.format(n_c)
-    # area = 0.0000
-    cont_area_array = []
-    for contour in range(n_c):
-        n_p = len(mpl_obj.collections[contour].get_paths())
-        zc = mpl_obj.levels[contour]
-        print zc
-        print n_p
-        area = 0.000
-        for path in range(n_p):
-            p = mpl_obj.collections[contour].get_paths()[path]
-            v = p.vertices
-            l = len(v)
-            s = 0.0000
-            # plt.figure()
-            # plt.fill(v[:, 0], v[:, 1], facecolor='b')
-            # plt.grid()
-            # plt.show()
-            for i in range(l):
-                j = (i + 1) % l
-                s += (v[j, 0] - v[i, 0]) * (v[j, 1] + v[i, 1])
-            poly_area = abs(0.5 * s)
-            area += poly_area
-        cont_area_array.append((zc, area))
-    return cont_area_array
-
 def conic_volume_estimate(area_1, area_2, height_diff):
     volume = (height_diff/3.0)*(area_1 + area_2 + (math.sqrt(area_1*area_2)))
     return volume
@@ -124,7 +89,9 @@ xi = np.linspace(X.min(), X.max(), 500)
 yi = np.linspace(Y.min(), Y.max(), 500)
 # create uniform grid from data based on X, Y, Z, , do linear interpolation,
 #  use fill value of 1 for areas outside the boundary/ where there is no data
-zi = griddata((X, Y), Z, (xi[None, :], yi[:, None]), method='linear', fill_value=1)
+# triangulation of the survey points is saved next to the survey file and reused for any grid
+survey_grid = gr.SurveyGrid(X, Y, cache_dir=os.path.dirname(data_file))
+zi = survey_grid.interpolate(Z, xi, yi, fill_value=1)
 # create meshgrid, necessary for contour
 xig, yig = np.meshgrid(xi, yi)
 
@@ -159,8 +126,11 @@ v = p.vertices
 # calculate area using poly_area function, see top
 area_at_stage_zero = abs(poly_area(v))
 print area_at_stage_zero
-# calculate the stage area relationship using function negative contour area, see top for function detail
-contour_area = negative_contour_area(CS)
+# calculate the stage area relationship from the interpolated depth grid, cells outside (fill value 1) stay dry
+# grid nodes outside the lake boundary stay dry
+inside_lake = gr.grid_mask(xi, yi, boundary_df['longitude'], boundary_df['latitude'])
+stage_area_volume = sa.StageAreaVolume(xi, yi, zi, mask=inside_lake)
+contour_area = list(zip(levels, stage_area_volume.area(levels)))
 # add boundary area as zero stage area
 contour_area.append((0, area_at_stage_zero))
 print contour_area
@@ -6,6 +6,7 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from spread import spread
+import checkdam.checkdam as cd
 # copy the code from http://code.activestate.com/recipes/577878-generate-equally-spaced-floats/ #
 import itertools
 from matplotlib import rc
@@ -41,20 +42,7 @@ output = pd.DataFrame(data, index=index, columns=columns)
 
 def calcvolume(profile, order, dy):
     """Profile = df.Y1,df.Y2,.. and order = 1,2,3"""
-    results = []
-
-    for z in dz:
-        water_area = 0
-        for y1, y2 in pairwise(profile):
-            delev = (y2 - y1) / 10
-            elev = y1
-            for b in range(1, 11, 1):
-                elev += delev
-                if z > elev:
-                    water_area += (0.1 * (z-elev))
-        calc_vol = water_area * dy
-        results.append(calc_vol)
-    output[('Volume_%s' % order)] = results
+    output[('Volume_%s' % order)] = cd.cross_section_area(profile, dz) * dy
     return output
 
 calcvolume(df.Y1, 1, 1)
@@ -3,6 +3,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 import checkdam.checkdam as cd
+import checkdam.hydraulics as hy
+import checkdam.water_balance as wb
 from matplotlib import rc
 import matplotlib.cm as cmx
 import matplotlib.colors as colors
@@ -423,20 +425,12 @@ for index, row in water_balance_df.iterrows():
 # plt.plot_date(water_balance_df.index, water_balance_df['volume (cu.m)'], '-g')
 # plt.hlines(stage_vol_df['total_vol_cu_m'][1.9], min(water_balance_df.index), max(water_balance_df.index))
 # plt.title('before overflow correction')
-water_balance_df['pumping status'] = 0.00
 # water_balance_df['pumping (cu.m)'] = 0.00
 """
 Pumping
 """
-for index, row in water_balance_df.iterrows():
-    if index > min(water_balance_df.index):
-        previous_time = index - timedelta(seconds=1800)
-        obs_stage = row['stage(m)']
-        v1 = water_balance_df['volume (cu.m)'][previous_time.strftime('%Y-%m-%d %H:%M:%S')]
-        v2 = water_balance_df['volume (cu.m)'][index.strftime('%Y-%m-%d %H:%M:%S')]
-        if ((v1 -v2) > 14) and obs_stage < full_stage:
-            water_balance_df['pumping status'][index.strftime(date_format)] = 1
-            # water_balance_df['pumping (cu.m)'][index.strftime(date_format)] = 14
+water_balance_df['pumping status'] = hy.pumping_status(water_balance_df['volume (cu.m)'], water_balance_df['stage(m)'],
+                                                       full_stage, threshold=14)
 
 
 """
@@ -449,23 +443,8 @@ length_check_dam = 10.4 # b
 width_check_dam = 0.5 # L
 # discharge_coeff = 1.704  # http://pubs.usgs.gov/wsp/0200/report.pdf page 9
 no_of_contractions = 0
-water_balance_df['overflow(cu.m)'] = 0.000
-for index in water_balance_df.index:
-    obs_stage = water_balance_df['stage(m)'][index.strftime(date_format)]
-    if (np.around(obs_stage, 2)) > full_stage:
-        effective_head = obs_stage - full_stage
-        previous_time = index - timedelta(seconds=1800)
-        if np.around(water_balance_df['stage(m)'][previous_time.strftime(date_format)], 2) > full_stage:
-            water_balance_df['overflow(cu.m)'][index.strftime(date_format)] = 1800*1.84*width_check_dam*(effective_head**1.5)
-        else:
-            x1 = 0
-            x2 = 1800
-            y1 = np.around(water_balance_df['stage(m)'][previous_time.strftime(date_format)], 2)
-            y2 = np.around(obs_stage, 2)
-            slope = (y1 - y2)/(x1 - x2)
-            intercept = y2 - (slope*x2)
-            time_of_overflow = 1800 - ((full_stage-intercept)/slope)
-            water_balance_df['overflow(cu.m)'][index.strftime(date_format)] = time_of_overflow*1.84*width_check_dam*(effective_head**1.5)
+water_balance_df['overflow(cu.m)'] = hy.overflow_volume(water_balance_df['stage(m)'], full_stage,
+                                                        weir_length=width_check_dam, coefficient=1.84)
 
 
 # for index, row in water_balance_df.iterrows():
@@ -549,16 +528,11 @@ hour = water_balance_df.index.hour
 minute = water_balance_df.index.minute
 ch_storage_df = water_balance_df[['volume (cu.m)']][((hour == 23) & (minute == 30))]
 ch_storage_df = ch_storage_df.resample('D', how=np.mean)
-water_balance_daily_df['change_storage(cu.m)'] = 0.000
 # print water_balance_daily_df.head()
 check_df = ch_storage_df['2014-05-29': ] #average
 print check_df.head()
-for index in ch_storage_df.index:
-    if index > min(ch_storage_df.index):
-        previous_date = index - timedelta(days=1)
-        d1_storage = ch_storage_df['volume (cu.m)'][previous_date.strftime(daily_format)]
-        d2_storage = ch_storage_df['volume (cu.m)'][index.strftime(daily_format)]
-        water_balance_daily_df['change_storage(cu.m)'][index.strftime(daily_format)] = d2_storage - d1_storage
+water_balance_daily_df['change_storage(cu.m)'] = wb.change_in_storage(water_balance_df['volume (cu.m)']).reindex(
+    water_balance_daily_df.index).fillna(0.0)
 # for d1, d2 in pairwise(ch_storage_df.index):
 #     if d2 > d1:
 #         diff = (d2-d1).days
@@ -577,17 +551,9 @@ new_df.to_csv('/media/kiruba/New Volume/ACCUWA_Data/Checkdam_water_balance/ch_46
 Separate out no inflow/ non rainy days
 two continuous days of no rain
 """
-water_balance_daily_df['status'] = "Y"
+dry = wb.dry_days(water_balance_daily_df, 'Rain Collection (mm)', window_days=2).values
+water_balance_daily_df['status'] = np.where(dry, "N", "Y")
 no_rain_df = water_balance_daily_df[water_balance_daily_df['Rain Collection (mm)'] == 0]
-# no_rain_df['status'] = "Y"
-for index in water_balance_daily_df.index:
-    initial_time_stamp = min(water_balance_daily_df.index) + timedelta(days=1)
-    if index > initial_time_stamp:
-        start_date = index - timedelta(days=1)
-        two_days_rain_df = water_balance_daily_df['Rain Collection (mm)'][start_date.strftime('%Y-%m-%d'):index.strftime('%Y-%m-%d')]
-        sum_df = two_days_rain_df.sum(axis=0)
-        if (sum_df == 0) and (water_balance_daily_df['change_storage(cu.m)'][index.strftime('%Y-%m-%d')] < 0) and (water_balance_daily_df['overflow(cu.m)'][index.strftime(daily_format)] == 0) and (water_balance_daily_df['pumping status'][index.strftime(daily_format)] == 0):
-            water_balance_daily_df['status'][index.strftime('%Y-%m-%d')] = "N"
 
 # print no_rain_df.head()
 water_balance_daily_df.to_csv("/media/kiruba/New Volume/ACCUWA_Data/Checkdam_water_balance/ch_463/water_bal.csv")
@@ -605,26 +571,17 @@ rain_water_balance_df = water_balance_daily_df[water_balance_daily_df['status']
 # # calculate infiltration
 # dry_water_balance_df.to_csv('/media/kiruba/New Volume/ACCUWA_Data/Checkdam_water_balance/591/dry_wb_check.CSV')
 # # print dry_water_balance_df.head()
-dry_water_balance_df['infiltration(cu.m)'] = 0.000
-delta_s = water_balance_daily_df['change_storage(cu.m)']
-evap = water_balance_daily_df['Evaporation (cu.m)']
-outflow = water_balance_daily_df['overflow(cu.m)']
+water_balance_daily_df['infiltration(cu.m)'] = wb.dry_infiltration(water_balance_daily_df, dry)
+daily_area = water_balance_daily_df['ws_area(sq.m)'].values
+with np.errstate(invalid='ignore', divide='ignore'):
+    water_balance_daily_df['infiltration rate (m/day)'] = np.where(
+        dry, water_balance_daily_df['infiltration(cu.m)'].values / daily_area, 0.0)
+dry_water_balance_df = water_balance_daily_df[dry]
 # for t1, t2 in pairwise(dry_water_balance_df.index):
 #     diff = abs((t2-t1).seconds)
 #     if diff == 1800:
 #         # print t1, t2
 #         dry_water_balance_df['infiltration(cu.m)'][t1.strftime('%Y-%m-%d %H:%M:%S')] = -1*(delta_s[t2.strftime('%Y-%m-%d %H:%M:%S')] + evap[t2.strftime('%Y-%m-%d %H:%M:%S')] + outflow[t2.strftime('%Y-%m-%d %H:%M:%S')])
-for index, row in dry_water_balance_df.iterrows():
-    if index > min(water_balance_daily_df.index):
-        t_1 = index - timedelta(days=1)
-        if t_1 < max(water_balance_daily_df.index):
-            dry_water_balance_df['infiltration(cu.m)'][index.strftime(daily_format)] = -1.0*(delta_s[index.strftime(daily_format)] + evap[index.strftime(daily_format)])
-    # print row
-dry_water_balance_df['infiltration rate (m/day)'] = 0.0
-
-for i in dry_water_balance_df.index:
-    i_1 = i - timedelta(days=1)
-    dry_water_balance_df['infiltration rate (m/day)'][i.strftime(daily_format)] = dry_water_balance_df['infiltration(cu.m)'][i.strftime(daily_format)] / water_balance_daily_df['ws_area(sq.m)'][i.strftime(daily_format)]
 # dry_water_balance_df['infiltration(cu.m)'] = -1.0*(evap + outflow + delta_s)
 # # print dry_water_balance_df.head()
 # # fig = plt.figure(figsize=(11.69, 8.27))
@@ -745,16 +702,16 @@ plt.savefig('/media/kiruba/New Volume/ACCUWA_Data/python_plots/check_dam_463/new
 """
 Rainy day infiltration
 """
-rain_water_balance_df['infiltration(cu.m)'] = 0.0
-rain_water_balance_df['infiltration rate (m/day)'] = 0.000
-for i in rain_water_balance_df.index:
-    if rain_water_balance_df['stage(m)'][i.strftime(daily_format)] > 0.1:
-        rain_water_balance_df['infiltration rate (m/day)'][i.strftime(daily_format)] = popt[0]*(rain_water_balance_df['stage(m)'][i.strftime(daily_format)]**popt[1])
-for i in rain_water_balance_df.index:
-    if rain_water_balance_df['stage(m)'][i.strftime(daily_format)] > 0.1:
-        if i > min(water_balance_daily_df.index):
-            i_1 = i - timedelta(days=1)
-            rain_water_balance_df['infiltration(cu.m)'][i.strftime(daily_format)] = rain_water_balance_df['infiltration rate (m/day)'][i.strftime(daily_format)]*water_balance_daily_df['ws_area(sq.m)'][i.strftime(daily_format)]
+daily_stage = water_balance_daily_df['stage(m)'].values
+predict = ~dry & (daily_stage > 0.1)
+water_balance_daily_df['infiltration rate (m/day)'] = np.where(predict, func(daily_stage, *popt),
+                                                               water_balance_daily_df['infiltration rate (m/day)'].values)
+# first day has no change in storage
+predict[:1] = False
+water_balance_daily_df['infiltration(cu.m)'] = np.where(
+    predict, water_balance_daily_df['infiltration rate (m/day)'].values * daily_area,
+    water_balance_daily_df['infiltration(cu.m)'].values)
+rain_water_balance_df = water_balance_daily_df[~dry]
 fig = plt.figure(figsize=(11.69, 8.27))
 plt.plot(rain_water_balance_df['stage(m)'], rain_water_balance_df['infiltration(cu.m)'], 'bo', label='Predicted Infiltration' )
 # # plt.vlines(1.9, 0, 100, 'g')
@@ -769,37 +726,22 @@ plt.savefig('/media/kiruba/New Volume/ACCUWA_Data/python_plots/check_dam_463/new
 Pumping calculation
 """
 
-merged_water_balance = pd.concat([dry_water_balance_df, rain_water_balance_df])
-pump_df = merged_water_balance[merged_water_balance['pumping status'] > 0]
-# print pump_df
-merged_water_balance['pumping (cu.m)'] = 0.000
-for index in pump_df.index:
-    merged_water_balance['pumping (cu.m)'][index.strftime(daily_format)] = -1.0*(merged_water_balance['change_storage(cu.m)'][index.strftime(daily_format)] +
-                                                                                 merged_water_balance['infiltration(cu.m)'][index.strftime(daily_format)] +
-                                                                                 merged_water_balance['Evaporation (cu.m)'][index.strftime(daily_format)] +
-                                                                                 merged_water_balance['overflow(cu.m)'][index.strftime(daily_format)])
+merged_water_balance = water_balance_daily_df.copy()
+# pumped volume is what the balance leaves after infiltration
+pumped = merged_water_balance['pumping status'].values > 0
+pump_volume = wb.balance_inflow(merged_water_balance, pumped, merged_water_balance['infiltration(cu.m)'].values)
+merged_water_balance['pumping (cu.m)'] = np.where(pumped, -1.0*pump_volume, 0.0)
 # raise SystemExit(0)
 """
 Inflow calculation
 """
 # merged_water_balance = pd.concat([dry_water_balance_df, rain_water_balance_df])
-merged_water_balance['Inflow (cu.m)'] = 0.000
-delta_s_rain = water_balance_daily_df['change_storage(cu.m)']
-inf_rain = merged_water_balance['infiltration(cu.m)']
-evap_rain = water_balance_daily_df['Evaporation (cu.m)']
-outflow_rain = water_balance_daily_df['overflow(cu.m)']
-pump_rain = merged_water_balance['pumping (cu.m)']
-for i, row in merged_water_balance.iterrows():
-    if i > min(merged_water_balance.index):
-        string1 = intern(row['status'])
-        string2 = intern('N')
-        if string1 != string2:
-            # i_1 = i - timedelta(days=1)
-            merged_water_balance['Inflow (cu.m)'][i.strftime(daily_format)] = (delta_s_rain[i.strftime(daily_format)] +
-                                                                               inf_rain[i.strftime(daily_format)] +
-                                                                               evap_rain[i.strftime(daily_format)] +
-                                                                               outflow_rain[i.strftime(daily_format)] +
-                                                                                  pump_rain[i.strftime(daily_format)])
+# first day has no change in storage
+wet = ~dry
+wet[:1] = False
+merged_water_balance['Inflow (cu.m)'] = wb.balance_inflow(merged_water_balance, wet,
+                                                          merged_water_balance['infiltration(cu.m)'].values,
+                                                          merged_water_balance['pumping (cu.m)'].values)
 
 
 # merged_water_balance = pd.concat([dry_water_balance_df, rain_water_balance_df])
@@ -839,10 +781,10 @@ print merged_water_balance['overflow(cu.m)'].sum()
 print merged_water_balance['Inflow (cu.m)'].sum()
 print merged_water_balance['pumping (cu.m)'].sum()
 
-wb = (merged_water_balance['Evaporation (cu.m)'].sum()+
-      merged_water_balance['infiltration(cu.m)'].sum() +
-      merged_water_balance['overflow(cu.m)'].sum()+merged_water_balance['pumping (cu.m)'].sum()) - merged_water_balance['Inflow (cu.m)'].sum()
-# print wb
+wb_residual = (merged_water_balance['Evaporation (cu.m)'].sum()+
+               merged_water_balance['infiltration(cu.m)'].sum() +
+               merged_water_balance['overflow(cu.m)'].sum()+merged_water_balance['pumping (cu.m)'].sum()) - merged_water_balance['Inflow (cu.m)'].sum()
+# print wb_residual
 merged_water_balance.index.name = 'Date'
 print merged_water_balance.head()
 merged_water_balance.to_csv('/media/kiruba/New Volume/ACCUWA_Data/Checkdam_water_balance/ch_463/et_infilt_463_w_of.csv')
\ No newline at end of file
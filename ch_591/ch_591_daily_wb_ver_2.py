@@ -226,11 +226,8 @@ Half hourly Extraterrestrial Radiation Calculation(J/m2/30min)
 sc_default = 1367.0  # Solar constant in W/m^2 is 1367.0.
 ch_591_lat = 13.260196
 ch_591_long = 77.512085
-weather_df['Rext (MJ/m2/30min)'] = 0.000
-for i in weather_df.index:
-    weather_df['Rext (MJ/m2/30min)'][i.strftime(date_format)] = (cd.extraterrestrial_irrad(local_datetime=i,
-                                                                                                   latitude_deg=ch_591_lat,
-                                                                                                   longitude_deg=ch_591_long))
+weather_df['Rext (MJ/m2/30min)'] = cd.extraterrestrial_irrad(local_datetime=weather_df.index,
+                                                           latitude_deg=ch_591_lat, longitude_deg=ch_591_long)
 """
 wind speed from km/h to m/s
 1 kmph = 0.277778 m/s
@@ -4,7 +4,6 @@ import matplotlib.pyplot as plt
 import mpld3 as m
 from mpl_toolkits.mplot3d import axes3d, Axes3D
 from matplotlib import rc
-from scipy.interpolate import griddata
 import numpy as np
 from matplotlib import cm
 from matplotlib.path import *
@@ -13,6 +12,8 @@ import matplotlib as mpl
 from matplotlib.ticker import MultipleLocator
 from matplotlib.ticker import MaxNLocator
 import checkdam.checkdam as cd
+import checkdam.stage_area as sa
+import checkdam.gridding as gr
 import checkdam.mynormalize as mn
 
 class MyAxes3D(axes3d.Axes3D):
@@ -153,6 +154,8 @@ data_1_df.to_csv('/media/kiruba/New Volume/r/r_dir/stream_profile/new_code/591/c
 X = data_1_df.x
 Y = data_1_df.y
 Z = data_1_df.z
+# triangulate the survey points once for all the grids below
+survey_grid = gr.SurveyGrid(X, Y)
 #
 # fig = plt.figure()
 # ax = fig.add_subplot(1,1,1, projection = '3d')
@@ -171,7 +174,7 @@ fig = plt.figure(figsize=(12, 7.414), facecolor='white')
 ax1 = fig.gca(projection='3d')
 xi = np.linspace(X.min(), X.max(), 100)
 yi = np.linspace(Y.min(), Y.max(), 100)
-zi = griddata((X, Y), Z, (xi[None, :], yi[:, None]), method='linear')    # create a uniform spaced grid
+zi = survey_grid.interpolate(Z, xi, yi)    # create a uniform spaced grid
 xig, yig = np.meshgrid(xi, yi)
 # surf = ax.plot_surface(xig, yig, zi, rstride=5, cstride=3, linewidth=0, cmap=cm.coolwarm, antialiased=False, rasterized=True)   # 3d plot
 surf = ax1.plot_surface(xig, yig, zi, rstride=1, cstride=1, cmap='Greys', shade=False, linewidth=0.25)   # 3d plot
@@ -221,7 +224,7 @@ yi = np.linspace(Y.min(), Y.max(), 100)
 # print len(xi)
 # print len(yi)
 # print len(Z)
-zi = griddata((X, Y), Z, (xi[None, :], yi[:, None]), method='linear')    # create a uniform spaced grid
+zi = survey_grid.interpolate(Z, xi, yi)    # create a uniform spaced grid
 # print zi.min()
 # print zi.max()
 # CS_1 = plt.contourf(xi, yi, zi, 36, alpha =.75, cmap= 'jet')
@@ -274,42 +277,7 @@ plt.gca().invert_xaxis()
 # plt.savefig('/media/kiruba/New Volume/r/r_dir/stream_profile/new_code/591/cont_2d')
 plt.show()
 # raise SystemExit(0)
-def contour_area(mpl_obj):
-    """
-    Returns a array of contour levels and
-    corresponding cumulative area of contours
-    :param mpl_obj: Matplotlib contour object
-    :return: [(level1, area1), (level1, area1+area2)]
-    """
-    #Refer: Nikolai Shokhirev http://www.numericalexpert.com/blog/area_calculation/
-    n_c = len(mpl_obj.collections)  # n_c = no of contours
-    print 'No. of contours = %s' % n_c
-    area = 0.0000
-    cont_area_array = []
-    for contour in range(n_c):
-        # area = 0
-        n_p = len(mpl_obj.collections[contour].get_paths())
-        zc = mpl_obj.levels[contour + 1]
-        print contour
-        print zc
-        for path in range(n_p):
-            p = mpl_obj.collections[contour].get_paths()[path]
-            v = p.vertices
-            print v
-            l = len(v)
-            s = 0.0000
-            for i in range(l):
-                j = (i+1) % l
-                s += (v[j, 0] - v[i, 0]) * (v[j, 1] + v[i, 1])
-                poly_area = 0.5*abs(s)
-            area += poly_area
-        print area
-        cont_area_array.append((zc, area))
-    return cont_area_array
-
-
-# contour_area(C)
-contour_a = contour_area(CS)
+stage_area_volume = sa.StageAreaVolume(xi, yi, zi)
 raise SystemExit(0)
 
 def poly_plot(xy, titlestr = "", margin = 0.25):
@@ -465,7 +433,7 @@ def areaofpolygon(polygon, i):
 # print z_3, area_3
 
 
-cont_area_df = pd.DataFrame(contour_a, columns=['Z', 'Area'])
+cont_area_df = stage_area_volume.table(levels[1:])[['Z', 'Area']]
 print cont_area_df
 
 plt.plot(cont_area_df['Z'], cont_area_df['Area'])
@@ -5,6 +5,7 @@ import pandas as pd
 import itertools
 from matplotlib import rc
 from spread import spread
+import checkdam.checkdam as cd
 import meteolib as met
 import evaplib
 from bisect import bisect_left, bisect_right
@@ -326,28 +327,7 @@ def calcvolume(profile, order, dy):
     """
 
     # print 'profile length = %s' % len(profile)
-    results = []
-
-    for stage in dz:
-        water_area = 0
-        for z1, z2 in pairwise(profile):
-            delev = (z2 - z1) / 10
-            elev = z1
-            for b in range(1, 11, 1):
-                elev += delev
-                if stage > elev:
-                    # print 'elev = %s' % elev
-                    water_area += (0.1 * (stage-elev))
-                    # print 'order = %s and dy = %s' %(order, dy)
-                    # print 'area = %s' % water_area
-
-            calc_vol = water_area * dy
-        # print 'calc vol = %s' % calc_vol
-        results.append(calc_vol)
-        # print 'results = %s' % results
-        # print 'results length = %s' % len(results)
-
-    output[('Volume_%s' % order)] = results
+    output[('Volume_%s' % order)] = cd.cross_section_area(profile, dz) * dy
 #input parameters
 base_file_591 = '/media/kiruba/New Volume/r/r_dir/stream_profile/new_code/591/base_profile_591.csv'
 check_dam_no = 591
@@ -16,6 +16,7 @@ import matplotlib as mpl
 import Pysolar as ps
 import pickle
 from scipy import stats
+import checkdam.hydraulics as hy
 
 # latex parameters
 rc('font', **{'family': 'sans-serif', 'sans-serif': ['Helvetica']})
@@ -501,16 +502,10 @@ Overflow
 full_stage = 1.1
 length_check_dam = 8.7
 width_check_dam = 0.613
-water_balance_df['overflow(cu.m)'] = 0.00
-for index in water_balance_df.index:
-    obs_stage = water_balance_df['stage(m)'][index.strftime(date_format)]
-    previous_time = index - timedelta(seconds=1800)
-    if (np.around(obs_stage, 2)) > full_stage:
-        effective_head = obs_stage - full_stage
-        if np.around(water_balance_df['stage(m)'][previous_time.strftime(date_format)],2) > full_stage:
-            water_balance_df['overflow(cu.m)'][index.strftime(date_format)] = 1800*1.84*width_check_dam*(effective_head**1.5)
-        else:
-            water_balance_df['overflow(cu.m)'][index.strftime(date_format)] = 900*1.84*width_check_dam*(effective_head**1.5)
+# first overflowing interval overflows for half of the interval
+water_balance_df['overflow(cu.m)'] = hy.overflow_volume(water_balance_df['stage(m)'], full_stage,
+                                                        weir_length=width_check_dam, coefficient=1.84,
+                                                        first_interval='half')
 
 print min(water_balance_df.index)
 water_balance_df = water_balance_df["2014-05-15":]
@@ -545,15 +540,8 @@ water_balance_df['Evaporation (cu.m)'] = (water_balance_df['Evaporation (mm/30mi
 """
 Pumping
 """
-for index, row in water_balance_df.iterrows():
-    if index > min(water_balance_df.index):
-        previous_time = index - timedelta(seconds=1800)
-        obs_stage = row['stage(m)']
-        v1 = water_balance_df['volume (cu.m)'][previous_time.strftime(date_format)]
-        v2 = water_balance_df['volume (cu.m)'][index.strftime(date_format)]
-        e1 = water_balance_df['Evaporation (cu.m)'][index.strftime(date_format)]
-        if ((v1 -v2) > (14 + e1)) and obs_stage < 1.9:
-            water_balance_df['pumping status'][index.strftime(date_format)] = 1
+water_balance_df['pumping status'] = hy.pumping_status(water_balance_df['volume (cu.m)'], water_balance_df['stage(m)'],
+                                                       1.9, threshold=14 + water_balance_df['Evaporation (cu.m)'])
 
 """
 Daily Totals of Rain, Evaporation, Overflow
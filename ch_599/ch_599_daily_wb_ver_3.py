@@ -156,11 +156,8 @@ Half hourly Extraterrestrial Radiation Calculation(J/m2/30min)
 sc_default = 1367.0  # Solar constant in W/m^2 is 1367.0.
 ch_599_lat = 13.250119
 ch_599_long = 77.514195
-weather_df['Rext (MJ/m2/30min)'] = 0.000
-for i in weather_df.index:
-    weather_df.loc[i.strftime('%Y-%m-%d %H:%M:%S'),'Rext (MJ/m2/30min)'] = (cd.extraterrestrial_irrad(local_datetime=i,
-                                                                                                   latitude_deg=ch_599_lat,
-                                                                                                   longitude_deg=ch_599_long))
+weather_df['Rext (MJ/m2/30min)'] = cd.extraterrestrial_irrad(local_datetime=weather_df.index,
+                                                           latitude_deg=ch_599_lat, longitude_deg=ch_599_long)
 """
 wind speed from km/h to m/s
 1 kmph = 0.277778 m/s
@@ -4,6 +4,7 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import itertools
 from spread import spread
+import checkdam.checkdam as cd
 """
 Stage Volume relation estimation from survey data
 """
@@ -29,28 +30,7 @@ def calcvolume(profile, order, dy):
     """
 
     # print 'profile length = %s' % len(profile)
-    results = []
-
-    for stage in dz:
-        water_area = 0
-        for z1, z2 in pairwise(profile):
-            delev = (z2 - z1) / 10
-            elev = z1
-            for b in range(1, 11, 1):
-                elev += delev
-                if stage > elev:
-                    # print 'elev = %s' % elev
-                    water_area += (0.1 * (stage-elev))
-                    # print 'order = %s and dy = %s' %(order, dy)
-                    # print 'area = %s' % water_area
-
-            calc_vol = water_area * dy
-        # print 'calc vol = %s' % calc_vol
-        results.append(calc_vol)
-        # print 'results = %s' % results
-        # print 'results length = %s' % len(results)
-
-    output[('Volume_%s' % order)] = results
+    output[('Volume_%s' % order)] = cd.cross_section_area(profile, dz) * dy
 #input parameters
 base_file = '/media/kiruba/New Volume/ACCUWA_Data/Checkdam_water_balance/ch_599/created_profile_599.csv'
 check_dam_no = 599
@@ -3,6 +3,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 import checkdam.checkdam as cd
+import checkdam.hydraulics as hy
 from matplotlib import rc
 import matplotlib.cm as cmx
 import matplotlib.colors as colors
@@ -151,11 +152,8 @@ Half hourly Extraterrestrial Radiation Calculation(J/m2/30min)
 sc_default = 1367.0  # Solar constant in W/m^2 is 1367.0.
 ch_591_lat = 13.260196
 ch_591_long = 77.512085
-weather_df['Rext (MJ/m2/30min)'] = 0.000
-for i in weather_df.index:
-    weather_df['Rext (MJ/m2/30min)'][i.strftime('%Y-%m-%d %H:%M:%S')] = (cd.extraterrestrial_irrad(local_datetime=i,
-                                                                                                   latitude_deg=ch_591_lat,
-                                                                                                   longitude_deg=ch_591_long))
+weather_df['Rext (MJ/m2/30min)'] = cd.extraterrestrial_irrad(local_datetime=weather_df.index,
+                                                           latitude_deg=ch_591_lat, longitude_deg=ch_591_long)
 """
 wind speed from km/h to m/s
 1 kmph = 0.277778 m/s
@@ -213,25 +211,9 @@ Overflow
 length_check_dam = 17.0
 width_check_dam = 0.5
 no_of_contractions = 0
-water_balance_df['overflow(cu.m)'] = 0.000
-for index, row in water_balance_df.iterrows():
-    obs_stage = row['stage(m)']
-    if cd.myround(a=obs_stage, decimals=2) > full_stage:
-        effective_head = obs_stage - full_stage
-        previous_time = index - timedelta(seconds=1800)
-        if cd.myround(a=water_balance_df['stage(m)'][previous_time.strftime(date_format)], decimals=2) > full_stage:
-            water_balance_df['overflow(cu.m)'][index.strftime(date_format)] = 1800 * 1.84 * width_check_dam * (
-                effective_head ** 1.5)
-        else:
-            x1 = 0
-            x2 = 1800
-            y1 = cd.myround(a=water_balance_df['stage(m)'][previous_time.strftime(date_format)], decimals=2)
-            y2 = cd.myround(a=obs_stage, decimals=2)
-            slope = (y1 - y2) / (x1 - x2)
-            intercept = y2 - (slope * x2)
-            time_of_overflow = 1800 - ((full_stage - intercept) / slope)
-            water_balance_df['overflow(cu.m)'][
-                index.strftime(date_format)] = time_of_overflow * 1.84 * width_check_dam * (effective_head ** 1.5)
+water_balance_df['overflow(cu.m)'] = hy.overflow_volume(water_balance_df['stage(m)'], full_stage,
+                                                        weir_length=width_check_dam, coefficient=1.84,
+                                                        decimals=2, rounding=cd.myround)
 
 water_balance_df = water_balance_df["2014-05-15":]
 print "overflow"
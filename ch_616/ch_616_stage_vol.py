@@ -11,6 +11,7 @@ from matplotlib import cm
 from matplotlib.path import *
 from mpl_toolkits.mplot3d import axes3d, Axes3D
 import matplotlib as mpl
+import checkdam.stage_area as sa
 
 # latex parameters
 rc('font', **{'family': 'sans-serif', 'sans-serif': ['Helvetica']})
@@ -174,40 +175,9 @@ plt.show()
 #     print(C.levels[i])
 
 
-def contour_area(mpl_obj):
-    """
-    Returns a array of contour levels and
-    corresponding cumulative area of contours
-    :param mpl_obj: Matplotlib contour object
-    :return: [(level1, area1), (level1, area1+area2)]
-    """
-    #Refer: Nikolai Shokhirev http://www.numericalexpert.com/blog/area_calculation/
-    n_c = len(mpl_obj.collections)  # n_c = no of contours
-    print 'No. of contours = %s' % n_c
-    area = 0.0000
-    cont_area_array = []
-    for contour in range(n_c):
-        # area = 0
-        n_p = len(mpl_obj.collections[contour].get_paths())
-        zc = mpl_obj.levels[contour]
-        for path in range(n_p):
-            p = mpl_obj.collections[contour].get_paths()[path]
-            v = p.vertices
-            l = len(v)
-            s = 0.0000
-            for i in range(l):
-                j = (i+1) % l
-                s += (v[j, 0] - v[i, 0]) * (v[j, 1] + v[i, 1])
-                poly_area = 0.5*abs(s)
-            area += poly_area
-        cont_area_array.append((zc, area))
-    return cont_area_array
-
-
-# contour_area(C)
-contour_a = contour_area(CS)
-
-cont_area_df = pd.DataFrame(contour_a, columns=['Z', 'Area'])
+stage_area_volume = sa.StageAreaVolume(xi, yi, zi)
+
+cont_area_df = stage_area_volume.table(levels[1:])[['Z', 'Area']]
 plt.plot(cont_area_df['Z'], cont_area_df['Area'])
 plt.rc('text', usetex=True)
 plt.rc('font', family='serif')
@@ -170,11 +170,8 @@ Half hourly Extraterrestrial Radiation Calculation(J/m2/30min)
 sc_default = 1367.0  # Solar constant in W/m^2 is 1367.0.
 ch_623_lat = 13.353
 ch_623_long = 77.549
-weather_df['Rext (MJ/m2/30min)'] = 0.000
-for i in weather_df.index:
-    weather_df['Rext (MJ/m2/30min)'][i.strftime(date_format)] = (cd.extraterrestrial_irrad(local_datetime=i,
-                                                                                           latitude_deg=ch_623_lat,
-                                                                                           longitude_deg=ch_623_long))
+weather_df['Rext (MJ/m2/30min)'] = cd.extraterrestrial_irrad(local_datetime=weather_df.index,
+                                                           latitude_deg=ch_623_lat, longitude_deg=ch_623_long)
 """
 wind speed from km/h to m/s
 1 kmph = 0.277778 m/s
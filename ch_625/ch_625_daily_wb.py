@@ -139,10 +139,8 @@ sc_default = 1367.0  # Solar constant in W/m^2 is 1367.0.
 ch_625_lat = 13.364112
 ch_625_long = 77.556057
 
-weather_df['Rext (MJ/m2/30min)'] = 0.000
-for i in weather_df.index:
-    weather_df['Rext (MJ/m2/30min)'][i.strftime(date_format)] = (
-        cd.extraterrestrial_irrad(local_datetime=i, latitude_deg=ch_625_lat, longitude_deg=ch_625_long))
+weather_df['Rext (MJ/m2/30min)'] = cd.extraterrestrial_irrad(local_datetime=weather_df.index,
+                                                           latitude_deg=ch_625_lat, longitude_deg=ch_625_long)
 
 """
 wind speed from km/h to m/s
@@ -3,6 +3,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 import checkdam.checkdam as cd
+import checkdam.hydraulics as hy
 from matplotlib import rc
 import matplotlib.cm as cmx
 import matplotlib.colors as colors
@@ -153,11 +154,8 @@ Half hourly Extraterrestrial Radiation Calculation(J/m2/30min)
 sc_default = 1367.0  # Solar constant in W/m^2 is 1367.0.
 ch_634_lat = 13.365621
 ch_634_long = 77.559051
-weather_df['Rext (MJ/m2/30min)'] = 0.000
-for i in weather_df.index:
-    weather_df['Rext (MJ/m2/30min)'][i.strftime('%Y-%m-%d %H:%M:%S')] = (cd.extraterrestrial_irrad(local_datetime=i,
-                                                                                                   latitude_deg=ch_634_lat,
-                                                                                                   longitude_deg=ch_634_long))
+weather_df['Rext (MJ/m2/30min)'] = cd.extraterrestrial_irrad(local_datetime=weather_df.index,
+                                                           latitude_deg=ch_634_lat, longitude_deg=ch_634_long)
 """
 wind speed from km/h to m/s
 1 kmph = 0.277778 m/s
@@ -197,43 +195,17 @@ stage_vol_df = pd.read_csv('/media/kiruba/New Volume/ACCUWA_Data/Checkdam_water_
 stage_vol_df.drop('sno', inplace=True, axis=1)
 stage_vol_df.set_index(stage_vol_df['stage_m'], inplace=True)
 water_balance_df = weather_stage_avl_df[['Rain Collection (mm)', 'Evaporation (mm/30min)', 'stage(m)']]
-water_balance_df['volume (cu.m)'] = 0.000
-for index, row in water_balance_df.iterrows():
-    obs_stage = row['stage(m)']  # observed stage
-    if obs_stage >= stage_cutoff:
-        x1, x2 = cd.find_range(stage_vol_df['stage_m'].tolist(), obs_stage)
-        x_diff = x2 - x1
-        y1 = stage_vol_df['total_vol_cu_m'][x1]
-        y2 = stage_vol_df['total_vol_cu_m'][x2]
-        y_diff = y2 - y1
-        slope = y_diff / x_diff
-        y_intercept = y2 - (slope * x2)
-        water_balance_df['volume (cu.m)'][index.strftime('%Y-%m-%d %H:%M:%S')] = (slope * obs_stage) + y_intercept
+stage_vol = cd.RatingCurve.from_df(stage_vol_df, value_column='total_vol_cu_m', stage_cutoff=stage_cutoff)
+water_balance_df['volume (cu.m)'] = stage_vol(water_balance_df['stage(m)'])
 """
 Overflow
 """
 length_check_dam = 12.0
 width_check_dam = 0.6
 no_of_contractions = 0
-water_balance_df['overflow(cu.m)'] = 0.000
-for index, row in water_balance_df.iterrows():
-    obs_stage = row['stage(m)']
-    if cd.myround(a=obs_stage, decimals=3) > full_stage:
-        effective_head = obs_stage - full_stage
-        previous_time = index - timedelta(seconds=1800)
-        if cd.myround(a=water_balance_df['stage(m)'][previous_time.strftime(date_format)], decimals=3) > full_stage:
-            water_balance_df['overflow(cu.m)'][index.strftime(date_format)] = 1800 * 1.84 * width_check_dam * (
-                effective_head ** 1.5)
-        else:
-            x1 = 0
-            x2 = 1800
-            y1 = cd.myround(a=water_balance_df['stage(m)'][previous_time.strftime(date_format)], decimals=3)
-            y2 = cd.myround(a=obs_stage, decimals=3)
-            slope = (y1 - y2) / (x1 - x2)
-            intercept = y2 - (slope * x2)
-            time_of_overflow = 1800 - ((full_stage - intercept) / slope)
-            water_balance_df['overflow(cu.m)'][
-                index.strftime(date_format)] = time_of_overflow * 1.84 * width_check_dam * (effective_head ** 1.5)
+water_balance_df['overflow(cu.m)'] = hy.overflow_volume(water_balance_df['stage(m)'], full_stage,
+                                                        weir_length=width_check_dam, coefficient=1.84,
+                                                        decimals=3, rounding=cd.myround)
 
 water_balance_df = water_balance_df["2014-07-18":]
 print "overflow"
@@ -246,18 +218,8 @@ stage_area_df.drop('sno', inplace=True, axis=1)
 # set stage as index
 stage_area_df.set_index(stage_area_df['stage_m'], inplace=True)
 # create empty column
-water_balance_df['ws_area(sq.m)'] = 0.000
-for index, row in water_balance_df.iterrows():
-    obs_stage = row['stage(m)']  # observed stage
-    if obs_stage >= stage_cutoff:
-        x1, x2 = cd.find_range(stage_area_df['stage_m'].tolist(), obs_stage)
-        x_diff = x2 - x1
-        y1 = stage_area_df['total_area_sq_m'][x1]
-        y2 = stage_area_df['total_area_sq_m'][x2]
-        y_diff = y2 - y1
-        slope = y_diff / x_diff
-        y_intercept = y2 - (slope * x2)
-        water_balance_df['ws_area(sq.m)'][index.strftime('%Y-%m-%d %H:%M:%S')] = (slope * obs_stage) + y_intercept
+stage_area = cd.RatingCurve.from_df(stage_area_df, value_column='total_area_sq_m', stage_cutoff=stage_cutoff)
+water_balance_df['ws_area(sq.m)'] = stage_area(water_balance_df['stage(m)'])
 """
 Evaporation Volume estimation
 """
@@ -275,18 +237,7 @@ stage_df = water_balance_df[['stage(m)']]
 stage_df = stage_df.resample('12H', how=np.mean)
 # print stage_df.head()
 water_balance_daily_df = sum_df.join(stage_df, how='left')
-water_balance_daily_df['ws_area(sq.m)'] = 0.000
-for index, row in water_balance_daily_df.iterrows():
-    obs_stage = row['stage(m)']  # observed stage
-    if obs_stage >= stage_cutoff:
-        x1, x2 = cd.find_range(stage_area_df['stage_m'].tolist(), obs_stage)
-        x_diff = x2 - x1
-        y1 = stage_area_df['total_area_sq_m'][x1]
-        y2 = stage_area_df['total_area_sq_m'][x2]
-        y_diff = y2 - y1
-        slope = y_diff / x_diff
-        y_intercept = y2 - (slope * x2)
-        water_balance_daily_df['ws_area(sq.m)'][index.strftime(date_format)] = (slope * obs_stage) + y_intercept
+water_balance_daily_df['ws_area(sq.m)'] = stage_area(water_balance_daily_df['stage(m)'])
 """
 Change in storage
 """
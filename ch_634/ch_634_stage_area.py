@@ -9,6 +9,7 @@ from mpl_toolkits.mplot3d import axes3d, Axes3D
 import matplotlib as mpl
 import matplotlib.colors as mc
 import checkdam.checkdam as cd
+import checkdam.stage_area as sa
 
 # latex parameters
 rc('font', **{'family': 'sans-serif', 'sans-serif': ['Helvetica']})
@@ -107,9 +108,8 @@ plt.gca().invert_xaxis()
 plt.savefig('/media/kiruba/New Volume/ACCUWA_Data/python_plots/check_dam_634/cont_2d')
 plt.show()
 
-contour_a = cd.contour_area(CS)
-
-cont_area_df = pd.DataFrame(contour_a, columns=['Z', 'Area'])
+stage_area_volume = sa.StageAreaVolume(xi, yi, zi)
+cont_area_df = stage_area_volume.table(levels[1:])[['Z', 'Area']]
 plt.plot(cont_area_df['Z'], cont_area_df['Area'])
 plt.rc('text', usetex=True)
 plt.rc('font', family='serif')
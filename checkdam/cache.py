@@ -0,0 +1,288 @@
+__author__ = 'kiruba'
+"""
+On disk cache for parsed and cleaned time series.
+A cached result is keyed by the content hash of its source files, the function that made it (its bytecode,
+defaults, closure and the contents of the file it is defined in) and its parameters (array and frame contents
+are hashed), so a changed source file, function or parameter gives a new key and the old result is not used.
+Default storage keeps the datetime index and each column as numpy .npy files, which are memory mapped copy on
+write on load, so a cached result can be changed in place like a new one without changing the cache.
+HDF5 (needs pytables) and parquet (needs pyarrow) storage can be used when those packages are installed.
+"""
+import os
+import json
+import pickle
+import shutil
+import hashlib
+import inspect
+import tempfile
+import functools
+import numpy as np
+import pandas as pd
+
+storages = ['npy', 'hdf', 'parquet']
+meta_file = 'meta.json'
+labels_file = 'labels.pkl'
+# changes when the layout of an entry changes, entries of other versions are not read
+cache_version = 2
+hash_file = 'source_hashes.json'
+
+
+def file_hash(path, block_size=2 ** 20):
+    """
+    sha1 hash of file contents
+
+    :param path: file path
+    :param block_size: bytes read at a time
+    :return: hex digest
+    """
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as source:
+        block = source.read(block_size)
+        while block:
+            sha1.update(block)
+            block = source.read(block_size)
+    return sha1.hexdigest()
+
+
+def update_code_hash(sha1, code):
+    """
+    Adds bytecode, names and constants of a code object (and of the functions defined in it) to sha1
+
+    :param sha1: hashlib sha1 object
+    :param code: code object, function.__code__
+    """
+    sha1.update(code.co_code)
+    sha1.update(repr(code.co_names).encode('utf-8'))
+    for constant in code.co_consts:
+        if inspect.iscode(constant):
+            update_code_hash(sha1, constant)
+        else:
+            sha1.update(repr(constant).encode('utf-8'))
+
+
+class DataCache(object):
+    """
+    Cache of dataframes and series in a directory
+
+    Examples:
+        >>> cache = DataCache('/media/kiruba/New Volume/cache')
+        >>> water_level = cache.load(cd.read_correct_ch_dam_data, source_files=[block_1], args=(block_1, slope, intercept), kwargs={'stage_cutoff': 0.1})
+    """
+    def __init__(self, cache_dir, storage='npy'):
+        if storage not in storages:
+            raise ValueError("storage must be one of {0}".format(storages))
+        self.cache_dir = cache_dir
+        self.storage = storage
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        self.source_hashes = self.read_source_hashes()
+
+    def read_source_hashes(self):
+        path = os.path.join(self.cache_dir, hash_file)
+        if os.path.exists(path):
+            with open(path) as hashes:
+                return json.load(hashes)
+        return {}
+
+    def source_hash(self, path):
+        """
+        Content hash of source file, reused while file size and modification time are unchanged
+
+        :param path: file path
+        :return: hex digest
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime]
+        known = self.source_hashes.get(path)
+        if known is not None and known[0] == signature:
+            return known[1]
+        digest = file_hash(path)
+        self.source_hashes[path] = [signature, digest]
+        # write to a temporary file first, other processes may read the hashes at the same time
+        handle, temporary = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(handle, 'w') as hashes:
+            json.dump(self.source_hashes, hashes)
+        os.rename(temporary, os.path.join(self.cache_dir, hash_file))
+        return digest
+
+    def update_hash(self, sha1, value):
+        """
+        Adds value to sha1 by contents: arrays and pandas objects by their data, functions by their code,
+        containers item by item, anything else by repr
+
+        :param sha1: hashlib sha1 object
+        :param value: parameter or function
+        """
+        sha1.update(type(value).__name__.encode('utf-8'))
+        if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+            if isinstance(value, pd.DataFrame):
+                sha1.update(repr(list(value.columns)).encode('utf-8'))
+                sha1.update(repr([str(dtype) for dtype in value.dtypes]).encode('utf-8'))
+            else:
+                sha1.update(repr((value.name, str(value.dtype))).encode('utf-8'))
+            if isinstance(value, pd.Index):
+                sha1.update(pd.util.hash_pandas_object(value).values.tobytes())
+            else:
+                sha1.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+                self.update_hash(sha1, value.index)
+        elif isinstance(value, np.ndarray):
+            sha1.update(repr((str(value.dtype), value.shape)).encode('utf-8'))
+            if value.dtype == object:
+                sha1.update(pickle.dumps(value.tolist(), protocol=2))
+            else:
+                sha1.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, (list, tuple)):
+            sha1.update(str(len(value)).encode('utf-8'))
+            for item in value:
+                self.update_hash(sha1, item)
+        elif isinstance(value, dict):
+            for item_key in sorted(value, key=repr):
+                sha1.update(repr(item_key).encode('utf-8'))
+                self.update_hash(sha1, value[item_key])
+        elif isinstance(value, functools.partial):
+            self.update_hash(sha1, [value.func, value.args, value.keywords or {}])
+        elif hasattr(value, '__code__'):
+            self.update_function_hash(sha1, value)
+        else:
+            sha1.update(repr(value).encode('utf-8'))
+
+    def update_function_hash(self, sha1, function):
+        # name, bytecode, defaults, closure and the file the function is defined in (for functions it calls)
+        sha1.update(getattr(function, '__name__', '').encode('utf-8'))
+        update_code_hash(sha1, function.__code__)
+        self.update_hash(sha1, list(function.__defaults__ or ()))
+        self.update_hash(sha1, [cell.cell_contents for cell in function.__closure__ or ()])
+        try:
+            source_file = inspect.getsourcefile(function)
+        except TypeError:
+            source_file = None
+        if source_file is not None and os.path.exists(source_file):
+            sha1.update(self.source_hash(source_file).encode('utf-8'))
+
+    def key(self, function, source_files, args=(), kwargs=None):
+        """
+        Cache key from source file contents, function and parameters
+
+        :param function: function that reads and processes the source files
+        :param source_files: list of files the result depends on
+        :param args: positional arguments of function
+        :param kwargs: keyword arguments of function
+        :return: hex digest
+        """
+        kwargs = kwargs or {}
+        sha1 = hashlib.sha1()
+        self.update_hash(sha1, function)
+        for source_file in source_files:
+            sha1.update(self.source_hash(source_file).encode('utf-8'))
+        self.update_hash(sha1, list(args))
+        self.update_hash(sha1, kwargs)
+        sha1.update('{0}.{1}'.format(self.storage, cache_version).encode('utf-8'))
+        return sha1.hexdigest()
+
+    def load(self, function, source_files, args=(), kwargs=None):
+        """
+        Returns cached result of function(*args, **kwargs), calls and caches it if not in cache
+
+        :param function: function returning a pandas DataFrame or Series
+        :param source_files: list of files the result depends on
+        :param args: positional arguments of function
+        :param kwargs: keyword arguments of function
+        :return: pandas DataFrame or Series
+        """
+        kwargs = kwargs or {}
+        entry = os.path.join(self.cache_dir, self.key(function, source_files, args, kwargs))
+        if os.path.exists(os.path.join(entry, meta_file)):
+            return self.read(entry)
+        data = function(*args, **kwargs)
+        self.write(entry, data)
+        return data
+
+    def write(self, entry, data):
+        is_series = isinstance(data, pd.Series)
+        df = data.to_frame() if is_series else data
+        # labels of any type (tuples, MultiIndex, numbers) are pickled, columns are stored by position
+        labels = {'columns': df.columns, 'index_name': df.index.name, 'name': data.name if is_series else None}
+        meta = {'storage': self.storage, 'series': is_series, 'columns': len(df.columns),
+                'datetime_index': isinstance(df.index, pd.DatetimeIndex)}
+        # write to a temporary directory first, so a half written entry is never read
+        temporary = tempfile.mkdtemp(dir=self.cache_dir)
+        try:
+            if self.storage == 'npy':
+                index = df.index.values.astype('datetime64[ns]').view('int64') if meta['datetime_index'] else np.asarray(df.index)
+                np.save(os.path.join(temporary, 'index.npy'), index, allow_pickle=index.dtype == object)
+                meta['index_dtype'] = str(index.dtype)
+                meta['dtypes'] = []
+                for i in range(len(df.columns)):
+                    values = np.asarray(df.iloc[:, i].values)
+                    if np.issubdtype(values.dtype, np.datetime64):
+                        values = values.astype('datetime64[ns]')
+                    np.save(os.path.join(temporary, '{0}.npy'.format(i)), values, allow_pickle=values.dtype == object)
+                    meta['dtypes'].append(str(values.dtype))
+            else:
+                stored = pd.DataFrame(dict((str(i), df.iloc[:, i]) for i in range(len(df.columns))),
+                                      columns=[str(i) for i in range(len(df.columns))])
+                stored.index = df.index.rename(None)
+                if self.storage == 'hdf':
+                    stored.to_hdf(os.path.join(temporary, 'data.h5'), key='data', mode='w')
+                else:
+                    stored.to_parquet(os.path.join(temporary, 'data.parquet'))
+            with open(os.path.join(temporary, labels_file), 'wb') as labels_pickle:
+                pickle.dump(labels, labels_pickle, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(os.path.join(temporary, meta_file), 'w') as meta_json:
+                json.dump(meta, meta_json)
+            try:
+                os.rename(temporary, entry)
+            except OSError:
+                # written by another process in the meantime
+                shutil.rmtree(temporary, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+
+    def read(self, entry):
+        with open(os.path.join(entry, meta_file)) as meta_json:
+            meta = json.load(meta_json)
+        with open(os.path.join(entry, labels_file), 'rb') as labels_pickle:
+            labels = pickle.load(labels_pickle)
+        if meta['storage'] == 'npy':
+            index = self.read_npy(os.path.join(entry, 'index.npy'), meta['index_dtype'])
+            if meta['datetime_index']:
+                index = pd.DatetimeIndex(np.asarray(index).view('datetime64[ns]'))
+            else:
+                index = pd.Index(index)
+            data = {}
+            for i in range(meta['columns']):
+                data[i] = self.read_npy(os.path.join(entry, '{0}.npy'.format(i)), meta['dtypes'][i])
+            df = pd.DataFrame(data, index=index, columns=list(range(meta['columns'])), copy=False)
+        elif meta['storage'] == 'hdf':
+            df = pd.read_hdf(os.path.join(entry, 'data.h5'), key='data')
+        else:
+            df = pd.read_parquet(os.path.join(entry, 'data.parquet'))
+        df.columns = labels['columns']
+        df.index.name = labels['index_name']
+        if meta['series']:
+            series = df.iloc[:, 0]
+            series.name = labels['name']
+            return series
+        return df
+
+    @staticmethod
+    def read_npy(path, dtype):
+        # numeric arrays are memory mapped copy on write (writable, changes stay in memory),
+        # object arrays have to be unpickled
+        if dtype == 'object':
+            return np.load(path, allow_pickle=True)
+        return np.load(path, mmap_mode='c')
+
+    def clear(self):
+        """
+        Removes all cached results and source hashes
+        """
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        self.source_hashes = {}
@@ -9,6 +9,8 @@ import math
 from datetime import datetime
 from datetime import timedelta
 import meteolib as met
+import solar
+import qc
 # import evaplib
 import scipy as sp
 import mynormalize
@@ -82,43 +84,54 @@ def pairwise(iterable):
     return itertools.izip(a, b)
 
 
-def calcvolume(y_value_list, elevation_data, dam_height):
+def cross_section_area(profile, stages, no_of_sub_segments=10, width=0.1):
+    """
+    Wetted area of a surveyed cross section for every stage, evaluated for all stages and
+    all segments of the profile at once.
+    Each pair of consecutive points is divided into no_of_sub_segments strips of width 0.1 m, and the
+    strip area below stage is added, as in the nested loops of calcvolume.
+
+    :param profile: elevation of points of the cross section (eg. elevation_data["Y_1.0"])
+    :param stages: array of stages
+    :param no_of_sub_segments: number of strips between two surveyed points
+    :param width: width of a strip in m
+    :return: array of wetted area in sq.m for each stage
+    """
+    profile = np.asarray(profile, dtype=float)
+    stages = np.asarray(stages, dtype=float)
+    if len(profile) < 2:
+        return np.zeros(len(stages))
+    # strip elevations z1 + delev, z1 + 2 * delev, ... accumulated in the same order as the loop
+    delev = (profile[1:] - profile[:-1]) / no_of_sub_segments
+    steps = np.empty((len(delev), no_of_sub_segments + 1))
+    steps[:, 0] = profile[:-1]
+    steps[:, 1:] = delev[:, np.newaxis]
+    elev = np.cumsum(steps, axis=1)[:, 1:].ravel()
+    depth = stages[:, np.newaxis] - elev[np.newaxis, :]
+    with np.errstate(invalid='ignore'):
+        wet = depth > 0
+    return np.where(wet, width * depth, 0.0).sum(axis=1)
+
+
+def calcvolume(y_value_list, elevation_data, dam_height, stage_interval=0.05):
     """
     Modified function to calculate stage vs volume relationship from elevation data
 
     :param y_value_list: List of Y values, y1, y2,...
     :param elevation_data: Elevation data with headers df.Yy1, df.Yy2
     :param dam_height: check dam height in metre
+    :param stage_interval: stage resolution in metre, default 5 cm
     :return: pandas dataframe with stage and corresponding volume
     """
-    no_of_stage_interval = dam_height / 0.05
-    dz = list((spread(0.00, dam_height, int(no_of_stage_interval), mode=3)))
-    index = [range(len(dz))]  # no of stage intervals
-    columns = ['stage_m']
-    data = np.array(dz)
-    output = pd.DataFrame(data, index=index, columns=columns)
+    no_of_stage_interval = dam_height / stage_interval
+    dz = np.array(list(spread(0.00, dam_height, int(no_of_stage_interval), mode=3)))
+    total_volume = np.zeros(len(dz))
     for l1, l2 in pairwise(y_value_list):
-        results = []
         profile = elevation_data["Y_%s" % float(l1)]
-        order = l1
         dy = int(l2 - l1)
-        for stage in dz:
-            water_area = 0
-            for z1, z2 in pairwise(profile):
-                delev = (z2 - z1) / 10
-                elev = z1
-                for b in range(1, 11, 1):
-                    elev += delev
-                    if stage > elev:
-                        water_area += (0.1 * (stage - elev))
-                calc_vol = water_area * dy
-            results.append(calc_vol)
-
-        output[('Volume_%s' % order)] = results
-
-    output_series = output.filter(regex="Volume_")
-    output["total_vol_cu_m"] = output_series.sum(axis=1)
-    final_results = output[['stage_m', "total_vol_cu_m"]]
+        total_volume += cross_section_area(profile, dz) * dy
+    final_results = pd.DataFrame({'stage_m': dz, 'total_vol_cu_m': total_volume}, index=range(len(dz)),
+                                 columns=['stage_m', 'total_vol_cu_m'])
     return final_results
 
 
@@ -142,6 +155,107 @@ def find_range(array, x):
         return min(array), max(array)
 
 
+def interpolate_range(array_x, array_y, x):
+    """
+    Vectorised piecewise linear interpolation with the same bounding intervals as find_range.
+    Values outside the table are extrapolated along the line joining the first and last breakpoints,
+    which is what find_range followed by slope/intercept interpolation gives.
+
+    :param array_x: sorted breakpoints (eg. stage)
+    :param array_y: values at breakpoints (eg. volume or area)
+    :param x: array of interpolation values
+    :return: array of interpolated values
+    :rtype: np.ndarray
+    """
+    array_x = np.asarray(array_x, dtype=float)
+    array_y = np.asarray(array_y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    last = len(array_x) - 1
+    start = np.searchsorted(array_x, x, side='left')
+    inside = x < array_x[last]
+    # start = 0 gives start - 1 = -1, i.e. the last breakpoint, same as array[start-1] in find_range
+    lower = np.where(inside, start - 1, 0)
+    upper = np.where(inside, np.minimum(start, last), last)
+    x1 = array_x[lower]
+    x2 = array_x[upper]
+    y1 = array_y[lower]
+    y2 = array_y[upper]
+    slope = (y2 - y1) / (x2 - x1)
+    intercept = y2 - (slope * x2)
+    return (slope * x) + intercept
+
+
+class RatingCurve(object):
+    """
+    Stage vs volume (or area) relationship of a check dam.
+    Breakpoints are sorted once, so a whole stage series is converted in a single call.
+
+    Examples:
+        >>> stage_vol = RatingCurve.from_csv('stage_vol.csv', value_column='total_vol_cu_m')
+        >>> water_balance_df['volume (cu.m)'] = stage_vol(water_balance_df['stage(m)'])
+    """
+    def __init__(self, stage, value, stage_cutoff=0.1):
+        stage = np.asarray(stage, dtype=float)
+        value = np.asarray(value, dtype=float)
+        if stage.shape != value.shape:
+            raise ValueError("stage and value must have the same length")
+        if len(stage) < 2:
+            raise ValueError("atleast two breakpoints are needed for interpolation")
+        # sort and drop repeated breakpoints, first one wins like bisect_left
+        stage, first = np.unique(stage, return_index=True)
+        self.stage = stage
+        self.value = value[first]
+        self.stage_cutoff = stage_cutoff
+
+    @classmethod
+    def from_df(cls, df, value_column, stage_column='stage_m', stage_cutoff=0.1):
+        return cls(stage=df[stage_column].values, value=df[value_column].values, stage_cutoff=stage_cutoff)
+
+    @classmethod
+    def from_csv(cls, csv_file, value_column, stage_column='stage_m', stage_cutoff=0.1):
+        df = pd.read_csv(csv_file, sep=',', header=0)
+        return cls.from_df(df, value_column=value_column, stage_column=stage_column, stage_cutoff=stage_cutoff)
+
+    def interpolate(self, obs_stage):
+        """
+        Interpolate without applying stage cutoff
+
+        :param obs_stage: float, array or pandas series of stage [m]
+        :return: interpolated value, same type as input
+        """
+        result = interpolate_range(self.stage, self.value, obs_stage)
+        return self._wrap(obs_stage, result)
+
+    def __call__(self, obs_stage):
+        """
+        Interpolate and set values for stage below stage cutoff (and missing stage) to zero
+
+        :param obs_stage: float, array or pandas series of stage [m]
+        :return: interpolated value, same type as input
+        """
+        stage = np.asarray(obs_stage, dtype=float)
+        result = interpolate_range(self.stage, self.value, stage)
+        if self.stage_cutoff is not None:
+            result = np.where(stage >= self.stage_cutoff, result, 0.0)
+        return self._wrap(obs_stage, result)
+
+    def inverse(self, stage_cutoff=None):
+        """
+        Value vs stage relationship, eg. volume to stage
+
+        :return: RatingCurve with value as breakpoints
+        """
+        return RatingCurve(stage=self.value, value=self.stage, stage_cutoff=stage_cutoff)
+
+    @staticmethod
+    def _wrap(obs_stage, result):
+        if isinstance(obs_stage, pd.Series):
+            return pd.Series(result, index=obs_stage.index, name=obs_stage.name)
+        if np.ndim(result) == 0:
+            return float(result)
+        return result
+
+
 def fill_profile(base_df, slope_df, midpoint_index):
     """
     Function to fill profile data where only slope data is collected.
@@ -257,6 +371,7 @@ def read_correct_ch_dam_data(csv_file, calibration_slope, calibration_intercept,
     :param csv_file: csv file created from sensor
     :param calibration_slope: slope
     :param calibration_intercept: intercept
+    :param stage_cutoff: stage below cutoff is set to zero [m]
     :return: calibrated and time corrected data
 
     Examples:
@@ -265,80 +380,73 @@ def read_correct_ch_dam_data(csv_file, calibration_slope, calibration_intercept,
     water_level = pd.read_csv(csv_file, skiprows=9, sep=',', header=0,
                               names=['scan no', 'date', 'time', 'raw value', 'calibrated value'])
     water_level['calibrated value'] = (water_level['raw value'] * calibration_slope) + calibration_intercept  # in cm
-    # water_level['calibrated value'] = np.round(water_level['calibrated value']/resolution_ody)*resolution_ody
     water_level['calibrated value'] /= 1000.0
     water_level['calibrated value'] = myround(a=water_level['calibrated value'], decimals=3)
     # #change the column name
-    water_level.columns.values[4] = 'stage(m)'
-    # print water_level.head()
+    water_level.rename(columns={'calibrated value': 'stage(m)'}, inplace=True)
 
     # create date time index
     format = '%d/%m/%Y  %H:%M:%S'
     c_str = ' 24:00:00'
-    for index, row in water_level.iterrows():
-        x_str = row['time']
-        if x_str == c_str:
-            # convert string to datetime object
-            r_date = pd.to_datetime(row['date'], format='%d/%m/%Y ')
-            # add 1 day
-            c_date = r_date + timedelta(days=1)
-            # convert datetime to string
-            c_date = c_date.strftime('%d/%m/%Y ')
-            c_time = ' 00:00:00'
-            # water_level.loc[:, ('date', index)] = c_date
-            # water_level.loc[:, ('time', index)] = c_time
-            water_level.loc[index,'date'] = c_date
-            water_level.loc[index,'time'] = c_time
-
-    water_level['date_time'] = pd.to_datetime(water_level['date'] + water_level['time'], format=format)
+    # logger writes midnight as 24:00:00 of previous day
+    midnight = (water_level['time'] == c_str).values
+    time = water_level['time'].where(~midnight, ' 00:00:00')
+    date_time = pd.to_datetime(water_level['date'] + time, format=format)
+    water_level['date_time'] = date_time.where(~midnight, date_time + timedelta(days=1))
     water_level.set_index(water_level['date_time'], inplace=True)
-    # # drop unneccessary columns before datetime aggregation
-    for index, row in water_level.iterrows():
-        # print row
-        obs_stage = row['stage(m)']
-        if obs_stage < stage_cutoff:
-            # water_level.loc[:, ('stage(m)', index.strftime(date_format))] = 0.0
-            water_level.loc[index,'stage(m)'] = 0.0
+    water_level.loc[(water_level['stage(m)'] < stage_cutoff).values, 'stage(m)'] = 0.0
 
     water_level.drop(['scan no', 'date', 'time', 'date_time'], inplace=True, axis=1)
 
     return water_level
 
 
+def read_correct_ch_dam_blocks(csv_files, calibration_slope, calibration_intercept, stage_cutoff=0.1, drop_ends=False,
+                               cache=None):
+    """
+    Reads and calibrates many odyssey data blocks of a logger into one dataframe, sorted by time.
+    Time stamps repeated in overlapping blocks are kept from the first block they appear in.
+
+    :param csv_files: list of csv files created from sensor
+    :param calibration_slope: slope
+    :param calibration_intercept: intercept
+    :param stage_cutoff: stage below cutoff is set to zero [m]
+    :param drop_ends: if True, first and last reading of each block (logger taken out for download) are dropped
+    :param cache: checkdam.cache.DataCache, blocks parsed in an earlier run are loaded from it
+    :return: calibrated and time corrected data
+
+    Examples:
+        >>> read_correct_ch_dam_blocks(csv_files=[block_1, block_2], calibration_slope=0.111, calibration_intercept=0.222)
+    """
+    blocks = []
+    for csv_file in csv_files:
+        if cache is None:
+            water_level = read_correct_ch_dam_data(csv_file, calibration_slope, calibration_intercept, stage_cutoff)
+        else:
+            water_level = cache.load(read_correct_ch_dam_data, [csv_file],
+                                     args=(csv_file, calibration_slope, calibration_intercept, stage_cutoff))
+        if drop_ends:
+            water_level = water_level.iloc[1:-1]
+        blocks.append(water_level)
+    water_level = pd.concat(blocks, axis=0)
+    water_level = water_level[~water_level.index.duplicated(keep='first')]
+    water_level = water_level.sort_index(kind='mergesort')
+    return water_level
+
+
 def extraterrestrial_irrad(local_datetime, latitude_deg, longitude_deg):
     """
     Calculates extraterrestrial radiation in MJ/m2/30min
 
-    :param local_datetime: datetime object
+    :param local_datetime: datetime object or pandas DatetimeIndex
     :param latitude_deg: in decimal degree
     :param longitude_deg: in decimal degree
     :return: Extra terrestrial radiation in MJ/m2/30min
-    :rtype: float
-    """
-
-    s = 0.0820  # MJ m-2 min-1
-    lat_rad = latitude_deg * (math.pi / 180)
-    day = (local_datetime - datetime(local_datetime.year, 1, 1)).days + 1
-    hour = float(local_datetime.hour)
-    minute = float(local_datetime.minute)
-    b = ((2 * math.pi) * (day - 81)) / 364
-    sc = 0.1645 * (math.sin(2 * b)) - 0.1255 * (math.cos(b)) - 0.025 * (math.sin(b))  # seasonal correction in hour
-    lz = 270  # for India longitude of local time zone in degrees west of greenwich
-    lm = (180 + (180 - longitude_deg))  # longitude of measurement site
-    t = (hour + (minute / 60)) - 0.25
-    t1 = 0.5  # 0.5 for 30 minute 1 for hourly period
-    w = (math.pi / 12) * ((t + (0.0667 * (lz - lm)) + sc) - 12)
-    w1 = w - ((math.pi * t1) / 24)  # solar time angle at beginning of period [rad]
-    w2 = w + ((math.pi * t1) / 24)  # solar time angle at end of period [rad]
-    dr = 1 + (0.033 * math.cos((2 * math.pi * day) / 365))  # inverse relative distance Earth-Sun
-    dt = 0.409 * math.sin(((2 * math.pi * day) / 365) - 1.39)  # solar declination in radian
-    ws = math.acos(-math.tan(lat_rad) * math.tan(dt))
-    if (w > ws) or (w < -ws):
-        rext = 0.0
-    else:
-        rext = ((12 * 60) / math.pi) * s * dr * (((w2 - w1) * math.sin(lat_rad) * math.sin(dt)) + (
-            math.cos(lat_rad) * math.cos(dt) * (math.sin(w2) - math.sin(w1))))  # MJm-2(30min)-1
-    return rext
+    :rtype: float or array
+    """
+    if isinstance(local_datetime, datetime):
+        return float(solar.extraterrestrial_irradiation([local_datetime], latitude_deg, longitude_deg)[0])
+    return solar.extraterrestrial_irradiation(local_datetime, latitude_deg, longitude_deg)
 
 
 """
@@ -348,26 +456,20 @@ http://python.hydrology-amsterdam.nl/moduledoc/index.html#module-evaplib
 """
 
 
-def delta_calc(airtemp):
+def delta_calc(airtemp, out=None):
     """
     Calculates slope of saturation vapour pressure curve at air temperature [kPa/Celsius]
     http://www.fao.org/docrep/x0490e/x0490e07.htm
 
-    :param airtemp: Temperature in Celsius
+    :param airtemp: Temperature in Celsius, single value, array or pandas Series
+    :param out: optional array to write the output in
     :return: slope of saturation vapour pressure curve [kPa/Celsius]
     """
-    l = sp.size(airtemp)
-    if l < 2:
-        temp = airtemp + 237.3
-        b = 0.6108 * (math.exp((17.27 * airtemp) / temp))
-        delta = (4098 * b) / (temp ** 2)
-    else:
-        delta = sp.zeros(l)
-        for i in range(0, l):
-            temp = airtemp[i] + 237.3
-            b = 0.6108 * (math.exp(17.27 * airtemp[i]) / temp)
-            delta[i] = (4098 * b) / (temp ** 2)
-    return delta
+    airtemp = np.asarray(airtemp, dtype=float)
+    temp = airtemp + 237.3
+    b = 0.6108 * np.exp((17.27 * airtemp) / temp)
+    delta = np.divide(4098 * b, temp ** 2, out=out)
+    return delta[()] if delta.ndim == 0 else delta
 
 
 def half_hour_evaporation(airtemp=sp.array([]),
@@ -376,12 +478,16 @@ def half_hour_evaporation(airtemp=sp.array([]),
                           rs=sp.array([]),
                           rext=sp.array([]),
                           u=sp.array([]),
-                          z=0.0):
+                          z=0.0,
+                          fao56=False,
+                          night_ratio=0.5,
+                          out=None):
     """
     Function to calculate daily Penman open water evaporation (in mm/30min).
     Equation according to
     Shuttleworth, W. J. 2007. "Putting the 'Vap' into Evaporation."
     Hydrology and Earth System Sciences 11 (1): 210-44. doi:10.5194/hess-11-210-2007.
+    Inputs can be single values, arrays or pandas Series.
 
     :param airtemp: average air temperature [Celsius]
     :param rh: relative humidity[%]
@@ -390,6 +496,10 @@ def half_hour_evaporation(airtemp=sp.array([]),
     :param rext: Extraterrestrial radiation [MJ/m2/30min]
     :param u: average wind speed at 2 m from ground [m/s]
     :param z: site elevation, default is zero [metre]
+    :param fao56: False - rs/rs0 as it is, which is nan or inf when there is no clear sky radiation (night).
+        True - rs/rs0 limited to 1 and night_ratio when there is no clear sky radiation, as in FAO 56
+    :param night_ratio: rs/rs0 used at night with fao56
+    :param out: optional array to write the output in
     :return: Penman open water evaporation values [mm/30min]
 
     Examples:
@@ -401,56 +511,32 @@ def half_hour_evaporation(airtemp=sp.array([]),
     # http://en.wikipedia.org/wiki/Stefan-Boltzmann_constant
     # sigma = 5.670373*(10**-8)  # J/m2/K4/s
     sigma = (1.02066714 * (10 ** -10))  # Stefan Boltzmann constant MJ/m2/K4/30min
+    airtemp = np.asarray(airtemp, dtype=float)
+    airpress = np.asarray(airpress, dtype=float)
+    rs = np.asarray(rs, dtype=float)
+    u = np.asarray(u, dtype=float)
     # Calculate Delta, gamma and lambda
     delta = delta_calc(airtemp)  # [Kpa/C]
-    # Lambda = met.L_calc(airtemp)/(10**6) # [MJ/Kg]
-    # gamma = met.gamma_calc(airtemp, rh, airpress)/1000
-    # Lambda = 2.501 -(0.002361*airtemp)     # [MJ/kg]
-    # gamma = (0.0016286 *(airpress/1000))/Lambda
     # Calculate saturated and actual water vapour pressure
     es = met.es_calc(airtemp)  # [Pa]
     ea = met.ea_calc(airtemp, rh)  # [Pa]
-    # Determine length of array
-    l = sp.size(airtemp)
-    # Check if we have a single value or an array
-    if l < 2:
-        lambda_mj_kg = 2.501 - (0.002361 * airtemp)  # [MJ/kg]
-        gamma = (0.0016286 * (airpress / 1000)) / lambda_mj_kg
-        rns = (1.0 - albedo) * rs  # shortwave component [MJ/m2/30min]
-        # calculate clear sky radiation Rs0
-        rs0 = (0.75 + (2E-5 * z)) * rext
-        f = (1.35 * (rs / rs0)) - 0.35
-        epsilom = 0.34 - (-0.14 * sp.sqrt(ea / 1000))
-        rnl = f * epsilom * sigma * (airtemp + 273.16) ** 4  # Longwave component [MJ/m2/30min]
-        rnet = rns - rnl
-        Ea = (1 + (0.536 * u)) * ((es / 1000) - (ea / 1000))
-        E0 = ((delta * rnet) + gamma * (6.43 * Ea)) / (lambda_mj_kg * (delta + gamma))
-    else:
-        # Inititate output array
-        E0 = sp.zeros(l)
-        rns = sp.zeros(l)
-        rs0 = sp.zeros(l)
-        f = sp.zeros(l)
-        epsilom = sp.zeros(l)
-        rnl = sp.zeros(l)
-        rnet = sp.zeros(l)
-        Ea = sp.zeros(l)
-        lambda_mj_kg = sp.zeros(l)
-        gamma = sp.zeros(l)
-        for i in range(0, l):
-            lambda_mj_kg[i] = 2.501 - (0.002361 * airtemp[i])
-            gamma[i] = (0.0016286 * (airpress[i] / 1000)) / lambda_mj_kg[i]
-            # calculate longwave radiation (MJ/m2/30min)
-            rns[i] = (1.0 - albedo) * rs[i]
-            # calculate clear sky radiation Rs0
-            rs0[i] = (0.75 + (2E-5 * z))
-            f[i] = (1.35 * (rs[i] / rs0[i])) - 0.35
-            epsilom[i] = 0.34 - (-0.14 * sp.sqrt(ea[i] / 1000))
-            rnl[i] = f[i] * epsilom[i] * sigma * (airtemp[i] + 273.16) ** 4  # Longwave component [MJ/m2/30min]
-            rnet[i] = rns[i] - rnl[i]
-            Ea[i] = (1 + (0.536 * u[i])) * ((es[i] / 1000) - (ea[i] / 1000))
-            E0[i] = ((delta[i] * rnet[i]) + gamma[i] * (6.43 * Ea[i])) / (lambda_mj_kg[i] * (delta[i] + gamma[i]))
-    return E0
+    lambda_mj_kg = 2.501 - (0.002361 * airtemp)  # [MJ/kg]
+    gamma = (0.0016286 * (airpress / 1000)) / lambda_mj_kg
+    rns = (1.0 - albedo) * rs  # shortwave component [MJ/m2/30min]
+    # calculate clear sky radiation Rs0
+    rs0 = (0.75 + (2E-5 * z)) * np.asarray(rext, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = rs / rs0
+    if fao56:
+        ratio = np.where(rs0 > 0, np.minimum(ratio, 1.0), night_ratio)
+    f = (1.35 * ratio) - 0.35
+    epsilom = 0.34 - (-0.14 * np.sqrt(ea / 1000))
+    rnl = f * epsilom * sigma * (airtemp + 273.16) ** 4  # Longwave component [MJ/m2/30min]
+    rnet = rns - rnl
+    Ea = (1 + (0.536 * u)) * ((es / 1000) - (ea / 1000))
+    with np.errstate(invalid='ignore'):
+        E0 = np.divide((delta * rnet) + gamma * (6.43 * Ea), (lambda_mj_kg * (delta + gamma)), out=out)
+    return E0[()] if E0.ndim == 0 else E0
 
 
 class Open_Water_Evaporation(object):
@@ -480,53 +566,7 @@ class Open_Water_Evaporation(object):
         lat = latitude or self.latitude
         lon = longitude or self.longitude
         date_time = date_time or self.date_time_index
-        l = np.size(date_time)
-        s = 0.0820  # MJ m-2 min-1
-        lat_rad = lat * (math.pi / 180)
-        if l < 2:
-            day = (date_time - datetime(datetime.year, 1, 1)).days + 1
-            hour = float(date_time.hour)
-            minute = float(date_time.minute)
-            b = ((2 * math.pi) * (day - 81)) / 364
-            sc = 0.1645 * (math.sin(2 * b)) - 0.1255 * (math.cos(b)) - 0.025 * (math.sin(b))  # seasonal correction in hour
-            lz = 270  # for India longitude of local time zone in degrees west of greenwich
-            lm = (180 + (180 - lon))  # longitude of measurement site
-            t = (hour + (minute / 60)) - 0.25
-            t1 = 0.5  # 0.5 for 30 minute 1 for hourly period
-            w = (math.pi / 12) * ((t + (0.0667 * (lz - lm)) + sc) - 12)
-            w1 = w - ((math.pi * t1) / 24)  # solar time angle at beginning of period [rad]
-            w2 = w + ((math.pi * t1) / 24)  # solar time angle at end of period [rad]
-            dr = 1 + (0.033 * math.cos((2 * math.pi * day) / 365))  # inverse relative distance Earth-Sun
-            dt = 0.409 * math.sin(((2 * math.pi * day) / 365) - 1.39)  # solar declination in radian
-            ws = math.acos(-math.tan(lat_rad) * math.tan(dt))
-            if (w > ws) or (w < -ws):
-                rext = 0.0
-            else:
-                rext = ((12 * 60) / math.pi) * s * dr * (((w2 - w1) * math.sin(lat_rad) * math.sin(dt)) + (math.cos(lat_rad) * math.cos(dt) * (math.sin(w2) - math.sin(w1))))  # MJm-2(30min)-1
-        else:
-            rext = np.zeros(l)
-            for dt in date_time:
-                i = date_time.get_loc(dt)
-                day = (dt - datetime(dt.year, 1, 1)).days + 1
-                hour = float(dt.hour)
-                minute = float(dt.minute)
-                b = ((2 * math.pi) * (day - 81)) / 364
-                sc = 0.1645 * (math.sin(2 * b)) - 0.1255 * (math.cos(b)) - 0.025 * (math.sin(b))  # seasonal correction in hour
-                lz = 270  # for India longitude of local time zone in degrees west of greenwich
-                lm = (180 + (180 - lon))  # longitude of measurement site
-                t = (hour + (minute / 60)) - 0.25
-                t1 = 0.5  # 0.5 for 30 minute 1 for hourly period
-                w = (math.pi / 12) * ((t + (0.0667 * (lz - lm)) + sc) - 12)
-                w1 = w - ((math.pi * t1) / 24)  # solar time angle at beginning of period [rad]
-                w2 = w + ((math.pi * t1) / 24)  # solar time angle at end of period [rad]
-                dr = 1 + (0.033 * math.cos((2 * math.pi * day) / 365))  # inverse relative distance Earth-Sun
-                dt = 0.409 * math.sin(((2 * math.pi * day) / 365) - 1.39)  # solar declination in radian
-                ws = math.acos(-math.tan(lat_rad) * math.tan(dt))
-                if (w > ws) or (w < -ws):
-                    rext[i] = 0.0
-                else:
-                    rext[i] = ((12 * 60) / math.pi) * s * dr * (((w2 - w1) * math.sin(lat_rad) * math.sin(dt)) + (math.cos(lat_rad) * math.cos(dt) * (math.sin(w2) - math.sin(w1))))  # MJm-2(30min)-1
-        return rext
+        return extraterrestrial_irrad(date_time, lat, lon)
 
     def calculate_half_hour_eo(self, airtemp=None, rh=None, airpress=None, rs=None, rext=None,u=None, z=None):
         at = airtemp or self.air_temperature
@@ -547,32 +587,13 @@ def pick_incorrect_value(dataframe, **param):
     :param dataframe: Pandas dataframe
     :param param: Conditonal Dictionary, Eg.{column name: [cutoff, '>']}
     :type param: dict
-    :return: unique list of timestamp
+    :return: unique list of timestamp, in time order
     :rtype: list
     """
-    wrong_date_time = []
-    unique_list = []
-    # first_time = pd.to_datetime('2014-05-15 18:00:00', format='%Y-%m-%d %H:%M:%S')
-    # final_time = pd.to_datetime('2014-09-09 23:00:00', format='%Y-%m-%d %H:%M:%S')
-    for key, value in param.items():
-        # print key
-        # print len(wrong_date_time)
-        if value[1] == '>':
-            wrong_df = dataframe[dataframe[key] > value[0]]
-        if value[1] == '<':
-            wrong_df = dataframe[dataframe[key] < value[0]]
-        if value[1] ==  '=':
-            wrong_df = dataframe[dataframe[key] == value[0]]
-        for wrong_time in wrong_df.index:
-            if max(dataframe.index) > wrong_time > min(dataframe.index):
-                wrong_date_time.append(wrong_time)
-            # if final_time > wrong_time > first_time:
-
-    for i in wrong_date_time:
-        if i not in unique_list:
-            unique_list.append(i)
-
-    return unique_list
+    wrong = qc.threshold_mask(dataframe, param).values.any(axis=1)
+    # first and last time stamps are not picked
+    wrong &= np.asarray((dataframe.index > min(dataframe.index)) & (dataframe.index < max(dataframe.index)))
+    return list(dataframe.index[wrong].unique())
 
 
 def day_interpolate(dataframe, column_name, wrong_date_time):
@@ -586,18 +607,7 @@ def day_interpolate(dataframe, column_name, wrong_date_time):
     :type wrong_date_time: list
     :return: Corrected dataframe
     """
-    initial_cutoff = min(dataframe.index) + timedelta(days=1)
-    final_cutoff = max(dataframe.index) - timedelta(days=1)
-    for date_time in wrong_date_time:
-        if (date_time > initial_cutoff) and (date_time < final_cutoff):
-            prev_date_time = date_time - timedelta(days=1)
-            next_date_time = date_time + timedelta(days=1)
-            prev_value = dataframe[column_name][prev_date_time.strftime('%Y-%m-%d %H:%M')]
-            next_value = dataframe[column_name][next_date_time.strftime('%Y-%m-%d %H:%M')]
-            average_value = 0.5*(prev_value + next_value)
-            dataframe[column_name][date_time.strftime('%Y-%m-%d %H:%M')] = average_value
-
-    return dataframe
+    return wrong_date_time_fill(dataframe, column_name, wrong_date_time, method='day_interpolate')
 
 
 def previous_interpolate(dataframe, column_name, wrong_date_time):
@@ -612,38 +622,34 @@ def previous_interpolate(dataframe, column_name, wrong_date_time):
     :type wrong_date_time: list
     :return: Corrected dataframe
     """
-    initial_cutoff = min(dataframe.index) + timedelta(days=1)
-    final_cutoff = max(dataframe.index) - timedelta(days=1)
-    for date_time in wrong_date_time:
-        if (date_time > initial_cutoff) and (date_time < final_cutoff):
-            prev_date_time = date_time - timedelta(days=1)
-            prev_value = dataframe[column_name][prev_date_time.strftime('%Y-%m-%d %H:%M')]
-            dataframe[column_name][date_time.strftime('%Y-%m-%d %H:%M')] = prev_value
+    return wrong_date_time_fill(dataframe, column_name, wrong_date_time, method='previous_day')
+
+
+def wrong_date_time_fill(dataframe, column_name, wrong_date_time, method):
+    """
+    Fills column at wrong timestamps in place, see qc.fill_values
 
+    :param dataframe: Pandas dataframe
+    :param column_name: Interpolation target column name of dataframe
+    :param wrong_date_time: List of error timestamp
+    :param method: 'day_interpolate' or 'previous_day'
+    :return: Corrected dataframe
+    """
+    mask = pd.DataFrame({column_name: dataframe.index.isin(wrong_date_time)}, index=dataframe.index)
+    corrected, filled = qc.fill_values(dataframe[[column_name]], mask, method=method)
+    dataframe[column_name] = corrected[column_name]
     return dataframe
 
 
 def calculate_daily_extraterrestrial_irradiation(doy, latitude):
-    lat = latitude
-    l = np.size(doy)
-    s = 0.0820  # MJ m-2 min-1
-    lat_rad = lat * (math.pi / 180)
-    if l < 2:
-        day = doy
-        dr = 1 + (0.033 * math.cos((2 * math.pi * day) / 365))  # inverse relative distance Earth-Sun
-        dt = 0.409 * math.sin(((2 * math.pi * day) / 365) - 1.39)  # solar declination in radian
-        ws = math.acos(-math.tan(lat_rad) * math.tan(dt))   # sunset hour angle in radian
-        rext = ((24* 60) / math.pi) * s * dr * ((ws * math.sin(lat_rad) * math.sin(dt)) + (math.cos(lat_rad) * math.cos(dt) * math.sin(ws)))  # MJm-2day-1
-    else:
-        rext = np.zeros(l)
-        for i in range(0, l):
-            day = doy[i]
-            dr = 1 + (0.033 * math.cos((2 * math.pi * day) / 365))  # inverse relative distance Earth-Sun
-            dt = 0.409 * math.sin(((2 * math.pi * day) / 365) - 1.39)  # solar declination in radian
-            ws = math.acos(-math.tan(lat_rad) * math.tan(dt))  # sunset hour angle in radian
-            rext[i] = ((24 * 60) / math.pi) * s * dr * ((ws * math.sin(lat_rad) * math.sin(dt)) + (math.cos(lat_rad) * math.cos(dt) * math.sin(ws)))  # MJm-2day-1
-    return rext
+    """
+    Calculates daily extraterrestrial radiation in MJ/m2/day
 
+    :param doy: (array of) day of year
+    :param latitude: in decimal degree
+    :return: Extra terrestrial radiation in MJ/m2/day
+    """
+    return solar.daily_extraterrestrial_irradiation(doy, latitude)
 
 
 class DraggableColorbar(object):
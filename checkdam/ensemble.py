@@ -0,0 +1,196 @@
+__author__ = 'kiruba'
+"""
+Monte Carlo scenario runner for cumulative impact of check dams.
+Each realisation samples infiltration rate, rainfall - runoff slope and intercept, initial volume and
+a year by year resampling of the (synthetic) weather, routes the check dam network and writes only
+summary statistics of the realisation to a csv file.
+Forcing arrays are sent once to every worker of the pool, realisations only carry their parameters.
+"""
+import calendar
+import csv
+import copy
+import numpy as np
+import pandas as pd
+from multiprocessing import Pool
+import routing
+
+# default uniform ranges of sampled parameters (low, high)
+default_parameter_ranges = {'infiltration_rate': (0.001, 0.003),   # m/day
+                            'slope': None,                           # None - keep deterministic value
+                            'intercept': None,
+                            'initial_volume': (0.0, 0.0)}          # fraction of max volume
+summary_columns = ['realisation', 'infiltration_rate', 'slope', 'intercept', 'initial_volume', 'total_recharge',
+                   'days_full']
+
+# read only forcing of worker process, set by init_worker
+forcing = {}
+
+
+def sample_parameters(no_of_realisations, slope, intercept, parameter_ranges=None, seed=None):
+    """
+    Samples parameters of every realisation from uniform distributions
+
+    :param no_of_realisations: number of realisations
+    :param slope: rainfall - inflow per catchment area slope, used when its range is None
+    :param intercept: rainfall - inflow per catchment area intercept, used when its range is None
+    :param parameter_ranges: dict of (low, high) per parameter, see default_parameter_ranges
+    :param seed: seed of random number generator
+    :return: dataframe with one row per realisation
+    """
+    ranges = dict(default_parameter_ranges)
+    if parameter_ranges is not None:
+        ranges.update(parameter_ranges)
+    deterministic = {'slope': slope, 'intercept': intercept}
+    rng = np.random.RandomState(seed)
+    parameters_df = pd.DataFrame(index=np.arange(no_of_realisations))
+    parameters_df.index.name = 'realisation'
+    for parameter in ['infiltration_rate', 'slope', 'intercept', 'initial_volume']:
+        if ranges[parameter] is None:
+            parameters_df[parameter] = deterministic[parameter]
+        else:
+            low, high = ranges[parameter]
+            parameters_df[parameter] = rng.uniform(low, high, no_of_realisations)
+    return parameters_df
+
+
+def resample_years(index, rng):
+    """
+    Synthetic weather sequence by drawing a random full calendar year of the record for every year in index.
+    Days are matched by month and day, so the seasonal pattern is kept. Partial first and last years of the
+    record are never drawn, only their days are filled from a full year. 29 February takes the weather of
+    28 February when the drawn year is not a leap year.
+
+    :param index: daily DatetimeIndex of weather record
+    :param rng: numpy RandomState
+    :return: position in record of the weather to use for each day of index
+    """
+    years = index.year.values
+    month_day = index.month.values * 100 + index.day.values
+    record_years, days = np.unique(years, return_counts=True)
+    full_years = record_years[days == [366 if calendar.isleap(year) else 365 for year in record_years]]
+    if not len(full_years):
+        raise ValueError("weather record has no full calendar year to resample")
+    source_position = np.empty(len(index), dtype=int)
+    for year in record_years:
+        target = np.flatnonzero(years == year)
+        donor = rng.choice(full_years)
+        source = np.flatnonzero(years == donor)
+        target_day = month_day[target]
+        if not calendar.isleap(donor):
+            target_day = np.where(target_day == 229, 228, target_day)
+        source_position[target] = source[np.searchsorted(month_day[source], target_day)]
+    return source_position
+
+
+def init_worker(shared_forcing):
+    forcing.update(shared_forcing)
+
+
+def run_realisation(args):
+    """
+    Routes one realisation with forcing of the worker and returns its summary
+
+    :param args: realisation number, infiltration rate, slope, intercept, initial volume (fraction of max volume)
+        and source position of weather (None - weather as recorded)
+    :return: dict of summary statistics
+    """
+    realisation, infiltration_rate, slope, intercept, initial_volume, source_position = args
+    if source_position is None:
+        source_position = slice(None)
+    inflow_catchment_area_ratio = (forcing['rain'][source_position] * slope) + intercept
+    summary = {'realisation': realisation, 'infiltration_rate': infiltration_rate, 'slope': slope,
+               'intercept': intercept, 'initial_volume': initial_volume, 'total_recharge': 0.0, 'days_full': 0}
+    outlet_inflow = np.zeros(len(forcing['outlets']))
+    for sub_basin, topology, lags, evaporation in zip(forcing['sub_basins'], forcing['topology'],
+                                                      forcing['overflow_lag_days'], forcing['evaporation']):
+        checkdams = []
+        for checkdam in sub_basin:
+            checkdam = copy.copy(checkdam)
+            checkdam.infiltration_rate = infiltration_rate
+            checkdam.initial_volume = initial_volume * checkdam.max_volume
+            checkdams.append(checkdam)
+        state, sub_basin_outlet_inflow = routing.simulate_sub_basin(checkdams, topology[0], topology[1],
+                                                                    inflow_catchment_area_ratio,
+                                                                    evaporation[source_position],
+                                                                    lags, forcing['solver'])
+        # last day is not routed
+        summary['total_recharge'] += state['infilt'][:-1].sum()
+        max_volume = np.array([checkdam.max_volume for checkdam in checkdams])
+        summary['days_full'] += int((state['volume'][:-1] >= max_volume).sum())
+        outlet_inflow[:sub_basin_outlet_inflow.shape[1]] += sub_basin_outlet_inflow.sum(axis=0)
+    for outlet, inflow in zip(forcing['outlets'], outlet_inflow):
+        summary[routing.column_name('overflow_to', outlet)] = inflow
+    return summary
+
+
+class CheckdamEnsemble(object):
+    """
+    Monte Carlo ensemble of a check dam network.
+    Summary of every realisation is appended to summary_csv as soon as it is finished:
+    total_recharge - infiltration of all check dams [cu.m], days_full - check dam days at full volume,
+    overflow_to_<outlet> - overflow leaving the network to each outlet (eg. lake) [cu.m]
+
+    Examples:
+        >>> had_ensemble = CheckdamEnsemble(inflow_catchment_area_df=weather_rain_df, checkdams=[checkdam_463, checkdam_640, checkdam_1], slope=slope, intercept=intercept)
+        >>> parameters_df = sample_parameters(1000, slope, intercept, seed=0)
+        >>> had_ensemble.run(parameters_df, summary_csv='had_ensemble.csv', resample_weather=True, processes=8)
+    """
+    def __init__(self, inflow_catchment_area_df, checkdams, slope, intercept, overflow_lag_days=1, solver='iterative'):
+        self.network = routing.CheckdamNetwork(inflow_catchment_area_df=inflow_catchment_area_df, checkdams=checkdams,
+                                               slope=slope, intercept=intercept, overflow_lag_days=overflow_lag_days,
+                                               solver=solver)
+        index = inflow_catchment_area_df.index
+        routing.check_daily_index(index)
+        self.index = index
+        self.forcing = {'rain': inflow_catchment_area_df['diff'].values.astype(float),
+                        'outlets': self.network.outlets,
+                        'solver': solver,
+                        'sub_basins': [], 'topology': [], 'overflow_lag_days': [], 'evaporation': []}
+        for sub_basin in self.network.sub_basins:
+            sub_basin_checkdams = [self.network.checkdams[name] for name in sub_basin]
+            self.forcing['sub_basins'].append(sub_basin_checkdams)
+            self.forcing['topology'].append(self.network.sub_basin_topology(sub_basin))
+            self.forcing['overflow_lag_days'].append(self.network.overflow_lags(sub_basin))
+            self.forcing['evaporation'].append(np.column_stack([checkdam.evaporation.reindex(index).values
+                                                                for checkdam in sub_basin_checkdams]))
+
+    def realisations(self, parameters_df, resample_weather=False, seed=None):
+        rng = np.random.RandomState(seed)
+        for realisation, row in parameters_df.iterrows():
+            source_position = resample_years(self.index, rng) if resample_weather else None
+            yield (realisation, row['infiltration_rate'], row['slope'], row['intercept'], row['initial_volume'],
+                   source_position)
+
+    def run(self, parameters_df, summary_csv, resample_weather=False, seed=None, processes=1, chunksize=4):
+        """
+        Runs all realisations and streams their summaries to csv file, in order of completion
+
+        :param parameters_df: dataframe from sample_parameters
+        :param summary_csv: output csv file
+        :param resample_weather: if True, every realisation uses a year by year resampling of the weather
+        :param seed: seed of weather resampling
+        :param processes: number of worker processes
+        :param chunksize: realisations sent to a worker at a time
+        :return: number of realisations written
+        """
+        columns = summary_columns + [routing.column_name('overflow_to', outlet) for outlet in self.network.outlets]
+        realisations = self.realisations(parameters_df, resample_weather=resample_weather, seed=seed)
+        with open(summary_csv, 'w') as summary_file:
+            writer = csv.DictWriter(summary_file, fieldnames=columns)
+            writer.writeheader()
+            n = 0
+            if processes > 1:
+                pool = Pool(processes=processes, initializer=init_worker, initargs=(self.forcing,))
+                try:
+                    for summary in pool.imap_unordered(run_realisation, realisations, chunksize=chunksize):
+                        writer.writerow(summary)
+                        n += 1
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                init_worker(self.forcing)
+                for summary in (run_realisation(args) for args in realisations):
+                    writer.writerow(summary)
+                    n += 1
+        return n
@@ -9,6 +9,7 @@
         - Ept: Calculate evaporation according to Priestley and Taylor (1972)
         - ET0pm: Calculate Penman Monteith reference evaporation short grass
         - Epm: Calculate Penman-Monteith evaporation (actual)
+        - Eensemble: Calculate several of the evaporation methods above in one pass
         - ra: Calculate aerodynamic resistance from windspeed and
           roughnes parameters
         - tvardry: calculate sensible heat flux from temperature variations
@@ -31,6 +32,7 @@ def evaplib():
         - Ept: Calculate evaporation according to Priestley and Taylor (1972)
         - ET0pm: Calculate Penman Monteith reference evaporation short grass (FAO)
         - Epm: Calculate Penman Monteith reference evaporation (Monteith, 1965)
+        - Eensemble: Calculate several evaporation methods in one pass
         - ra: Calculate  from windspeed and roughnes parameters
         - tvardry: calculate sensible heat flux from temperature variations
           (Vugts et al., 1993)
@@ -48,6 +50,7 @@ def evaplib():
     print '- Ept: Calculate evaporation according to Priestley and Taylor (1972).'
     print '- ET0pm: Calculate Penman Monteith reference evaporation short grass.'
     print '- Epm: Calculate Penman Monteith evaporation (Monteith, 1965).'
+    print '- Eensemble: Calculate several evaporation methods in one pass.'
     print '- ra: Calculate aerodynamic resistance.'
     print '- tvardry: calculate sensible heat flux from temperature variations \
           (Vugts et al., 1993).'
@@ -60,6 +63,7 @@ def evaplib():
 # First load python micrometeorological functions
 import meteolib
 import scipy
+import numpy
 
 '''
     ================================================================
@@ -67,6 +71,103 @@ import scipy
     ================================================================  
 '''
 
+def _psychrometrics(airtemp = scipy.array([]),\
+                    rh = scipy.array([]),\
+                    airpress = scipy.array([])):
+    '''
+    Function to calculate the psychrometric terms shared by the evaporation
+    functions, with the equations of meteolib (es_calc, ea_calc, Delta_calc,
+    L_calc, cp_calc, gamma_calc and rho_calc) from one saturated vapour
+    pressure.
+
+    Input:
+        - airtemp: (array of) air temperatures [Celsius]
+        - rh: (array of) relative humidity values [%]
+        - airpress: (array of) air pressure data [Pa]
+
+    Output:
+        - dictionary with es, ea and vpd [Pa], DELTA [Pa/K], Lambda [J/kg],
+          cp [J/kg/K], gamma [Pa/K] and rho [kg/m3]
+    '''
+    airtemp = numpy.asarray(airtemp, dtype=float)
+    airpress = numpy.asarray(airpress, dtype=float)
+    es = meteolib.es_calc(airtemp) # [Pa]
+    ea = meteolib._as_array(rh) / 100.0 * es # [Pa]
+    Lambda = meteolib.L_calc(airtemp) # [J/kg]
+    cp = 0.24 * 4185.5 * (1 + 0.8 * (0.622 * ea / (airpress - ea))) # [J/kg/K]
+    return {'es': es,
+            'ea': ea,
+            'vpd': es - ea, # [Pa]
+            'DELTA': es / 1000.0 * 4098.0 / (airtemp + 237.3) ** 2 * 1000, # [Pa/K]
+            'Lambda': Lambda,
+            'cp': cp,
+            'gamma': cp * airpress / (0.622 * Lambda), # [Pa/K]
+            'rho': 1.201 * (290.0 * (airpress - 0.378 * ea)) / (1000.0 * (airtemp + 273.15)) / 100.0} # [kg/m3]
+
+def _net_radiation(airtemp = scipy.array([]),\
+                   ea = scipy.array([]),\
+                   Rs = scipy.array([]),\
+                   Rext = scipy.array([]),\
+                   Z=0.0,\
+                   albedo=0.06):
+    '''
+    Function to calculate daily net radiation from incoming solar radiation,
+    with the longwave component from the clear sky radiation (FAO 56).
+
+    Input:
+        - airtemp: (array of) daily average air temperatures [Celsius]
+        - ea: (array of) actual vapour pressures [Pa]
+        - Rs: (array of) daily incoming solar radiation [J/m2/day]
+        - Rext: (array of) daily extraterrestrial radiation [J/m2/day]
+        - Z: site elevation [m a.s.l.], default is zero
+        - albedo: surface albedo, default is 0.06 (open water)
+
+    Output:
+        - Rnet: (array of) net radiation [J/m2/day]
+    '''
+    sigma = 4.903E-3 # Stefan Boltzmann constant J/m2/K4/d
+    Rs = numpy.asarray(Rs, dtype=float)
+    Rns = (1.0-albedo)*Rs # Shortwave component [J/m2/d]
+    # Calculate clear sky radiation Rs0
+    Rs0 = (0.75+2E-5*Z)*numpy.asarray(Rext, dtype=float) # Clear sky radiation [J/m2/d]
+    f = 1.35*Rs/Rs0-0.35
+    epsilom = 0.34-0.14*numpy.sqrt(ea/1000)
+    Rnl = f*epsilom*sigma*(numpy.asarray(airtemp, dtype=float)+273.15)**4 # Longwave component [J/m2/d]
+    return Rns-Rnl # Net radiation [J/m2/d]
+
+def _E0(p, Rnet, u, out=None):
+    # Penman open water evaporation [mm/day] from psychrometric terms p
+    Ea = (1+0.536*numpy.asarray(u, dtype=float))*p['vpd']/1000.
+    DELTA, gamma, Lambda = p['DELTA'], p['gamma'], p['Lambda']
+    return numpy.add(DELTA/(DELTA+gamma)*Rnet/Lambda, gamma/(DELTA+gamma)*6430000*Ea/Lambda, out=out)
+
+def _ET0pm(p, airtemp, Rnet, u, out=None):
+    # FAO Penman Monteith reference evaporation [mm/day] from psychrometric terms p
+    u = numpy.asarray(u, dtype=float)
+    airtemp = numpy.asarray(airtemp, dtype=float)
+    return numpy.divide(p['DELTA']/1000.*Rnet/p['Lambda']+900./(airtemp+273.16)*u*p['vpd']/1000\
+                        *p['gamma']/1000, p['DELTA']/1000.+p['gamma']/1000*(1.+0.34*u), out=out)
+
+def _Em(p, Rs, out=None):
+    # Makkink evaporation [mm/day] from psychrometric terms p
+    DELTA, gamma = p['DELTA'], p['gamma']
+    return numpy.divide(0.65*DELTA/(DELTA+gamma)*numpy.asarray(Rs, dtype=float), p['Lambda'], out=out)
+
+def _Ept(p, Rn, G, out=None):
+    # Priestley Taylor evaporation [mm/day] from psychrometric terms p
+    DELTA, gamma = p['DELTA'], p['gamma']
+    return numpy.divide(1.26*DELTA/(DELTA+gamma)*(numpy.asarray(Rn, dtype=float)-numpy.asarray(G, dtype=float)),
+                        p['Lambda'], out=out)
+
+def _Epm(p, Rn, ra, rs, out=None):
+    # Penman Monteith evaporation [mm] from psychrometric terms p, in hPa
+    DELTA = p['DELTA']/100. # [hPa/K]
+    gamma = p['gamma']/100. # [hPa/K]
+    ra = numpy.asarray(ra, dtype=float)
+    rs = numpy.asarray(rs, dtype=float)
+    return numpy.divide(DELTA*numpy.asarray(Rn, dtype=float)+p['rho']*p['cp']*p['vpd']/100.*ra/\
+                        (DELTA+gamma*(1.+rs/ra)), p['Lambda'], out=out)
+
 def E0(airtemp = scipy.array([]),\
        rh = scipy.array([]),\
        airpress = scipy.array([]),\
@@ -74,7 +175,8 @@ def E0(airtemp = scipy.array([]),\
        # N = scipy.array([]),\
        Rext = scipy.array([]),\
        u = scipy.array([]),\
-       Z=0.0):
+       Z=0.0,\
+       out=None):
     '''
     Function to calculate daily Penman open water evaporation (in mm/day).
     Equation according to J.D. Valiantzas (2006). Simplified versions
@@ -91,6 +193,7 @@ def E0(airtemp = scipy.array([]),\
         - Rext: (array of) daily extraterrestrial radiation [J/m2/day]
         - u: (array of) daily average wind speed at 2 m [m/s]
         - Z: (array of) site elevation [m a.s.l.], default is zero...
+        - out: (optional) array to write the output in
    
     Output:
         - E0: (array of) Penman open water evaporation values [mm/day]
@@ -107,52 +210,9 @@ def E0(airtemp = scipy.array([]),\
         6.5991748573832343
         >>> 
     '''
-    # Set constants
-    albedo = 0.06 # Open water albedo
-    sigma = 4.903E-3 # Stefan Boltzmann constant J/m2/K4/d
-    # Calculate Delta, gamma and lambda
-    DELTA = meteolib.Delta_calc(airtemp) # [Pa/K]
-    gamma = meteolib.gamma_calc(airtemp,rh,airpress) # [Pa/K]
-    Lambda = meteolib.L_calc(airtemp) # [J/kg]
-    # Calculate saturated and actual water vapour pressures
-    es = meteolib.es_calc(airtemp) # [Pa]
-    ea = meteolib.ea_calc(airtemp,rh) # [Pa]
-    # Determine length of array
-    l = scipy.size(airtemp)
-    # Check if we have a single value or an array
-    if l < 2:   # Dealing with single value...
-        Rns = (1.0-albedo)*Rs # Shortwave component [J/m2/d]
-        # Calculate clear sky radiation Rs0 
-        Rs0 = (0.75+2E-5*Z)*Rext
-        f = 1.35*Rs/Rs0-0.35
-        epsilom = 0.34-0.14*scipy.sqrt(ea/1000)
-        Rnl = f*epsilom*sigma*(airtemp+273.15)**4 # Longwave component [J/m2/d]
-        Rnet = Rns-Rnl # Net radiation [J/m2/d]
-        Ea = (1+0.536*u)*(es/1000.-ea/1000.)
-        E0 = DELTA/(DELTA+gamma)*Rnet/Lambda+gamma/(DELTA+gamma)*6430000*Ea/Lambda
-    else:   # Dealing with an array  
-        # Initiate output arrays
-        E0 = scipy.zeros(l)
-        Rns = scipy.zeros(l)
-        Rs0 = scipy.zeros(l)
-        f = scipy.zeros(l)
-        epsilom = scipy.zeros(l)
-        Rnl = scipy.zeros(l)
-        Rnet = scipy.zeros(l)
-        Ea = scipy.zeros(l)
-        for i in range(0,l):
-            # calculate longwave radiation component Rln (J/m2/day)
-            Rns[i] = (1.0-albedo)*Rs[i] # Shortwave component [J/m2/d]
-            # Calculate clear sky radiation Rs0 
-            Rs0[i] = (0.75+2E-5*Z)*Rext[i]
-            f[i] = 1.35*Rs[i]/Rs0[i]-0.35
-            epsilom[i] = 0.34-0.14*scipy.sqrt(ea[i]/1000)
-            Rnl[i] = f[i]*epsilom[i]*sigma*(airtemp[i]+273.15)**4 # Longwave component [J/m2/d]
-            Rnet[i] = Rns[i]-Rnl[i] # Net radiation [J/m2/d]
-            Ea[i] = (1+0.536*u[i])*(es[i]/1000-ea[i]/1000)
-            E0[i] = DELTA[i]/(DELTA[i]+gamma[i])*Rnet[i]/Lambda[i]+gamma[i]/(DELTA[i]+gamma[i])* \
-                6430000*Ea[i]/Lambda[i]
-    return E0
+    p = _psychrometrics(airtemp,rh,airpress)
+    Rnet = _net_radiation(airtemp,p['ea'],Rs,Rext,Z,albedo=0.06) # Open water albedo
+    return meteolib._output(_E0(p,Rnet,u,out=out))
 
 def ET0pm(airtemp = scipy.array([]),\
           rh = scipy.array([]),\
@@ -161,7 +221,8 @@ def ET0pm(airtemp = scipy.array([]),\
           N = scipy.array([]),\
           Rext = scipy.array([]),\
           u = scipy.array([]), \
-          Z=0.0):
+          Z=0.0,\
+          out=None):
     '''
     Function to calculate daily Penman Monteith reference evaporation
     (in mm/day). Source: R.G. Allen, L.S. Pereira, D. Raes and M. Smith
@@ -178,6 +239,7 @@ def ET0pm(airtemp = scipy.array([]),\
         - Rext: Incoming shortwave radiation at the top of the atmosphere [J/m2/day]
         - u: windspeed [m/s]
         - Z: elevation [m], default is 0.0 m
+        - out: (optional) array to write the output in
    
     Output:
         - ET0pm: (array of) Penman Monteith reference evaporation (short grass with optimum water supply) values [mm] 
@@ -185,57 +247,16 @@ def ET0pm(airtemp = scipy.array([]),\
     Examples:--
         >>> Eref_data = ET0pm(T,RH,press,Rs,N,Rext,u)    
     '''
-    # Set constants
-    albedo = 0.23 # short grass albedo
-    sigma = 4.903E-3 # Stefan Boltzmann constant J/m2/K4/d
-    # Calculate Delta, gamma and lambda
-    DELTA = meteolib.Delta_calc(airtemp) # [Pa/K]
-    gamma = meteolib.gamma_calc(airtemp,rh,airpress) # [Pa/K]
-    Lambda = meteolib.L_calc(airtemp) # [J/kg]
-    # Calculate saturated and actual water vapour pressures
-    es = meteolib.es_calc(airtemp) # [Pa]
-    ea = meteolib.ea_calc(airtemp,rh) # [Pa]
-    # Determine length of array
-    l = scipy.size(airtemp)
-    # Check if we have a single value or an array
-    if l < 2:   # Dealing with single value...
-        Rns = (1.0-albedo)*Rs # Shortwave component [J/m2/d]
-        # Calculate clear sky radiation Rs0 
-        Rs0 = (0.75+2E-5*Z)*Rext # Clear sky radiation [J/m2/d]
-        f = 1.35*Rs/Rs0-0.35
-        epsilom = 0.34-0.14*scipy.sqrt(ea/1000)
-        Rnl = f*epsilom*sigma*(airtemp+273.15)**4 # Longwave component [J/m2/d]
-        Rnet = Rns-Rnl # Net radiation [J/m2/d]
-        ET0pm = (DELTA/1000.*Rnet/Lambda+900./(airtemp+273.16)*u*(es-ea)/1000\
-                 *gamma/1000)/(DELTA/1000.+gamma/1000*(1.+0.34*u))
-    else:   # Dealing with an array  
-        # Initiate output arrays
-        ET0pm = scipy.zeros(l)
-        Rns = scipy.zeros(l)
-        Rs0 = scipy.zeros(l)
-        f = scipy.zeros(l)
-        epsilom = scipy.zeros(l)
-        Rnl = scipy.zeros(l)
-        Rnet = scipy.zeros(l)
-        for i in range(0,l):
-            # calculate longwave radiation component Rln (J/m2/day)
-            Rns[i] = (1.0-albedo)*Rs[i] # Shortwave component [J/m2/d]
-            # Calculate clear sky radiation Rs0 
-            Rs0[i] = (0.75+2E-5*Z)*Rext[i]
-            f[i] = 1.35*Rs[i]/Rs0[i]-0.35
-            epsilom[i] = 0.34-0.14*scipy.sqrt(ea[i]/1000)
-            Rnl[i] = f[i]*epsilom[i]*sigma*(airtemp[i]+273.15)**4 # Longwave component [J/m2/d]
-            Rnet[i] = Rns[i]-Rnl[i] # Net radiation [J/m2/d]
-            ET0pm[i] = (DELTA[i]/1000.*Rnet[i]/Lambda[i]+900./(airtemp[i]+273.16)* \
-                       u[i]*(es[i]-ea[i])/1000*gamma[i]/1000)/ \
-                      (DELTA[i]/1000.+gamma[i]/1000*(1.+0.34*u[i]))
-    return ET0pm # FAO reference evaporation [mm/day]
+    p = _psychrometrics(airtemp,rh,airpress)
+    Rnet = _net_radiation(airtemp,p['ea'],Rs,Rext,Z,albedo=0.23) # short grass albedo
+    return meteolib._output(_ET0pm(p,airtemp,Rnet,u,out=out)) # FAO reference evaporation [mm/day]
 
 
 def Em(airtemp = scipy.array([]),\
        rh = scipy.array([]),\
        airpress = scipy.array([]),\
-       Rs = scipy.array([])):
+       Rs = scipy.array([]),\
+       out=None):
     '''
     Function to calculate Makkink evaporation (in mm/day). The Makkink
     evaporation is a reference crop evaporation used in the Netherlands,
@@ -250,6 +271,7 @@ def Em(airtemp = scipy.array([]),\
         - rh: (array of) daily average relative humidity values[%]
         - airpress: (array of) daily average air pressure data [Pa]
         - Rs: (array of) average daily incoming solar radiation [J/m2/day]
+        - out: (optional) array to write the output in
    
     Output:
         - Em: (array of) Makkink evaporation values [mm]
@@ -259,31 +281,16 @@ def Em(airtemp = scipy.array([]),\
         >>> Em(21.65,67.0,101300,24200000)
         4.5038304791979913
     '''
-    # Calculate Delta and gamma constants
-    DELTA = meteolib.Delta_calc(airtemp)
-    gamma = meteolib.gamma_calc(airtemp,rh,airpress)
-    Lambda = meteolib.L_calc(airtemp)
-    # Determine length of array
-    l = scipy.size(airtemp)
-    # Check if we have a single value or an array
-    if l < 2:   # Dealing with single value...
-        # calculate Em [mm/day]
-        Em = 0.65 * DELTA/(DELTA + gamma) * Rs / Lambda
-    else:   # Dealing with an array         
-        # Initiate output array
-        Em = scipy.zeros(l)
-        for i in range(0,l):   
-            # calculate Em [mm/day]
-            Em[i]= 0.65*DELTA[i]/(DELTA[i]+gamma[i])*Rs[i]/Lambda[i]
-        Em=scipy.array(Em)
-    return Em
+    p = _psychrometrics(airtemp,rh,airpress)
+    return meteolib._output(_Em(p,Rs,out=out))
 
 
 def Ept(airtemp = scipy.array([]),\
         rh = scipy.array([]),\
         airpress = scipy.array([]),\
         Rn = scipy.array([]),\
-        G = scipy.array([])):
+        G = scipy.array([]),\
+        out=None):
     '''
     Function to calculate daily Priestley - Taylor evaporation (in mm).
     Source: Priestley, C.H.B. and R.J. Taylor, 1972. On the assessment
@@ -296,6 +303,7 @@ def Ept(airtemp = scipy.array([]),\
         - airpress: (array of) daily average air pressure data [Pa]
         - Rn: (array of) average daily net radiation [J/m2/day]
         - G: (array of) average daily soil heat flux [J/m2/day]
+        - out: (optional) array to write the output in
    
     Output:
         - Ept: (array of) Priestley Taylor evaporation values [mm]
@@ -305,24 +313,8 @@ def Ept(airtemp = scipy.array([]),\
         >>> Ept(21.65,67.0,101300,18200000,600000)
         6.3494561161280778
     '''
-    # Calculate Delta and gamma constants
-    DELTA = meteolib.Delta_calc(airtemp)
-    gamma = meteolib.gamma_calc(airtemp,rh,airpress)
-    Lambda = meteolib.L_calc(airtemp)
-    # Determine length of array
-    l = scipy.size(airtemp)
-    # Check if we have a single value or an array
-    if l < 2:   # Dealing with single value...
-        # calculate Em [mm/day]
-        Ept= 1.26*DELTA/(DELTA+gamma)*(Rn-G)/Lambda
-    else:   # Dealing with an array         
-        # Initiate output array
-        Ept = scipy.zeros(l)
-        for i in range(0,l):   
-            # calculate Ept [mm/day]
-            Ept[i]= 1.26*DELTA[i]/(DELTA[i]+gamma[i])*(Rn[i]-G[i])/Lambda[i]
-        Ept= scipy.array(Ept)
-    return Ept
+    p = _psychrometrics(airtemp,rh,airpress)
+    return meteolib._output(_Ept(p,Rn,G,out=out))
 
 '''
     ================================================================
@@ -333,7 +325,8 @@ def Ept(airtemp = scipy.array([]),\
 def ra(z=float,\
        z0=float,\
        d=float,\
-       u = scipy.array([])):
+       u = scipy.array([]),\
+       out=None):
     '''
     Function to calculate the aerodynamic resistance 
     (in s/m) from windspeed and height/roughness values
@@ -343,6 +336,7 @@ def ra(z=float,\
         - z0: roughness length [m]
         - d: displacement length [m]
         - u: (array of) windspeed [m/s]
+        - out: (optional) array to write the output in
 
 
     Output:
@@ -355,17 +349,8 @@ def ra(z=float,\
         >>> ra(3,0.12,2.4,u)
         array([ 8.09465748,  4.04732874,  2.69821916])
     '''
-    # Determine length of array
-    l = scipy.size(u)
-    # Check if we have a single value or an array
-    if l < 2:   # Dealing with single value...
-        ra= (scipy.log((z-d)/z0))**2/(0.16*u)
-    else:   # Dealing with an array  
-        # Initiate output arrays
-        ra = scipy.zeros(l)
-        for i in range(0,l):
-            ra[i]= (scipy.log((z-d)/z0))**2/(0.16*u[i])
-    return ra # aerodynamic resistanc in s/m
+    ra = numpy.divide((numpy.log((z-d)/z0))**2, 0.16*numpy.asarray(u, dtype=float), out=out)
+    return meteolib._output(ra) # aerodynamic resistanc in s/m
 
 def Epm(airtemp = scipy.array([]),\
         rh = scipy.array([]),\
@@ -373,7 +358,8 @@ def Epm(airtemp = scipy.array([]),\
         Rn = scipy.array([]),\
         G = scipy.array([]),\
         ra = scipy.array([]),\
-        rs = scipy.array([])):
+        rs = scipy.array([]),\
+        out=None):
     '''
     Function to calculate the Penman Monteith evaporation
     (in mm) Monteith, J.L. (1965) Evaporation and environment.
@@ -387,6 +373,7 @@ def Epm(airtemp = scipy.array([]),\
         - G: (array of) average daily soil heat flux [J]
         - ra: aerodynamic resistance [s/m]
         - rs: surface resistance [s/m]
+        - out: (optional) array to write the output in
 
     Output:
         - Epm: (array of) Penman Monteith evaporation values [mm]
@@ -394,28 +381,78 @@ def Epm(airtemp = scipy.array([]),\
     Examples:
         >>> Epm_data = Epm(T,RH,press,Rn,G,ra,rs)    
     '''
-    # Calculate Delta, gamma and lambda
-    DELTA = meteolib.Delta_calc(airtemp)/100. # [hPa/K]
-    airpress=airpress*100. # [Pa]
-    gamma = meteolib.gamma_calc(airtemp,rh,airpress)/100. # [hPa/K]
-    Lambda = meteolib.L_calc(airtemp) # [J/kg]
-    rho = meteolib.rho_calc(airtemp,rh,airpress)
-    cp = meteolib.cp_calc(airtemp,rh,airpress)
-    # Calculate saturated and actual water vapour pressures
-    es = meteolib.es_calc(airtemp)/100. # [hPa]
-    ea = meteolib.ea_calc(airtemp,rh)/100. # [hPa]
-    # Determine length of array
-    l = scipy.size(airtemp)
-    # Check if we have a single value or an array
-    if l < 2:   # Dealing with single value...
-        Epm = (DELTA*Rn+rho*cp*(es-ea)*ra/(DELTA+gamma*(1.+rs/ra)))/Lambda
-    else:   # Dealing with an array  
-        # Initiate output arrays
-        Epm = scipy.zeros(l)
-        for i in range(0,l):
-            Epm = (DELTA[i]*Rn[i]+rho[i]*cp[i]*(es[i]-ea[i])*ra[i]/(DELTA[i] \
-                + gamma[i]*(1.+rs[i]/ra[i])))/Lambda[i]
-    return Epm # actual ET in mm
+    airpress = numpy.asarray(airpress, dtype=float)*100. # [Pa]
+    p = _psychrometrics(airtemp,rh,airpress)
+    return meteolib._output(_Epm(p,Rn,ra,rs,out=out)) # actual ET in mm
+
+
+def Eensemble(airtemp = scipy.array([]),\
+              rh = scipy.array([]),\
+              airpress = scipy.array([]),\
+              Rs = None,\
+              Rext = None,\
+              u = None,\
+              Z = 0.0,\
+              Rn = None,\
+              G = None,\
+              ra = None,\
+              rs = None,\
+              methods = ('E0', 'ET0pm', 'Em', 'Ept')):
+    '''
+    Function to calculate several evaporation methods for the same forcing in
+    one pass. The psychrometric terms (es, ea, Delta, lambda, cp, gamma, rho)
+    are calculated once and shared by all methods, which use the same
+    equations as E0, ET0pm, Em, Ept and Epm. A ValueError naming the input
+    is raised when an input of a requested method is not given.
+
+    Input (measured at 2 m height):
+        - airtemp: (array of) daily average air temperatures [Celsius]
+        - rh: (array of) daily average relative humidity values [%]
+        - airpress: (array of) daily average air pressure data [Pa], also
+          for Epm (which itself takes hPa)
+        - Rs: (array of) daily incoming solar radiation [J/m2/day], for E0, ET0pm and Em
+        - Rext: (array of) daily extraterrestrial radiation [J/m2/day], for E0 and ET0pm
+        - u: (array of) daily average wind speed at 2 m [m/s], for E0 and ET0pm
+        - Z: site elevation [m a.s.l.], default is zero, for E0 and ET0pm
+        - Rn: (array of) average daily net radiation [J/m2/day], for Ept and Epm
+        - G: (array of) average daily soil heat flux [J/m2/day], for Ept and Epm
+        - ra: aerodynamic resistance [s/m], for Epm
+        - rs: surface resistance [s/m], for Epm
+        - methods: names of the methods to calculate
+
+    Output:
+        - dictionary of method name: (array of) evaporation values [mm/day]
+
+    Examples:
+        >>> E = Eensemble(T,RH,press,Rs=Rs,Rext=Rext,u=u,methods=('E0','ET0pm','Em'))
+        >>> E['ET0pm'] - E['E0']
+    '''
+    required = {'E0': ('Rs', 'Rext', 'u'),
+                'ET0pm': ('Rs', 'Rext', 'u'),
+                'Em': ('Rs',),
+                'Ept': ('Rn', 'G'),
+                'Epm': ('Rn', 'ra', 'rs')}
+    inputs = {'Rs': Rs, 'Rext': Rext, 'u': u, 'Rn': Rn, 'G': G, 'ra': ra, 'rs': rs}
+    for method in methods:
+        if method not in required:
+            raise ValueError('unknown evaporation method %s, use one of %s' % (method, ', '.join(sorted(required))))
+        for name in required[method]:
+            if inputs[name] is None:
+                raise ValueError('evaporation method %s needs input %s' % (method, name))
+    # Shared psychrometric terms
+    p = _psychrometrics(airtemp,rh,airpress)
+    E = {}
+    if 'E0' in methods:
+        E['E0'] = _E0(p,_net_radiation(airtemp,p['ea'],Rs,Rext,Z,albedo=0.06),u)
+    if 'ET0pm' in methods:
+        E['ET0pm'] = _ET0pm(p,airtemp,_net_radiation(airtemp,p['ea'],Rs,Rext,Z,albedo=0.23),u)
+    if 'Em' in methods:
+        E['Em'] = _Em(p,Rs)
+    if 'Ept' in methods:
+        E['Ept'] = _Ept(p,Rn,G)
+    if 'Epm' in methods:
+        E['Epm'] = _Epm(p,Rn,ra,rs)
+    return dict((method, meteolib._output(E[method])) for method in methods)
     
     
 def tvardry(rho = scipy.array([]),\
@@ -0,0 +1,313 @@
+__author__ = 'kiruba'
+"""
+Gridding of scattered survey points (x, y, z).
+Linear gridding with a reusable Delaunay triangulation:
+scipy.interpolate.griddata(method='linear') triangulates the points on every call, here the triangulation
+is built once per point set, kept in memory and pickled in cache_dir (eg. next to the survey file) under the
+hash of the points, and the barycentric weights of every grid are kept, so regridding, replotting or another
+z (eg. corrected depth) on the same points does not triangulate again.
+Local gridding for dense surveys (echo sounder tracks): every grid node uses only its k nearest points
+found with a KD-tree, the grid is split into tiles that can be processed in parallel, and nodes outside the
+lake boundary are masked out with a vectorised point in polygon test.
+"""
+import os
+import pickle
+import hashlib
+import tempfile
+import numpy as np
+from multiprocessing import Pool
+from scipy.spatial import Delaunay, cKDTree
+
+# point set hash: Delaunay triangulation
+_triangulations = {}
+methods = ['idw', 'shepard']
+# KD-tree and values of worker process, set by init_worker
+worker_data = {}
+
+
+def point_set_hash(points):
+    """
+    sha1 hash of point coordinates
+
+    :param points: array of shape (n, 2)
+    :return: hex digest
+    """
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    sha1 = hashlib.sha1()
+    sha1.update(str(points.shape).encode('utf-8'))
+    sha1.update(points.tobytes())
+    return sha1.hexdigest()
+
+
+def load_triangulation(points, cache_dir=None):
+    """
+    Delaunay triangulation of points, from memory, cache_dir or built (and saved to cache_dir)
+
+    :param points: array of shape (n, 2)
+    :param cache_dir: directory of pickled triangulations, None - memory only
+    :return: scipy.spatial.Delaunay
+    """
+    key = point_set_hash(points)
+    if key in _triangulations:
+        return _triangulations[key]
+    path = os.path.join(cache_dir, 'delaunay_{0}.pkl'.format(key)) if cache_dir is not None else None
+    triangulation = None
+    if path is not None and os.path.exists(path):
+        with open(path, 'rb') as pickled:
+            triangulation = pickle.load(pickled)
+    if triangulation is None:
+        triangulation = Delaunay(points)
+        if path is not None:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            # write to a temporary file first, so a half written triangulation is never read
+            handle, temporary = tempfile.mkstemp(dir=cache_dir)
+            with os.fdopen(handle, 'wb') as pickled:
+                pickle.dump(triangulation, pickled, protocol=pickle.HIGHEST_PROTOCOL)
+            os.rename(temporary, path)
+    _triangulations[key] = triangulation
+    return triangulation
+
+
+def clear_cache():
+    _triangulations.clear()
+
+
+class SurveyGrid(object):
+    """
+    Linear interpolation of survey points onto regular grids, same result as
+    griddata((x, y), z, (xi[None, :], yi[:, None]), method='linear', fill_value=fill_value)
+
+    Examples:
+        >>> survey_grid = SurveyGrid(X, Y, cache_dir='/media/kiruba/New Volume/milli_watershed/smg_lake_bathymetry/process')
+        >>> zi = survey_grid.interpolate(Z, xi, yi, fill_value=1)
+        >>> zi_fine = survey_grid.interpolate(Z, np.linspace(X.min(), X.max(), 1000), np.linspace(Y.min(), Y.max(), 1000), fill_value=1)
+    """
+    def __init__(self, x, y, cache_dir=None):
+        self.points = np.column_stack((np.asarray(x, dtype=float), np.asarray(y, dtype=float)))
+        self.triangulation = load_triangulation(self.points, cache_dir=cache_dir)
+        # grid hash: (vertices, barycentric weights, outside)
+        self._weights = {}
+
+    def grid_weights(self, xi, yi):
+        """
+        Triangle vertices and barycentric weights of every node of grid zi[j, i] at (xi[i], yi[j])
+
+        :param xi: x coordinates of grid
+        :param yi: y coordinates of grid
+        :return: vertices (n, 3), weights (n, 3) and outside (n,) - nodes outside the convex hull of the points
+        """
+        xi = np.asarray(xi, dtype=float)
+        yi = np.asarray(yi, dtype=float)
+        key = point_set_hash(np.concatenate((xi, [np.nan], yi)).reshape(-1, 1))
+        if key not in self._weights:
+            nodes = np.column_stack((np.tile(xi, len(yi)), np.repeat(yi, len(xi))))
+            simplex = self.triangulation.find_simplex(nodes)
+            outside = simplex < 0
+            simplex[outside] = 0
+            transform = self.triangulation.transform[simplex]
+            barycentric = np.einsum('ijk,ik->ij', transform[:, :2, :], nodes - transform[:, 2, :])
+            weights = np.column_stack((barycentric, 1 - barycentric.sum(axis=1)))
+            vertices = self.triangulation.simplices[simplex]
+            self._weights[key] = (vertices, weights, outside)
+        return self._weights[key]
+
+    def interpolate(self, z, xi, yi, fill_value=np.nan):
+        """
+        Linear interpolation of z onto grid
+
+        :param z: values at survey points
+        :param xi: x coordinates of grid
+        :param yi: y coordinates of grid
+        :param fill_value: value outside the convex hull of the points
+        :return: array of shape (len(yi), len(xi))
+        """
+        z = np.asarray(z, dtype=float)
+        if len(z) != len(self.points):
+            raise ValueError("z must have one value for each of the {0} points".format(len(self.points)))
+        vertices, weights, outside = self.grid_weights(xi, yi)
+        zi = (z[vertices] * weights).sum(axis=1)
+        zi[outside] = fill_value
+        return zi.reshape(len(yi), len(xi))
+
+
+def points_in_polygon(x, y, polygon_x, polygon_y):
+    """
+    Even-odd ray casting test of many points against a polygon (eg. lake boundary), vectorised over points
+
+    :param x: x of points
+    :param y: y of points
+    :param polygon_x: x of polygon vertices, closed or not
+    :param polygon_y: y of polygon vertices
+    :return: boolean array, True for points inside polygon
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    polygon_x = np.asarray(polygon_x, dtype=float)
+    polygon_y = np.asarray(polygon_y, dtype=float)
+    inside = np.zeros(x.shape, dtype=bool)
+    x1, y1 = polygon_x, polygon_y
+    x2, y2 = np.roll(polygon_x, -1), np.roll(polygon_y, -1)
+    for i in range(len(polygon_x)):
+        if y1[i] == y2[i]:
+            continue
+        crosses = (y1[i] > y) != (y2[i] > y)
+        x_cross = x1[i] + ((y - y1[i]) * (x2[i] - x1[i]) / (y2[i] - y1[i]))
+        inside ^= crosses & (x < x_cross)
+    return inside
+
+
+def grid_mask(xi, yi, polygon_x, polygon_y):
+    """
+    Nodes of grid zi[j, i] at (xi[i], yi[j]) inside polygon.
+    Scan line form of points_in_polygon: crossings of every grid row with all edges are found at once and
+    nodes are counted against the sorted crossings.
+
+    :param xi: x coordinates of grid
+    :param yi: y coordinates of grid
+    :param polygon_x: x of polygon vertices
+    :param polygon_y: y of polygon vertices
+    :return: boolean array of shape (len(yi), len(xi))
+    """
+    xi = np.asarray(xi, dtype=float)
+    yi = np.asarray(yi, dtype=float)[:, np.newaxis]
+    x1 = np.asarray(polygon_x, dtype=float)
+    y1 = np.asarray(polygon_y, dtype=float)
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    crosses = (y1 > yi) != (y2 > yi)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x1 + ((yi - y1) * (x2 - x1) / (y2 - y1))
+    x_cross = np.sort(np.where(crosses, x_cross, np.inf), axis=1)
+    no_of_crossings = crosses.sum(axis=1)
+    mask = np.empty((len(yi), len(xi)), dtype=bool)
+    for j in range(len(yi)):
+        # crossings to the right of node
+        right = no_of_crossings[j] - np.searchsorted(x_cross[j, :no_of_crossings[j]], xi, side='right')
+        mask[j] = (right % 2) == 1
+    return mask
+
+
+def local_weights(distance, method='idw', power=2):
+    """
+    Weights of the k nearest points of each node
+
+    :param distance: array of shape (n, k), distances sorted nearest first
+    :param method: 'idw' - inverse distance ** power, 'shepard' - modified Shepard (Franke and Nielson) weights,
+        ((r - d) / (r * d)) ** 2 with r the distance to the k th point, which go smoothly to zero at r
+        and behave like natural neighbour interpolation near the points
+    :param power: power of inverse distance
+    :return: array of shape (n, k) of weights summing to 1, a point at the node gets all the weight
+    """
+    if method not in methods:
+        raise ValueError("method must be one of {0}".format(methods))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method == 'idw':
+            weights = 1.0 / (distance ** power)
+        else:
+            # farthest neighbour found (distance is infinite for neighbours beyond max_distance)
+            radius = np.where(np.isfinite(distance), distance, 0.0).max(axis=1)[:, np.newaxis] * 1.0001
+            weights = ((radius - distance) / (radius * distance)) ** 2
+        exact = distance == 0
+        hit = exact.any(axis=1)
+        weights[hit] = exact[hit]
+        weights[~np.isfinite(weights)] = 0.0
+        return weights / weights.sum(axis=1)[:, np.newaxis]
+
+
+def init_worker(x, y, z, k, method, power, max_distance):
+    worker_data['tree'] = cKDTree(np.column_stack((x, y)))
+    worker_data['z'] = z
+    worker_data['parameters'] = (k, method, power, max_distance)
+
+
+def interpolate_nodes(nodes):
+    """
+    Interpolates nodes with the KD-tree of the worker
+
+    :param nodes: array of shape (n, 2)
+    :return: array of n values, NaN if no point within max_distance
+    """
+    k, method, power, max_distance = worker_data['parameters']
+    k = min(k, len(worker_data['z']))
+    distance, neighbour = worker_data['tree'].query(nodes, k=k, distance_upper_bound=max_distance)
+    if k == 1:
+        distance, neighbour = distance[:, np.newaxis], neighbour[:, np.newaxis]
+    # neighbours beyond max_distance come back with infinite distance and index n
+    found = np.isfinite(distance)
+    neighbour = np.where(found, neighbour, 0)
+    weights = local_weights(np.where(found, distance, np.inf), method=method, power=power)
+    values = (weights * worker_data['z'][neighbour]).sum(axis=1)
+    values[~found[:, 0]] = np.nan
+    return values
+
+
+def interpolate_tile(tile):
+    return tile[0], interpolate_nodes(tile[1])
+
+
+class LocalGrid(object):
+    """
+    Tiled KD-tree interpolation of dense survey points onto a grid
+
+    Examples:
+        >>> local_grid = LocalGrid(X, Y, Z, k=12, method='idw', processes=4)
+        >>> inside = grid_mask(xi, yi, boundary_df['longitude'], boundary_df['latitude'])
+        >>> zi = local_grid.interpolate(xi, yi, mask=inside, fill_value=1)
+    """
+    def __init__(self, x, y, z, k=12, method='idw', power=2, max_distance=np.inf, tile_size=256, processes=1):
+        if method not in methods:
+            raise ValueError("method must be one of {0}".format(methods))
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.z = np.asarray(z, dtype=float)
+        self.parameters = (k, method, power, max_distance)
+        self.tile_size = tile_size
+        self.processes = processes
+
+    def tiles(self, xi, yi, mask):
+        for row in range(0, len(yi), self.tile_size):
+            for column in range(0, len(xi), self.tile_size):
+                rows = slice(row, min(row + self.tile_size, len(yi)))
+                columns = slice(column, min(column + self.tile_size, len(xi)))
+                xig, yig = np.meshgrid(xi[columns], yi[rows])
+                selected = mask[rows, columns]
+                if selected.any():
+                    yield (rows, columns), np.column_stack((xig[selected], yig[selected]))
+
+    def interpolate(self, xi, yi, mask=None, fill_value=np.nan):
+        """
+        Interpolates grid zi[j, i] at (xi[i], yi[j])
+
+        :param xi: x coordinates of grid
+        :param yi: y coordinates of grid
+        :param mask: boolean array of shape (len(yi), len(xi)), only True nodes are interpolated (see grid_mask)
+        :param fill_value: value of masked nodes and nodes without points within max_distance
+        :return: array of shape (len(yi), len(xi))
+        """
+        xi = np.asarray(xi, dtype=float)
+        yi = np.asarray(yi, dtype=float)
+        if mask is None:
+            mask = np.ones((len(yi), len(xi)), dtype=bool)
+        zi = np.empty((len(yi), len(xi)))
+        zi.fill(fill_value)
+        initargs = (self.x, self.y, self.z) + self.parameters
+        tiles = self.tiles(xi, yi, mask)
+        if self.processes > 1:
+            pool = Pool(processes=self.processes, initializer=init_worker, initargs=initargs)
+            try:
+                results = pool.imap_unordered(interpolate_tile, tiles)
+                self.fill(zi, mask, results, fill_value)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            init_worker(*initargs)
+            self.fill(zi, mask, (interpolate_tile(tile) for tile in tiles), fill_value)
+        return zi
+
+    @staticmethod
+    def fill(zi, mask, results, fill_value):
+        for (rows, columns), values in results:
+            values[np.isnan(values)] = fill_value
+            tile = zi[rows, columns]
+            tile[mask[rows, columns]] = values
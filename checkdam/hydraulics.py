@@ -0,0 +1,165 @@
+__author__ = 'kiruba'
+"""
+Check dam hydraulics over whole water level series.
+Overflow over the check dam wall is the broad crested weir formula Q = C * L * H^1.5 (cu.m/s), integrated over the
+logger interval. In the interval the stage rises above the wall, only the part of the interval after the
+(linearly interpolated) time the stage crossed the wall top is counted, or half of the interval (first_interval).
+Pumping is a fall in volume over one interval larger than the pump can explain otherwise.
+The reading one interval earlier is looked up by reindexing on the shifted index, not timestamp by timestamp.
+"""
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+first_intervals = ['interpolate', 'half']
+
+
+def previous_values(series, seconds=1800):
+    """
+    Values one interval earlier, NaN where there is no reading at that time
+
+    :param series: Pandas series with unique datetime index
+    :param seconds: interval in seconds
+    :return: array aligned with series
+    """
+    return series.reindex(series.index - timedelta(seconds=seconds)).values
+
+
+def weir_discharge(head, weir_length, coefficient=1.84):
+    """
+    Discharge over broad crested weir
+
+    :param head: (array of) head above the weir crest in m
+    :param weir_length: length of weir in m
+    :param coefficient: discharge coefficient, 1.84 for SI units
+    :return: discharge in cu.m/s
+    """
+    return coefficient * weir_length * (np.asarray(head, dtype=float) ** 1.5)
+
+
+def overflow_volume(stage, full_stage, weir_length, coefficient=1.84, interval=1800, decimals=2, rounding=np.around,
+                    first_interval='interpolate'):
+    """
+    Overflow volume of every interval ending at the time stamps of stage.
+    A stage above full stage overflows for the whole interval if the previous stage was above full stage too,
+    else for the part of the interval after the stage crossed full stage (see first_interval).
+    A time stamp without a reading one interval earlier has no overflow, the crossing can't be placed.
+
+    :param stage: Pandas series of stage in m with unique datetime index
+    :param full_stage: stage of check dam wall top in m, above this check dam overflows
+    :param weir_length: length of weir (check dam wall) in m
+    :param coefficient: discharge coefficient
+    :param interval: logger interval in seconds
+    :param decimals: stages are rounded to this many decimals before comparison with full stage
+    :param rounding: rounding function(a, decimals), np.around or checkdam.myround
+    :param first_interval: part of the interval the stage crossed full stage in that overflows, 'interpolate' -
+        after the crossing of a linear rise from the previous stage, 'half' - half of the interval
+    :return: Pandas series of overflow volume in cu.m
+    """
+    if first_interval not in first_intervals:
+        raise ValueError("first_interval must be one of {0}".format(first_intervals))
+    obs_stage = stage.values.astype(float)
+    current = rounding(obs_stage, decimals=decimals)
+    previous = rounding(previous_values(stage, interval), decimals=decimals)
+    overflowing = current > full_stage
+    duration = np.zeros(len(obs_stage))
+    duration[overflowing] = interval
+    duration[overflowing & np.isnan(previous)] = 0.0
+    with np.errstate(invalid='ignore'):
+        rising = overflowing & (previous <= full_stage)
+    if first_interval == 'half':
+        duration[rising] = 0.5 * interval
+    else:
+        # linear rise from previous to current stage, overflow starts when it crosses full stage
+        duration[rising] = interval * (current[rising] - full_stage) / (current[rising] - previous[rising])
+    volume = np.zeros(len(obs_stage))
+    volume[overflowing] = duration[overflowing] * weir_discharge(obs_stage[overflowing] - full_stage,
+                                                                 weir_length, coefficient)
+    return pd.Series(volume, index=stage.index, name='overflow(cu.m)')
+
+
+def overflow_status(stage, full_stage, decimals=2, rounding=np.around):
+    """
+    1 where the stage is above full stage, else 0
+
+    :param stage: Pandas series of stage in m
+    :param full_stage: stage of check dam wall top in m
+    :param decimals: see overflow_volume
+    :param rounding: see overflow_volume
+    :return: Pandas series of float status
+    """
+    status = (rounding(stage.values.astype(float), decimals=decimals) > full_stage).astype(float)
+    return pd.Series(status, index=stage.index, name='overflow status')
+
+
+def pumping_status(volume, stage, full_stage, threshold=14.0, interval=1800):
+    """
+    1 where the volume fell by more than threshold since the previous reading while the check dam was
+    not overflowing, else 0. Time stamps without a reading one interval earlier are never pumping.
+
+    :param volume: Pandas series of volume in cu.m with unique datetime index
+    :param stage: Pandas series of stage in m, same index as volume
+    :param full_stage: stage of check dam wall top in m
+    :param threshold: fall in volume (cu.m) per interval, or a series of it eg. 14 + evaporation
+    :param interval: logger interval in seconds
+    :return: Pandas series of float status
+    """
+    fall = previous_values(volume, interval) - volume.values
+    threshold = np.asarray(threshold, dtype=float)
+    with np.errstate(invalid='ignore'):
+        status = (fall > threshold) & (stage.values < full_stage)
+    return pd.Series(status.astype(float), index=volume.index, name='pumping status')
+
+
+class CheckDamWeir(object):
+    """
+    Overflow and pumping of a check dam, with the parameters of that dam
+
+    Examples:
+        >>> weir = CheckDamWeir(full_stage=1.91, weir_length=0.5)
+        >>> water_balance_df['pumping status'] = weir.pumping(water_balance_df['volume (cu.m)'], water_balance_df['stage(m)'])
+        >>> water_balance_df['overflow(cu.m)'] = weir.overflow(water_balance_df['stage(m)'])
+    """
+    def __init__(self, full_stage, weir_length, coefficient=1.84, pumping_threshold=14.0, interval=1800, decimals=2,
+                 rounding=np.around, first_interval='interpolate'):
+        self.full_stage = full_stage
+        self.weir_length = weir_length
+        self.coefficient = coefficient
+        self.pumping_threshold = pumping_threshold
+        self.interval = interval
+        self.decimals = decimals
+        self.rounding = rounding
+        self.first_interval = first_interval
+
+    def overflow(self, stage):
+        """
+        Overflow volume, see overflow_volume
+
+        :param stage: Pandas series of stage in m
+        :return: Pandas series of overflow volume in cu.m
+        """
+        return overflow_volume(stage, self.full_stage, self.weir_length, coefficient=self.coefficient,
+                               interval=self.interval, decimals=self.decimals, rounding=self.rounding,
+                               first_interval=self.first_interval)
+
+    def overflow_status(self, stage):
+        """
+        Overflow status, see overflow_status
+
+        :param stage: Pandas series of stage in m
+        :return: Pandas series of float status
+        """
+        return overflow_status(stage, self.full_stage, decimals=self.decimals, rounding=self.rounding)
+
+    def pumping(self, volume, stage, threshold=None):
+        """
+        Pumping status, see pumping_status
+
+        :param volume: Pandas series of volume in cu.m
+        :param stage: Pandas series of stage in m
+        :param threshold: fall in volume per interval, default pumping_threshold of the dam
+        :return: Pandas series of float status
+        """
+        if threshold is None:
+            threshold = self.pumping_threshold
+        return pumping_status(volume, stage, self.full_stage, threshold=threshold, interval=self.interval)
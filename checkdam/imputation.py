@@ -0,0 +1,398 @@
+__author__ = 'kiruba'
+"""
+Gap imputation of weather records from truncated normal distributions.
+As in the MCMC imputation scripts, a missing value is TruncatedNormal(mu, tau, a, b), with mu and tau of the observed
+values around its gap (or of the whole record), separately for day and night. mu and tau are fixed, not sampled,
+so the posterior of every missing value is that truncated normal and its mean (what the mean of the trace values of
+the scripts estimated) and central interval are computed exactly instead of drawn by MCMC, for all missing values
+of all gaps and variables from one batch of arrays. Every gap is logged with the number of observed values behind
+mu and tau, its mu, tau, interval width and the wall time of its moments.
+For short gaps AnalogImputer is a faster mode: every missing value is the mean of its nearest analogs, observed
+time steps of the same period (day or night) close in time of day, neighbouring station readings and recent weather,
+found with a KD-tree.
+"""
+import time
+import numpy as np
+import pandas as pd
+from scipy import stats
+from scipy.spatial import cKDTree
+
+periods = ['day', 'night']
+
+
+def find_gaps(series):
+    """
+    Runs of missing (NaN) values
+
+    :param series: Pandas series with datetime index
+    :return: dataframe with start, end (time stamps of first and last missing value), length and position of
+        first missing value of every gap
+    """
+    missing = np.isnan(series.values.astype(float))
+    edges = np.diff(np.concatenate(([0], missing.astype(np.int8), [0])))
+    first = np.flatnonzero(edges == 1)
+    stop = np.flatnonzero(edges == -1)
+    return pd.DataFrame({'start': series.index[first], 'end': series.index[stop - 1], 'length': stop - first,
+                         'position': first}, columns=['start', 'end', 'length', 'position'])
+
+
+def day_selector(index, day_hours=(6, 18)):
+    """
+    True for time stamps of day hours (6 <= hour <= 18 as in the scripts), False for night
+
+    :param index: DatetimeIndex
+    :param day_hours: first and last hour of day
+    :return: boolean array
+    """
+    hour = index.hour
+    return np.asarray((hour >= day_hours[0]) & (hour <= day_hours[1]))
+
+
+def window_statistics(series, gaps, selector, window_days=None, ddof=0):
+    """
+    Mean and standard deviation of observed values of selector in a window around every gap,
+    from cumulative sums, so every gap costs two searchsorted lookups
+
+    :param series: Pandas series with sorted datetime index
+    :param gaps: dataframe from find_gaps
+    :param selector: boolean array, values of the period (day or night)
+    :param window_days: days before the first and after the last missing value, None - whole record
+    :param ddof: delta degrees of freedom of standard deviation (np.std default 0)
+    :return: arrays of mean, standard deviation and number of observed values per gap
+    """
+    values = series.values.astype(float)
+    observed = ~np.isnan(values) & selector
+    x = np.where(observed, values, 0.0)
+    count = np.concatenate(([0], np.cumsum(observed)))
+    sum_x = np.concatenate(([0.0], np.cumsum(x)))
+    sum_x2 = np.concatenate(([0.0], np.cumsum(x * x)))
+    if window_days is None:
+        left = np.zeros(len(gaps.index), dtype=int)
+        right = np.repeat(len(values), len(gaps.index))
+    else:
+        window = pd.Timedelta(days=window_days)
+        left = series.index.searchsorted(pd.DatetimeIndex(gaps['start']) - window, side='left')
+        right = series.index.searchsorted(pd.DatetimeIndex(gaps['end']) + window, side='right')
+    n = (count[right] - count[left]).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (sum_x[right] - sum_x[left]) / n
+        variance = ((sum_x2[right] - sum_x2[left]) / n - mean ** 2) * n / (n - ddof)
+    sigma = np.sqrt(np.clip(variance, 0.0, None))
+    enough = n > ddof
+    return np.where(enough, mean, np.nan), np.where(enough, sigma, np.nan), n
+
+
+def truncated_normal_moments(loc, scale, a, b, confidence=0.95):
+    """
+    Mean and central interval of truncated normal distributions
+
+    :param loc: array of mean of the normal distribution
+    :param scale: array of standard deviation, zero - loc clipped to the limits
+    :param a: array of lower limit
+    :param b: array of upper limit
+    :param confidence: probability of the interval
+    :return: arrays of mean, lower and upper end of interval
+    """
+    loc, scale, a, b = [np.asarray(values, dtype=float) for values in (loc, scale, a, b)]
+    positive = scale > 0
+    safe_scale = np.where(positive, scale, 1.0)
+    a_standard = (a - loc) / safe_scale
+    b_standard = (b - loc) / safe_scale
+    # limits far in the tail, where scipy gives nan, and zero scale give the limit nearest the mean
+    nearest = np.clip(loc, a, b)
+    with np.errstate(all='ignore'):
+        mean = stats.truncnorm.mean(a_standard, b_standard, loc=loc, scale=safe_scale)
+        lower, upper = stats.truncnorm.interval(confidence, a_standard, b_standard, loc=loc, scale=safe_scale)
+    moments = []
+    for values in (mean, lower, upper):
+        values = np.asarray(values, dtype=float).reshape(loc.shape)
+        moments.append(np.where(positive & np.isfinite(values), values, nearest))
+    return tuple(moments)
+
+
+class GapImputer(object):
+    """
+    Truncated normal imputation of every gap of weather variables, day and night values separately
+
+    Examples:
+        >>> imputer = GapImputer(limits={'Wind Speed (kmph)': (0, 14), 'Air Temperature (C)': (-np.inf, np.inf)})
+        >>> corrected_df, filled, intervals, log = imputer.impute(weather_df, confidence=0.95)
+        >>> imputer = GapImputer(limits={'WIND_SPEED': {'day': (0, 27.0), 'night': (0, 22.0)}}, window_days=4)
+    """
+    def __init__(self, limits, window_days=None, day_hours=(6, 18), ddof=0):
+        """
+        :param limits: {column: (a, b)} truncation limits, or {column: {'day': (a, b), 'night': (a, b)}}
+        :param window_days: mu and tau from observed values this many days around each gap, None - whole record.
+            Gaps without observed values in the window use the whole record.
+        :param day_hours: see day_selector
+        :param ddof: see window_statistics
+        """
+        self.limits = limits
+        self.window_days = window_days
+        self.day_hours = day_hours
+        self.ddof = ddof
+
+    def period_limits(self, column, period):
+        limits = self.limits[column]
+        if isinstance(limits, dict):
+            limits = limits[period]
+        return float(limits[0]), float(limits[1])
+
+    def gaps(self, dataframe):
+        """
+        Gaps of every imputed column
+
+        :param dataframe: Pandas dataframe with sorted datetime index
+        :return: dataframe of find_gaps with a column column
+        """
+        gaps = []
+        for column in self.limits:
+            column_gaps = find_gaps(dataframe[column])
+            column_gaps.insert(0, 'column', column)
+            gaps.append(column_gaps)
+        return pd.concat(gaps, ignore_index=True)
+
+    def batch(self, dataframe):
+        """
+        Distribution of every missing value of the imputed columns
+
+        :param dataframe: Pandas dataframe with sorted datetime index
+        :return: dict of arrays, column (position in columns), position (row), gap (row of gaps), period (position
+            in periods), observed (number of observed values behind loc and scale), loc, scale, a, b, the columns and
+            the gaps (see gaps)
+        """
+        day = day_selector(dataframe.index, self.day_hours)
+        columns = list(self.limits.keys())
+        parts = []
+        gap_offset = 0
+        for c, column in enumerate(columns):
+            series = dataframe[column]
+            values = series.values.astype(float)
+            missing = np.flatnonzero(np.isnan(values))
+            if not len(missing):
+                continue
+            gaps = find_gaps(series)
+            # gap of every missing value, missing values are in order of the gaps
+            gap_id = np.repeat(np.arange(len(gaps.index)), gaps['length'].values)
+            period_id = np.empty(len(missing), dtype=int)
+            observed = np.empty(len(missing))
+            loc = np.empty(len(missing))
+            scale = np.empty(len(missing))
+            a = np.empty(len(missing))
+            b = np.empty(len(missing))
+            for p, (period, selector) in enumerate(zip(periods, [day, ~day])):
+                mean, sigma, n = window_statistics(series, gaps, selector, self.window_days, self.ddof)
+                if self.window_days is not None:
+                    record_mean, record_sigma, record_n = window_statistics(series, gaps.iloc[:1], selector, None,
+                                                                            self.ddof)
+                    n = np.where(np.isnan(mean), record_n[0], n)
+                    mean = np.where(np.isnan(mean), record_mean[0], mean)
+                    sigma = np.where(np.isnan(sigma), record_sigma[0], sigma)
+                in_period = selector[missing]
+                period_id[in_period] = p
+                observed[in_period] = n[gap_id[in_period]]
+                loc[in_period] = mean[gap_id[in_period]]
+                scale[in_period] = sigma[gap_id[in_period]]
+                a[in_period], b[in_period] = self.period_limits(column, period)
+            parts.append((np.repeat(c, len(missing)), missing, gap_id + gap_offset, period_id, observed, loc, scale, a,
+                          b))
+            gap_offset += len(gaps.index)
+        names = ['column', 'position', 'gap', 'period', 'observed', 'loc', 'scale', 'a', 'b']
+        if not parts:
+            result = dict((name, np.empty(0)) for name in names)
+        else:
+            result = dict((name, np.concatenate([part[i] for part in parts])) for i, name in enumerate(names))
+        result['column'] = result['column'].astype(int)
+        result['position'] = result['position'].astype(int)
+        result['gap'] = result['gap'].astype(int)
+        result['period'] = result['period'].astype(int)
+        # values without observations of their period are left missing
+        valid = ~np.isnan(result['loc']) & ~np.isnan(result['scale'])
+        result = dict((name, values[valid]) for name, values in result.items())
+        result['columns'] = columns
+        result['gaps'] = self.gaps(dataframe)
+        return result
+
+    @staticmethod
+    def moments(imputation_batch, confidence=0.95):
+        """
+        Mean and central interval of every missing value of a batch
+
+        :param imputation_batch: batch from batch
+        :param confidence: see truncated_normal_moments
+        :return: arrays of mean, lower and upper end of interval
+        """
+        return truncated_normal_moments(imputation_batch['loc'], imputation_batch['scale'], imputation_batch['a'],
+                                        imputation_batch['b'], confidence=confidence)
+
+    @staticmethod
+    def log_moments(imputation_batch, confidence=0.95):
+        """
+        Mean and central interval of every missing value of a batch, gap by gap and period by period, timed
+
+        :param imputation_batch: batch from batch
+        :param confidence: see truncated_normal_moments
+        :return: arrays of mean, lower and upper end of interval and the log, a dataframe with gap (row of gaps),
+            period, missing (number of values), observed, mu, sigma, width (of the interval) and seconds (wall time)
+            of every gap and period
+        """
+        imputed, lower, upper = [np.empty(len(imputation_batch['loc'])) for i in range(3)]
+        # values of a gap and period share loc, scale and limits
+        order = np.lexsort((imputation_batch['period'], imputation_batch['gap']))
+        key = imputation_batch['gap'][order] * len(periods) + imputation_batch['period'][order]
+        bounds = np.flatnonzero(np.diff(np.concatenate(([-1], key, [-1]))))
+        rows = []
+        for first, stop in zip(bounds[:-1], bounds[1:]):
+            selected = order[first:stop]
+            start_time = time.time()
+            moments = truncated_normal_moments(imputation_batch['loc'][selected], imputation_batch['scale'][selected],
+                                               imputation_batch['a'][selected], imputation_batch['b'][selected],
+                                               confidence=confidence)
+            seconds = time.time() - start_time
+            imputed[selected], lower[selected], upper[selected] = moments
+            i = selected[0]
+            rows.append((imputation_batch['gap'][i], periods[imputation_batch['period'][i]], len(selected),
+                         int(imputation_batch['observed'][i]), imputation_batch['loc'][i],
+                         imputation_batch['scale'][i], upper[i] - lower[i], seconds))
+        log = pd.DataFrame(rows, columns=['gap', 'period', 'missing', 'observed', 'mu', 'sigma', 'width', 'seconds'])
+        return imputed, lower, upper, log
+
+    def impute(self, dataframe, confidence=0.95):
+        """
+        Fills every gap of the imputed columns with the mean of the truncated normal of each missing value
+
+        :param dataframe: Pandas dataframe with sorted datetime index
+        :param confidence: probability of the intervals
+        :return: corrected copy of dataframe, boolean dataframe of filled values, dataframe of the filled values
+            with column, time, value, lower and upper (ends of the central interval) and log of gaps (see gaps) with
+            period, missing, observed, mu, sigma, width and seconds of every period of a gap (see log_moments)
+        """
+        imputation_batch = self.batch(dataframe)
+        imputed, lower, upper, log = self.log_moments(imputation_batch, confidence=confidence)
+        corrected = dataframe.copy()
+        filled = pd.DataFrame(False, index=dataframe.index, columns=imputation_batch['columns'])
+        for c, column in enumerate(imputation_batch['columns']):
+            selected = imputation_batch['column'] == c
+            positions = imputation_batch['position'][selected]
+            values = corrected[column].values.astype(float)
+            values[positions] = imputed[selected]
+            corrected[column] = values
+            mask = np.zeros(len(values), dtype=bool)
+            mask[positions] = True
+            filled[column] = mask
+        columns = np.asarray(imputation_batch['columns'], dtype=object)
+        intervals = pd.DataFrame({'column': columns[imputation_batch['column']],
+                                  'time': dataframe.index[imputation_batch['position']], 'value': imputed,
+                                  'lower': lower, 'upper': upper},
+                                 columns=['column', 'time', 'value', 'lower', 'upper'])
+        gaps = imputation_batch['gaps']
+        log = gaps.iloc[log['gap'].values].reset_index(drop=True).join(log.drop('gap', axis=1))
+        return corrected, filled, intervals, log
+
+
+class AnalogImputer(object):
+    """
+    Nearest analog imputation of short gaps of weather variables, day and night values separately.
+    Features of a time step are time of day (as a point on the unit circle), readings of neighbouring stations and
+    the mean of recent_columns over the recent_hours before it, all standardised. Observed time steps of a column
+    are indexed in a KD-tree per period and all missing values of the period are queried at once.
+
+    Examples:
+        >>> imputer = AnalogImputer(['Air Temperature (C)', 'Humidity (%)', 'Wind Speed (kmph)'], max_gap_hours=24)
+        >>> corrected_df, filled, log = imputer.impute(weather_df, neighbours=weather_ksndmc_df[['TEMPERATURE']])
+    """
+    def __init__(self, columns, recent_columns=None, recent_hours=3, k=5, max_gap_hours=None, day_hours=(6, 18)):
+        """
+        :param columns: imputed columns
+        :param recent_columns: columns of recent weather features, default columns
+        :param recent_hours: hours averaged for recent weather
+        :param k: number of analogs
+        :param max_gap_hours: longer gaps are left missing (eg. for GapImputer), None - all gaps
+        :param day_hours: see day_selector
+        """
+        self.columns = list(columns)
+        self.recent_columns = self.columns if recent_columns is None else list(recent_columns)
+        self.recent_hours = recent_hours
+        self.k = k
+        self.max_gap_hours = max_gap_hours
+        self.day_hours = day_hours
+
+    def features(self, dataframe, neighbours=None):
+        """
+        Standardised features of every time step, missing features are set to the mean (zero)
+
+        :param dataframe: Pandas dataframe with sorted datetime index
+        :param neighbours: dataframe of neighbouring station readings, put on the index of dataframe
+        :return: array (time steps, features)
+        """
+        index = dataframe.index
+        hours = index.hour + index.minute / 60.0
+        angle = 2.0 * np.pi * np.asarray(hours) / 24.0
+        features = [np.cos(angle), np.sin(angle)]
+        if neighbours is not None:
+            neighbours = neighbours.reindex(index)
+            features.extend(neighbours[column].values.astype(float) for column in neighbours.columns)
+        window = '{0}h'.format(self.recent_hours)
+        for column in self.recent_columns:
+            # before the time step, the imputed value itself is not a feature: sum and count of the window ending
+            # at the time step less its own value (rolling closed= needs pandas 0.20)
+            values = dataframe[column].astype(float)
+            rolling = values.rolling(window)
+            count = rolling.count() - values.notnull()
+            recent = ((rolling.sum() - values.fillna(0.0)) / count).where(count > 0).ffill()
+            features.append(recent.values)
+        features = np.column_stack(features)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            features = (features - np.nanmean(features, axis=0)) / np.nanstd(features, axis=0)
+        features[~np.isfinite(features)] = 0.0
+        return features
+
+    def impute(self, dataframe, neighbours=None):
+        """
+        Fills every gap (up to max_gap_hours) of the imputed columns with the mean of the k nearest analogs
+
+        :param dataframe: Pandas dataframe with sorted datetime index
+        :param neighbours: see features
+        :return: corrected copy of dataframe, boolean dataframe of filled values and log of gaps (see find_gaps) with
+            filled (number of filled values) and distance (mean feature distance of their analogs)
+        """
+        features = self.features(dataframe, neighbours)
+        day = day_selector(dataframe.index, self.day_hours)
+        corrected = dataframe.copy()
+        filled = pd.DataFrame(False, index=dataframe.index, columns=self.columns)
+        logs = []
+        for column in self.columns:
+            values = dataframe[column].values.astype(float)
+            missing = np.isnan(values)
+            gaps = find_gaps(dataframe[column])
+            gaps.insert(0, 'column', column)
+            gap_id = np.repeat(np.arange(len(gaps.index)), gaps['length'].values)
+            short = np.zeros(len(values), dtype=bool)
+            if self.max_gap_hours is None:
+                short[missing] = True
+            else:
+                duration = (pd.DatetimeIndex(gaps['end']) - pd.DatetimeIndex(gaps['start'])) / pd.Timedelta(hours=1)
+                short[missing] = np.asarray(duration <= self.max_gap_hours)[gap_id]
+            distance = np.repeat(np.nan, len(values))
+            new_values = values.copy()
+            for selector in [day, ~day]:
+                donors = np.flatnonzero(~missing & selector)
+                recipients = np.flatnonzero(short & selector)
+                if not len(donors) or not len(recipients):
+                    continue
+                k = min(self.k, len(donors))
+                tree = cKDTree(features[donors])
+                analog_distance, analog = tree.query(features[recipients], k=k)
+                analog_distance = analog_distance.reshape(len(recipients), k)
+                analog = analog.reshape(len(recipients), k)
+                new_values[recipients] = values[donors[analog]].mean(axis=1)
+                distance[recipients] = analog_distance.mean(axis=1)
+            corrected[column] = new_values
+            # recipients of a period without donors stay missing
+            imputed = short & ~np.isnan(new_values)
+            filled[column] = imputed
+            gaps['filled'] = np.bincount(gap_id, weights=imputed[missing], minlength=len(gaps.index)).astype(int)
+            gap_distance = pd.Series(distance[missing]).groupby(gap_id).mean()
+            gaps['distance'] = gap_distance.reindex(np.arange(len(gaps.index))).values
+            logs.append(gaps)
+        return corrected, filled, pd.concat(logs, ignore_index=True)
@@ -0,0 +1,97 @@
+__author__ = 'kiruba'
+"""
+KSNDMC 15 minute rain gauge data.
+KSNDMC tables are wide, one row per day with a column for every 15 minute time,
+and the gauge value is cumulative rainfall which is reset every day at 8:30.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+# station information columns of KSNDMC tables
+info_columns = ["TRGCODE", "DISTRICT", "TALUKNAME", "HOBLINAME", "HOBLICODE", "PHASE", "COMPANY", "TYPE", "CATEGORY",
+                "FIRSTREPORTED", "Total"]
+date_format = "%d-%b-%y %H:%M"
+
+
+def melt_ksndmc(rain_df, date_format=date_format, value_name='rain(mm)', date_column='Date', keep_columns=False,
+                time_column='Time'):
+    """
+    Reshapes wide KSNDMC table into a time series
+
+    :param rain_df: KSNDMC table with one row per day and one column per time of day
+    :param date_format: format of date + ' ' + time, eg. "%d-%b-%y %H:%M" or "%d-%b-%Y %H:%M"
+    :param value_name: name of rain column
+    :param date_column: name of date column
+    :param keep_columns: if True, the date and time of day (time_column) of the table are kept as columns before
+        the rain column
+    :param time_column: name of time of day column
+    :return: dataframe with sorted date time index and cumulative rain column
+    """
+    time_columns = [column for column in rain_df.columns if column != date_column and column not in info_columns]
+    long_df = pd.melt(rain_df, id_vars=[date_column], value_vars=time_columns, var_name=time_column,
+                      value_name=value_name)
+    date_time = pd.to_datetime(long_df[date_column] + ' ' + long_df[time_column], format=date_format)
+    columns = [date_column, time_column, value_name] if keep_columns else [value_name]
+    long_df = pd.DataFrame(dict((column, long_df[column].values) for column in columns), columns=columns,
+                           index=pd.DatetimeIndex(date_time, name='date_time'))
+    return long_df.sort_index(kind='mergesort')
+
+
+def cumulative_difference(cumulative_rain, reset_to_zero=False):
+    """
+    Rainfall of each time step from cumulative gauge value.
+    A fall of the gauge value is a reset (8:30 every day), giving zero rainfall for that time step,
+    or the new gauge value if reset_to_zero is True (rain since reset to zero is counted).
+
+    :param cumulative_rain: array or Series of cumulative rain in time order
+    :param reset_to_zero: if True, rainfall of time step with a reset is the new gauge value
+    :return: array of rainfall of each time step, zero for the first
+    """
+    cumulative_rain = np.asarray(cumulative_rain, dtype=float)
+    rain = np.zeros(len(cumulative_rain))
+    if len(cumulative_rain) < 2:
+        return rain
+    difference = np.diff(cumulative_rain)
+    with np.errstate(invalid='ignore'):
+        rain[1:] = np.where(difference > 0, difference, 0.0)
+        if reset_to_zero:
+            reset = (difference < 0) & (cumulative_rain[1:] > 0)
+            rain[1:][reset] = cumulative_rain[1:][reset]
+    return rain
+
+
+def read_ksndmc(csv_files, date_format=date_format, start=None, end=None, reset_to_zero=False, station_column='TRGCODE'):
+    """
+    Reads KSNDMC csv files of many stations and seasons into one long table of rainfall.
+    Files of the same station (seasons) are joined, repeated time stamps keep the last value.
+
+    :param csv_files: list of KSNDMC csv files
+    :param date_format: format of date + ' ' + time
+    :param start: start of period, eg. '2014-05-01 08:30'
+    :param end: end of period
+    :param reset_to_zero: see cumulative_difference
+    :param station_column: column with station code, file name is used if not in file
+    :return: dataframe with date time index and columns station, rain(mm) (cumulative) and diff (rainfall)
+    """
+    stations = {}
+    order = []
+    for csv_file in csv_files:
+        rain_df = pd.read_csv(csv_file, sep=',', header=0)
+        if station_column in rain_df.columns:
+            station = str(rain_df[station_column].iloc[0])
+        else:
+            station = os.path.splitext(os.path.basename(csv_file))[0]
+        if station not in stations:
+            stations[station] = []
+            order.append(station)
+        stations[station].append(melt_ksndmc(rain_df, date_format=date_format))
+    station_dfs = []
+    for station in order:
+        station_df = pd.concat(stations[station], axis=0).sort_index(kind='mergesort')
+        station_df = station_df[start:end]
+        station_df = station_df[~station_df.index.duplicated(keep='last')].copy()
+        station_df['diff'] = cumulative_difference(station_df['rain(mm)'], reset_to_zero=reset_to_zero)
+        station_df.insert(0, 'station', station)
+        station_dfs.append(station_df)
+    return pd.concat(station_dfs, axis=0)
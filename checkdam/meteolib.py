@@ -3,6 +3,7 @@
     
     Miscellaneous functions:
         - dataload: Loads an ASCII data file into an array
+        - datachunks: Reads an ASCII data file block by block into arrays
         - event2time: Convert (event) based measurements into equidistant time spaced data for a selected interval
         - date2doy: Calculates day of year from day, month and year data
         - sun_NR: Maximum sunshine duration [h] and extraterrestrial radiation [J/day]
@@ -30,6 +31,21 @@ __date__ = "Nov 2012"
 import math     # import math library
 import scipy    # import scientific python functions
 import datetime # Get date and time module
+import numpy    # import numerical python for array calculations
+import re       # regular expressions, to find blank lines in data files
+
+
+def _as_array(x):
+    # single values, lists, arrays and pandas Series are all handled as float arrays
+    return numpy.asarray(x, dtype=float)
+
+
+def _output(x):
+    # return single value for single value input, array otherwise
+    x = numpy.asarray(x)
+    if x.ndim == 0:
+        return x[()]
+    return x
 
 '''
     ================================================================
@@ -37,7 +53,75 @@ import datetime # Get date and time module
     ================================================================
 '''
 
-def dataload(datafile, delimiter):
+def _columns(line, delimiter):
+    # number of values in a line, any whitespace run separates values for a whitespace delimiter
+    if delimiter.strip():
+        return len(line.split(delimiter.encode('ascii')))
+    return len(line.split())
+
+
+# line end followed by a line that is empty or holds only whitespace
+_blank_lines = re.compile(b'\n[ \t\r\f\v]*(?=\n)')
+
+
+def _textblocks(datafile, chunksize):
+    # blocks of about chunksize bytes of datafile cut at line ends, without blank lines,
+    # carriage returns and the last line end, so every line end separates two rows
+    remainder = b''
+    inputfile = open(datafile, 'rb')
+    try:
+        while True:
+            block = inputfile.read(chunksize)
+            if not block:
+                text = remainder + b'\n'
+            else:
+                block = remainder + block
+                cut = block.rfind(b'\n') + 1
+                if cut == 0:
+                    remainder = block
+                    continue
+                text, remainder = block[:cut], block[cut:]
+            # a line end is put in front, so that blank lines at the start are found too
+            text = _blank_lines.sub(b'', b'\n' + text).replace(b'\r', b'')
+            if len(text) > 2:
+                yield text[1:-1]
+            if not block:
+                break
+    finally:
+        inputfile.close()
+
+
+def datachunks(datafile, delimiter, chunksize=2 ** 24):
+    '''
+    Generator reading a regular ASCII data file "datafile" with values separated
+    by a "delimiter" in blocks of about chunksize bytes, cut at line ends.
+    Every block is parsed by numpy straight into a float64 array, so a large
+    station archive can be processed block by block.
+
+    Usage:
+        for block in datachunks(filename,delimiter):
+            ...
+
+    Examples
+        >>> total = 0
+        >>> for block in datachunks('meteo.dat',','):
+        >>>     total = total + block[:,3].sum()
+    '''
+    sep = delimiter.encode('ascii')
+    columns = None
+    # empty and whitespace only lines are skipped
+    for text in _textblocks(datafile, chunksize):
+        if columns is None:
+            columns = _columns(text.split(b'\n', 1)[0], delimiter)
+        rows = text.count(b'\n') + 1
+        # line ends become delimiters, the block is one run of values
+        values = numpy.fromstring(text.replace(b'\n', sep), dtype=numpy.float64, sep=delimiter)
+        if values.size != rows * columns:
+            raise ValueError('%s: data not regular or not numeric in block of %d rows' % (datafile, rows))
+        yield values.reshape(rows, columns)
+
+
+def dataload(datafile, delimiter, chunksize=2 ** 24, memmap=None):
     '''
     Function to load data from an ASCII text file "filename" with values being
     separated by a "delimiter".
@@ -49,7 +133,9 @@ def dataload(datafile, delimiter):
     for further calculations. Both filename and delimiter are of type string.
 
     The data must be regular, i.e. the same number of values should appear in
-    every row.
+    every row. Lines are counted first, the float64 array is allocated once and
+    filled with the blocks of datachunks. For very large files give a file name
+    as memmap to fill a memory-mapped array on disk instead.
 
     Examples
         >>> data = dataload('meteo.dat',',')  # meteo.dat comma delimited
@@ -58,34 +144,37 @@ def dataload(datafile, delimiter):
         >>> filedir = 'd:/workdir/meteo.dat'
         >>> separator = '\t'                  # tab delimited data file
         >>>
-        >>> data = loadtxt(filedir,separator) 
+        >>> data = dataload(filedir,separator)
+        >>> data = dataload(filedir,separator,memmap='d:/workdir/meteo.npy')
     '''
     
-    # Open and read the file
-    inputfile = file(datafile, "r");
-    
-    # Define array which will hold all data
-    alldata = []
-    
-    # Start reading the data from the file into the linedata array
-    for line in inputfile.readlines():
-        # Define array holding single line of data
-        linedata = []
-        # split the dataline at "separator" (tab = \t) and get the values
-        for value in line.split(delimiter):
-            # Append each value in a line so that we have a complete data
-            # line 
-            linedata.append(float(value))
-        # Append the values in linedata to the alldata array    
-        alldata.append(linedata)
-    # Now close the file
-    inputfile.close()
-    
-    # Store the data in an array
-    data_array = scipy.qarray(alldata)
+    # Count the data lines, blank lines are skipped as in datachunks
+    rows = 0
+    for text in _textblocks(datafile, chunksize):
+        rows = rows + text.count(b'\n') + 1
+    
+    # Store the data in an array (or memory-mapped array) allocated at the first block
+    data_array = None
+    row = 0
+    for block in datachunks(datafile, delimiter, chunksize):
+        if data_array is None:
+            shape = (rows, block.shape[1])
+            if memmap is None:
+                data_array = numpy.empty(shape, dtype=numpy.float64)
+            else:
+                data_array = numpy.lib.format.open_memmap(memmap, mode='w+', dtype=numpy.float64, shape=shape)
+        if block.shape[1] != data_array.shape[1] or row + block.shape[0] > rows:
+            raise ValueError('%s: data not regular' % datafile)
+        data_array[row:row + block.shape[0]] = block
+        row = row + block.shape[0]
+    if data_array is None:
+        return numpy.empty((0, 0))
+    if row != rows:
+        # file changed while it was read
+        raise ValueError('%s: %d of %d rows read' % (datafile, row, rows))
     
     # Make the data array available as function output 
-    return(data_array)
+    return data_array
 
 
 def event2time(yyyy=scipy.array([]), doytime=scipy.array([]), \
@@ -96,6 +185,7 @@ def event2time(yyyy=scipy.array([]), doytime=scipy.array([]), \
     You can choose to sum (e.g. for event-based rainfall measurements) or average the input data over a given time interval.
     If you choose to average, a -9999 value (missing value) will be output if there are no data in the specified interval. For summation,
     a zero will be output, as required for event-based rainfall measurements.
+    Events are put in their intervals with searchsorted and summed or counted with bincount, without a loop over intervals.
     
     
     Input:
@@ -190,71 +280,50 @@ def event2time(yyyy=scipy.array([]), doytime=scipy.array([]), \
               datetime.timedelta(days=scipy.floor(end) - 1, \
               seconds=scipy.mod(end, 1) * 86400)
     
-    # Create arrays for storing the equidistant time output
-    YEAR = []
-    DECTIME = []
-    Y = []
-    
-    # Set initial date/time value to first date/time interval
-    intervaldate = startdate
-    
-    # Set counters to zero
-    i = 0 # desired time-index value counter
-    j = 0 # event data index counter
-    counter = 0 # counts events in one time interval
-    
-    # Set initial data value sum to zero
-    processedY = 0
-    
-    # Start data processing  
-    while intervaldate < enddate:
-        i = i + 1
-        # checkdate is event based date/time
-        checkdate = datetime.datetime(int(yyyy[j]), 1, 1, 0, 0, 0) + \
-                    datetime.timedelta(days=scipy.floor(doytime[j]) - 1, \
-                    seconds=scipy.mod(doytime[j], 1) * 86400)
-        # intervaldate is the date/time at regular interval
-        intervaldate = intervaldate + datetime.timedelta(seconds=interval)
-        # If the statement below is true, we have event(s)
-        while checkdate < intervaldate:
-            counter = counter + 1
-            j = j + 1
-            checkdate = datetime.datetime(int(yyyy[j]), 1, 1, 0, 0, 0) + \
-                        datetime.timedelta(days=scipy.floor(doytime[j]) - 1, \
-                        seconds=scipy.mod(doytime[j], 1) * 86400)
-            processedY = processedY + X[j]
-        # Append the time spaced data to the lists
-        YEAR.append(intervaldate.year)
-        # Recalculate to doy.decimaltime format
-        dtime = (int(intervaldate.strftime("%j")) + \
-                  (int(intervaldate.strftime("%H")) * 3600 + \
-                   int(intervaldate.strftime("%M")) * 60 + \
-                   int(intervaldate.strftime("%S"))) / 86400.0)
-        # Correct of error in day when interval is 86400 s
-        # This because new day starts at midnight, but processed data
-        # covers previous day ending at midnight
-        if interval == 86400:
-            dtime = dtime - 1
-        DECTIME.append(dtime)
-        if method=='sum':
-            Y.append(processedY)
-        if method=='avg':
-            # In case there are missing data in the interval, division by zero
-            # could occur while averaging. In this case we indicate missing data
-            # by -9999  
-            if counter==0:
-                counter=1.
-                processedY=-9999
-            Y.append(processedY/counter) 
-        # Set processedY and counter to zero for next event
-        processedY = 0
-        counter = 0
-        
-    # Convert lists to arrays and output these arrays
-    YEAR = scipy.array(YEAR)
-    DECTIME = scipy.array(DECTIME)
-    Y = scipy.array(Y)
-    
+    # Event and interval end times as integer microseconds since 1970, datetime rounds the seconds of a
+    # timedelta to microseconds as well, so comparisons are those of datetime objects
+    yyyy = numpy.asarray(yyyy, dtype=int)
+    doytime = _as_array(doytime)
+    X = _as_array(X)
+    yearstart = (yyyy - 1970).astype('datetime64[Y]').astype('datetime64[us]').astype(numpy.int64)
+    day = numpy.int64(86400 * 10 ** 6)
+    eventtime = yearstart + (numpy.floor(doytime).astype(numpy.int64) - 1) * day + \
+        numpy.round(numpy.mod(doytime, 1) * 86400 * 10 ** 6).astype(numpy.int64)
+    startus = numpy.datetime64(startdate, 'us').astype(numpy.int64)
+    endus = numpy.datetime64(enddate, 'us').astype(numpy.int64)
+    step = numpy.int64(round(interval * 10 ** 6))
+
+    # Intervals end at startdate + interval, + 2 interval, ... up to the first end at or after enddate
+    n = int(-((startus - endus) // step)) if endus > startus else 0
+    intervalend = startus + step * numpy.arange(1, n + 1, dtype=numpy.int64)
+
+    # Interval of every event, the first interval ending after it (events before the first interval fall in it).
+    # As in the event loop, an interval counts the events in it and sums the value of the event after each of them.
+    interval_index = numpy.searchsorted(intervalend, eventtime, side='right')
+    counted = interval_index < n
+    counter = numpy.bincount(interval_index[counted], minlength=n)
+    valued = counted[:-1]
+    processedY = numpy.bincount(interval_index[:-1][valued], weights=X[1:][valued], minlength=n)
+
+    # Year and doy.decimaltime (whole seconds) of the interval ends
+    intervaldate = intervalend.astype('datetime64[us]')
+    intervalyear = intervaldate.astype('datetime64[Y]')
+    intervalday = intervaldate.astype('datetime64[D]')
+    YEAR = intervalyear.astype(int) + 1970
+    DECTIME = (intervalday - intervalyear.astype('datetime64[D]')).astype(int) + 1 + \
+        (intervaldate - intervalday).astype('timedelta64[s]').astype(int) / 86400.0
+    # Correct of error in day when interval is 86400 s
+    # This because new day starts at midnight, but processed data
+    # covers previous day ending at midnight
+    if interval == 86400:
+        DECTIME = DECTIME - 1
+    if method == 'sum':
+        Y = processedY
+    else:
+        # Intervals without data are missing (-9999) when averaging
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            Y = numpy.where(counter > 0, processedY / counter, -9999.0)
+
     # Return year, doy.decimaltime and datavalue as output
     return YEAR, DECTIME, Y
     
@@ -285,33 +354,19 @@ def date2doy(dd=scipy.array([]),\
         array([ 10.,  41.,  69.])
         >>>
     '''
-    # Determine length of array
-    n = scipy.size(dd)
-    if n < 2:   # Dealing with single value...date2doy
-        # Determine julian day     
-        doy = math.floor(275 * mm / 9 - 30 + dd) - 2
-        if mm < 3:
-            doy = doy + 2
-        # Correct for leap years
-        if (math.fmod(yyyy / 4.0, 1) == 0.0 and math.fmod(yyyy / 100.0, 1) != 0.0)\
-        or math.fmod(yyyy / 400.0, 1) == 0.0:
-            if mm > 2:
-                doy = doy + 1
-        doy = int(doy)
-    else:   # Dealing with an array
-        # Initiate the output array  
-        doy = scipy.zeros(n)
-        # Calculate julian days   
-        for i in range(0, n):
-            doy[i] = math.floor(275 * mm[i] / 9 - 30 + dd[i]) - 2
-            if mm[i] < 3:
-                doy[i] = doy[i] + 2
-            # Correct for leap years
-            if (math.fmod(yyyy[i] / 4.0, 1) == 0.0 and math.fmod(yyyy[i] / 100.0, 1)\
-            != 0.0) or math.fmod(yyyy[i] / 400.0, 1) == 0.0:
-                if mm[i] > 2:
-                    doy[i] = doy[i] + 1
-            doy[i] = int(doy[i])
+    # Work on arrays, single values are returned as integer
+    dd = numpy.asarray(dd, dtype=float)
+    mm = numpy.asarray(mm, dtype=float)
+    yyyy = numpy.asarray(yyyy, dtype=float)
+    # Determine julian day
+    doy = numpy.floor(numpy.floor(275 * mm / 9) - 30 + dd) - 2
+    doy = numpy.where(mm < 3, doy + 2, doy)
+    # Correct for leap years
+    leap = ((numpy.fmod(yyyy / 4.0, 1) == 0.0) & (numpy.fmod(yyyy / 100.0, 1) != 0.0)) \
+        | (numpy.fmod(yyyy / 400.0, 1) == 0.0)
+    doy = numpy.where(leap & (mm > 2), doy + 1, doy)
+    if doy.ndim == 0:
+        return int(doy)
     return doy # Julian day [integer]
 
 
@@ -371,58 +426,27 @@ def sun_NR(doy=scipy.array([]),\
         >>> jd_calc(day,month,year)
         array([ 10.,  41.,  69.])
     '''
-
     # Set solar constant [W/m2]
     S = 1367.0  #[W/m2]
     # Convert latitude [degrees] to radians
     latrad = lat * math.pi / 180.0
-    # Determine length of doy array
-    l = scipy.size(doy)
-    # Check if we have a single value or an array
-    if l < 2:   # Dealing with single value...
-        # calculate solar declination dt [radians]
-        dt = 0.409 * math.sin(2 * math.pi / 365 * doy - 1.39)
-        # calculate sunset hour angle [radians]
-        ws = scipy.arccos(-math.tan(latrad) * math.tan(dt))
-        # Calculate sunshine duration N [h]
-        N = 24 / math.pi * ws
-        # Calculate day angle j [radians]
-        j = 2 * math.pi / 365.25 * doy
-        # Calculate relative distance to sun
-        dr = 1.0 + 0.03344 * math.cos(j - 0.048869)
-        # Calculate Rext
-        Rext = S * 86400 / math.pi * dr * (ws * math.sin(latrad) * math.sin(dt)\
-               + math.sin(ws) * math.cos(latrad) * math.cos(dt))
-    else:   # Dealing with an array     
-        # Initiate the output arrays
-        N = scipy.zeros(l)
-        Rext = scipy.zeros(l)
-        dt = scipy.zeros(l)
-        ws = scipy.zeros(l)
-        j = scipy.zeros(l)
-        dr = scipy.zeros(l)
-        # Calculate N and Rext
-        for i in range(0, l):       
-            # calculate solar declination dt [radians]
-            dt[i] = 0.409 * math.sin(2 * math.pi / 365 * doy[i] - 1.39)
-            # calculate sunset hour angle [radians]
-            ws[i] = scipy.arccos(-math.tan(latrad) * math.tan(dt[i]))
-            # Calculate sunshine duration N [h]
-            N[i] = 24 / math.pi * ws[i]
-            # Calculate day angle j [radians]
-            j[i] = 2 * math.pi / 365.25 * doy[i]
-            # Calculate relative distance to sun
-            dr[i] = 1.0 + 0.03344 * math.cos(j[i] - 0.048869)
-            # Calculate Rext
-            Rext[i] = S * 86400.0 / math.pi * dr[i] * (ws[i] * math.sin(latrad)\
-                      * math.sin(dt[i]) + math.sin(ws[i]) * math.cos(latrad)\
-                      * math.cos(dt[i]))
-    # Convert to arrays
-    N = scipy.array(N)
-    Rext = scipy.array(Rext)
-    return N, Rext
-
-def es_calc(airtemp= scipy.array([])):
+    doy = _as_array(doy)
+    # calculate solar declination dt [radians]
+    dt = 0.409 * numpy.sin(2 * math.pi / 365 * doy - 1.39)
+    # calculate sunset hour angle [radians]
+    ws = numpy.arccos(-math.tan(latrad) * numpy.tan(dt))
+    # Calculate sunshine duration N [h]
+    N = 24 / math.pi * ws
+    # Calculate day angle j [radians]
+    j = 2 * math.pi / 365.25 * doy
+    # Calculate relative distance to sun
+    dr = 1.0 + 0.03344 * numpy.cos(j - 0.048869)
+    # Calculate Rext
+    Rext = S * 86400.0 / math.pi * dr * (ws * math.sin(latrad) * numpy.sin(dt)\
+           + numpy.sin(ws) * math.cos(latrad) * numpy.cos(dt))
+    return _output(N), _output(Rext)
+
+def es_calc(airtemp= scipy.array([]), out=None):
     '''
     Function to calculate saturated vapour pressure from temperature.
     For T<0 C:  Saturation vapour pressure equation for ice: Goff, J.A.,and S.
@@ -441,6 +465,7 @@ def es_calc(airtemp= scipy.array([])):
                 
     Input:
         - airtemp: (array of) measured air temperature [Celsius]
+        - out: (optional) array to write the output in
         
     Output:
         - es: (array of) saturated vapour pressure [Pa]
@@ -452,55 +477,30 @@ def es_calc(airtemp= scipy.array([])):
         >>> es_calc(x)
         array([ 2337.080198,  3166.824419])
     '''
-
-    # Determine length of array
-    n = scipy.size(airtemp)
-    # Check if we have a single (array) value or an array
-    if n < 2:
-        # Calculate saturated vapour pressures, distinguish between water/ice
-        if airtemp < 0:
-            # Calculate saturation vapour pressure for ice
-            log_pi = - 9.09718 * (273.16 / (airtemp + 273.15) - 1.0) \
-                     - 3.56654 * math.log10(273.16 / (airtemp + 273.15)) \
-                     + 0.876793 * (1.0 - (airtemp + 273.15) / 273.16) \
-                     + math.log10(6.1071)
-            es = math.pow(10, log_pi)   
-        else:
-            # Calculate saturation vapour pressure for water
-            log_pw = 10.79574 * (1.0 - 273.16 / (airtemp + 273.15)) \
-                     - 5.02800 * math.log10((airtemp + 273.15) / 273.16) \
-                     + 1.50475E-4 * (1 - math.pow(10, (-8.2969 * ((airtemp +\
-                     273.15) / 273.16 - 1.0)))) + 0.42873E-3 * \
-                     (math.pow(10, (+4.76955 * (1.0 - 273.16\
-                     / (airtemp + 273.15)))) - 1) + 0.78614
-            es = math.pow(10, log_pw)
-    else:   # Dealing with an array     
-        # Initiate the output array
-        es = scipy.zeros(n)
-        # Calculate saturated vapour pressures, distinguish between water/ice
-        for i in range(0, n):              
-            if airtemp[i] < 0:
-                # Saturation vapour pressure equation for ice
-                log_pi = - 9.09718 * (273.16 / (airtemp[i] + 273.15) - 1.0) \
-                         - 3.56654 * math.log10(273.16 / (airtemp[i] + 273.15)) \
-                         + 0.876793 * (1.0 - (airtemp[i] + 273.15) / 273.16) \
-                         + math.log10(6.1071)
-                es[i] = math.pow(10, log_pi)
-            else:
-                # Calculate saturation vapour pressure for water  
-                log_pw = 10.79574 * (1.0 - 273.16 / (airtemp[i] + 273.15)) \
-                         - 5.02800 * math.log10((airtemp[i] + 273.15) / 273.16) \
-                         + 1.50475E-4 * (1 - math.pow(10, (-8.2969\
-                         * ((airtemp[i] + 273.15) / 273.16 - 1.0)))) + 0.42873E-3\
-                         * (math.pow(10, (+4.76955 * (1.0 - 273.16\
-                         / (airtemp[i] + 273.15)))) - 1) + 0.78614
-                es[i] = pow(10, log_pw)
+    airtemp = _as_array(airtemp)
+    t = airtemp + 273.15
+    # Calculate saturated vapour pressures, distinguish between water/ice
+    with numpy.errstate(invalid='ignore'):
+        ice = airtemp < 0
+    # Saturation vapour pressure for water
+    log_p = 10.79574 * (1.0 - 273.16 / t) \
+            - 5.02800 * numpy.log10(t / 273.16) \
+            + 1.50475E-4 * (1 - numpy.power(10, (-8.2969 * (t / 273.16 - 1.0)))) \
+            + 0.42873E-3 * (numpy.power(10, (+4.76955 * (1.0 - 273.16 / t))) - 1) + 0.78614
+    if ice.any():
+        # Saturation vapour pressure for ice
+        log_pi = - 9.09718 * (273.16 / t - 1.0) \
+                 - 3.56654 * numpy.log10(273.16 / t) \
+                 + 0.876793 * (1.0 - t / 273.16) \
+                 + math.log10(6.1071)
+        log_p = numpy.where(ice, log_pi, log_p)
+    es = numpy.power(10, log_p, out=out)
     # Convert from hPa to Pa
-    es = es * 100.0
-    return es # in Pa
+    es = numpy.multiply(es, 100.0, out=out)
+    return _output(es) # in Pa
 
 
-def Delta_calc(airtemp= scipy.array([])):
+def Delta_calc(airtemp= scipy.array([]), out=None):
     '''
     Function to calculate the slope of the temperature - vapour pressure curve
     (Delta) from air temperatures. Source: Technical regulations 49, World
@@ -508,6 +508,7 @@ def Delta_calc(airtemp= scipy.array([])):
     
     Input:
         - airtemp: (array of) air temperature [Celsius]
+        - out: (optional) array to write the output in
     
     Output:
         - Delta: (array of) slope of saturated vapour curve [Pa K-1]
@@ -519,38 +520,25 @@ def Delta_calc(airtemp= scipy.array([])):
         >>> Delta_calc(x)
         array([ 144.665841,  188.625046])
     '''
-
-    # Determine length of array
-    n = scipy.size(airtemp)
-    # Check if we have a single value or an array
-    if n < 2:   # Dealing with single value...
-        # calculate vapour pressure
-        es = es_calc(airtemp) # in Pa
-        # Convert es (Pa) to kPa
-        es = es / 1000.0
-        # Calculate Delta
-        Delta = es * 4098.0 / math.pow((airtemp + 237.3), 2)*1000
-    else:   # Dealing with an array         
-        # Initiate the output arrays
-        Delta = scipy.zeros(n)
-        # calculate vapour pressure
-        es = es_calc(airtemp) # in Pa
-        # Convert es (Pa) to kPa
-        es = es / 1000.0
-        # Calculate Delta
-        for i in range(0, n):
-            Delta[i] = es[i] * 4098.0 / math.pow((airtemp[i] + 237.3), 2)*1000
-    return Delta # in Pa/K
+    airtemp = _as_array(airtemp)
+    # calculate vapour pressure
+    es = es_calc(airtemp, out=out) # in Pa
+    # Convert es (Pa) to kPa
+    es = numpy.divide(es, 1000.0, out=out)
+    # Calculate Delta
+    Delta = numpy.multiply(es * 4098.0 / (airtemp + 237.3) ** 2, 1000, out=out)
+    return _output(Delta) # in Pa/K
 
 
 def ea_calc(airtemp= scipy.array([]),\
-            rh= scipy.array([])):
+            rh= scipy.array([]), out=None):
     '''
     Function to calculate actual saturation vapour pressure.
 
     Input:
         - airtemp: array of measured air temperatures [Celsius]
         - rh: Relative humidity [%]
+        - out: (optional) array to write the output in
 
     Output:
         - ea: array of actual vapour pressure [Pa]
@@ -559,33 +547,22 @@ def ea_calc(airtemp= scipy.array([]),\
         >>> ea_calc(25,60)
         1900.0946514729308
     '''
-
-    # Determine length of array
-    n = scipy.size(airtemp)
-    if n < 2:   # Dealing with single value...    
-        # Calculate saturation vapour pressures
-        es = es_calc(airtemp)
-        # Calculate actual vapour pressure
-        eact = float(rh) / 100.0 * es
-    else:   # Dealing with an array
-        # Initiate the output arrays
-        eact = scipy.zeros(n)
-        # Calculate saturation vapour pressures
-        es = es_calc(airtemp)
-        for i in range(0, n):
-            # Calculate actual vapour pressure
-            eact[i] = float(rh[i]) / 100.0 * es[i]
-    return eact # in Pa
+    # Calculate saturation vapour pressures
+    es = es_calc(airtemp, out=out)
+    # Calculate actual vapour pressure
+    eact = numpy.multiply(_as_array(rh) / 100.0, es, out=out)
+    return _output(eact) # in Pa
 
 
 def vpd_calc(airtemp= scipy.array([]),\
-             rh= scipy.array([])):
+             rh= scipy.array([]), out=None):
     '''
     Function to calculate vapour pressure deficit.
 
     Input:
         - airtemp: measured air temperatures [Celsius]
         - rh: (array of) rRelative humidity [%]
+        - out: (optional) array to write the output in
         
     Output:
         - vpd: (array of) vapour pressure deficits [Pa]
@@ -598,28 +575,14 @@ def vpd_calc(airtemp= scipy.array([]),\
         >>> vpd_calc(T,RH)
         array([ 1168.540099,   0.        ])
     '''
-
-    # Determine length of array
-    n = scipy.size(airtemp)
-    # Check if we have a single value or an array
-    if n < 2:   # Dealing with single value...
-        # Calculate saturation vapour pressures
-        es = es_calc(airtemp)
-        eact = ea_calc(airtemp, rh) 
-        # Calculate vapour pressure deficit
-        vpd = es - eact
-    else:   # Dealing with an array
-        # Initiate the output arrays
-        vpd = scipy.zeros(n)
-        # Calculate saturation vapor pressures
-        es = es_calc(airtemp)
-        eact = ea_calc(airtemp, rh)
-        # Calculate vapour pressure deficit
-        for i in range(0, n):
-            vpd[i] = es[i] - eact[i]
-    return vpd # in hPa
-
-def L_calc(airtemp= scipy.array([])):
+    # Calculate saturation vapour pressures
+    es = es_calc(airtemp)
+    eact = _as_array(rh) / 100.0 * es
+    # Calculate vapour pressure deficit
+    vpd = numpy.subtract(es, eact, out=out)
+    return _output(vpd) # in hPa
+
+def L_calc(airtemp= scipy.array([]), out=None):
     '''
     Function to calculate the latent heat of vapourisation,
     lambda, from air temperature. Source: J. Bringfelt. Test of a forest
@@ -628,6 +591,7 @@ def L_calc(airtemp= scipy.array([])):
     
     Input:
         - airtemp: (array of) air temperature [Celsius]
+        - out: (optional) array to write the output in
         
     Output:
         - L: (array of) lambda [J kg-1 K-1]
@@ -640,25 +604,14 @@ def L_calc(airtemp= scipy.array([])):
         >>> L_calc(t)
         array([ 2476387.3842125,  2452718.3817125,  2429049.3792125])
     '''
-
-    # Determine length of array
-    n = scipy.size(airtemp)
-    # Check if we have a single value or an array
-    if n < 2:   # Dealing with single value...
-        # Calculate lambda
-        L = 4185.5 * (751.78 - 0.5655 * (airtemp + 273.15))
-    else:   # Dealing with an array
-       # Initiate the output arrays
-        L = scipy.zeros(n)    
-        # Calculate lambda
-        for i in range(0, n):
-            L[i] = 4185.5 * (751.78 - 0.5655 * (airtemp[i] + 273.15))
-    return L # in J/kg
+    # Calculate lambda
+    L = numpy.multiply(4185.5, (751.78 - 0.5655 * (_as_array(airtemp) + 273.15)), out=out)
+    return _output(L) # in J/kg
 
 
 def cp_calc(airtemp= scipy.array([]),\
             rh= scipy.array([]),\
-            airpress= scipy.array([])):
+            airpress= scipy.array([]), out=None):
     '''
     Function to calculate the specific heat of air, c_p, from air temperatures, relative humidity and air pressure.
     
@@ -666,6 +619,7 @@ def cp_calc(airtemp= scipy.array([]),\
         - airtemp: (array of) air temperature [Celsius]
         - rh: (array of) relative humidity data [%]
         - airpress: (array of) air pressure data [Pa]
+        - out: (optional) array to write the output in
         
     Output:
         cp: array of saturated c_p values [J kg-1 K-1]
@@ -682,29 +636,16 @@ def cp_calc(airtemp= scipy.array([]),\
         >>> cp_calc(t,rh,airpress)
         array([ 1005.13411289,  1006.84399787,  1010.83623841])
     '''
-
-    # Determine length of array
-    n = scipy.size(airtemp)
-    # Check if we have a single value or an array
-    if n < 2:   # Dealing with single value...
-        # calculate vapour pressures
-        eact = ea_calc(airtemp, rh)
-        # Calculate cp
-        cp = 0.24 * 4185.5 * (1 + 0.8 * (0.622 * eact / (airpress - eact)))
-    else:   # Dealing with an array
-        # Initiate the output arrays
-        cp = scipy.zeros(n)
-        # calculate vapour pressures
-        eact = ea_calc(airtemp, rh)
-        # Calculate cp
-        for i in range(0, n):
-            cp[i] = 0.24 * 4185.5 * (1 + 0.8 * (0.622 * eact[i] / (airpress[i] - eact[i])))
-    return cp # in J/kg/K
+    # calculate vapour pressures
+    eact = ea_calc(airtemp, rh)
+    # Calculate cp
+    cp = numpy.multiply(0.24 * 4185.5, (1 + 0.8 * (0.622 * eact / (_as_array(airpress) - eact))), out=out)
+    return _output(cp) # in J/kg/K
 
 
 def gamma_calc(airtemp= scipy.array([]),\
                rh= scipy.array([]),\
-               airpress=scipy.array([])):
+               airpress=scipy.array([]), out=None):
     '''
     Function to calculate the psychrometric constant gamma.
     Source: J. Bringfelt. Test of a forest evapotranspiration model.
@@ -715,6 +656,7 @@ def gamma_calc(airtemp= scipy.array([]),\
         - airtemp: array of measured air temperature [Celsius]
         - rh: array of relative humidity values[%]
         - airpress: array of air pressure data [Pa]
+        - out: (optional) array to write the output in
         
     Output:
         - gamma: array of psychrometric constant values [Pa\K]
@@ -731,30 +673,17 @@ def gamma_calc(airtemp= scipy.array([]),\
         >>> gamma_calc(t,rh,airpress)
         array([ 65.255188,  66.656958,  68.242393])
     '''
-
-    # Determine length of array
-    n = scipy.size(airtemp)
-    # Check if we have a single value or an array
-    if n < 2:   # Dealing with single value...
-        cp = cp_calc(airtemp, rh, airpress)
-        L = L_calc(airtemp)
-        # Calculate gamma
-        gamma = cp * airpress / (0.622 * L)
-    else:   # Dealing with an array
-        # Initiate the output arrays
-        gamma = scipy.zeros(n)
-        # Calculate cp and Lambda values
-        cp = cp_calc(airtemp, rh, airpress)
-        L = L_calc(airtemp)
-        # Calculate gamma
-        for i in range(0, n):
-            gamma[i] = cp[i] * airpress[i] / (0.622 * L[i])
-    return gamma # in Pa\K
+    # Calculate cp and Lambda values
+    cp = cp_calc(airtemp, rh, airpress)
+    L = L_calc(airtemp)
+    # Calculate gamma
+    gamma = numpy.divide(cp * _as_array(airpress), (0.622 * L), out=out)
+    return _output(gamma) # in Pa\K
 
 
 def rho_calc(airtemp= scipy.array([]),\
              rh= scipy.array([]),\
-             airpress= scipy.array([])):
+             airpress= scipy.array([]), out=None):
     '''
     Function to calculate the density of air, rho, from air
     temperatures, relative humidity and air pressure.
@@ -763,6 +692,7 @@ def rho_calc(airtemp= scipy.array([]),\
         - airtemp: (array of) air temperature data [Celsius]
         - rh: (array of) relative humidity data [%]
         - airpress: (array of) air pressure data [Pa]
+        - out: (optional) array to write the output in
         
     Output:
         - rho: (array of) air density data [kg m-3]
@@ -779,29 +709,17 @@ def rho_calc(airtemp= scipy.array([]),\
         >> rho_calc(10,50,101300)
         1.2431927125520903
     '''
-
-    # Determine length of array
-    n = scipy.size(airtemp)    
-    # Check if we have a single value or an array
-    if n < 2:   # Dealing with single value...
-        eact = ea_calc(airtemp, rh)
-        rho = 1.201 * (290.0 * (airpress - 0.378 * eact)) \
-                 / (1000.0 * (airtemp + 273.15)) / 100.0
-    else:   # Dealing with an array        
-        # Initiate the output arrays
-        rho = scipy.zeros(n)
-        # Calculate actual vapour pressure
-        eact = ea_calc(airtemp, rh)
-        # calculate rho
-        for i in range(0, n):
-            rho[i] = 1.201 * (290.0 * (airpress[i] - 0.378 * eact[i])) \
-                 / (1000.0 * (airtemp[i] + 273.15)) / 100.0
-    return rho # in kg/m3
+    # Calculate actual vapour pressure
+    eact = ea_calc(airtemp, rh)
+    # calculate rho
+    rho = numpy.divide(1.201 * (290.0 * (_as_array(airpress) - 0.378 * eact)) \
+                       / (1000.0 * (_as_array(airtemp) + 273.15)), 100.0, out=out)
+    return _output(rho) # in kg/m3
 
 
 def pottemp(airtemp= scipy.array([]),\
             rh=scipy.array([]),\
-            airpress=scipy.array([])):
+            airpress=scipy.array([]), out=None):
     '''
     Function to calculate the potential temperature air, theta, from air
     temperatures, relative humidity and air pressure. Reference pressure
@@ -811,6 +729,7 @@ def pottemp(airtemp= scipy.array([]),\
         - airtemp: (array of) air temperature data [Celsius]
         - rh: (array of) relative humidity data [%]
         - airpress: (array of) air pressure data [Pa]
+        - out: (optional) array to write the output in
         
     Output:
         - theta: (array of) potential air temperature data [Celsius]
@@ -827,25 +746,12 @@ def pottemp(airtemp= scipy.array([]),\
         >>> pottemp(5,45,101300)
         3.977415823848844
     '''
-
-    # Determine length of array
-    n = scipy.size(airtemp)
-    # Check if we have a single value or an array
-    if n < 2:   # Dealing with single value...
-        # Determine cp
-        cp = cp_calc(airtemp, rh, airpress)
-        theta = (airtemp + 273.15) * pow((100000.0 / airpress), \
-                                       (287.0 / cp)) - 273.15
-    else:   # Dealing with an array
-        # Initiate the output array  
-        theta = scipy.zeros(n)
-        # Determine cp
-        cp = cp_calc(airtemp, rh, airpress)
-        # Calculate potential temperature   
-        for i in range(0, n):
-            theta[i] = ((airtemp[i] + 273.15) * math.pow((100000.0 / airpress[i]), \
-                       (287.0 / cp[i])) - 273.15)
-    return theta # in degrees celsius
+    # Determine cp
+    cp = cp_calc(airtemp, rh, airpress)
+    # Calculate potential temperature
+    theta = numpy.subtract((_as_array(airtemp) + 273.15) * numpy.power((100000.0 / _as_array(airpress)), \
+                           (287.0 / cp)), 273.15, out=out)
+    return _output(theta) # in degrees celsius
 
 def windvec(u= scipy.array([]),\
             D=scipy.array([])):
@@ -878,18 +784,13 @@ def windvec(u= scipy.array([]),\
         >>> Dv
         353.21188820369366
     '''
-
-    ve = 0.0 # define east component of wind speed
-    vn = 0.0 # define north component of wind speed
-    D = D * math.pi / 180.0 # convert wind direction degrees to radians
-    for i in range(0, len(u)):
-        ve = ve + u[i] * math.sin(D[i]) # calculate sum east speed components
-        vn = vn + u[i] * math.cos(D[i]) # calculate sum north speed components
-    ve = - ve / len(u) # determine average east speed component
-    vn = - vn / len(u) # determine average north speed component
+    u = _as_array(u).ravel()
+    D = _as_array(D).ravel() * math.pi / 180.0 # convert wind direction degrees to radians
+    ve = - numpy.sum(u * numpy.sin(D)) / len(u) # determine average east speed component
+    vn = - numpy.sum(u * numpy.cos(D)) / len(u) # determine average north speed component
     uv = math.sqrt(ve * ve + vn * vn) # calculate wind speed vector magnitude
     # Calculate wind speed vector direction
-    vdir = scipy.arctan2(ve, vn)
+    vdir = numpy.arctan2(ve, vn)
     vdir = vdir * 180.0 / math.pi # Convert radians to degrees
     if vdir < 180:
         Dv = vdir + 180.0
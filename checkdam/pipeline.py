@@ -0,0 +1,674 @@
+__author__ = 'kiruba'
+"""
+Batch water balance of all check dams from a network parameter file.
+The network file (json) names the weather stations and the check dams, every check dam has its own parameter
+file (or entry) with its logger files, calibration, survey tables, weir and location.
+Weather and rain of each station are read once and sent once to every worker of the pool, check dams are
+processed in parallel and each writes a half hourly and a daily water balance csv to output_dir/<name>/.
+With -u (incremental) a check dam run before continues from the state.json it left in output_dir/<name>/:
+only new or changed logger files are read, rows are appended to the half hourly csv and the daily csv is
+rewritten from its last (possibly incomplete) day on, with the infiltration parameters fitted in the first run.
+With cache_dir in the network file, parsed weather, rain and logger files are kept in a checkdam.cache.DataCache
+there and reruns read only the files that changed.
+
+Examples:
+    network.json
+        {"output_dir": "/media/kiruba/New Volume/ACCUWA_Data/Checkdam_water_balance/network",
+         "cache_dir": "/media/kiruba/New Volume/ACCUWA_Data/Checkdam_water_balance/cache",
+         "weather_stations": {"smgollahalli": {"weather_file": ".../corrected_weather.csv",
+                                               "rain_file": ".../corrected_rain.csv",
+                                               "rain_column": "Rain Collection (mm)"}},
+         "dams": ["ch_591/ch_591.json", "ch_599/ch_599.json"]}
+    ch_591.json
+        {"name": "591", "weather_station": "smgollahalli", "stage_files": [".../2525_008_001.CSV"],
+         "calibration": {"raw": [2036, 2458, 3025], "stage_mm": [100, 400, 1000]},
+         "stage_volume_file": ".../stage_vol.csv", "stage_area_file": ".../cont_area.csv",
+         "full_stage": 1.91, "weir_length": 0.5, "elevation": 799, "latitude": 13.260196, "longitude": 77.512085,
+         "start": "2014-05-15"}
+
+    python checkdam/pipeline.py -c network.json -n 4
+    python checkdam/pipeline.py -c network.json -u
+"""
+import os
+import json
+import hashlib
+import tempfile
+import traceback
+from optparse import OptionParser
+from multiprocessing import Pool
+import numpy as np
+import pandas as pd
+import checkdam as cd
+import cache as ch
+import hydraulics as hy
+import water_balance as wb
+
+date_format = '%Y-%m-%d %H:%M:%S'
+rain_column = 'rain (mm)'
+overflow_methods = ['weir', 'volume']
+required_dam_parameters = ['name', 'weather_station', 'stage_files', 'stage_volume_file', 'stage_area_file',
+                           'full_stage', 'elevation', 'latitude', 'longitude']
+default_dam_parameters = {'calibration': None,           # {'raw': [...], 'stage_mm': [...]}, fitted linearly
+                          'calibration_slope': None,     # used when calibration is None
+                          'calibration_intercept': None,
+                          'stage_cutoff': 0.1,
+                          'drop_ends': False,
+                          'overflow_method': 'weir',     # 'volume' - volume above full volume overflows
+                          'weir_length': None,
+                          'weir_coefficient': 1.84,
+                          'pumping_threshold': 14.0,
+                          'infiltration_model': 'power',
+                          'dry_window_days': 2,
+                          'start': None,
+                          'end': None}
+sub_daily_columns = [rain_column, 'Evaporation (mm/30min)', 'stage(m)', 'volume (cu.m)', 'ws_area(sq.m)',
+                     'Evaporation (cu.m)', 'overflow(cu.m)', 'pumping status']
+sum_columns = [rain_column, 'Evaporation (mm/30min)', 'Evaporation (cu.m)', 'overflow(cu.m)', 'pumping status']
+total_columns = ['rain (mm)', 'Evaporation (cu.m)', 'infiltration(cu.m)', 'overflow(cu.m)', 'pumping (cu.m)',
+                 'Inflow (cu.m)']
+state_file = 'state.json'
+state_version = 1
+summary_columns = ['name', 'start', 'end', 'days', 'dry_days', 'alpha', 'beta', 'rain (mm)', 'Evaporation (cu.m)',
+                   'infiltration(cu.m)', 'overflow(cu.m)', 'pumping (cu.m)', 'Inflow (cu.m)', 'error']
+
+# weather of every station, set by init_worker
+weather_stations = {}
+
+
+def read_json(json_file):
+    with open(json_file) as parameters:
+        return json.load(parameters)
+
+
+def dam_parameters(parameters):
+    """
+    Check dam parameters with defaults filled in
+
+    :param parameters: dict of check dam parameters, see default_dam_parameters and required_dam_parameters
+    :return: dict
+    """
+    missing = [parameter for parameter in required_dam_parameters if parameter not in parameters]
+    if missing:
+        raise ValueError("check dam {0} has no {1}".format(parameters.get('name'), missing))
+    dam = dict(default_dam_parameters)
+    dam.update(parameters)
+    dam['name'] = str(dam['name'])
+    if dam['overflow_method'] not in overflow_methods:
+        raise ValueError("overflow_method must be one of {0}".format(overflow_methods))
+    if dam['overflow_method'] == 'weir' and dam['weir_length'] is None:
+        raise ValueError("check dam {0} has no weir_length".format(dam['name']))
+    if dam['calibration'] is None and (dam['calibration_slope'] is None or dam['calibration_intercept'] is None):
+        raise ValueError("check dam {0} has no calibration".format(dam['name']))
+    return dam
+
+
+def read_config(config_file):
+    """
+    Reads network parameter file, check dams given as file names are read relative to it
+
+    :param config_file: json file with output_dir, weather_stations, dams and optionally cache_dir
+    :return: dict, dams is a list of check dam parameters
+    """
+    config = read_json(config_file)
+    config.setdefault('cache_dir', None)
+    base_dir = os.path.dirname(os.path.abspath(config_file))
+    dams = []
+    for dam in config['dams']:
+        if not isinstance(dam, dict):
+            dam = read_json(os.path.join(base_dir, dam))
+        dam = dam_parameters(dam)
+        if dam['weather_station'] not in config['weather_stations']:
+            raise ValueError("check dam {0}: unknown weather station {1}".format(dam['name'], dam['weather_station']))
+        dams.append(dam)
+    names = [dam['name'] for dam in dams]
+    repeated = sorted(set(name for name in names if names.count(name) > 1))
+    if repeated:
+        raise ValueError("check dams {0} are repeated".format(repeated))
+    config['dams'] = dams
+    return config
+
+
+def read_time_series(csv_file, date_column='Date_Time', date_format=date_format):
+    """
+    Reads csv file with a date time column, sorted, repeated time stamps keep the last row
+
+    :param csv_file: csv file
+    :param date_column: date time column
+    :param date_format: format of date time column
+    :return: dataframe with datetime index
+    """
+    df = pd.read_csv(csv_file, sep=',', header=0)
+    df.index = pd.DatetimeIndex(pd.to_datetime(df[date_column], format=date_format), name=date_column)
+    df = df.drop(date_column, axis=1)
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index(kind='mergesort')
+
+
+def read_cached_time_series(csv_file, date_format=date_format, cache=None):
+    if cache is None:
+        return read_time_series(csv_file, date_format=date_format)
+    return cache.load(read_time_series, [csv_file], args=(csv_file,), kwargs={'date_format': date_format})
+
+
+def read_weather_station(station, cache=None):
+    """
+    Weather and rain of a station, at the time stamps of the rain file
+
+    :param station: dict with weather_file, rain_file and optionally rain_column (default 'Rain Collection (mm)')
+        and date_format
+    :param cache: checkdam.cache.DataCache, files parsed in an earlier run are loaded from it
+    :return: dataframe with 'rain (mm)' column
+    """
+    station_format = station.get('date_format', date_format)
+    weather_df = read_cached_time_series(station['weather_file'], date_format=station_format, cache=cache)
+    rain_df = read_cached_time_series(station['rain_file'], date_format=station_format, cache=cache)
+    rain_df = rain_df[[station.get('rain_column', 'Rain Collection (mm)')]]
+    rain_df.columns = [rain_column]
+    weather_df = weather_df.drop([column for column in weather_df.columns if column in rain_df.columns], axis=1)
+    return weather_df.join(rain_df, how='right')
+
+
+def read_weather_stations(stations, cache=None):
+    return dict((name, read_weather_station(station, cache=cache)) for name, station in stations.items())
+
+
+def calibration_line(dam):
+    if dam['calibration'] is None:
+        return dam['calibration_slope'], dam['calibration_intercept']
+    coefficients = cd.polyfit(np.asarray(dam['calibration']['raw'], dtype=float),
+                              np.asarray(dam['calibration']['stage_mm'], dtype=float), 1)['polynomial']
+    return coefficients[0], coefficients[1]
+
+
+def read_water_level(dam, stage_files=None, cache=None):
+    """
+    Calibrated stage readings of logger files, put on the minute
+
+    :param dam: check dam parameters
+    :param stage_files: logger files, default stage_files of dam
+    :param cache: checkdam.cache.DataCache, logger files parsed in an earlier run are loaded from it
+    :return: stage series [m]
+    """
+    slope, intercept = calibration_line(dam)
+    if stage_files is None:
+        stage_files = dam['stage_files']
+    water_level = cd.read_correct_ch_dam_blocks(stage_files, slope, intercept, stage_cutoff=dam['stage_cutoff'],
+                                                drop_ends=dam['drop_ends'], cache=cache)
+    stage = water_level['stage(m)']
+    # loggers started off the minute are put on the minute
+    stage.index = pd.DatetimeIndex(stage.index.values.astype('datetime64[m]'))
+    return stage[~stage.index.duplicated(keep='first')]
+
+
+def stage_grid(water_level, stage_cutoff, freq='30min', after=None):
+    """
+    Stage readings interpolated in time on a regular grid
+
+    :param water_level: stage series, see read_water_level
+    :param stage_cutoff: stage below cutoff is set to zero [m]
+    :param freq: interval of grid
+    :param after: last time stamp of an earlier grid, the grid continues from it, default first reading
+    :return: stage series [m]
+    """
+    start = water_level.index.min().ceil(freq) if after is None else after + pd.Timedelta(freq)
+    grid = pd.date_range(start, water_level.index.max().floor(freq), freq=freq)
+    stage = water_level.reindex(water_level.index.union(grid)).interpolate(method='time').reindex(grid)
+    stage[stage < stage_cutoff] = 0.0
+    stage.name = 'stage(m)'
+    return stage
+
+
+def read_stage(dam, freq='30min'):
+    """
+    Calibrated stage of all logger files on a regular grid, interpolated in time
+
+    :param dam: check dam parameters
+    :param freq: interval of grid
+    :return: stage series [m]
+    """
+    return stage_grid(read_water_level(dam), dam['stage_cutoff'], freq=freq)
+
+
+def open_water_evaporation(weather_df, elevation, latitude, longitude):
+    """
+    Half hourly open water evaporation of weather station records at a check dam
+
+    :param weather_df: half hourly weather with Humidity (%), Solar Radiation (Wpm2), Air Temperature (C)
+        (or Min and Max Air Temperature (C)) and Wind Speed (mps) (or Wind Speed (kmph))
+    :param elevation: elevation of check dam [m]
+    :param latitude: latitude of check dam [decimal degree]
+    :param longitude: longitude of check dam [decimal degree]
+    :return: evaporation series [mm/30min]
+    """
+    if 'Air Temperature (C)' in weather_df.columns:
+        airtemp = weather_df['Air Temperature (C)']
+    else:
+        airtemp = 0.5 * (weather_df['Min Air Temperature (C)'] + weather_df['Max Air Temperature (C)'])
+    if 'Wind Speed (mps)' in weather_df.columns:
+        wind_speed = weather_df['Wind Speed (mps)']
+    else:
+        wind_speed = weather_df['Wind Speed (kmph)'] * 0.277778
+    air_p_pa = 101325 * ((1 - (2.25577 * (10 ** -5) * elevation)) ** 5.25588)
+    airpress = np.repeat(air_p_pa, len(weather_df.index))
+    rs = (weather_df['Solar Radiation (Wpm2)'] * 1800) / (10 ** 6)
+    rext = cd.extraterrestrial_irrad(local_datetime=weather_df.index, latitude_deg=latitude, longitude_deg=longitude)
+    evaporation = cd.half_hour_evaporation(airtemp=airtemp.values, rh=weather_df['Humidity (%)'].values,
+                                           airpress=airpress, rs=rs.values, rext=np.asarray(rext),
+                                           u=wind_speed.values, z=elevation)
+    return pd.Series(evaporation, index=weather_df.index, name='Evaporation (mm/30min)')
+
+
+def rating_curve(csv_file, value_column, stage_cutoff):
+    df = pd.read_csv(csv_file, sep=',', header=0, names=['sno', 'stage_m', value_column])
+    return cd.RatingCurve.from_df(df, value_column=value_column, stage_cutoff=stage_cutoff)
+
+
+def sub_daily_water_balance(dam, weather_df, stage=None, previous_stage=None):
+    """
+    Half hourly stage, volume, area, evaporation, overflow and pumping status of a check dam
+
+    :param dam: check dam parameters
+    :param weather_df: weather of the station of the check dam, see read_weather_station
+    :param stage: stage series on the grid, default read_stage(dam)
+    :param previous_stage: stage of the time stamp before stage (series), for overflow and pumping of the first
+        interval when stage continues an earlier run, it is not returned
+    :return: dataframe with sub_daily_columns
+    """
+    if stage is None:
+        stage = read_stage(dam)
+    if previous_stage is not None:
+        stage = pd.concat([previous_stage, stage])
+    weather_df = weather_df.reindex(stage.index)
+    water_balance_df = pd.DataFrame({rain_column: weather_df[rain_column].values}, index=stage.index)
+    water_balance_df['Evaporation (mm/30min)'] = open_water_evaporation(weather_df, dam['elevation'], dam['latitude'],
+                                                                        dam['longitude']).values
+    water_balance_df['stage(m)'] = stage.values
+    stage_vol = rating_curve(dam['stage_volume_file'], 'total_vol_cu_m', dam['stage_cutoff'])
+    stage_area = rating_curve(dam['stage_area_file'], 'total_area_sq_m', dam['stage_cutoff'])
+    water_balance_df['volume (cu.m)'] = stage_vol(water_balance_df['stage(m)'])
+    water_balance_df['ws_area(sq.m)'] = stage_area(water_balance_df['stage(m)'])
+    water_balance_df['Evaporation (cu.m)'] = (water_balance_df['Evaporation (mm/30min)'] * 0.001) * \
+                                             water_balance_df['ws_area(sq.m)']
+    if dam['overflow_method'] == 'weir':
+        water_balance_df['overflow(cu.m)'] = hy.overflow_volume(water_balance_df['stage(m)'], dam['full_stage'],
+                                                                weir_length=dam['weir_length'],
+                                                                coefficient=dam['weir_coefficient'])
+    else:
+        full_volume = stage_vol(dam['full_stage'])
+        water_balance_df['overflow(cu.m)'] = (water_balance_df['volume (cu.m)'] - full_volume).clip(lower=0.0)
+    water_balance_df['pumping status'] = hy.pumping_status(water_balance_df['volume (cu.m)'],
+                                                           water_balance_df['stage(m)'], dam['full_stage'],
+                                                           threshold=dam['pumping_threshold'])
+    if previous_stage is not None:
+        water_balance_df = water_balance_df.iloc[len(previous_stage.index):]
+    water_balance_df = water_balance_df[dam['start']:dam['end']]
+    water_balance_df.index.name = 'Date'
+    return water_balance_df[sub_daily_columns]
+
+
+def daily_dam_water_balance(dam, water_balance_df, parameters=None, previous_end_volume=None, previous_rain=None,
+                            record_start=None):
+    """
+    Daily water balance of a check dam from its half hourly water balance
+
+    :param dam: check dam parameters
+    :param water_balance_df: half hourly dataframe, see sub_daily_water_balance
+    :param parameters: see water_balance.daily_water_balance, default fitted on the dry days of water_balance_df
+    :param previous_end_volume: see water_balance.change_in_storage
+    :param previous_rain: see water_balance.dry_days
+    :param record_start: see water_balance.dry_days
+    :return: daily dataframe and infiltration (alpha, beta)
+    :rtype: tuple
+    """
+    daily_df = wb.daily_totals(water_balance_df, sum_columns)
+    stage_area = rating_curve(dam['stage_area_file'], 'total_area_sq_m', dam['stage_cutoff'])
+    daily_df['ws_area(sq.m)'] = stage_area(daily_df['stage(m)'])
+    daily_df['change_storage(cu.m)'] = wb.change_in_storage(water_balance_df['volume (cu.m)'],
+                                                            previous=previous_end_volume).reindex(
+        daily_df.index).fillna(0.0)
+    return wb.daily_water_balance(daily_df, rain_column, model=dam['infiltration_model'],
+                                  stage_cutoff=dam['stage_cutoff'], window_days=dam['dry_window_days'],
+                                  parameters=parameters, previous_rain=previous_rain, record_start=record_start)
+
+
+def dam_water_balance(dam, weather_df):
+    """
+    Half hourly and daily water balance of a check dam
+
+    :param dam: check dam parameters
+    :param weather_df: weather of the station of the check dam
+    :return: half hourly dataframe, daily dataframe and fitted infiltration (alpha, beta)
+    :rtype: tuple
+    """
+    water_balance_df = sub_daily_water_balance(dam, weather_df)
+    daily_df, parameters = daily_dam_water_balance(dam, water_balance_df)
+    return water_balance_df, daily_df, parameters
+
+
+def dam_key(dam):
+    """
+    Hash of the check dam parameters that past results depend on, all but stage_files and end
+
+    :param dam: check dam parameters
+    :return: hex digest
+    """
+    parameters = dict((name, value) for name, value in dam.items() if name not in ['stage_files', 'end'])
+    return hashlib.sha1(json.dumps(parameters, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def file_signature(path):
+    return [os.path.getsize(path), os.path.getmtime(path)]
+
+
+def series_to_json(series, series_format=date_format):
+    return dict((time.strftime(series_format), float(value)) for time, value in series.items())
+
+
+def series_from_json(values, series_format=date_format):
+    times = sorted(values.keys())
+    return pd.Series([values[time] for time in times], index=pd.to_datetime(times, format=series_format),
+                     dtype=float)
+
+
+def read_state(dam_dir):
+    path = os.path.join(dam_dir, state_file)
+    if not os.path.exists(path):
+        return None
+    return read_json(path)
+
+
+def write_state(dam_dir, state):
+    # write to a temporary file first, so a half written state is never read
+    handle, temporary = tempfile.mkstemp(dir=dam_dir)
+    with os.fdopen(handle, 'w') as state_json:
+        json.dump(state, state_json)
+    path = os.path.join(dam_dir, state_file)
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(temporary, path)
+
+
+def write_rows(df, csv_file, offset=None, split=None):
+    """
+    Writes dataframe to csv file, replacing the rows from byte offset on, or the whole file with header if offset
+    is None
+
+    :param df: dataframe with datetime index
+    :param csv_file: csv file
+    :param offset: byte offset of the first row replaced
+    :param split: time stamp, offset of the first row at or after it is returned
+    :return: byte offset of the row at split, end of file if split is None
+    """
+    with open(csv_file, 'w' if offset is None else 'r+') as out:
+        if offset is None:
+            out.write(df.iloc[:0].to_csv())
+        else:
+            out.seek(offset)
+            out.truncate()
+        if split is not None:
+            out.write(df[df.index < split].to_csv(header=False))
+            df = df[df.index >= split]
+        split_offset = out.tell()
+        out.write(df.to_csv(header=False))
+        return split_offset if split is not None else out.tell()
+
+
+def daily_summary(daily_df, closed=None):
+    """
+    Number of days, dry days and totals of daily water balance
+
+    :param daily_df: daily dataframe, see daily_dam_water_balance
+    :param closed: summary of days before daily_df, added to it
+    :return: dict
+    """
+    summary = {'days': len(daily_df.index), 'dry_days': int((daily_df['status'] == 'N').sum())}
+    for column in total_columns:
+        summary[column] = float(daily_df[column].sum())
+    if closed is not None:
+        for name in summary:
+            summary[name] += closed[name]
+    return summary
+
+
+def tail_to_json(water_balance_df):
+    return {'index': [time.strftime(date_format) for time in water_balance_df.index],
+            'columns': dict((column, [float(value) for value in water_balance_df[column].values])
+                            for column in sub_daily_columns)}
+
+
+def tail_from_json(tail):
+    water_balance_df = pd.DataFrame(tail['columns'], index=pd.to_datetime(tail['index'], format=date_format),
+                                    columns=sub_daily_columns, dtype=float)
+    water_balance_df.index.name = 'Date'
+    return water_balance_df
+
+
+def save_dam(dam, dam_dir, state, water_level, water_balance_df, daily_df, parameters, signatures):
+    """
+    Writes new rows of half hourly and daily water balance and the state needed to continue them.
+    The last day may be incomplete, its half hourly rows are kept in the state, it is computed again on the next
+    update and its daily row is rewritten from daily_offset.
+
+    :param dam: check dam parameters
+    :param dam_dir: output directory of check dam
+    :param state: state of the earlier run, None for a run from the start
+    :param water_level: stage readings of the run, see read_water_level
+    :param water_balance_df: new half hourly rows
+    :param daily_df: daily rows from the last day of the earlier run on
+    :param parameters: infiltration (alpha, beta)
+    :param signatures: {logger file: file_signature} of the logger files read
+    :return: new state
+    """
+    if state is None:
+        record_start = daily_df.index.min()
+        previous_rain = series_from_json({})
+        previous_end_volume = series_from_json({})
+        tail = water_balance_df.iloc[:0]
+        sub_daily_offset, daily_offset, closed = None, None, None
+    else:
+        record_start = pd.Timestamp(state['record_start'])
+        previous_rain = series_from_json(state['previous_rain'])
+        previous_end_volume = series_from_json(state['previous_end_volume'])
+        tail = tail_from_json(state['tail'])
+        sub_daily_offset, daily_offset, closed = state['sub_daily_offset'], state['daily_offset'], state['closed']
+    last_time = water_balance_df.index.max()
+    boundary = last_time.normalize()
+    sub_daily_offset = write_rows(water_balance_df, os.path.join(dam_dir, 'water_balance_30min.csv'),
+                                  offset=sub_daily_offset)
+    daily_offset = write_rows(daily_df, os.path.join(dam_dir, 'water_balance_daily.csv'), offset=daily_offset,
+                              split=boundary)
+    rain = pd.concat([previous_rain[previous_rain.index < daily_df.index.min()], daily_df[rain_column]])
+    window_start = boundary - pd.Timedelta(days=dam['dry_window_days'] - 1)
+    rows = pd.concat([tail, water_balance_df])
+    end_volume = pd.concat([previous_end_volume, wb.end_of_day_volume(rows['volume (cu.m)'])])
+    summary = daily_summary(daily_df, closed)
+    summary.update({'start': str(record_start.date()), 'end': str(daily_df.index.max().date()),
+                    'alpha': parameters[0], 'beta': parameters[1]})
+    state = {'version': state_version,
+             'key': dam_key(dam),
+             'stage_files': signatures,
+             'record_start': record_start.strftime(date_format),
+             'last_time': last_time.strftime(date_format),
+             'last_stage': float(water_balance_df['stage(m)'].iloc[-1]),
+             'last_reading': [water_level.index.max().strftime(date_format), float(water_level.iloc[-1])],
+             'parameters': [float(parameters[0]), float(parameters[1])],
+             'previous_rain': series_to_json(rain[(rain.index >= window_start) & (rain.index < boundary)]),
+             'previous_end_volume': series_to_json(end_volume[end_volume.index == boundary - pd.Timedelta(days=1)]),
+             'tail': tail_to_json(rows[rows.index >= boundary]),
+             'sub_daily_offset': sub_daily_offset,
+             'daily_offset': daily_offset,
+             'closed': daily_summary(daily_df[daily_df.index < boundary], closed),
+             'summary': summary}
+    write_state(dam_dir, state)
+    return state
+
+
+def run_dam_from_start(dam, weather_df, dam_dir, cache=None):
+    """
+    Water balance of a check dam over all its logger files, infiltration fitted on all dry days
+
+    :param dam: check dam parameters
+    :param weather_df: weather of the station of the check dam
+    :param dam_dir: output directory of check dam
+    :param cache: see read_water_level
+    :return: state, see save_dam
+    """
+    signatures = dict((stage_file, file_signature(stage_file)) for stage_file in dam['stage_files'])
+    water_level = read_water_level(dam, cache=cache)
+    water_balance_df = sub_daily_water_balance(dam, weather_df, stage=stage_grid(water_level, dam['stage_cutoff']))
+    daily_df, parameters = daily_dam_water_balance(dam, water_balance_df)
+    return save_dam(dam, dam_dir, None, water_level, water_balance_df, daily_df, parameters, signatures)
+
+
+def update_dam(dam, weather_df, dam_dir, state, cache=None):
+    """
+    Continues the water balance of a check dam with the logger files that are new or changed since state.
+    Only readings after the last reading of state are used, the grid continues from the last time stamp and
+    the days from the last (possibly incomplete) day of state on are computed, with the infiltration parameters,
+    end of day volume and rain of the dry day window kept in state.
+
+    :param dam: check dam parameters
+    :param weather_df: weather of the station of the check dam
+    :param dam_dir: output directory of check dam
+    :param state: state of the earlier run, see save_dam
+    :param cache: see read_water_level
+    :return: new state
+    """
+    signatures = dict((stage_file, file_signature(stage_file)) for stage_file in dam['stage_files'])
+    new_files = [stage_file for stage_file in dam['stage_files']
+                 if state['stage_files'].get(stage_file) != signatures[stage_file]]
+    if not new_files:
+        return state
+    last_time = pd.Timestamp(state['last_time'])
+    reading_time, reading = pd.Timestamp(state['last_reading'][0]), state['last_reading'][1]
+    water_level = read_water_level(dam, new_files, cache=cache)
+    water_level = pd.concat([pd.Series([reading], index=pd.DatetimeIndex([reading_time])),
+                             water_level[water_level.index > reading_time]])
+    stage = stage_grid(water_level, dam['stage_cutoff'], after=last_time)
+    water_balance_df = None
+    if len(stage.index):
+        water_balance_df = sub_daily_water_balance(dam, weather_df, stage=stage,
+                                                   previous_stage=pd.Series([state['last_stage']],
+                                                                            index=pd.DatetimeIndex([last_time])))
+    if water_balance_df is None or not len(water_balance_df.index):
+        # nothing on the grid yet, the readings are kept for the next update
+        state['stage_files'] = signatures
+        state['last_reading'] = [water_level.index.max().strftime(date_format), float(water_level.iloc[-1])]
+        write_state(dam_dir, state)
+        return state
+    daily_df, parameters = daily_dam_water_balance(dam, pd.concat([tail_from_json(state['tail']), water_balance_df]),
+                                                   parameters=tuple(state['parameters']),
+                                                   previous_end_volume=series_from_json(state['previous_end_volume']),
+                                                   previous_rain=series_from_json(state['previous_rain']),
+                                                   record_start=pd.Timestamp(state['record_start']))
+    return save_dam(dam, dam_dir, state, water_level, water_balance_df, daily_df, parameters, signatures)
+
+
+def init_worker(shared_weather_stations):
+    weather_stations.update(shared_weather_stations)
+
+
+def run_dam(args):
+    """
+    Water balance of one check dam with weather of the worker, written to output_dir/<name>/.
+    If incremental and the state of an earlier run with the same check dam parameters is found, only new logger
+    files are processed, else the check dam is run from the start.
+
+    :param args: check dam parameters, output directory, incremental and cache directory (or None)
+    :return: dict of summary, error is the traceback if the check dam failed
+    """
+    dam, output_dir, incremental, cache_dir = args
+    summary = dict((column, None) for column in summary_columns)
+    summary['name'] = dam['name']
+    try:
+        dam_dir = os.path.join(output_dir, dam['name'])
+        if not os.path.isdir(dam_dir):
+            os.makedirs(dam_dir)
+        weather_df = weather_stations[dam['weather_station']]
+        cache = ch.DataCache(cache_dir) if cache_dir is not None else None
+        state = read_state(dam_dir) if incremental else None
+        if state is not None and state.get('version') == state_version and state.get('key') == dam_key(dam):
+            state = update_dam(dam, weather_df, dam_dir, state, cache=cache)
+        else:
+            state = run_dam_from_start(dam, weather_df, dam_dir, cache=cache)
+        summary.update(state['summary'])
+    except Exception:
+        summary['error'] = traceback.format_exc()
+    return summary
+
+
+class WaterBalancePipeline(object):
+    """
+    Water balance of all check dams of a network parameter file
+
+    Examples:
+        >>> pipeline = WaterBalancePipeline('network.json')
+        >>> summary_df = pipeline.run(processes=4)
+        >>> summary_df = pipeline.run(processes=4, incremental=True)
+    """
+    def __init__(self, config_file):
+        self.config = read_config(config_file)
+        self.output_dir = self.config['output_dir']
+        self.dams = self.config['dams']
+        self.cache_dir = self.config['cache_dir']
+        self.weather_stations = None
+
+    def load_weather(self):
+        """
+        Reads weather of the stations used by the check dams, once
+        """
+        if self.weather_stations is None:
+            used = set(dam['weather_station'] for dam in self.dams)
+            cache = ch.DataCache(self.cache_dir) if self.cache_dir is not None else None
+            self.weather_stations = read_weather_stations(dict((name, station) for name, station in
+                                                                self.config['weather_stations'].items()
+                                                                if name in used), cache=cache)
+        return self.weather_stations
+
+    def run(self, processes=1, names=None, incremental=False):
+        """
+        Runs check dams and writes their outputs and summary.csv to output_dir
+
+        :param processes: number of worker processes
+        :param names: names of check dams to run, default all
+        :param incremental: if True, check dams run before are continued with their new logger files, see run_dam
+        :return: summary dataframe, one row per check dam in order of the network file
+        """
+        dams = [dam for dam in self.dams if names is None or dam['name'] in names]
+        if not os.path.isdir(self.output_dir):
+            os.makedirs(self.output_dir)
+        weather = self.load_weather()
+        jobs = [(dam, self.output_dir, incremental, self.cache_dir) for dam in dams]
+        if processes > 1 and len(jobs) > 1:
+            pool = Pool(processes=min(processes, len(jobs)), initializer=init_worker, initargs=(weather,))
+            try:
+                summaries = pool.map(run_dam, jobs, chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            init_worker(weather)
+            summaries = [run_dam(job) for job in jobs]
+        summary_df = pd.DataFrame(summaries, columns=summary_columns)
+        summary_df.to_csv(os.path.join(self.output_dir, 'summary.csv'), index=False)
+        return summary_df
+
+
+if __name__ == '__main__':
+    parser = OptionParser()
+    parser.add_option("-c", "--config", dest="config", type="string", help="network parameter file (json)",
+                      metavar="FILE")
+    parser.add_option("-n", "--processes", dest="processes", default=1, type="int",
+                      help="number of processes used in parallel (default=1)")
+    parser.add_option("-d", "--dam", dest="dams", action="append", help="run only this check dam (repeatable)")
+    parser.add_option("-u", "--update", dest="incremental", action="store_true", default=False,
+                      help="continue check dams run before with their new logger files")
+    (options, args) = parser.parse_args()
+    if options.config is None:
+        parser.error("network parameter file is needed, -c FILE")
+    summary_df = WaterBalancePipeline(options.config).run(processes=options.processes, names=options.dams,
+                                                          incremental=options.incremental)
+    print(summary_df.drop('error', axis=1).to_string(index=False))
+    for name, error in zip(summary_df['name'], summary_df['error']):
+        if error is not None and error == error:
+            print("check dam {0} failed:\n{1}".format(name, error))
@@ -0,0 +1,205 @@
+__author__ = 'kiruba'
+"""
+Rule based quality control of sensor (weather station, water level logger) records.
+Every rule is evaluated as a boolean mask over all its columns at once, and the result of all rules is a
+flag bitmap per value, so flagged values can be audited later (which rule flagged them, whether they were filled).
+Flagged values are filled from the same time of day of the previous and next day (day_interpolate) or the
+previous day (previous_day), looked up by reindexing on the shifted index instead of timestamp by timestamp.
+"""
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+# flag bits
+THRESHOLD = 1
+RATE_OF_CHANGE = 2
+STUCK = 4
+FILLED = 8
+flag_names = {THRESHOLD: 'threshold', RATE_OF_CHANGE: 'rate_of_change', STUCK: 'stuck', FILLED: 'filled'}
+operators = {'>': np.greater, '<': np.less, '=': np.equal, '>=': np.greater_equal, '<=': np.less_equal}
+fill_methods = ['day_interpolate', 'previous_day']
+
+
+def threshold_mask(dataframe, rules):
+    """
+    Values beyond cutoff
+
+    :param dataframe: Pandas dataframe
+    :param rules: Conditional dictionary as in pick_incorrect_value, Eg.{column name: [cutoff, '>']},
+        or a list of conditions per column, Eg. {column name: [[45, '>'], [0, '<']]}
+    :return: boolean dataframe of rule columns
+    """
+    masks = {}
+    for column, conditions in rules.items():
+        if not isinstance(conditions[0], (list, tuple)):
+            conditions = [conditions]
+        values = dataframe[column].values
+        mask = np.zeros(len(values), dtype=bool)
+        for cutoff, operator in conditions:
+            if operator not in operators:
+                raise ValueError("operator must be one of {0}".format(sorted(operators.keys())))
+            with np.errstate(invalid='ignore'):
+                mask |= operators[operator](values, cutoff)
+        masks[column] = mask
+    return pd.DataFrame(masks, index=dataframe.index, columns=list(rules.keys()))
+
+
+def rate_of_change_mask(dataframe, rules):
+    """
+    Values that change from the previous value by more than the allowed change (spikes and steps)
+
+    :param dataframe: Pandas dataframe
+    :param rules: {column name: maximum absolute change between consecutive values}
+    :return: boolean dataframe of rule columns
+    """
+    columns = list(rules.keys())
+    values = dataframe[columns].values.astype(float)
+    max_change = np.array([rules[column] for column in columns], dtype=float)
+    mask = np.zeros(values.shape, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        mask[1:] = np.abs(np.diff(values, axis=0)) > max_change
+    return pd.DataFrame(mask, index=dataframe.index, columns=columns)
+
+
+def stuck_mask(dataframe, rules):
+    """
+    Values of a run of at least n identical consecutive values (stuck sensor)
+
+    :param dataframe: Pandas dataframe
+    :param rules: {column name: minimum number of identical consecutive values}
+    :return: boolean dataframe of rule columns
+    """
+    masks = {}
+    for column, min_run in rules.items():
+        values = dataframe[column].values
+        n = len(values)
+        if n == 0:
+            masks[column] = np.zeros(0, dtype=bool)
+            continue
+        # start of every run of identical values
+        starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+        lengths = np.diff(np.append(starts, n))
+        run_length = np.repeat(lengths, lengths)
+        masks[column] = run_length >= min_run
+    return pd.DataFrame(masks, index=dataframe.index, columns=list(rules.keys()))
+
+
+def day_offset_values(series, days):
+    """
+    Values at the same time of day, days later (negative - earlier), NaN where the time stamp is not in series
+
+    :param series: Pandas series with unique datetime index
+    :param days: day offset
+    :return: array aligned with series
+    """
+    return series.reindex(series.index + timedelta(days=days)).values
+
+
+def fill_values(dataframe, mask, method='day_interpolate', inner=True):
+    """
+    Replaces masked values with the average of the same time of previous and next day (day_interpolate)
+    or with the value of the same time of previous day (previous_day).
+    Neighbouring days that are masked themselves are not used, day_interpolate then uses the other day
+    and previous_day goes back to the latest unmasked day.
+
+    :param dataframe: Pandas dataframe with unique datetime index
+    :param mask: boolean dataframe, True - value to be replaced, columns are the columns to fill
+    :param method: 'day_interpolate' or 'previous_day'
+    :param inner: if True, only time stamps more than a day from the ends of dataframe are filled
+        (as day_interpolate and previous_interpolate of checkdam)
+    :return: corrected copy of dataframe and boolean dataframe of filled values
+    """
+    if method not in fill_methods:
+        raise ValueError("method must be one of {0}".format(fill_methods))
+    corrected = dataframe.copy()
+    filled = pd.DataFrame(False, index=dataframe.index, columns=mask.columns)
+    fillable = np.ones(len(dataframe.index), dtype=bool)
+    if inner and len(dataframe.index):
+        initial_cutoff = dataframe.index.min() + timedelta(days=1)
+        final_cutoff = dataframe.index.max() - timedelta(days=1)
+        fillable = np.asarray((dataframe.index > initial_cutoff) & (dataframe.index < final_cutoff))
+    for column in mask.columns:
+        wrong = mask[column].values & fillable
+        if not wrong.any():
+            continue
+        good = dataframe[column].where(~mask[column].values)
+        if method == 'day_interpolate':
+            prev_value = day_offset_values(good, -1)
+            next_value = day_offset_values(good, 1)
+            with np.errstate(invalid='ignore'):
+                replacement = np.where(np.isnan(prev_value), next_value,
+                                       np.where(np.isnan(next_value), prev_value, 0.5 * (prev_value + next_value)))
+        else:
+            # latest unmasked value at the same time of day
+            replacement = good.groupby(good.index.time).ffill().values
+        wrong &= ~np.isnan(replacement)
+        values = corrected[column].values.copy()
+        values[wrong] = replacement[wrong]
+        corrected[column] = values
+        filled[column] = wrong
+    return corrected, filled
+
+
+class SensorQC(object):
+    """
+    Threshold, rate of change and stuck sensor rules over a dataframe
+
+    Examples:
+        >>> qc = SensorQC(threshold={'Max Air Temperature (C)': [45, '>'], 'Min Air Temperature (C)': [0, '<']},
+        ...               rate_of_change={'Air Temperature (C)': 8.0}, stuck={'Wind Speed (kmph)': 12})
+        >>> corrected_df, flags = qc.correct(weather_df, method='day_interpolate')
+        >>> qc.summary(flags)
+    """
+    def __init__(self, threshold=None, rate_of_change=None, stuck=None):
+        self.rules = [(THRESHOLD, threshold_mask, threshold or {}),
+                      (RATE_OF_CHANGE, rate_of_change_mask, rate_of_change or {}),
+                      (STUCK, stuck_mask, stuck or {})]
+
+    @property
+    def columns(self):
+        columns = []
+        for flag, rule_mask, rules in self.rules:
+            columns.extend(column for column in rules if column not in columns)
+        return columns
+
+    def flags(self, dataframe):
+        """
+        Flag bitmap of every value of rule columns, sum of THRESHOLD, RATE_OF_CHANGE and STUCK bits
+
+        :param dataframe: Pandas dataframe
+        :return: dataframe of uint8 flags
+        """
+        flags = pd.DataFrame(np.zeros((len(dataframe.index), len(self.columns)), dtype=np.uint8),
+                             index=dataframe.index, columns=self.columns)
+        for flag, rule_mask, rules in self.rules:
+            if rules:
+                mask = rule_mask(dataframe, rules)
+                for column in mask.columns:
+                    flags[column] = flags[column].values | (mask[column].values * flag).astype(np.uint8)
+        return flags
+
+    def correct(self, dataframe, method='day_interpolate', inner=True):
+        """
+        Flags and fills values
+
+        :param dataframe: Pandas dataframe with unique datetime index
+        :param method: 'day_interpolate' or 'previous_day', see fill_values
+        :param inner: see fill_values
+        :return: corrected copy of dataframe and flags with FILLED bit set for replaced values
+        """
+        flags = self.flags(dataframe)
+        corrected, filled = fill_values(dataframe, flags > 0, method=method, inner=inner)
+        flags = flags | (filled.values * FILLED).astype(np.uint8)
+        return corrected, flags
+
+    @staticmethod
+    def summary(flags):
+        """
+        Number of values with each flag per column
+
+        :param flags: flags from flags or correct
+        :return: dataframe, one row per column and one column per flag
+        """
+        values = flags.values
+        return pd.DataFrame({name: ((values & flag) > 0).sum(axis=0) for flag, name in flag_names.items()},
+                            index=flags.columns, columns=[flag_names[flag] for flag in sorted(flag_names)])
@@ -0,0 +1,497 @@
+__author__ = 'kiruba'
+"""
+Check dam routing engine for cumulative impact model.
+State of every check dam is kept in numpy arrays indexed by (day, check dam) and
+the output dataframe is written only once at the end of the simulation.
+"""
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from multiprocessing import Pool
+
+# per check dam output columns, in the order CheckdamChain creates them
+output_columns = ['volume', 'inflow_from_catchment', 'inflow_from_overflow', 'total_inflow', 'evap', 'infilt',
+                  'overflow', 'conv_ratio', 'est_own_flow_ratio']
+checkdam_attributes = ['check_dam_name', 'catchment_area', 'evaporation', 'infiltration_rate', 'initial_volume',
+                       'own_catchment_inflow_ratio', 'next_check_dam', 'max_volume', 'convert_volume_to_area']
+
+
+def check_checkdam(checkdam):
+    """
+    Raises TypeError if object doesn't have the attributes of CheckdamParameters
+
+    :param checkdam: check dam parameters object
+    """
+    for attribute in checkdam_attributes:
+        if not hasattr(checkdam, attribute):
+            raise TypeError("{0} is not an instance of CheckdamParameters()".format(checkdam))
+
+
+def column_name(column, check_dam_name):
+    return '{0}_{1}'.format(column, check_dam_name)
+
+
+def check_daily_index(index):
+    """
+    Routing carries the volume of day t to day t + 1 by position, so the index has to be daily without gaps.
+
+    :param index: pandas DatetimeIndex
+    """
+    if len(index) > 1:
+        if not index.is_monotonic_increasing:
+            raise ValueError("index must be sorted in increasing order")
+        if not (np.diff(index.values) == np.timedelta64(timedelta(days=1))).all():
+            raise ValueError("index must be daily without missing days")
+
+
+def own_catchment_inflow(catchment_area, inflow_catchment_area_ratio, own_catchment_inflow_ratio, inflow_from_overflow):
+    """
+    Iterates the own catchment inflow ratio until the estimated ratio is same as assumed ratio (rounded to 2 decimals)
+    or 100 iterations. Same as the convergence loop in CheckdamChain.simulate
+
+    :param catchment_area: catchment area of check dam [sq.km]
+    :param inflow_catchment_area_ratio: inflow per catchment area for the day
+    :param own_catchment_inflow_ratio: initial assumed own catchment inflow ratio
+    :param inflow_from_overflow: inflow from upstream check dam overflow [cu.m]
+    :return: inflow from catchment, total inflow and convergence ratio
+    :rtype: tuple
+    """
+    n = 1
+    convergence_ratio = 5
+    assumed_own_catchment_inflow_ratio = own_catchment_inflow_ratio
+    while True:
+        if (round(convergence_ratio, 2) == round(1.0, 2)) or (n > 100) or (round(convergence_ratio, 2) == round(0.00, 2)):
+            return inflow_from_catchment, inflow, convergence_ratio
+        inflow_from_catchment = catchment_area * inflow_catchment_area_ratio * assumed_own_catchment_inflow_ratio
+        if inflow_from_catchment > 0.0:
+            estimated_own_catchment_inflow_ratio = inflow_from_catchment / (inflow_from_catchment + inflow_from_overflow)
+            convergence_ratio = estimated_own_catchment_inflow_ratio / assumed_own_catchment_inflow_ratio
+            assumed_own_catchment_inflow_ratio = 0.5 * (estimated_own_catchment_inflow_ratio + assumed_own_catchment_inflow_ratio)
+            inflow = inflow_from_catchment + inflow_from_overflow
+            n += 1
+        else:
+            inflow = inflow_from_overflow
+            convergence_ratio = 5
+            n = 101
+
+
+def direct_own_catchment_inflow(catchment_area, inflow_catchment_area_ratio, own_catchment_inflow_ratio, inflow_from_overflow):
+    """
+    Solves the own catchment inflow ratio directly instead of iterating.
+    With q = catchment_area * inflow_catchment_area_ratio, the iteration looks for the ratio a with
+    a = q*a / (q*a + inflow_from_overflow), whose non zero solution is a = 1 - inflow_from_overflow / q.
+    When upstream overflow is more than q, a is zero and all the inflow is from overflow.
+    Works on scalars or arrays, so all check dams of a time step can be solved in one call.
+
+    Convergence ratio is estimated ratio / solved ratio, which is 1.0 except when a is zero
+    (limit of the iteration) and 5 when there is no inflow from catchment, as in CheckdamChain.
+
+    :param catchment_area: catchment area of check dam [sq.km]
+    :param inflow_catchment_area_ratio: inflow per catchment area
+    :param own_catchment_inflow_ratio: initial own catchment inflow ratio, only its sign is used
+    :param inflow_from_overflow: inflow from upstream check dam overflow [cu.m]
+    :return: inflow from catchment, total inflow, convergence ratio and own catchment inflow ratio
+    :rtype: tuple
+    """
+    catchment_area = np.asarray(catchment_area, dtype=float)
+    inflow_catchment_area_ratio = np.asarray(inflow_catchment_area_ratio, dtype=float)
+    own_catchment_inflow_ratio = np.asarray(own_catchment_inflow_ratio, dtype=float)
+    inflow_from_overflow = np.asarray(inflow_from_overflow, dtype=float)
+    catchment_inflow = catchment_area * inflow_catchment_area_ratio
+    initial_inflow = catchment_inflow * own_catchment_inflow_ratio
+    has_inflow = initial_inflow > 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(has_inflow, np.maximum(1.0 - (inflow_from_overflow / catchment_inflow), 0.0), 0.0)
+        inflow_from_catchment = np.where(has_inflow, catchment_inflow * ratio, initial_inflow)
+        inflow = np.where(has_inflow, inflow_from_catchment + inflow_from_overflow, inflow_from_overflow)
+        convergence_ratio = np.where(has_inflow, catchment_inflow / (inflow_from_catchment + inflow_from_overflow), 5.0)
+    return inflow_from_catchment[()], inflow[()], convergence_ratio[()], ratio[()]
+
+
+class ArrayCheckdamChain(object):
+    """
+    Drop in replacement for CheckdamChain. Takes the same arguments and gives the same output dataframe,
+    but keeps volume, inflow, overflow, evaporation and infiltration of all check dams in preallocated
+    arrays during simulation.
+
+    solver='iterative' (default) iterates the own catchment inflow ratio like CheckdamChain, solver='direct' solves
+    it for all check dams of a time step at once (see direct_own_catchment_inflow) and also fills est_own_flow_ratio.
+
+    Examples:
+        >>> had_chain_1 = ArrayCheckdamChain(inflow_catchment_area_df=inflow_df, check_dam_chain=[checkdam_463, checkdam_640], slope=slope, intercept=intercept)
+        >>> had_output_1_df = had_chain_1.simulate
+    """
+    def __init__(self, inflow_catchment_area_df, check_dam_chain, slope, intercept, output_df=None, solver='iterative'):
+        self.inflow_catchment_area_df = inflow_catchment_area_df
+        self.check_dam_chain = check_dam_chain  # list of check dams in order, must be instance of CheckdamParameters class
+        self.slope = slope
+        self.intercept = intercept
+        self.duration = len(self.inflow_catchment_area_df.index)
+        self.no_of_check_dams = len(self.check_dam_chain)
+        self.checkdam_list = list(self.check_dam_chain)
+        if solver not in ('iterative', 'direct'):
+            raise ValueError("solver must be 'iterative' or 'direct'")
+        self.solver = solver
+        for checkdam in self.check_dam_chain:
+            check_checkdam(checkdam)
+        if output_df is None:
+            self.output_df = self.create_output_df()
+        else:
+            self.modify_df = output_df
+            self.output_df = self.modify_output_df()
+
+    def create_output_df(self):
+        return self._initialise(self.inflow_catchment_area_df, reset_overflow_inflow=True)
+
+    def modify_output_df(self):
+        # inflow from overflow is kept, it comes from upstream chain
+        return self._initialise(self.modify_df, reset_overflow_inflow=False)
+
+    def _initialise(self, output_df, reset_overflow_inflow):
+        for checkdam in self.check_dam_chain:
+            for column in output_columns:
+                if column == 'inflow_from_overflow' and not reset_overflow_inflow:
+                    continue
+                output_df[column_name(column, checkdam.check_dam_name)] = 0.0
+            initial_volume = checkdam.initial_volume
+            if initial_volume is None:
+                initial_volume = np.nan
+            volume = output_df[column_name('volume', checkdam.check_dam_name)].values.copy()
+            volume[0] = initial_volume
+            output_df[column_name('volume', checkdam.check_dam_name)] = volume
+        return output_df
+
+    @property
+    def simulate(self):
+        output_df = self.output_df
+        index = output_df.index
+        check_daily_index(index)
+        no_of_days = len(index)
+        no_of_check_dams = self.no_of_check_dams
+        position = dict((checkdam.check_dam_name, j) for j, checkdam in enumerate(self.check_dam_chain))
+        # state arrays
+        state = {}
+        for column in output_columns:
+            state[column] = np.zeros((no_of_days, no_of_check_dams))
+        for j, checkdam in enumerate(self.check_dam_chain):
+            state['volume'][:, j] = output_df[column_name('volume', checkdam.check_dam_name)].values
+            state['inflow_from_overflow'][:, j] = output_df[column_name('inflow_from_overflow', checkdam.check_dam_name)].values
+        # overflow into check dams outside this chain
+        downstream_inflow = {}
+        inflow_catchment_area_ratio = (output_df['diff'].values * self.slope) + self.intercept
+        evaporation = np.empty((no_of_days, no_of_check_dams))
+        for j, checkdam in enumerate(self.check_dam_chain):
+            evaporation[:, j] = checkdam.evaporation.reindex(index).values
+        volume = state['volume']
+        inflow_from_catchment = state['inflow_from_catchment']
+        inflow_from_overflow = state['inflow_from_overflow']
+        total_inflow = state['total_inflow']
+        evap = state['evap']
+        infilt = state['infilt']
+        overflow = state['overflow']
+        conv_ratio = state['conv_ratio']
+        est_own_flow_ratio = state['est_own_flow_ratio']
+        catchment_area = np.array([checkdam.catchment_area for checkdam in self.check_dam_chain], dtype=float)
+        own_catchment_inflow_ratio = np.array([checkdam.own_catchment_inflow_ratio for checkdam in self.check_dam_chain], dtype=float)
+        for i in range(no_of_days - 1):
+            if self.solver == 'direct':
+                # inflow from overflow of day i is known from day i - 1, so all check dams are solved together
+                (inflow_from_catchment[i], total_inflow[i], conv_ratio[i],
+                 est_own_flow_ratio[i]) = direct_own_catchment_inflow(catchment_area, inflow_catchment_area_ratio[i],
+                                                                      own_catchment_inflow_ratio, inflow_from_overflow[i])
+            else:
+                for j, checkdam in enumerate(self.check_dam_chain):
+                    ic, inflow, convergence_ratio = own_catchment_inflow(checkdam.catchment_area,
+                                                                         inflow_catchment_area_ratio[i],
+                                                                         checkdam.own_catchment_inflow_ratio,
+                                                                         inflow_from_overflow[i, j])
+                    inflow_from_catchment[i, j] = ic
+                    conv_ratio[i, j] = convergence_ratio
+                    total_inflow[i, j] = inflow
+            for j, checkdam in enumerate(self.check_dam_chain):
+                inflow = total_inflow[i, j]
+                current_volume = volume[i, j]
+                surface_area = checkdam.convert_volume_to_area(current_volume)
+                evaporation_volume = surface_area * evaporation[i, j] * 0.001
+                evap[i, j] = evaporation_volume
+                infiltration = surface_area * checkdam.infiltration_rate
+                infilt[i, j] = infiltration
+                # routing
+                current_volume = (current_volume + inflow) - (infiltration + evaporation_volume)
+                if current_volume > checkdam.max_volume:
+                    overflow_volume = current_volume - checkdam.max_volume
+                    current_volume = checkdam.max_volume
+                else:
+                    overflow_volume = 0.0
+                volume[i, j] = current_volume
+                volume[i + 1, j] = current_volume
+                if overflow_volume > 0.0:
+                    overflow[i, j] = overflow_volume
+                    next_check_dam = checkdam.next_check_dam
+                    if next_check_dam is not None:
+                        if next_check_dam in position:
+                            inflow_from_overflow[i + 1, position[next_check_dam]] = overflow_volume
+                        else:
+                            if next_check_dam not in downstream_inflow:
+                                name = column_name('inflow_from_overflow', next_check_dam)
+                                if name in output_df.columns:
+                                    downstream_inflow[next_check_dam] = output_df[name].values.astype(float)
+                                else:
+                                    downstream_inflow[next_check_dam] = np.full(no_of_days, np.nan)
+                            downstream_inflow[next_check_dam][i + 1] = overflow_volume
+        # write to dataframe
+        for j, checkdam in enumerate(self.check_dam_chain):
+            for column in output_columns:
+                output_df[column_name(column, checkdam.check_dam_name)] = state[column][:, j]
+        for next_check_dam in sorted(downstream_inflow):
+            output_df[column_name('inflow_from_overflow', next_check_dam)] = downstream_inflow[next_check_dam]
+        return output_df
+
+
+def simulate_sub_basin(checkdams, downstream, outlets, inflow_catchment_area_ratio, evaporation, overflow_lag_days=1,
+                       solver='iterative'):
+    """
+    Routes one sub basin of a check dam network. Check dams must be in topological order (upstream first).
+
+    :param checkdams: list of check dam parameters, upstream first
+    :param downstream: position of downstream check dam in checkdams for each check dam, -1 if none
+    :param outlets: position of outlet in outlet list for each check dam, -1 if none
+    :param inflow_catchment_area_ratio: array of inflow per catchment area, one value per day
+    :param evaporation: array of evaporation [mm/day], shape (days, check dams)
+    :param overflow_lag_days: lag of the overflow of each check dam (or one lag for all), 1 - overflow of day t
+        reaches the downstream check dam or outlet on day t + 1, 0 - on same day t
+    :param solver: 'iterative' or 'direct', see ArrayCheckdamChain
+    :return: state arrays of shape (days, check dams) and inflow to outlets of shape (days, outlets)
+    :rtype: tuple
+    """
+    no_of_days = len(inflow_catchment_area_ratio)
+    no_of_check_dams = len(checkdams)
+    downstream = np.asarray(downstream, dtype=int)
+    outlets = np.asarray(outlets, dtype=int)
+    state = {}
+    for column in output_columns:
+        state[column] = np.zeros((no_of_days, no_of_check_dams))
+    outlet_inflow = np.zeros((no_of_days, max(outlets.max() + 1, 0) if no_of_check_dams else 0))
+    volume = state['volume']
+    inflow_from_overflow = state['inflow_from_overflow']
+    for j, checkdam in enumerate(checkdams):
+        volume[0, j] = np.nan if checkdam.initial_volume is None else checkdam.initial_volume
+    catchment_area = np.array([checkdam.catchment_area for checkdam in checkdams], dtype=float)
+    own_catchment_inflow_ratio = np.array([checkdam.own_catchment_inflow_ratio for checkdam in checkdams], dtype=float)
+    infiltration_rate = np.array([checkdam.infiltration_rate for checkdam in checkdams], dtype=float)
+    max_volume = np.array([checkdam.max_volume for checkdam in checkdams], dtype=float)
+    lag = np.zeros(no_of_check_dams, dtype=int) + np.asarray(overflow_lag_days, dtype=int)
+    # check dams that can be routed together in a time step, a check dam comes after those overflowing into it on
+    # the same day
+    level = np.zeros(no_of_check_dams, dtype=int)
+    for j in range(no_of_check_dams):
+        if downstream[j] >= 0 and lag[j] == 0:
+            level[downstream[j]] = max(level[downstream[j]], level[j] + 1)
+    batches = [np.flatnonzero(level == l) for l in range(level.max() + 1)] if no_of_check_dams else []
+    surface_area = np.zeros(no_of_check_dams)
+    for i in range(no_of_days - 1):
+        for batch in batches:
+            target = i + lag[batch]
+            if solver == 'direct':
+                (state['inflow_from_catchment'][i, batch], state['total_inflow'][i, batch], state['conv_ratio'][i, batch],
+                 state['est_own_flow_ratio'][i, batch]) = direct_own_catchment_inflow(catchment_area[batch],
+                                                                                      inflow_catchment_area_ratio[i],
+                                                                                      own_catchment_inflow_ratio[batch],
+                                                                                      inflow_from_overflow[i, batch])
+            else:
+                for j in batch:
+                    (state['inflow_from_catchment'][i, j], state['total_inflow'][i, j],
+                     state['conv_ratio'][i, j]) = own_catchment_inflow(catchment_area[j], inflow_catchment_area_ratio[i],
+                                                                       own_catchment_inflow_ratio[j], inflow_from_overflow[i, j])
+            for j in batch:
+                surface_area[j] = checkdams[j].convert_volume_to_area(volume[i, j])
+            evaporation_volume = surface_area[batch] * evaporation[i, batch] * 0.001
+            infiltration = surface_area[batch] * infiltration_rate[batch]
+            current_volume = (volume[i, batch] + state['total_inflow'][i, batch]) - (infiltration + evaporation_volume)
+            full = current_volume > max_volume[batch]
+            overflow_volume = np.where(full, current_volume - max_volume[batch], 0.0)
+            current_volume = np.where(full, max_volume[batch], current_volume)
+            state['evap'][i, batch] = evaporation_volume
+            state['infilt'][i, batch] = infiltration
+            state['overflow'][i, batch] = overflow_volume
+            volume[i, batch] = current_volume
+            volume[i + 1, batch] = current_volume
+            to_checkdam = downstream[batch] >= 0
+            np.add.at(inflow_from_overflow, (target[to_checkdam], downstream[batch][to_checkdam]),
+                      overflow_volume[to_checkdam])
+            to_outlet = outlets[batch] >= 0
+            np.add.at(outlet_inflow, (target[to_outlet], outlets[batch][to_outlet]), overflow_volume[to_outlet])
+    return state, outlet_inflow
+
+
+def simulate_sub_basin_star(args):
+    # Pool.map passes a single argument
+    return simulate_sub_basin(*args)
+
+
+class CheckdamNetwork(object):
+    """
+    Check dam network as a directed acyclic graph, edges are given by next_check_dam of each check dam.
+    Generalises CheckdamChain and CheckdamChainMerge, a watershed with any number of branches and
+    confluences is routed in one pass per time step without merging dataframes.
+    Overflow into a next_check_dam that is not in the network (eg. lake) is given as inflow_from_overflow_<name>.
+    Sub basins that don't share any check dam are independent and are simulated in parallel when processes > 1.
+    overflow_lag_days is the lag of every overflow edge (1 - next day as in CheckdamChain, 0 - same day), or a dict
+    of check dam name: lag of its overflow for edges that differ from next day. CheckdamChainMerge routes the
+    overflow of the last check dams of both chains into the converging check dam on the same day and all other
+    overflow on the next day, which is a lag of 0 for those two check dams.
+
+    Examples:
+        >>> had_network = CheckdamNetwork(inflow_catchment_area_df=inflow_df, checkdams=[checkdam_463, checkdam_640, checkdam_1, checkdam_639], slope=slope, intercept=intercept, processes=4)
+        >>> had_output_df = had_network.simulate
+        >>> # same routing as CheckdamChainMerge(chain_a, chain_b, 640, 1, checkdam_639)
+        >>> had_network = CheckdamNetwork(inflow_catchment_area_df=inflow_df, checkdams=[checkdam_463, checkdam_640, checkdam_1, checkdam_639], slope=slope, intercept=intercept, overflow_lag_days={640: 0, 1: 0})
+    """
+    def __init__(self, inflow_catchment_area_df, checkdams, slope, intercept, overflow_lag_days=1, solver='iterative',
+                 processes=1):
+        self.inflow_catchment_area_df = inflow_catchment_area_df
+        self.slope = slope
+        self.intercept = intercept
+        if solver not in ('iterative', 'direct'):
+            raise ValueError("solver must be 'iterative' or 'direct'")
+        self.overflow_lag_days = overflow_lag_days
+        self.solver = solver
+        self.processes = processes
+        self.checkdams = {}
+        self.names = []
+        for checkdam in checkdams:
+            check_checkdam(checkdam)
+            if checkdam.check_dam_name in self.checkdams:
+                raise ValueError("check dam {0} is repeated".format(checkdam.check_dam_name))
+            self.checkdams[checkdam.check_dam_name] = checkdam
+            self.names.append(checkdam.check_dam_name)
+        self.outlets = []
+        for name in self.names:
+            next_check_dam = self.checkdams[name].next_check_dam
+            if next_check_dam is not None and next_check_dam not in self.checkdams and next_check_dam not in self.outlets:
+                self.outlets.append(next_check_dam)
+        lags = overflow_lag_days.values() if isinstance(overflow_lag_days, dict) else [overflow_lag_days]
+        if any(lag not in (0, 1) for lag in lags):
+            raise ValueError("overflow_lag_days must be 0 or 1")
+        if isinstance(overflow_lag_days, dict):
+            unknown = [name for name in overflow_lag_days if name not in self.checkdams]
+            if unknown:
+                raise ValueError("overflow_lag_days of check dams not in network: {0}".format(unknown))
+        self.order = self.topological_order()
+        self.sub_basins = self.find_sub_basins()
+        self.output_df = None
+
+    def downstream(self, name):
+        next_check_dam = self.checkdams[name].next_check_dam
+        if next_check_dam in self.checkdams:
+            return next_check_dam
+        return None
+
+    def upstream(self, name):
+        return [upstream for upstream in self.names if self.downstream(upstream) == name]
+
+    def topological_order(self):
+        """
+        Orders check dams so that every check dam comes after all its upstream check dams
+
+        :return: list of check dam names
+        """
+        no_of_upstream = dict((name, 0) for name in self.names)
+        for name in self.names:
+            if self.downstream(name) is not None:
+                no_of_upstream[self.downstream(name)] += 1
+        ready = [name for name in self.names if no_of_upstream[name] == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            next_check_dam = self.downstream(name)
+            if next_check_dam is not None:
+                no_of_upstream[next_check_dam] -= 1
+                if no_of_upstream[next_check_dam] == 0:
+                    ready.append(next_check_dam)
+        if len(order) != len(self.names):
+            raise ValueError("check dam network has a cycle: {0}".format([name for name in self.names if name not in order]))
+        return order
+
+    def find_sub_basins(self):
+        """
+        Groups check dams that are connected by overflow, each group in topological order
+
+        :return: list of list of check dam names
+        """
+        basin = {}
+        for name in reversed(self.order):
+            next_check_dam = self.downstream(name)
+            basin[name] = name if next_check_dam is None else basin[next_check_dam]
+        sub_basins = []
+        basin_position = {}
+        for name in self.order:
+            if basin[name] not in basin_position:
+                basin_position[basin[name]] = len(sub_basins)
+                sub_basins.append([])
+            sub_basins[basin_position[basin[name]]].append(name)
+        return sub_basins
+
+    def sub_basin_topology(self, sub_basin):
+        """
+        Downstream check dam and outlet of each check dam in a sub basin, as positions for simulate_sub_basin
+
+        :param sub_basin: list of check dam names in topological order
+        :return: downstream positions and outlet positions, -1 if none
+        :rtype: tuple
+        """
+        position = dict((name, j) for j, name in enumerate(sub_basin))
+        downstream = [position.get(self.downstream(name), -1) for name in sub_basin]
+        outlets = [self.outlets.index(self.checkdams[name].next_check_dam) if self.checkdams[name].next_check_dam in self.outlets else -1
+                   for name in sub_basin]
+        return downstream, outlets
+
+    def overflow_lags(self, sub_basin):
+        """
+        Overflow lag of each check dam in a sub basin, for simulate_sub_basin
+
+        :param sub_basin: list of check dam names
+        :return: list of lags in days
+        """
+        if isinstance(self.overflow_lag_days, dict):
+            return [self.overflow_lag_days.get(name, 1) for name in sub_basin]
+        return [self.overflow_lag_days] * len(sub_basin)
+
+    @property
+    def simulate(self):
+        index = self.inflow_catchment_area_df.index
+        check_daily_index(index)
+        inflow_catchment_area_ratio = (self.inflow_catchment_area_df['diff'].values * self.slope) + self.intercept
+        jobs = []
+        for sub_basin in self.sub_basins:
+            checkdams = [self.checkdams[name] for name in sub_basin]
+            downstream, outlets = self.sub_basin_topology(sub_basin)
+            evaporation = np.column_stack([checkdam.evaporation.reindex(index).values for checkdam in checkdams])
+            jobs.append((checkdams, downstream, outlets, inflow_catchment_area_ratio, evaporation,
+                         self.overflow_lags(sub_basin), self.solver))
+        if self.processes > 1 and len(jobs) > 1:
+            pool = Pool(processes=min(self.processes, len(jobs)))
+            try:
+                results = pool.map(simulate_sub_basin_star, jobs)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [simulate_sub_basin_star(job) for job in jobs]
+        columns = []
+        data = {}
+        outlet_inflow = np.zeros((len(index), len(self.outlets)))
+        for sub_basin, (state, sub_basin_outlet_inflow) in zip(self.sub_basins, results):
+            for j, name in enumerate(sub_basin):
+                for column in output_columns:
+                    columns.append(column_name(column, name))
+                    data[columns[-1]] = state[column][:, j]
+            outlet_inflow[:, :sub_basin_outlet_inflow.shape[1]] += sub_basin_outlet_inflow
+        for k, outlet in enumerate(self.outlets):
+            columns.append(column_name('inflow_from_overflow', outlet))
+            data[columns[-1]] = outlet_inflow[:, k]
+        network_df = pd.DataFrame(data, index=index, columns=columns)
+        input_df = self.inflow_catchment_area_df.drop([column for column in columns if column in self.inflow_catchment_area_df.columns], axis=1)
+        self.output_df = pd.concat([input_df, network_df], axis=1)
+        return self.output_df
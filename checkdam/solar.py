@@ -0,0 +1,121 @@
+__author__ = 'kiruba'
+"""
+Extraterrestrial radiation from solar geometry for pandas DatetimeIndex.
+FAO 56 equations (http://www.fao.org/docrep/x0490e/x0490e07.htm) on arrays of day of year and time of day.
+Values depend only on day of year and time of day, so a table of one year is calculated once for every
+(latitude, longitude, timestep) and looked up for any period.
+"""
+import math
+import numpy as np
+import pandas as pd
+
+s = 0.0820  # solar constant MJ m-2 min-1
+lz = 270  # for India longitude of local time zone in degrees west of greenwich
+# length of period in hours
+timestep_hours = {'30min': 0.5, 'H': 1.0, 'D': 24.0}
+# (latitude, longitude, timestep): table of rext by [day of year, minute of day]
+_cache = {}
+
+
+def check_timestep(timestep):
+    if timestep not in timestep_hours:
+        raise ValueError("timestep must be one of {0}".format(sorted(timestep_hours.keys())))
+
+
+def daily_extraterrestrial_irradiation(doy, latitude):
+    """
+    Calculates daily extraterrestrial radiation
+
+    :param doy: (array of) day of year
+    :param latitude: in decimal degree
+    :return: Extra terrestrial radiation in MJ/m2/day
+    """
+    day = np.asarray(doy, dtype=float)
+    lat_rad = latitude * (math.pi / 180)
+    dr = 1 + (0.033 * np.cos((2 * math.pi * day) / 365))  # inverse relative distance Earth-Sun
+    dt = 0.409 * np.sin(((2 * math.pi * day) / 365) - 1.39)  # solar declination in radian
+    ws = np.arccos(-math.tan(lat_rad) * np.tan(dt))   # sunset hour angle in radian
+    rext = ((24 * 60) / math.pi) * s * dr * ((ws * math.sin(lat_rad) * np.sin(dt)) + (math.cos(lat_rad) * np.cos(dt) * np.sin(ws)))  # MJm-2day-1
+    return rext[()] if rext.ndim == 0 else rext
+
+
+def period_extraterrestrial_irradiation(doy, hour, latitude, longitude, timestep='30min'):
+    """
+    Calculates extraterrestrial radiation for periods shorter than a day, time stamp is end of the period
+
+    :param doy: (array of) day of year
+    :param hour: (array of) time of day in decimal hours
+    :param latitude: in decimal degree
+    :param longitude: in decimal degree
+    :param timestep: '30min' or 'H'
+    :return: Extra terrestrial radiation in MJ/m2/timestep
+    """
+    check_timestep(timestep)
+    t1 = timestep_hours[timestep]  # 0.5 for 30 minute 1 for hourly period
+    day = np.asarray(doy, dtype=float)
+    lat_rad = latitude * (math.pi / 180)
+    b = ((2 * math.pi) * (day - 81)) / 364
+    sc = 0.1645 * (np.sin(2 * b)) - 0.1255 * (np.cos(b)) - 0.025 * (np.sin(b))  # seasonal correction in hour
+    lm = (180 + (180 - longitude))  # longitude of measurement site
+    t = np.asarray(hour, dtype=float) - (t1 / 2)  # mid point of period
+    w = (math.pi / 12) * ((t + (0.0667 * (lz - lm)) + sc) - 12)
+    w1 = w - ((math.pi * t1) / 24)  # solar time angle at beginning of period [rad]
+    w2 = w + ((math.pi * t1) / 24)  # solar time angle at end of period [rad]
+    dr = 1 + (0.033 * np.cos((2 * math.pi * day) / 365))  # inverse relative distance Earth-Sun
+    dt = 0.409 * np.sin(((2 * math.pi * day) / 365) - 1.39)  # solar declination in radian
+    ws = np.arccos(-math.tan(lat_rad) * np.tan(dt))
+    rext = ((12 * 60) / math.pi) * s * dr * (((w2 - w1) * math.sin(lat_rad) * np.sin(dt)) + (
+        math.cos(lat_rad) * np.cos(dt) * (np.sin(w2) - np.sin(w1))))
+    # sun below horizon
+    rext = np.where((w > ws) | (w < -ws), 0.0, rext)
+    return rext[()] if rext.ndim == 0 else rext
+
+
+def extraterrestrial_irradiation_table(latitude, longitude, timestep='30min'):
+    """
+    Extraterrestrial radiation of every minute of day (or every day for daily timestep) of a leap year, cached
+
+    :param latitude: in decimal degree
+    :param longitude: in decimal degree
+    :param timestep: '30min', 'H' or 'D'
+    :return: array of shape (367, 1440), (367,) for daily, indexed by day of year
+    """
+    check_timestep(timestep)
+    key = (latitude, longitude, timestep)
+    if key not in _cache:
+        doy = np.arange(367)
+        if timestep == 'D':
+            table = daily_extraterrestrial_irradiation(doy, latitude)
+        else:
+            minute = np.arange(1440)
+            table = period_extraterrestrial_irradiation(doy[:, np.newaxis], minute[np.newaxis, :] / 60.0,
+                                                        latitude, longitude, timestep)
+        table.setflags(write=False)
+        _cache[key] = table
+    return _cache[key]
+
+
+def extraterrestrial_irradiation(date_time_index, latitude, longitude, timestep='30min'):
+    """
+    Calculates extraterrestrial radiation for each time stamp
+
+    :param date_time_index: pandas DatetimeIndex (or list of datetime), end of each period
+    :param latitude: in decimal degree
+    :param longitude: in decimal degree
+    :param timestep: '30min' [MJ/m2/30min], 'H' [MJ/m2/hour] or 'D' [MJ/m2/day]
+    :return: array of extraterrestrial radiation
+    """
+    date_time_index = pd.DatetimeIndex(date_time_index)
+    table = extraterrestrial_irradiation_table(latitude, longitude, timestep)
+    doy = np.asarray(date_time_index.dayofyear)
+    if timestep == 'D':
+        return table[doy]
+    minute = (np.asarray(date_time_index.hour) * 60) + np.asarray(date_time_index.minute)
+    if (np.asarray(date_time_index.second) != 0).any():
+        hour = minute / 60.0 + np.asarray(date_time_index.second) / 3600.0
+        return period_extraterrestrial_irradiation(doy, hour, latitude, longitude, timestep)
+    return table[doy, minute]
+
+
+def clear_cache():
+    _cache.clear()
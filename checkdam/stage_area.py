@@ -0,0 +1,104 @@
+__author__ = 'kiruba'
+"""
+Stage - area - volume relationship straight from gridded elevations (eg. griddata output), without contouring.
+Cell elevations are sorted once with their plan area, so wetted area and volume for any number of stages
+is a cumulative sum lookup: area(h) = sum of area of cells with z < h, volume(h) = sum of area * (h - z) of those cells.
+"""
+import numpy as np
+import pandas as pd
+
+
+def node_weights(coords):
+    """
+    Plan length represented by each grid node, half a spacing on either side (half at the edges)
+
+    :param coords: grid coordinates along one axis, eg. xi from np.linspace
+    :return: array of lengths, sums to the extent of the grid
+    """
+    coords = np.asarray(coords, dtype=float)
+    if len(coords) < 2:
+        return np.ones(len(coords))
+    edges = np.concatenate(([coords[0]], (coords[1:] + coords[:-1]) / 2.0, [coords[-1]]))
+    return np.abs(np.diff(edges))
+
+
+def cell_area(xi, yi):
+    """
+    Plan area of every node of a grid with zi[j, i] at (xi[i], yi[j]), as returned by
+    griddata((X, Y), Z, (xi[None, :], yi[:, None]))
+
+    :param xi: x coordinates of grid
+    :param yi: y coordinates of grid
+    :return: array of shape (len(yi), len(xi))
+    """
+    return np.outer(node_weights(yi), node_weights(xi))
+
+
+class StageAreaVolume(object):
+    """
+    Stage - area - volume relationship of a gridded surface.
+    Nodes with NaN elevation (outside survey) or outside mask are left out.
+
+    Examples:
+        >>> zi = griddata((X, Y), Z, (xi[None, :], yi[:, None]), method='linear')
+        >>> stage_area_volume = StageAreaVolume(xi, yi, zi)
+        >>> cont_area_df = stage_area_volume.table(np.arange(0.01, 1.96, 0.01))
+    """
+    def __init__(self, xi, yi, zi, mask=None):
+        zi = np.asarray(zi, dtype=float)
+        area = cell_area(xi, yi)
+        if area.shape != zi.shape:
+            raise ValueError("zi must have shape (len(yi), len(xi)) {0}, got {1}".format(area.shape, zi.shape))
+        valid = ~np.isnan(zi)
+        if mask is not None:
+            valid &= np.asarray(mask, dtype=bool)
+        z = zi[valid]
+        area = area[valid]
+        order = np.argsort(z, kind='mergesort')
+        self.z = z[order]
+        # elevations relative to the lowest cell, keeps volume accurate for elevations above mean sea level
+        self.z_min = self.z[0] if len(self.z) else 0.0
+        self.cumulative_area = np.cumsum(area[order])
+        self.cumulative_area_z = np.cumsum(area[order] * (self.z - self.z_min))
+
+    def area(self, stages):
+        """
+        Wetted area at each stage
+
+        :param stages: (array of) stage in the elevation units of the grid
+        :return: area in plan units of the grid (sq.m for metre grid)
+        """
+        return self.area_volume(stages)[0]
+
+    def volume(self, stages):
+        """
+        Volume below each stage
+
+        :param stages: (array of) stage
+        :return: volume (cu.m for metre grid)
+        """
+        return self.area_volume(stages)[1]
+
+    def area_volume(self, stages):
+        stages = np.asarray(stages, dtype=float)
+        # number of cells below stage
+        n = np.searchsorted(self.z, stages, side='left')
+        wet = n > 0
+        area = np.zeros(stages.shape)
+        volume = np.zeros(stages.shape)
+        area[wet] = self.cumulative_area[n[wet] - 1]
+        volume[wet] = ((stages[wet] - self.z_min) * area[wet]) - self.cumulative_area_z[n[wet] - 1]
+        if area.ndim == 0:
+            return area[()], volume[()]
+        return area, volume
+
+    def table(self, stages):
+        """
+        Stage - area - volume table
+
+        :param stages: array of stages
+        :return: pandas dataframe with columns Z, Area and Volume, in the layout of cont_area.csv
+        """
+        stages = np.asarray(stages, dtype=float)
+        area, volume = self.area_volume(stages)
+        return pd.DataFrame({'Z': stages, 'Area': area, 'Volume': volume}, columns=['Z', 'Area', 'Volume'])
@@ -0,0 +1,213 @@
+__author__ = 'kiruba'
+"""
+Daily water balance of a check dam from half hourly rain, evaporation, stage, volume, overflow and pumping.
+Change in storage is taken between the end of day (23:30) volumes of consecutive days.
+Dry days (no rain in the window, falling storage, no overflow, no pumping) give infiltration = -(change in storage +
+evaporation), a stage - infiltration rate relationship is fitted on them and used for the other days,
+and inflow closes the balance of the wet days.
+"""
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from scipy.optimize import curve_fit
+
+infiltration_models = ['power', 'average']
+
+
+def daily_totals(water_balance_df, sum_columns, stage_column='stage(m)'):
+    """
+    Daily sums of flux columns and daily mean stage
+
+    :param water_balance_df: half hourly dataframe with datetime index
+    :param sum_columns: columns summed over the day, eg. rain, evaporation volume, overflow, pumping status
+    :param stage_column: stage column, averaged over the day
+    :return: daily dataframe
+    """
+    sum_df = water_balance_df[sum_columns].resample('D').sum()
+    stage_df = water_balance_df[[stage_column]].resample('D').mean()
+    return sum_df.join(stage_df, how='left')
+
+
+def end_of_day_volume(volume, end_of_day='23:30'):
+    """
+    Volume at the end of day reading of every day that has one
+
+    :param volume: half hourly volume series with datetime index
+    :param end_of_day: time of the end of day reading, 'HH:MM'
+    :return: daily series
+    """
+    hour, minute = [int(part) for part in end_of_day.split(':')]
+    index = volume.index
+    end_volume = volume[(index.hour == hour) & (index.minute == minute)]
+    return end_volume.groupby(end_volume.index.normalize()).mean()
+
+
+def change_in_storage(volume, end_of_day='23:30', previous=None):
+    """
+    Change in storage between end of day volumes of consecutive days.
+    Days without an end of day reading on the previous day have zero change.
+
+    :param volume: half hourly volume series with datetime index
+    :param end_of_day: time of the end of day reading, 'HH:MM'
+    :param previous: end of day volumes of days before volume (daily series), eg. the day before an update
+    :return: daily series of change in storage
+    """
+    end_volume = end_of_day_volume(volume, end_of_day)
+    all_end_volume = end_volume
+    if previous is not None and len(previous.index):
+        all_end_volume = pd.concat([previous[previous.index < end_volume.index.min()], end_volume]) \
+            if len(end_volume.index) else previous
+    previous_volume = all_end_volume.reindex(end_volume.index - timedelta(days=1)).values
+    change = pd.Series(end_volume.values - previous_volume, index=end_volume.index, name='change_storage(cu.m)')
+    return change.fillna(0.0)
+
+
+def dry_days(daily_df, rain_column, window_days=2, change_column='change_storage(cu.m)',
+             overflow_column='overflow(cu.m)', pumping_column='pumping status', previous_rain=None, record_start=None):
+    """
+    Days without inflow: no rain on the day and the days before it (window_days in all), storage falling,
+    no overflow and no pumping. The first window_days - 1 days of the record can't be checked and are never dry.
+
+    :param daily_df: daily dataframe
+    :param rain_column: daily rain column
+    :param window_days: number of days without rain
+    :param change_column: change in storage column
+    :param overflow_column: overflow column
+    :param pumping_column: pumping status column, skipped if None or not in daily_df
+    :param previous_rain: daily rain of the days before daily_df (series), for the window of its first days
+    :param record_start: first day of the record, default first day of daily_df
+    :return: boolean series
+    """
+    rain = daily_df[rain_column]
+    if previous_rain is not None and len(previous_rain.index):
+        rain = pd.concat([previous_rain[previous_rain.index < rain.index.min()], rain])
+    rain_sum = rain.rolling('{0}D'.format(window_days), min_periods=1).sum().reindex(daily_df.index)
+    dry = (rain_sum.values == 0) & (daily_df[change_column].values < 0) & (daily_df[overflow_column].values == 0)
+    if pumping_column is not None and pumping_column in daily_df.columns:
+        dry &= daily_df[pumping_column].values == 0
+    if len(daily_df.index):
+        if record_start is None:
+            record_start = daily_df.index.min()
+        dry &= daily_df.index > (pd.Timestamp(record_start) + timedelta(days=window_days - 1))
+    return pd.Series(dry, index=daily_df.index, name='dry')
+
+
+def dry_infiltration(daily_df, dry, change_column='change_storage(cu.m)', evaporation_column='Evaporation (cu.m)'):
+    """
+    Infiltration of dry days, -(change in storage + evaporation), zero on other days
+
+    :param daily_df: daily dataframe
+    :param dry: boolean array, see dry_days
+    :param change_column: change in storage column
+    :param evaporation_column: evaporation volume column
+    :return: array [cu.m]
+    """
+    dry = np.asarray(dry, dtype=bool)
+    loss = daily_df[change_column].values.astype(float) + daily_df[evaporation_column].values.astype(float)
+    return np.where(dry, -1.0 * loss, 0.0)
+
+
+def balance_inflow(daily_df, wet, infiltration, pumping=0.0, change_column='change_storage(cu.m)',
+                   evaporation_column='Evaporation (cu.m)', overflow_column='overflow(cu.m)'):
+    """
+    Inflow closing the balance of wet days, change in storage + infiltration + evaporation + overflow + pumping,
+    zero on other days
+
+    :param daily_df: daily dataframe
+    :param wet: boolean array of days to close
+    :param infiltration: array of infiltration [cu.m]
+    :param pumping: array (or scalar) of pumped volume [cu.m]
+    :return: array [cu.m]
+    """
+    wet = np.asarray(wet, dtype=bool)
+    inflow = daily_df[change_column].values.astype(float) + np.asarray(infiltration, dtype=float) + \
+        daily_df[evaporation_column].values.astype(float) + daily_df[overflow_column].values.astype(float) + \
+        np.asarray(pumping, dtype=float)
+    return np.where(wet, inflow, 0.0)
+
+
+def power_rate(stage, alpha, beta):
+    return alpha * (stage ** beta)
+
+
+def fit_infiltration(stage, rate, model='power', stage_cutoff=0.1):
+    """
+    Stage - infiltration rate relationship from dry days
+
+    :param stage: daily mean stage of dry days [m]
+    :param rate: infiltration rate of dry days [m/day]
+    :param model: 'power' - rate = alpha * stage^beta, 'average' - rate = mean of dry days (beta = 0)
+    :param stage_cutoff: days with stage at or below cutoff are left out
+    :return: alpha, beta
+    :rtype: tuple
+    """
+    if model not in infiltration_models:
+        raise ValueError("model must be one of {0}".format(infiltration_models))
+    stage = np.asarray(stage, dtype=float)
+    rate = np.asarray(rate, dtype=float)
+    valid = (stage > stage_cutoff) & np.isfinite(rate) & (rate > 0)
+    if not valid.any():
+        raise ValueError("no dry day with stage above {0} m to fit infiltration".format(stage_cutoff))
+    if model == 'average' or valid.sum() < 3:
+        return float(rate[valid].mean()), 0.0
+    popt, pcov = curve_fit(power_rate, stage[valid], rate[valid], p0=(rate[valid].mean(), 1.0), maxfev=6000)
+    return float(popt[0]), float(popt[1])
+
+
+def daily_water_balance(daily_df, rain_column, model='power', stage_cutoff=0.1, window_days=2,
+                        stage_column='stage(m)', area_column='ws_area(sq.m)', evaporation_column='Evaporation (cu.m)',
+                        change_column='change_storage(cu.m)', overflow_column='overflow(cu.m)',
+                        pumping_column='pumping status', parameters=None, previous_rain=None, record_start=None):
+    """
+    Classifies days, back calculates dry day infiltration, predicts wet day infiltration from the fitted stage
+    relationship and closes the balance of wet days for inflow.
+    On pumping days the pumped volume is what the balance leaves after infiltration, so their inflow is zero.
+
+    :param daily_df: daily dataframe with stage, area, evaporation, change in storage, overflow (and pumping status)
+    :param rain_column: daily rain column
+    :param model: infiltration model, see fit_infiltration
+    :param stage_cutoff: stage below which there is no infiltration [m]
+    :param window_days: see dry_days
+    :param parameters: (alpha, beta) from an earlier fit, used instead of fitting the dry days of daily_df
+    :param previous_rain: see dry_days
+    :param record_start: see dry_days, first day of the record when daily_df continues an earlier run
+    :return: copy of daily_df with status ('N' - dry, 'Y' - wet), infiltration(cu.m), infiltration rate (m/day),
+        pumping (cu.m) and Inflow (cu.m) columns, and fitted (alpha, beta)
+    """
+    daily_df = daily_df.copy()
+    if pumping_column not in daily_df.columns:
+        pumping_column = None
+    dry = dry_days(daily_df, rain_column, window_days=window_days, change_column=change_column,
+                   overflow_column=overflow_column, pumping_column=pumping_column, previous_rain=previous_rain,
+                   record_start=record_start).values
+    stage = daily_df[stage_column].values.astype(float)
+    area = daily_df[area_column].values.astype(float)
+    infiltration = dry_infiltration(daily_df, dry, change_column=change_column, evaporation_column=evaporation_column)
+    rate = np.zeros(len(stage))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rate[dry] = np.where(area[dry] > 0, infiltration[dry] / area[dry], np.nan)
+    if parameters is None:
+        alpha, beta = fit_infiltration(stage[dry], rate[dry], model=model, stage_cutoff=stage_cutoff)
+    else:
+        alpha, beta = parameters
+    # first day of the record has no change in storage, nothing is predicted for it
+    wet = ~dry
+    if len(daily_df.index) and (record_start is None or daily_df.index[0] <= pd.Timestamp(record_start)):
+        wet[:1] = False
+    predict = wet & (stage > stage_cutoff)
+    rate[predict] = power_rate(stage[predict], alpha, beta)
+    infiltration[predict] = rate[predict] * area[predict]
+    pumping = np.zeros(len(stage))
+    if pumping_column is not None:
+        pumped = wet & (daily_df[pumping_column].values > 0)
+        pumping[pumped] = -1.0 * balance_inflow(daily_df, pumped, infiltration, change_column=change_column,
+                                                evaporation_column=evaporation_column,
+                                                overflow_column=overflow_column)[pumped]
+    inflow = balance_inflow(daily_df, wet, infiltration, pumping, change_column=change_column,
+                            evaporation_column=evaporation_column, overflow_column=overflow_column)
+    daily_df['status'] = np.where(dry, 'N', 'Y')
+    daily_df['infiltration(cu.m)'] = infiltration
+    daily_df['infiltration rate (m/day)'] = rate
+    daily_df['pumping (cu.m)'] = pumping
+    daily_df['Inflow (cu.m)'] = inflow
+    return daily_df, (alpha, beta)
@@ -18,93 +18,8 @@ from datetime import timedelta
 """
 Check dam network
 """
-class Open_Water_Evaporation(object):
-    def __init__(self,check_dam_name, air_temperature, relative_humidity,incoming_solar_radiation, wind_speed_mps, date_time_index, elevation, latitdude, longitude):
-        self.check_dam_name = check_dam_name
-        self.date_time_index = date_time_index
-        self.elevation = elevation
-        self.latitude = latitdude
-        self.longitude = longitude
-        self.air_temperature = air_temperature
-        self.relative_humidity = relative_humidity
-        self.incoming_solar_radiation = incoming_solar_radiation
-        self.wind_speed_mps = wind_speed_mps
-        self.air_p_pa = self.calculate_air_pressure()
-        self.air_pressure = np.empty(len(self.date_time_index))
-        self.air_pressure.fill(self.air_p_pa)
-        self.extraterrestrial_irradiation = self.calculate_extraterrestrial_irradiation()
-        self.half_hour_eo = self.calculate_half_hour_eo()
-
-    def calculate_air_pressure(self, elevation=None):    # None is the key here
-        z = elevation or self.elevation
-        p = ((1 - (2.25577 * (10 ** -5) * z)))
-        air_p_pa = 101325 * (p ** 5.25588)
-        return air_p_pa
-
-    def calculate_extraterrestrial_irradiation(self, date_time=None, latitude=None, longitude=None):
-        lat = latitude or self.latitude
-        lon = longitude or self.longitude
-        date_time = date_time or self.date_time_index
-        l = np.size(date_time)
-        s = 0.0820  # MJ m-2 min-1
-        lat_rad = lat * (math.pi / 180)
-        if l < 2:
-            day = (date_time - datetime(datetime.year, 1, 1)).days + 1
-            hour = float(date_time.hour)
-            minute = float(date_time.minute)
-            b = ((2 * math.pi) * (day - 81)) / 364
-            sc = 0.1645 * (math.sin(2 * b)) - 0.1255 * (math.cos(b)) - 0.025 * (math.sin(b))  # seasonal correction in hour
-            lz = 270  # for India longitude of local time zone in degrees west of greenwich
-            lm = (180 + (180 - lon))  # longitude of measurement site
-            t = (hour + (minute / 60)) - 0.25
-            t1 = 0.5  # 0.5 for 30 minute 1 for hourly period
-            w = (math.pi / 12) * ((t + (0.0667 * (lz - lm)) + sc) - 12)
-            w1 = w - ((math.pi * t1) / 24)  # solar time angle at beginning of period [rad]
-            w2 = w + ((math.pi * t1) / 24)  # solar time angle at end of period [rad]
-            dr = 1 + (0.033 * math.cos((2 * math.pi * day) / 365))  # inverse relative distance Earth-Sun
-            dt = 0.409 * math.sin(((2 * math.pi * day) / 365) - 1.39)  # solar declination in radian
-            ws = math.acos(-math.tan(lat_rad) * math.tan(dt))
-            if (w > ws) or (w < -ws):
-                rext = 0.0
-            else:
-                rext = ((12 * 60) / math.pi) * s * dr * (((w2 - w1) * math.sin(lat_rad) * math.sin(dt)) + (math.cos(lat_rad) * math.cos(dt) * (math.sin(w2) - math.sin(w1))))  # MJm-2(30min)-1
-        else:
-            rext = np.zeros(l)
-            for dt in date_time:
-                i = date_time.get_loc(dt)
-                day = (dt - datetime(dt.year, 1, 1)).days + 1
-                hour = float(dt.hour)
-                minute = float(dt.minute)
-                b = ((2 * math.pi) * (day - 81)) / 364
-                sc = 0.1645 * (math.sin(2 * b)) - 0.1255 * (math.cos(b)) - 0.025 * (math.sin(b))  # seasonal correction in hour
-                lz = 270  # for India longitude of local time zone in degrees west of greenwich
-                lm = (180 + (180 - lon))  # longitude of measurement site
-                t = (hour + (minute / 60)) - 0.25
-                t1 = 0.5  # 0.5 for 30 minute 1 for hourly period
-                w = (math.pi / 12) * ((t + (0.0667 * (lz - lm)) + sc) - 12)
-                w1 = w - ((math.pi * t1) / 24)  # solar time angle at beginning of period [rad]
-                w2 = w + ((math.pi * t1) / 24)  # solar time angle at end of period [rad]
-                dr = 1 + (0.033 * math.cos((2 * math.pi * day) / 365))  # inverse relative distance Earth-Sun
-                dt = 0.409 * math.sin(((2 * math.pi * day) / 365) - 1.39)  # solar declination in radian
-                ws = math.acos(-math.tan(lat_rad) * math.tan(dt))
-                if (w > ws) or (w < -ws):
-                    rext[i] = 0.0
-                else:
-                    rext[i] = ((12 * 60) / math.pi) * s * dr * (((w2 - w1) * math.sin(lat_rad) * math.sin(dt)) + (math.cos(lat_rad) * math.cos(dt) * (math.sin(w2) - math.sin(w1))))  # MJm-2(30min)-1
-        return rext
-
-    def calculate_half_hour_eo(self, airtemp=None, rh=None, airpress=None, rs=None, rext=None,u=None, z=None):
-        at = airtemp or self.air_temperature
-        rh = rh or self.relative_humidity
-        ap = airpress or self.air_pressure
-        rs = rs or self.incoming_solar_radiation
-        rext = rext or self.extraterrestrial_irradiation
-        u = u or self.wind_speed_mps
-        z = z or self.elevation
-        half_hour_eo = cd.half_hour_evaporation(airtemp=at, rh=rh, airpress=ap, rs=rs, rext=rext, u=u, z=z)
-        return half_hour_eo
-
-
+# half hourly open water evaporation, extraterrestrial radiation from checkdam.solar
+Open_Water_Evaporation = cd.Open_Water_Evaporation
 
 
 class CheckdamParameters(object):
@@ -588,7 +503,7 @@ catchment_area_463 = 0.182
 elevation_463 = 839
 ch_463_lat = 13.360354
 ch_463_long = 77.527267
-weather_463 = Open_Water_Evaporation(check_dam_name="463",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_463, date_time_index=weather_df.index, latitdude=ch_463_lat, longitude=ch_463_long)
+weather_463 = Open_Water_Evaporation(check_dam_name="463",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_463, date_time_index=weather_df.index, latitude=ch_463_lat, longitude=ch_463_long)
 weather_463 = weather_463.calculate_half_hour_eo()
 weather_463_df = pd.DataFrame(weather_463, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_463_df = weather_463_df.join(rain_df, how='right')
@@ -612,7 +527,7 @@ max_height_640 = 0.0
 elevation_640 = 838
 ch_640_lat = 13.36007
 ch_640_long = 77.52778
-weather_640 = Open_Water_Evaporation(check_dam_name="640",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_640, date_time_index=weather_df.index, latitdude=ch_640_lat, longitude=ch_640_long)
+weather_640 = Open_Water_Evaporation(check_dam_name="640",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_640, date_time_index=weather_df.index, latitude=ch_640_lat, longitude=ch_640_long)
 weather_640 = weather_640.calculate_half_hour_eo()
 weather_640_df = pd.DataFrame(weather_640, index=weather_df.index, columns=['Evaporation (mm)'])
 weather_640_df_daily = weather_640_df.resample('D', how=np.sum)
@@ -651,7 +566,7 @@ catchment_area_639 = 0.624
 elevation_639 = 831
 ch_639_lat = 13.35314
 ch_639_long = 77.53556
-weather_639 = Open_Water_Evaporation(check_dam_name="639",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_639, date_time_index=weather_df.index, latitdude=ch_639_lat, longitude=ch_639_long)
+weather_639 = Open_Water_Evaporation(check_dam_name="639",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_639, date_time_index=weather_df.index, latitude=ch_639_lat, longitude=ch_639_long)
 weather_639 = weather_639.calculate_half_hour_eo()
 weather_639_df = pd.DataFrame(weather_639, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_639_df = weather_639_df.join(rain_df, how='right')
@@ -672,7 +587,7 @@ catchment_area_641 = 0.082
 elevation_641 = 828
 ch_641_lat = 13.35405
 ch_641_long = 77.53615
-weather_641 = Open_Water_Evaporation(check_dam_name="641",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_641, date_time_index=weather_df.index, latitdude=ch_641_lat, longitude=ch_641_long)
+weather_641 = Open_Water_Evaporation(check_dam_name="641",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_641, date_time_index=weather_df.index, latitude=ch_641_lat, longitude=ch_641_long)
 weather_641 = weather_641.calculate_half_hour_eo()
 weather_641_df = pd.DataFrame(weather_641, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_641_df = weather_641_df.join(rain_df, how='right')
@@ -692,7 +607,7 @@ catchment_area_2 = 0.152
 # elevation_2 = 831
 # ch_2_lat = 13.35314
 # ch_2_long = 77.53556
-# weather_2 = Open_Water_Evaporation(check_dam_name="2",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_2, date_time_index=weather_df.index, latitdude=ch_2_lat, longitude=ch_2_long)
+# weather_2 = Open_Water_Evaporation(check_dam_name="2",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_2, date_time_index=weather_df.index, latitude=ch_2_lat, longitude=ch_2_long)
 # weather_2 = weather_2.calculate_half_hour_eo()
 # weather_2_df = pd.DataFrame(weather_2, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_2_df = weather_2_df.join(rain_df, how='right')
@@ -721,7 +636,7 @@ catchment_area_3 = 0.244
 # elevation_3 = 831
 # ch_3_lat = 13.35314
 # ch_3_long = 77.53556
-# weather_3 = Open_Water_Evaporation(check_dam_name="2",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_3, date_time_index=weather_df.index, latitdude=ch_3_lat, longitude=ch_3_long)
+# weather_3 = Open_Water_Evaporation(check_dam_name="2",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_3, date_time_index=weather_df.index, latitude=ch_3_lat, longitude=ch_3_long)
 # weather_3 = weather_3.calculate_half_hour_eo()
 # weather_3_df = pd.DataFrame(weather_3, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_3_df = weather_3_df.join(rain_df, how='right')
@@ -748,7 +663,7 @@ catchment_area_625 = 0.35
 elevation_625 = 830
 ch_625_lat = 13.36411
 ch_625_long = 77.55606
-weather_625 = Open_Water_Evaporation(check_dam_name="625",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_625, date_time_index=weather_df.index, latitdude=ch_625_lat, longitude=ch_625_long)
+weather_625 = Open_Water_Evaporation(check_dam_name="625",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_625, date_time_index=weather_df.index, latitude=ch_625_lat, longitude=ch_625_long)
 weather_625 = weather_625.calculate_half_hour_eo()
 weather_625_df = pd.DataFrame(weather_625, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_625_df = weather_625_df.join(rain_df, how='right')
@@ -769,7 +684,7 @@ catchment_area_5 = 0.335
 # elevation_5 = 830
 # ch_5_lat = 13.36411
 # ch_5_long = 77.55606
-# weather_5 = Open_Water_Evaporation(check_dam_name="5",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_5, date_time_index=weather_df.index, latitdude=ch_5_lat, longitude=ch_5_long)
+# weather_5 = Open_Water_Evaporation(check_dam_name="5",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_5, date_time_index=weather_df.index, latitude=ch_5_lat, longitude=ch_5_long)
 # weather_5 = weather_5.calculate_half_hour_eo()
 # weather_5_df = pd.DataFrame(weather_5, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_5_df = weather_5_df.join(rain_df, how='right')
@@ -796,7 +711,7 @@ catchment_area_627 = 0.456
 elevation_627 = 841
 ch_627_lat = 13.36838
 ch_627_long = 77.55807
-weather_627 = Open_Water_Evaporation(check_dam_name="627",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_627, date_time_index=weather_df.index, latitdude=ch_627_lat, longitude=ch_627_long)
+weather_627 = Open_Water_Evaporation(check_dam_name="627",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_627, date_time_index=weather_df.index, latitude=ch_627_lat, longitude=ch_627_long)
 weather_627 = weather_627.calculate_half_hour_eo()
 weather_627_df = pd.DataFrame(weather_627, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_627_df = weather_627_df.join(rain_df, how='right')
@@ -824,7 +739,7 @@ catchment_area_633 = 0.145
 elevation_633 = 839
 ch_633_lat = 13.36838
 ch_633_long = 77.55807
-weather_633 = Open_Water_Evaporation(check_dam_name="633",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_633, date_time_index=weather_df.index, latitdude=ch_633_lat, longitude=ch_633_long)
+weather_633 = Open_Water_Evaporation(check_dam_name="633",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_633, date_time_index=weather_df.index, latitude=ch_633_lat, longitude=ch_633_long)
 weather_633 = weather_633.calculate_half_hour_eo()
 weather_633_df = pd.DataFrame(weather_633, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_633_df = weather_633_df.join(rain_df, how='right')
@@ -850,7 +765,7 @@ catchment_area_626 = 0.051
 elevation_626 = 834
 ch_626_lat = 13.36586
 ch_626_long = 77.5588
-weather_626 = Open_Water_Evaporation(check_dam_name="626",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_626, date_time_index=weather_df.index, latitdude=ch_626_lat, longitude=ch_626_long)
+weather_626 = Open_Water_Evaporation(check_dam_name="626",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_626, date_time_index=weather_df.index, latitude=ch_626_lat, longitude=ch_626_long)
 weather_626 = weather_626.calculate_half_hour_eo()
 weather_626_df = pd.DataFrame(weather_626, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_626_df = weather_626_df.join(rain_df, how='right')
@@ -876,7 +791,7 @@ catchment_area_634 = 0.007
 elevation_634 = 838
 ch_634_lat = 13.36562
 ch_634_long = 77.55905
-weather_634 = Open_Water_Evaporation(check_dam_name="634",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_634, date_time_index=weather_df.index, latitdude=ch_634_lat, longitude=ch_634_long)
+weather_634 = Open_Water_Evaporation(check_dam_name="634",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_634, date_time_index=weather_df.index, latitude=ch_634_lat, longitude=ch_634_long)
 weather_634 = weather_634.calculate_half_hour_eo()
 weather_634_df = pd.DataFrame(weather_634, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_634_df = weather_634_df.join(rain_df, how='right')
@@ -902,7 +817,7 @@ catchment_area_624 = 1
 elevation_624 = 833
 ch_624_lat = 13.3642
 ch_624_long = 77.55827
-weather_624 = Open_Water_Evaporation(check_dam_name="624",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_624, date_time_index=weather_df.index, latitdude=ch_624_lat, longitude=ch_624_long)
+weather_624 = Open_Water_Evaporation(check_dam_name="624",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_624, date_time_index=weather_df.index, latitude=ch_624_lat, longitude=ch_624_long)
 weather_624 = weather_624.calculate_half_hour_eo()
 weather_624_df = pd.DataFrame(weather_624, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_624_df = weather_624_df.join(rain_df, how='right')
@@ -930,7 +845,7 @@ catchment_area_6 = 0.263
 # elevation_6 = 831
 # ch_6_lat = 13.35314
 # ch_6_long = 77.53556
-# weather_6 = Open_Water_Evaporation(check_dam_name="6",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_6, date_time_index=weather_df.index, latitdude=ch_6_lat, longitude=ch_6_long)
+# weather_6 = Open_Water_Evaporation(check_dam_name="6",air_temperature=airtemp, relative_humidity=hum, incoming_solar_radiation=rs, wind_speed_mps=wind_speed,elevation=elevation_6, date_time_index=weather_df.index, latitude=ch_6_lat, longitude=ch_6_long)
 # weather_6 = weather_6.calculate_half_hour_eo()
 # weather_6_df = pd.DataFrame(weather_6, index=weather_df.index, columns=['Evaporation (mm)'])
 # weather_6_df = weather_6_df.join(rain_df, how='right')
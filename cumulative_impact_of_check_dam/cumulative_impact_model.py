@@ -13,6 +13,7 @@ import scipy as sp
 import math
 from datetime import datetime
 import checkdam.checkdam as cd
+import checkdam.routing as routing
 import networkx as nx
 # import checkdam as cd
 from datetime import timedelta
@@ -78,93 +79,8 @@ def columns_in(dataframe):
 # plt.show()
 # print weather_df.head()
 
-class Open_Water_Evaporation(object):
-    def __init__(self,check_dam_name, air_temperature, relative_humidity,incoming_solar_radiation, wind_speed_mps, date_time_index, elevation, latitude, longitude):
-        self.check_dam_name = check_dam_name
-        self.date_time_index = date_time_index
-        self.elevation = elevation
-        self.latitude = latitude
-        self.longitude = longitude
-        self.air_temperature = air_temperature
-        self.relative_humidity = relative_humidity
-        self.incoming_solar_radiation = incoming_solar_radiation
-        self.wind_speed_mps = wind_speed_mps
-        self.air_p_pa = self.calculate_air_pressure()
-        self.air_pressure = np.empty(len(self.date_time_index))
-        self.air_pressure.fill(self.air_p_pa)
-        self.extraterrestrial_irradiation = self.calculate_extraterrestrial_irradiation()
-        self.half_hour_eo = self.calculate_half_hour_eo()
-
-    def calculate_air_pressure(self, elevation=None):    # None is the key here
-        z = elevation or self.elevation
-        p = ((1 - (2.25577 * (10 ** -5) * z)))
-        air_p_pa = 101325 * (p ** 5.25588)
-        return air_p_pa
-
-    def calculate_extraterrestrial_irradiation(self, date_time=None, latitude=None, longitude=None):
-        lat = latitude or self.latitude
-        lon = longitude or self.longitude
-        date_time = date_time or self.date_time_index
-        l = np.size(date_time)
-        s = 0.0820  # MJ m-2 min-1
-        lat_rad = lat * (math.pi / 180)
-        if l < 2:
-            day = (date_time - datetime(datetime.year, 1, 1)).days + 1
-            hour = float(date_time.hour)
-            minute = float(date_time.minute)
-            b = ((2 * math.pi) * (day - 81)) / 364
-            sc = 0.1645 * (math.sin(2 * b)) - 0.1255 * (math.cos(b)) - 0.025 * (math.sin(b))  # seasonal correction in hour
-            lz = 270  # for India longitude of local time zone in degrees west of greenwich
-            lm = (180 + (180 - lon))  # longitude of measurement site
-            t = (hour + (minute / 60)) - 0.25
-            t1 = 0.5  # 0.5 for 30 minute 1 for hourly period
-            w = (math.pi / 12) * ((t + (0.0667 * (lz - lm)) + sc) - 12)
-            w1 = w - ((math.pi * t1) / 24)  # solar time angle at beginning of period [rad]
-            w2 = w + ((math.pi * t1) / 24)  # solar time angle at end of period [rad]
-            dr = 1 + (0.033 * math.cos((2 * math.pi * day) / 365))  # inverse relative distance Earth-Sun
-            dt = 0.409 * math.sin(((2 * math.pi * day) / 365) - 1.39)  # solar declination in radian
-            ws = math.acos(-math.tan(lat_rad) * math.tan(dt))
-            if (w > ws) or (w < -ws):
-                rext = 0.0
-            else:
-                rext = ((12 * 60) / math.pi) * s * dr * (((w2 - w1) * math.sin(lat_rad) * math.sin(dt)) + (math.cos(lat_rad) * math.cos(dt) * (math.sin(w2) - math.sin(w1))))  # MJm-2(30min)-1
-        else:
-            rext = np.zeros(l)
-            for dt in date_time:
-                i = date_time.get_loc(dt)
-                day = (dt - datetime(dt.year, 1, 1)).days + 1
-                hour = float(dt.hour)
-                minute = float(dt.minute)
-                b = ((2 * math.pi) * (day - 81)) / 364
-                sc = 0.1645 * (math.sin(2 * b)) - 0.1255 * (math.cos(b)) - 0.025 * (math.sin(b))  # seasonal correction in hour
-                lz = 270  # for India longitude of local time zone in degrees west of greenwich
-                lm = (180 + (180 - lon))  # longitude of measurement site
-                t = (hour + (minute / 60)) - 0.25
-                t1 = 0.5  # 0.5 for 30 minute 1 for hourly period
-                w = (math.pi / 12) * ((t + (0.0667 * (lz - lm)) + sc) - 12)
-                w1 = w - ((math.pi * t1) / 24)  # solar time angle at beginning of period [rad]
-                w2 = w + ((math.pi * t1) / 24)  # solar time angle at end of period [rad]
-                dr = 1 + (0.033 * math.cos((2 * math.pi * day) / 365))  # inverse relative distance Earth-Sun
-                dt = 0.409 * math.sin(((2 * math.pi * day) / 365) - 1.39)  # solar declination in radian
-                ws = math.acos(-math.tan(lat_rad) * math.tan(dt))
-                if (w > ws) or (w < -ws):
-                    rext[i] = 0.0
-                else:
-                    rext[i] = ((12 * 60) / math.pi) * s * dr * (((w2 - w1) * math.sin(lat_rad) * math.sin(dt)) + (math.cos(lat_rad) * math.cos(dt) * (math.sin(w2) - math.sin(w1))))  # MJm-2(30min)-1
-        return rext
-
-    def calculate_half_hour_eo(self, airtemp=None, rh=None, airpress=None, rs=None, rext=None,u=None, z=None):
-        at = airtemp or self.air_temperature
-        rh = rh or self.relative_humidity
-        ap = airpress or self.air_pressure
-        rs = rs or self.incoming_solar_radiation
-        rext = rext or self.extraterrestrial_irradiation
-        u = u or self.wind_speed_mps
-        z = z or self.elevation
-        half_hour_eo = cd.half_hour_evaporation(airtemp=at, rh=rh, airpress=ap, rs=rs, rext=rext, u=u, z=z)
-        return half_hour_eo
-
-
+# half hourly open water evaporation, extraterrestrial radiation from checkdam.solar
+Open_Water_Evaporation = cd.Open_Water_Evaporation
 
 
 class CheckdamParameters(object):
@@ -184,6 +100,11 @@ class CheckdamParameters(object):
         self.stage_volume_df = self.convert_stage_volume_csv_to_df(stage_volume_csv)
         self.stage_area_df = self.convert_stage_area_csv_to_df(stage_area_csv)
         self.stage_volume_df_indexed_by_stage = self.convert_stage_volume_with_stage_index_csv_to_df(stage_volume_csv)
+        # breakpoints as lists, so that find_range doesn't rebuild them for every time step
+        self.volume_list = self.stage_volume_df['volume_cu_m'].tolist()
+        self.stage_by_volume = dict(zip(self.volume_list, self.stage_volume_df['stage_m'].tolist()))
+        self.stage_list = self.stage_area_df['stage_m'].tolist()
+        self.area_by_stage = dict(zip(self.stage_list, self.stage_area_df['area_sq_m'].tolist()))
         self.max_volume = self.estimate_max_volume(max_height=self.max_height)
 
     def convert_stage_volume_csv_to_df(self, csv):
@@ -205,16 +126,16 @@ class CheckdamParameters(object):
         return df
 
     def convert_volume_to_area(self, volume):
-        vol_1, vol_2 = cd.find_range(self.stage_volume_df['volume_cu_m'].tolist(), volume) #x
-        stage_1 = self.stage_volume_df.loc[vol_1, 'stage_m'] # y
-        stage_2 = self.stage_volume_df.loc[vol_2, 'stage_m']
+        vol_1, vol_2 = cd.find_range(self.volume_list, volume) #x
+        stage_1 = self.stage_by_volume[vol_1] # y
+        stage_2 = self.stage_by_volume[vol_2]
         slope_vol = (stage_2 - stage_1) / (vol_2 - vol_1)
         intercept_vol = stage_2 - (slope_vol*vol_2)
         obs_stage = (slope_vol*volume) + intercept_vol
         if obs_stage >= self.stage_cutoff:
-            stage_1, stage_2 = cd.find_range(self.stage_area_df['stage_m'].tolist(), obs_stage)
-            area_1 = self.stage_area_df.loc[stage_1, 'area_sq_m']
-            area_2 = self.stage_area_df.loc[stage_2, 'area_sq_m']
+            stage_1, stage_2 = cd.find_range(self.stage_list, obs_stage)
+            area_1 = self.area_by_stage[stage_1]
+            area_2 = self.area_by_stage[stage_2]
             slope_area = (stage_2 - stage_1) / (area_2 - area_1)
             intercept_area = area_2 - (slope_area *  stage_2)
             area = (slope_area * obs_stage) + intercept_area
@@ -394,7 +315,7 @@ class CheckdamChain(object):
 
 
 class CheckdamChainMerge(object):
-    def __init__(self, checkdam_chain_a, checkdam_chain_b, check_dam_a, check_dam_b, converging_check_dam, merged_df=None):
+    def __init__(self, checkdam_chain_a, checkdam_chain_b, check_dam_a, check_dam_b, converging_check_dam, merged_df=None, solver='iterative'):
         self.checkdam_chain_a = checkdam_chain_a
         self.checkdam_chain_b = checkdam_chain_b
         self.check_dam_a = check_dam_a
@@ -403,6 +324,7 @@ class CheckdamChainMerge(object):
         self.output_df_a = self.checkdam_chain_a.output_df
         self.output_df_b = self.checkdam_chain_b.output_df
         self.checkdam_list = self.merge_check_dam_list()
+        self.solver = solver  # 'iterative' or 'direct', see checkdam.routing
         if merged_df is None:
             self.output_df = self.merge_df(df_a=self.output_df_a, df_b=self.output_df_b)
         else:
@@ -437,35 +359,15 @@ class CheckdamChainMerge(object):
         last_date = max(self.output_df.index)
         for dt in self.output_df.index:
             if dt < last_date:
-                n = 1
-                convergence_ratio = 5
-                assumed_own_catchment_inflow_ratio = self.converging_check_dam.own_catchment_inflow_ratio
-                while True:
-                    if (round(convergence_ratio, 2) == round(1.0, 2)) or (n > 100) or (round(convergence_ratio, 2) == round(0.00, 2)):
-                        self.output_df.loc[dt, 'conv_ratio{0:d}'.format(checkdam.check_dam_name)] = convergence_ratio
-                        convergence_ratio = 5
-                        break
-                    else:
-                        inflow_from_catchment_area_ratio = (self.output_df.loc[dt, 'diff'] * 1.1868) + 0.508
-                        inflow_from_catchment = (checkdam.catchment_area * inflow_from_catchment_area_ratio * assumed_own_catchment_inflow_ratio)
-                        self.output_df.loc[dt, ('inflow_from_catchment_{0:d}'.format(checkdam.check_dam_name))] = inflow_from_catchment
-                        inflow_from_overflow =  self.output_df.loc[dt, ('inflow_from_overflow_{0:d}'.format(checkdam.check_dam_name))]
-                        # print 'inflow = ', inflow_from_catchment
-                        if inflow_from_catchment > 0.0:
-                            # print "ok"
-                            estimated_own_catchment_inflow_ratio = inflow_from_catchment / (inflow_from_catchment + inflow_from_overflow)
-                            convergence_ratio = estimated_own_catchment_inflow_ratio / assumed_own_catchment_inflow_ratio
-                            assumed_own_catchment_inflow_ratio = 0.5 * (estimated_own_catchment_inflow_ratio + assumed_own_catchment_inflow_ratio)
-                            # print 'convergence ratio = {0:.2f} for iteration {1:d}'.format(convergence_ratio, n)
-                            inflow = inflow_from_catchment + inflow_from_overflow
-                            n += 1
-                        else:
-                            estimated_own_catchment_inflow_ratio = 0.0
-                            inflow = inflow_from_overflow
-                            convergence_ratio = 5
-                            n = 101
-                            # print "ok" * 10
-
+                inflow_from_catchment_area_ratio = (self.output_df.loc[dt, 'diff'] * 1.1868) + 0.508
+                inflow_from_overflow = self.output_df.loc[dt, ('inflow_from_overflow_{0:d}'.format(checkdam.check_dam_name))]
+                if self.solver == 'direct':
+                    inflow_from_catchment, inflow, convergence_ratio, estimated_own_catchment_inflow_ratio = routing.direct_own_catchment_inflow(checkdam.catchment_area, inflow_from_catchment_area_ratio, checkdam.own_catchment_inflow_ratio, inflow_from_overflow)
+                    self.output_df.loc[dt, ('est_own_flow_ratio_{0:d}'.format(checkdam.check_dam_name))] = estimated_own_catchment_inflow_ratio
+                else:
+                    inflow_from_catchment, inflow, convergence_ratio = routing.own_catchment_inflow(checkdam.catchment_area, inflow_from_catchment_area_ratio, checkdam.own_catchment_inflow_ratio, inflow_from_overflow)
+                self.output_df.loc[dt, ('inflow_from_catchment_{0:d}'.format(checkdam.check_dam_name))] = inflow_from_catchment
+                self.output_df.loc[dt, 'conv_ratio_{0:d}'.format(checkdam.check_dam_name)] = convergence_ratio
                 # print inflow
                 self.output_df.loc[dt, ('total_inflow_{0:d}'.format(checkdam.check_dam_name))] = inflow
                 # calculate surface area
@@ -698,7 +600,7 @@ checkdam_1.next_check_dam = 3
 # print type(checkdam_640.check_dam_name)
 # print inflow_catchment_area_had_df.head()
 # raise SystemExit(0)
-had_chain_1 = CheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_463, checkdam_640, checkdam_1], slope=slope, intercept=intercept)
+had_chain_1 = routing.ArrayCheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_463, checkdam_640, checkdam_1], slope=slope, intercept=intercept)
 had_chain_1.create_output_df()
 had_output_1_df = had_chain_1.simulate
 
@@ -767,7 +669,7 @@ own_catchment_inflow_ratio_2 = 1.0
 checkdam_2 = CheckdamParameters(check_dam_name=2, catchment_area=catchment_area_2, infiltration_rate=infiltration_rate, evaporation=evaporation_2, max_height=max_height_2, stage_volume_csv=stage_volume_2, stage_area_csv=stage_area_2,previous_check_dam=checkdam_641, own_catchment_inflow_ratio=own_catchment_inflow_ratio_2)
 checkdam_2.initial_volume = 0.0
 
-had_chain_2 = CheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_639, checkdam_641, checkdam_2], slope=slope, intercept=intercept)
+had_chain_2 = routing.ArrayCheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_639, checkdam_641, checkdam_2], slope=slope, intercept=intercept)
 # had_chain_2.create_output_df()
 had_output_2_df = had_chain_2.simulate
 
@@ -844,7 +746,7 @@ own_catchment_inflow_ratio_5 = 1.0
 checkdam_5 = CheckdamParameters(check_dam_name=5, catchment_area=catchment_area_5, infiltration_rate=infiltration_rate, evaporation=evaporation_5, max_height=max_height_5, stage_volume_csv=stage_volume_5, stage_area_csv=stage_area_5,previous_check_dam=checkdam_625, own_catchment_inflow_ratio=own_catchment_inflow_ratio_5)
 checkdam_5.initial_volume = 0.0
 
-had_chain_3 = CheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_625, checkdam_5], slope=slope, intercept=intercept)
+had_chain_3 = routing.ArrayCheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_625, checkdam_5], slope=slope, intercept=intercept)
 had_output_3_df = had_chain_3.simulate
 
 
@@ -871,7 +773,7 @@ own_catchment_inflow_ratio_627 = 1.0
 checkdam_627 = CheckdamParameters(check_dam_name=627, catchment_area=catchment_area_627, infiltration_rate=infiltration_rate, evaporation=evaporation_627, max_height=max_height_627, stage_volume_csv=stage_volume_627, stage_area_csv=stage_area_627,previous_check_dam=None, own_catchment_inflow_ratio=own_catchment_inflow_ratio_627)
 checkdam_627.initial_volume = 0.0
 
-had_chain_4 = CheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_627], slope=slope, intercept=intercept)
+had_chain_4 = routing.ArrayCheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_627], slope=slope, intercept=intercept)
 had_output_4_df = had_chain_4.simulate
 
 # test plots
@@ -899,7 +801,7 @@ own_catchment_inflow_ratio_633 = 1.0
 checkdam_633 = CheckdamParameters(check_dam_name=633, catchment_area=catchment_area_633, infiltration_rate=infiltration_rate, evaporation=evaporation_633, max_height=max_height_633, stage_volume_csv=stage_volume_633, stage_area_csv=stage_area_633,previous_check_dam=None, own_catchment_inflow_ratio=own_catchment_inflow_ratio_633)
 checkdam_633.initial_volume = 0.0
 
-had_chain_5 = CheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_633], slope=slope, intercept=intercept)
+had_chain_5 = routing.ArrayCheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_633], slope=slope, intercept=intercept)
 had_output_5_df = had_chain_5.simulate
 
 """
@@ -951,7 +853,7 @@ own_catchment_inflow_ratio_634 = 1.0
 checkdam_634 = CheckdamParameters(check_dam_name=634, catchment_area=catchment_area_634, infiltration_rate=infiltration_rate, evaporation=evaporation_634, max_height=max_height_634, stage_volume_csv=stage_volume_634, stage_area_csv=stage_area_634,previous_check_dam=None, own_catchment_inflow_ratio=own_catchment_inflow_ratio_634)
 checkdam_634.initial_volume = 0.0
 
-had_chain_6 = CheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_634], slope=slope, intercept=intercept)
+had_chain_6 = routing.ArrayCheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_634], slope=slope, intercept=intercept)
 had_output_6_df = had_chain_6.simulate
 
 """
@@ -1005,7 +907,7 @@ own_catchment_inflow_ratio_6 = 1.0
 checkdam_6 = CheckdamParameters(check_dam_name=6, catchment_area=catchment_area_6, infiltration_rate=infiltration_rate, evaporation=evaporation_6, max_height=max_height_6, stage_volume_csv=stage_volume_6, stage_area_csv=stage_area_6, previous_check_dam=None, own_catchment_inflow_ratio=own_catchment_inflow_ratio_6)
 checkdam_6.initial_volume = 0.0
 
-had_chain_7 = CheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_6], slope=slope, intercept=intercept, output_df=had_chain_4_5_6.output_df)
+had_chain_7 = routing.ArrayCheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_6], slope=slope, intercept=intercept, output_df=had_chain_4_5_6.output_df)
 # had_chain_2.create_output_df()
 had_output_7_df = had_chain_7.simulate
 had_output_7_df.to_csv('/media/kiruba/New Volume/milli_watershed/cumulative impacts/had_output_df_7.csv')
@@ -1025,7 +927,7 @@ stage_area_7 = default_stage_area_file
 own_catchment_inflow_ratio_7 = 1.0
 checkdam_7 = CheckdamParameters(check_dam_name=7, catchment_area=catchment_area_7, infiltration_rate=infiltration_rate, evaporation=evaporation_7, max_height=max_height_7, stage_volume_csv=stage_volume_7, stage_area_csv=stage_area_7, previous_check_dam=None, own_catchment_inflow_ratio=own_catchment_inflow_ratio_7)
 checkdam_7.initial_volume = 0.0
-had_chain_8 = CheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_7], slope=slope, intercept=intercept)
+had_chain_8 = routing.ArrayCheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_7], slope=slope, intercept=intercept)
 # had_chain_8.create_output_df()
 had_output_8_df = had_chain_8.simulate
 
@@ -1041,7 +943,7 @@ stage_area_4 = default_stage_area_file
 own_catchment_inflow_ratio_4 = 1.0
 checkdam_4 = CheckdamParameters(check_dam_name=4, catchment_area=catchment_area_4, infiltration_rate=infiltration_rate, evaporation=evaporation_4, max_height=max_height_4, stage_volume_csv=stage_volume_4, stage_area_csv=stage_area_4, previous_check_dam=None, own_catchment_inflow_ratio=own_catchment_inflow_ratio_4)
 checkdam_4.initial_volume = 0.0
-had_chain_9 = CheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_4], slope=slope, intercept=intercept)
+had_chain_9 = routing.ArrayCheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_4], slope=slope, intercept=intercept)
 had_output_9_df = had_chain_9.simulate
 
 """
@@ -1056,7 +958,7 @@ stage_area_8 = default_stage_area_file
 own_catchment_inflow_ratio_8 = 1.0
 checkdam_8 = CheckdamParameters(check_dam_name=8, catchment_area=catchment_area_8, infiltration_rate=infiltration_rate, evaporation=evaporation_8, max_height=max_height_8, stage_volume_csv=stage_volume_8, stage_area_csv=stage_area_8, previous_check_dam=None, own_catchment_inflow_ratio=own_catchment_inflow_ratio_8)
 checkdam_8.initial_volume = 0.0
-had_chain_10 = CheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_8], slope=slope, intercept=intercept)
+had_chain_10 = routing.ArrayCheckdamChain(inflow_catchment_area_df=inflow_catchment_area_had_df, check_dam_chain=[checkdam_8], slope=slope, intercept=intercept)
 had_output_10_df = had_chain_10.simulate
 
 
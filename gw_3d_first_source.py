@@ -4,7 +4,7 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import itertools
 from mpl_toolkits.mplot3d import axes3d, Axes3D
-from scipy.interpolate import griddata
+import checkdam.gridding as gr
 from matplotlib import cm
 
 file_gw = '/home/kiruba/Downloads/All_arkavathy_lithologs_yield_source.csv'
@@ -17,7 +17,7 @@ fig = plt.figure(figsize=plt.figaspect(0.5))
 ax = fig.gca(projection='3d')
 xi = np.linspace(X.min(), X.max(), 100)
 yi = np.linspace(Y.min(), Y.max(), 100)
-zi = griddata((X,Y), Z, (xi[None, :], yi[:, None]), method='linear')
+zi = gr.SurveyGrid(X, Y).interpolate(Z, xi, yi)
 xig, yig = np.meshgrid(xi, yi)
 surf = ax.scatter(xig, yig, zi, zdir='z')
 fig.colorbar(surf)
@@ -82,32 +82,13 @@ stage_vol_df.sort_index(inplace=True)
 # plt.show()
 
 water_balance_df = weather_df[['Evaporation (mm/day)', 'stage(m)', 'mean_stage_m']]
-water_balance_df.loc[:, 'volume (cu.m)'] = 0.000
-
-
-for index, row in water_balance_df.iterrows():
-    obs_stage = row['stage(m)']  # observed stage
-    if obs_stage >= stage_cutoff:
-        x1, x2 = cd.find_range(stage_vol_df['stage_m'].tolist(), obs_stage)
-        x_diff = x2 - x1
-        y1 = stage_vol_df.loc[x1, 'total_vol_cu_m']
-        y2 = stage_vol_df.loc[x2, 'total_vol_cu_m']
-        y_diff = y2 - y1
-        slope = y_diff / x_diff
-        y_intercept = y2 - (slope * x2)
-        water_balance_df.loc[index.strftime(daily_format), 'volume (cu.m)'] = (slope * obs_stage) + y_intercept
+stage_vol = cd.RatingCurve.from_df(stage_vol_df, value_column='total_vol_cu_m', stage_cutoff=stage_cutoff)
+water_balance_df.loc[:, 'volume (cu.m)'] = stage_vol(water_balance_df['stage(m)'])
 
 """
 full volume calculation
 """
-x1, x2 = cd.find_range(stage_vol_df['stage_m'].tolist(), full_stage)
-x_diff = x2 - x1
-y1 = stage_vol_df.loc[x1, 'total_vol_cu_m']
-y2 = stage_vol_df.loc[x2, 'total_vol_cu_m']
-y_diff = y2 - y1
-slope = y_diff / x_diff
-y_intercept = y2 - (slope * x2)
-full_volume = (slope*full_stage) + y_intercept
+full_volume = stage_vol.interpolate(full_stage)
 # print("full volume = %s" % full_volume)
 """
 Overflow
@@ -130,18 +111,8 @@ stage_area_df.drop(['stage_ft', 'area_sq_ft'], inplace=True, axis=1)
 # set stage as index
 stage_area_df.set_index(stage_area_df['stage_m'], inplace=True)
 # create empty column
-water_balance_df.loc[:, 'ws_area(sq.m)'] = 0.000
-for index, row in water_balance_df.iterrows():
-    obs_stage = row['stage(m)']  # observed stage
-    if obs_stage >= stage_cutoff:
-        x1, x2 = cd.find_range(stage_area_df['stage_m'].tolist(), obs_stage)
-        x_diff = x2 - x1
-        y1 = stage_area_df.loc[x1, 'total_area_sq_m']
-        y2 = stage_area_df.loc[x2, 'total_area_sq_m']
-        y_diff = y2 - y1
-        slope = y_diff / x_diff
-        y_intercept = y2 - (slope * x2)
-        water_balance_df.loc[index.strftime(date_format), 'ws_area(sq.m)'] = (slope * obs_stage) + y_intercept
+stage_area = cd.RatingCurve.from_df(stage_area_df, value_column='total_area_sq_m', stage_cutoff=stage_cutoff)
+water_balance_df.loc[:, 'ws_area(sq.m)'] = stage_area(water_balance_df['stage(m)'])
 
 """
 Evaporation Volume estimation
@@ -0,0 +1,133 @@
+__author__ = 'kiruba'
+"""
+Checks that DataCache returns cached results for the same inputs, computes new ones when a source file, the function
+or a parameter changes, keeps index, labels and dtypes of series and dataframes, and that a memory mapped result
+can be changed without changing the cache.
+Run from the repository root with python -m pytest tests
+"""
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import checkdam.cache as ch
+
+calls = []
+
+
+def read_scaled(csv_file, scale=1.0):
+    calls.append(csv_file)
+    df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+    return df * scale
+
+
+def write_csv(csv_file, values):
+    index = pd.date_range('2014-05-01', periods=len(values), freq='30min', name='date_time')
+    pd.DataFrame({'stage(m)': values}, index=index).to_csv(csv_file)
+
+
+def stored(data):
+    calls.append(data)
+    return data
+
+
+def labelled_data():
+    index = pd.date_range('2014-05-01 08:30', periods=6, freq='30min', name='date_time')
+    df = pd.DataFrame({0: np.linspace(0.1, 0.6, 6), 2.5: np.arange(6), ('stage', 'm'): np.arange(6) > 2},
+                      index=index, columns=[0, 2.5, ('stage', 'm')])
+    series = pd.Series(np.linspace(1.0, 2.0, 6), index=index, name=599)
+    return df, series
+
+
+def test_hit_and_miss(tmpdir):
+    cache = ch.DataCache(str(tmpdir.join('cache')))
+    csv_file = str(tmpdir.join('stage.csv'))
+    write_csv(csv_file, [0.1, 0.2, 0.3])
+    del calls[:]
+    first = cache.load(read_scaled, [csv_file], args=(csv_file,), kwargs={'scale': 2.0})
+    second = cache.load(read_scaled, [csv_file], args=(csv_file,), kwargs={'scale': 2.0})
+    assert len(calls) == 1
+    assert second.equals(first)
+    # changed parameter
+    cache.load(read_scaled, [csv_file], args=(csv_file,), kwargs={'scale': 3.0})
+    assert len(calls) == 2
+    # changed source file
+    write_csv(csv_file, [0.1, 0.2, 0.35, 0.4])
+    changed = cache.load(read_scaled, [csv_file], args=(csv_file,), kwargs={'scale': 2.0})
+    assert len(calls) == 3
+    assert len(changed.index) == 4
+
+
+def test_miss_on_function_body(tmpdir):
+    cache = ch.DataCache(str(tmpdir.join('cache')))
+    csv_file = str(tmpdir.join('stage.csv'))
+    write_csv(csv_file, [0.1, 0.2, 0.3])
+    source = "def read(csv_file):\n    return pd.read_csv(csv_file, index_col=0, parse_dates=True) * {0}\n"
+    functions = []
+    for factor in ['1.0', '100.0']:
+        namespace = {'pd': pd}
+        exec(source.format(factor), namespace)
+        functions.append(namespace['read'])
+    centimetre = cache.load(functions[1], [csv_file], args=(csv_file,))
+    metre = cache.load(functions[0], [csv_file], args=(csv_file,))
+    assert np.allclose(centimetre.values, 100.0 * metre.values)
+
+
+def test_miss_on_array_and_frame_parameters(tmpdir):
+    cache = ch.DataCache(str(tmpdir.join('cache')))
+    csv_file = str(tmpdir.join('stage.csv'))
+    write_csv(csv_file, [0.1, 0.2, 0.3])
+    del calls[:]
+
+    def offset(csv_file, values):
+        return read_scaled(csv_file) + np.asarray(values).reshape(-1, 1)
+
+    df = pd.DataFrame({'offset': [0.0, 0.0, 0.0]})
+    for values in [np.zeros(3), np.array([0.0, 0.0, 1.0]), df, df + 1.0]:
+        cache.load(offset, [csv_file], args=(csv_file, values))
+    assert len(calls) == 4
+    cache.load(offset, [csv_file], args=(csv_file, df + 1.0))
+    cache.load(offset, [csv_file], args=(csv_file, np.array([0.0, 0.0, 1.0])))
+    assert len(calls) == 4
+
+
+@pytest.mark.parametrize('storage', ch.storages)
+def test_round_trip(tmpdir, storage):
+    if storage == 'hdf':
+        pytest.importorskip('tables')
+    elif storage == 'parquet':
+        pytest.importorskip('pyarrow')
+    cache = ch.DataCache(str(tmpdir.join('cache')), storage=storage)
+    df, series = labelled_data()
+    for data in [df, series]:
+        del calls[:]
+        cache.load(stored, [], args=(data,))
+        cached = cache.load(stored, [], args=(data,))
+        assert len(calls) == 1
+        assert type(cached) is type(data)
+        assert isinstance(cached.index, pd.DatetimeIndex)
+        assert np.array_equal(cached.index.values, data.index.values)
+        assert cached.index.name == 'date_time'
+        if isinstance(data, pd.Series):
+            assert cached.name == 599
+            assert np.array_equal(cached.values, data.values)
+        else:
+            assert list(cached.columns) == [0, 2.5, ('stage', 'm')]
+            assert list(cached.dtypes) == list(data.dtypes)
+            for i in range(len(data.columns)):
+                assert np.array_equal(cached.iloc[:, i].values, data.iloc[:, i].values)
+
+
+def test_memory_map_copy_on_write(tmpdir):
+    cache = ch.DataCache(str(tmpdir.join('cache')))
+    df, series = labelled_data()
+    cache.load(stored, [], args=(df,))
+    entry = os.path.join(cache.cache_dir, cache.key(stored, [], args=(df,)))
+    values = ch.DataCache.read_npy(os.path.join(entry, '0.npy'), 'float64')
+    assert isinstance(values, np.memmap) and values.mode == 'c'
+    values[:] = -1.0
+    cached = cache.load(stored, [], args=(df,))
+    cached.iloc[0, 0] = -2.0
+    cached.iloc[:, 1] = cached.iloc[:, 1] * 10
+    reloaded = cache.load(stored, [], args=(df,))
+    assert np.array_equal(reloaded.iloc[:, 0].values, df.iloc[:, 0].values)
+    assert np.array_equal(reloaded.iloc[:, 1].values, df.iloc[:, 1].values)
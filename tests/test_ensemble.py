@@ -0,0 +1,60 @@
+__author__ = 'kiruba'
+"""
+Checks that a realisation of CheckdamEnsemble with fixed parameters gives the summary of the deterministic
+CheckdamNetwork routing, and that resample_years draws only full years and matches leap days and partial years by
+month and day.
+Run from the repository root with python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import checkdam.ensemble as en
+import checkdam.routing as routing
+from test_routing import Checkdam, inflow_df
+
+
+def test_fixed_parameters_reproduce_network(tmpdir):
+    df = inflow_df(days=120)
+    evaporation = pd.Series(5.0, index=df.index)
+    checkdams = [Checkdam(1, 2, 3000.0, 400.0, evaporation), Checkdam(2, 5, 2000.0, 300.0, evaporation),
+                 Checkdam(3, 5, 4000.0, 500.0, evaporation), Checkdam(5, 'lake', 1500.0, 350.0, evaporation),
+                 Checkdam(7, 'tank', 2500.0, 200.0, evaporation)]
+    network_df = routing.CheckdamNetwork(df, checkdams, slope=1.2, intercept=0.0).simulate
+    names = [checkdam.check_dam_name for checkdam in checkdams]
+    volume = np.column_stack([network_df['volume_{0}'.format(name)].values for name in names])
+    max_volume = np.array([checkdam.max_volume for checkdam in checkdams])
+    # degenerate ranges, every realisation is the deterministic network
+    parameters_df = en.sample_parameters(3, 1.2, 0.0, parameter_ranges={'infiltration_rate': (0.002, 0.002)},
+                                         seed=1)
+    summary_csv = str(tmpdir.join('summary.csv'))
+    ensemble = en.CheckdamEnsemble(df, checkdams, slope=1.2, intercept=0.0)
+    assert ensemble.run(parameters_df, summary_csv, seed=1, processes=1) == 3
+    summary_df = pd.read_csv(summary_csv)
+    total_recharge = sum(network_df['infilt_{0}'.format(name)].values[:-1].sum() for name in names)
+    assert total_recharge > 0 and (volume[:-1] >= max_volume).sum() > 0
+    assert np.allclose(summary_df['total_recharge'], total_recharge, rtol=1e-12)
+    assert (summary_df['days_full'] == (volume[:-1] >= max_volume).sum()).all()
+    for outlet in ['lake', 'tank']:
+        inflow = network_df['inflow_from_overflow_{0}'.format(outlet)].values.sum()
+        assert inflow > 0
+        assert np.allclose(summary_df['overflow_to_{0}'.format(outlet)], inflow, rtol=1e-12)
+
+
+def test_resample_years_leap_day_and_partial_years():
+    rng = np.random.RandomState(0)
+    # partial first and last years around one full leap year
+    index = pd.date_range('2015-07-01', '2017-03-10', freq='D')
+    source = index[en.resample_years(index, rng)]
+    assert (source.year == 2016).all()
+    assert (source.month == index.month).all() and (source.day == index.day).all()
+    # 29 February of a partial leap year from a full year without it
+    index = pd.date_range('2014-01-01', '2016-03-31', freq='D')
+    for i in range(10):
+        source = index[en.resample_years(index, rng)]
+        assert set(source.year) <= {2014, 2015}
+        leap_day = (index.month == 2) & (index.day == 29)
+        assert (source.month[leap_day] == 2).all() and (source.day[leap_day] == 28).all()
+        assert (source.month[~leap_day] == index.month[~leap_day]).all()
+        assert (source.day[~leap_day] == index.day[~leap_day]).all()
+    with pytest.raises(ValueError):
+        en.resample_years(pd.date_range('2015-03-01', '2016-02-28', freq='D'), rng)
@@ -0,0 +1,40 @@
+__author__ = 'kiruba'
+"""
+Checks that Eensemble gives the values of the single method evaporation functions and names missing inputs.
+Run from the repository root with python -m pytest tests
+"""
+import numpy as np
+import pytest
+import checkdam.evaplib as ev
+
+
+def daily_forcing(n=20, seed=0):
+    rng = np.random.RandomState(seed)
+    rext = rng.uniform(2E7, 4.2E7, n)
+    rs = rext * rng.uniform(0.3, 0.7, n)
+    return dict(airtemp=rng.uniform(5.0, 35.0, n), rh=rng.uniform(20.0, 100.0, n),
+                airpress=rng.uniform(90000.0, 101325.0, n), Rs=rs, Rext=rext, u=rng.uniform(0.5, 5.0, n),
+                Rn=0.6 * rs, G=0.05 * rs, ra=rng.uniform(20.0, 100.0, n), rs=rng.uniform(30.0, 200.0, n))
+
+
+def test_ensemble_matches_single_methods():
+    f = daily_forcing()
+    E = ev.Eensemble(Z=800.0, methods=('E0', 'ET0pm', 'Em', 'Ept', 'Epm'), **f)
+    met = (f['airtemp'], f['rh'], f['airpress'])
+    assert np.allclose(E['E0'], ev.E0(*met, Rs=f['Rs'], Rext=f['Rext'], u=f['u'], Z=800.0), rtol=1e-12)
+    assert np.allclose(E['ET0pm'], ev.ET0pm(*met, Rs=f['Rs'], N=0, Rext=f['Rext'], u=f['u'], Z=800.0), rtol=1e-12)
+    assert np.allclose(E['Em'], ev.Em(*met, Rs=f['Rs']), rtol=1e-12)
+    assert np.allclose(E['Ept'], ev.Ept(*met, Rn=f['Rn'], G=f['G']), rtol=1e-12)
+    # Epm takes air pressure in hPa
+    assert np.allclose(E['Epm'], ev.Epm(f['airtemp'], f['rh'], f['airpress'] / 100.0, f['Rn'], f['G'], f['ra'],
+                                        f['rs']), rtol=1e-12)
+
+
+def test_ensemble_names_missing_input():
+    f = daily_forcing()
+    with pytest.raises(ValueError, match='E0 needs input Rext'):
+        ev.Eensemble(f['airtemp'], f['rh'], f['airpress'], Rs=f['Rs'], u=f['u'], methods=('Em', 'E0'))
+    with pytest.raises(ValueError, match='Epm needs input rs'):
+        ev.Eensemble(f['airtemp'], f['rh'], f['airpress'], Rn=f['Rn'], G=f['G'], ra=f['ra'], methods=('Epm',))
+    E = ev.Eensemble(f['airtemp'], f['rh'], f['airpress'], Rs=f['Rs'], methods=('Em',))
+    assert list(E) == ['Em']
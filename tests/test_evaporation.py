@@ -0,0 +1,121 @@
+__author__ = 'kiruba'
+"""
+Regression tests of half hourly open water evaporation against the element wise loop it replaced, with rs/rs0 as
+it is (the loop) and limited as in FAO 56 (fao56).
+Run from the repository root with python -m pytest tests
+"""
+import math
+import numpy as np
+import pandas as pd
+import checkdam.checkdam as cd
+import checkdam.meteolib as met
+
+
+def loop_delta_calc(airtemp):
+    temp = airtemp + 237.3
+    b = 0.6108 * (math.exp((17.27 * airtemp) / temp))
+    return (4098 * b) / (temp ** 2)
+
+
+def loop_half_hour_evaporation(airtemp, rh, airpress, rs, rext, u, z=0.0, fao56=False, night_ratio=0.5):
+    # single value branch of the old loop, called for every element, with the FAO 56 limits of rs/rs0 added
+    albedo = 0.06
+    sigma = (1.02066714 * (10 ** -10))
+    e0 = np.zeros(len(airtemp))
+    for i in range(len(airtemp)):
+        delta = loop_delta_calc(airtemp[i])
+        es = float(met.es_calc(airtemp[i]))
+        ea = float(met.ea_calc(airtemp[i], rh[i]))
+        lambda_mj_kg = 2.501 - (0.002361 * airtemp[i])
+        gamma = (0.0016286 * (airpress[i] / 1000)) / lambda_mj_kg
+        rns = (1.0 - albedo) * rs[i]
+        rs0 = (0.75 + (2E-5 * z)) * rext[i]
+        if fao56:
+            ratio = min(rs[i] / rs0, 1.0) if rs0 > 0 else night_ratio
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.float64(rs[i]) / rs0
+        f = (1.35 * ratio) - 0.35
+        epsilom = 0.34 - (-0.14 * math.sqrt(ea / 1000))
+        rnl = f * epsilom * sigma * (airtemp[i] + 273.16) ** 4
+        rnet = rns - rnl
+        Ea = (1 + (0.536 * u[i])) * ((es / 1000) - (ea / 1000))
+        e0[i] = ((delta * rnet) + gamma * (6.43 * Ea)) / (lambda_mj_kg * (delta + gamma))
+    return e0
+
+
+def day_weather(n=50, seed=1):
+    # day time half hours, clear sky ratio below 1
+    rng = np.random.RandomState(seed)
+    rext = rng.uniform(0.5, 2.4, n)
+    return dict(airtemp=rng.uniform(15.0, 38.0, n), rh=rng.uniform(20.0, 100.0, n),
+                airpress=rng.uniform(90000.0, 101325.0, n), rs=rext * rng.uniform(0.1, 0.7, n), rext=rext,
+                u=rng.uniform(0.0, 6.0, n))
+
+
+def test_delta_calc_does_not_depend_on_size():
+    airtemp = np.array([-5.0, 0.0, 12.5, 25.0, 40.0])
+    expected = np.array([loop_delta_calc(t) for t in airtemp])
+    assert np.allclose(cd.delta_calc(airtemp), expected, rtol=1e-12)
+    assert np.allclose(cd.delta_calc(pd.Series(airtemp)), expected, rtol=1e-12)
+    assert np.allclose(cd.delta_calc(list(airtemp)), expected, rtol=1e-12)
+    for t, e in zip(airtemp, expected):
+        assert np.isclose(cd.delta_calc(t), e, rtol=1e-12)
+        assert np.isclose(cd.delta_calc([t])[0], e, rtol=1e-12)
+    assert np.allclose(cd.delta_calc([25.0, 25.0]), cd.delta_calc(25.0), rtol=1e-12)
+
+
+def test_half_hour_evaporation_scalar():
+    weather = day_weather()
+    expected = loop_half_hour_evaporation(z=800.0, **weather)
+    for i in range(len(expected)):
+        value = cd.half_hour_evaporation(z=800.0, **dict((k, v[i]) for k, v in weather.items()))
+        assert np.ndim(value) == 0
+        assert np.isclose(value, expected[i], rtol=1e-10)
+
+
+def test_half_hour_evaporation_array():
+    weather = day_weather()
+    expected = loop_half_hour_evaporation(z=800.0, **weather)
+    assert np.allclose(cd.half_hour_evaporation(z=800.0, **weather), expected, rtol=1e-10)
+    out = np.empty(len(expected))
+    cd.half_hour_evaporation(z=800.0, out=out, **weather)
+    assert np.allclose(out, expected, rtol=1e-10)
+    pair = dict((k, v[:2]) for k, v in weather.items())
+    assert np.allclose(cd.half_hour_evaporation(z=800.0, **pair), expected[:2], rtol=1e-10)
+
+
+def test_half_hour_evaporation_series():
+    weather = day_weather()
+    expected = loop_half_hour_evaporation(z=800.0, **weather)
+    index = pd.date_range('2014-05-01 06:00', periods=len(expected), freq='30min')
+    series = dict((k, pd.Series(v, index=index)) for k, v in weather.items())
+    assert np.allclose(cd.half_hour_evaporation(z=800.0, **series), expected, rtol=1e-10)
+
+
+def test_half_hour_evaporation_above_clear_sky():
+    weather = day_weather(n=10)
+    # cloudless half hours with more radiation than the clear sky radiation
+    weather['rs'] = weather['rext'] * np.linspace(0.8, 1.2, 10)
+    above = weather['rs'] > 0.75 * weather['rext']
+    expected = loop_half_hour_evaporation(**weather)
+    assert np.allclose(cd.half_hour_evaporation(**weather), expected, rtol=1e-10)
+    limited = loop_half_hour_evaporation(fao56=True, **weather)
+    assert np.allclose(cd.half_hour_evaporation(fao56=True, **weather), limited, rtol=1e-10)
+    # rs/rs0 above 1 means more net longwave loss, FAO 56 limits it to that of a clear sky
+    assert np.all(limited[above] > expected[above])
+    assert np.allclose(limited[~above], expected[~above], rtol=1e-12)
+
+
+def test_half_hour_evaporation_night():
+    weather = day_weather(n=4)
+    weather['rs'] = np.zeros(4)
+    weather['rext'] = np.zeros(4)
+    # no clear sky radiation, rs/rs0 is nan
+    assert np.all(np.isnan(cd.half_hour_evaporation(z=800.0, **weather)))
+    assert np.all(np.isnan(loop_half_hour_evaporation(z=800.0, **weather)))
+    evaporation = cd.half_hour_evaporation(z=800.0, fao56=True, **weather)
+    assert np.all(np.isfinite(evaporation))
+    assert np.allclose(evaporation, loop_half_hour_evaporation(z=800.0, fao56=True, **weather), rtol=1e-10)
+    # larger rs/rs0 means more net longwave loss
+    assert np.all(cd.half_hour_evaporation(z=800.0, fao56=True, night_ratio=0.8, **weather) < evaporation)
@@ -0,0 +1,69 @@
+__author__ = 'kiruba'
+"""
+Checks overflow_volume against the overflow loops of the ch_591 (interpolated crossing) and ch_599 (half interval)
+scripts it replaced, and that readings without a reading one interval earlier have no overflow.
+Run from the repository root with python -m pytest tests
+"""
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+import pytest
+import checkdam.hydraulics as hy
+
+
+def loop_overflow(stage, full_stage, width_check_dam, half=False):
+    # loop of the scripts, stage series with a reading every half hour from the first one
+    overflow = pd.Series(0.0, index=stage.index)
+    for index in stage.index[1:]:
+        obs_stage = stage[index]
+        if (np.around(obs_stage, 2)) > full_stage:
+            effective_head = obs_stage - full_stage
+            previous_time = index - timedelta(seconds=1800)
+            if np.around(stage[previous_time], 2) > full_stage:
+                overflow[index] = 1800 * 1.84 * width_check_dam * (effective_head ** 1.5)
+            elif half:
+                overflow[index] = 900 * 1.84 * width_check_dam * (effective_head ** 1.5)
+            else:
+                x1 = 0
+                x2 = 1800
+                y1 = np.around(stage[previous_time], 2)
+                y2 = np.around(obs_stage, 2)
+                slope = (y1 - y2) / (x1 - x2)
+                intercept = y2 - (slope * x2)
+                time_of_overflow = 1800 - ((full_stage - intercept) / slope)
+                overflow[index] = time_of_overflow * 1.84 * width_check_dam * (effective_head ** 1.5)
+    return overflow
+
+
+def stage_series(seed=4):
+    rng = np.random.RandomState(seed)
+    index = pd.date_range('2014-06-01 00:00', periods=300, freq='30min')
+    stage = 1.0 + 0.4 * np.sin(np.arange(300) / 15.0) + rng.uniform(-0.05, 0.05, 300)
+    stage[0] = 0.8
+    return pd.Series(stage, index=index, name='stage(m)')
+
+
+@pytest.mark.parametrize('first_interval', hy.first_intervals)
+def test_overflow_loop(first_interval):
+    stage = stage_series()
+    expected = loop_overflow(stage, 1.1, 0.613, half=first_interval == 'half')
+    overflow = hy.overflow_volume(stage, 1.1, weir_length=0.613, first_interval=first_interval)
+    assert (expected > 0).sum() > 50
+    assert np.allclose(overflow.values, expected.values, rtol=1e-12)
+    weir = hy.CheckDamWeir(full_stage=1.1, weir_length=0.613, first_interval=first_interval)
+    assert np.allclose(weir.overflow(stage).values, expected.values, rtol=1e-12)
+
+
+def test_overflow_without_previous_reading():
+    stage = stage_series()
+    overflowing = np.flatnonzero(np.around(stage.values, 2) > 1.1)
+    # logger gap before an overflowing reading, and a record starting above full stage
+    after_gap = overflowing[overflowing > 10][5]
+    gapped = stage.drop(stage.index[after_gap - 1])
+    overflow = hy.overflow_volume(gapped, 1.1, weir_length=0.613)
+    assert overflow[stage.index[after_gap]] == 0.0
+    assert overflow[stage.index[after_gap + 1]] > 0.0
+    starting = stage.iloc[overflowing[0]:]
+    assert hy.overflow_volume(starting, 1.1, weir_length=0.613).iloc[0] == 0.0
+    with pytest.raises(ValueError):
+        hy.overflow_volume(stage, 1.1, weir_length=0.613, first_interval='full')
@@ -0,0 +1,67 @@
+__author__ = 'kiruba'
+"""
+Checks the per gap log of GapImputer against the observed values around each gap and the truncated normal moments
+of its missing values, and that AnalogImputer counts only values it filled.
+Run from the repository root with python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import checkdam.imputation as imp
+
+
+def wind_speed_df(days=10, seed=3):
+    rng = np.random.RandomState(seed)
+    index = pd.date_range('2014-08-01 00:00', periods=96 * days, freq='15min')
+    wind_speed = np.clip(8.0 + 4.0 * rng.randn(len(index)), 0.0, None)
+    # a night gap, a gap from night into day and a single missing value, in two columns
+    wind_speed[100:120] = np.nan
+    wind_speed[500:540] = np.nan
+    wind_speed[700] = np.nan
+    temperature = 25.0 + rng.randn(len(index))
+    temperature[300:310] = np.nan
+    return pd.DataFrame({'WIND_SPEED': wind_speed, 'TEMPERATURE': temperature}, index=index)
+
+
+def test_gap_log():
+    df = wind_speed_df()
+    imputer = imp.GapImputer(limits={'WIND_SPEED': {'day': (0, 27.0), 'night': (0, 22.0)},
+                                     'TEMPERATURE': (-np.inf, np.inf)}, window_days=1)
+    corrected_df, filled, intervals, log = imputer.impute(df, confidence=0.9)
+    day = imp.day_selector(df.index)
+    # every gap and period of a gap has one row, with as many values as it has missing values of that period
+    gaps = imputer.gaps(df)
+    assert log['missing'].sum() == gaps['length'].sum() == filled.values.sum() == len(intervals.index)
+    assert set(zip(log['column'], log['start'])) == set(zip(gaps['column'], gaps['start']))
+    assert (log['seconds'] >= 0).all()
+    for row in log.itertuples():
+        series = df[row.column]
+        selector = day if row.period == 'day' else ~day
+        in_gap = (df.index >= row.start) & (df.index <= row.end)
+        assert row.missing == (in_gap & selector).sum()
+        window = (df.index >= row.start - pd.Timedelta(days=1)) & (df.index <= row.end + pd.Timedelta(days=1))
+        observed = series.values[window & selector & ~np.isnan(series.values)]
+        assert row.observed == len(observed)
+        assert np.isclose(row.mu, observed.mean())
+        assert np.isclose(row.sigma, observed.std())
+        a, b = imputer.period_limits(row.column, row.period)
+        mean, lower, upper = imp.truncated_normal_moments([row.mu], [row.sigma], [a], [b], confidence=0.9)
+        assert np.isclose(row.width, upper[0] - lower[0])
+        gap_values = corrected_df[row.column].values[in_gap & selector]
+        assert np.allclose(gap_values, mean[0])
+    # a gap from night into day has a row for each period
+    assert (log['start'] == df.index[500]).sum() == 2
+
+
+def test_analog_filled_without_donors():
+    df = wind_speed_df()
+    night = ~imp.day_selector(df.index)
+    # no observed night wind speed, night values of the gaps have no analogs
+    df.loc[night, 'WIND_SPEED'] = np.nan
+    corrected_df, filled, log = imp.AnalogImputer(['WIND_SPEED', 'TEMPERATURE'], k=3).impute(df)
+    assert np.isnan(corrected_df['WIND_SPEED'].values[night]).all()
+    assert not filled['WIND_SPEED'].values[night].any()
+    assert (filled['WIND_SPEED'].values == ~np.isnan(corrected_df['WIND_SPEED'].values) &
+            np.isnan(df['WIND_SPEED'].values)).all()
+    for column in ['WIND_SPEED', 'TEMPERATURE']:
+        assert log.loc[log['column'] == column, 'filled'].sum() == filled[column].sum()
+    assert filled['TEMPERATURE'].sum() == 10
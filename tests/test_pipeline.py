@@ -0,0 +1,137 @@
+__author__ = 'kiruba'
+"""
+End to end check of the evaporation of the batch water balance pipeline against half_hour_evaporation called for
+every half hour with single values, and of incremental updates against a single run over all logger files.
+Run from the repository root with python -m pytest tests
+"""
+import os
+import numpy as np
+import pandas as pd
+import checkdam.checkdam as cd
+import checkdam.pipeline as pipeline
+
+
+def weather(days=3, seed=1):
+    rng = np.random.RandomState(seed)
+    index = pd.date_range('2014-05-01 00:00', periods=48 * days, freq='30min')
+    hour = index.hour + index.minute / 60.0
+    return pd.DataFrame({'Min Air Temperature (C)': 22 + 5 * np.sin((hour - 9) / 24.0 * 2 * np.pi),
+                         'Max Air Temperature (C)': 24 + 5 * np.sin((hour - 9) / 24.0 * 2 * np.pi),
+                         'Humidity (%)': 70 - 15 * np.sin((hour - 9) / 24.0 * 2 * np.pi),
+                         'Wind Speed (kmph)': 5 + rng.rand(len(index)) * 3,
+                         'Solar Radiation (Wpm2)': np.clip(800 * np.sin((hour - 6) / 12.0 * np.pi), 0, None),
+                         pipeline.rain_column: np.zeros(len(index))}, index=index)
+
+
+def row_evaporation(weather_df, elevation, latitude, longitude):
+    air_p_pa = 101325 * ((1 - (2.25577 * (10 ** -5) * elevation)) ** 5.25588)
+    evaporation = []
+    for date_time, row in weather_df.iterrows():
+        airtemp = 0.5 * (row['Min Air Temperature (C)'] + row['Max Air Temperature (C)'])
+        rext = cd.extraterrestrial_irrad(date_time.to_pydatetime(), latitude, longitude)
+        evaporation.append(cd.half_hour_evaporation(airtemp=airtemp, rh=row['Humidity (%)'], airpress=air_p_pa,
+                                                    rs=row['Solar Radiation (Wpm2)'] * 1800 / (10 ** 6), rext=rext,
+                                                    u=row['Wind Speed (kmph)'] * 0.277778, z=elevation))
+    return np.array(evaporation)
+
+
+def test_open_water_evaporation_rows():
+    weather_df = weather()
+    expected = row_evaporation(weather_df, 799, 13.26, 77.51)
+    evaporation = pipeline.open_water_evaporation(weather_df, 799, 13.26, 77.51)
+    # night half hours have no clear sky radiation
+    assert np.isfinite(expected).sum() > 0 and np.isnan(expected).sum() > 0
+    assert np.allclose(evaporation.values, expected, rtol=1e-10, equal_nan=True)
+
+
+def test_water_balance_evaporation(tmpdir):
+    weather_df = weather()
+    stage_m = np.arange(0, 2.05, 0.05)
+    stage_volume_file = str(tmpdir.join('stage_vol.csv'))
+    stage_area_file = str(tmpdir.join('cont_area.csv'))
+    pd.DataFrame({'stage_m': stage_m, 'total_vol_cu_m': 500 * stage_m ** 2}).to_csv(stage_volume_file)
+    pd.DataFrame({'stage_m': stage_m, 'total_area_sq_m': 1000 * stage_m}).to_csv(stage_area_file)
+    dam = pipeline.dam_parameters({'name': '999', 'weather_station': 'sm', 'stage_files': [],
+                                   'calibration_slope': 1.0, 'calibration_intercept': 0.0,
+                                   'stage_volume_file': stage_volume_file, 'stage_area_file': stage_area_file,
+                                   'full_stage': 1.9, 'weir_length': 0.5, 'elevation': 799, 'latitude': 13.26,
+                                   'longitude': 77.51})
+    stage = pd.Series(np.linspace(1.0, 0.8, len(weather_df.index)), index=weather_df.index, name='stage(m)')
+    water_balance_df = pipeline.sub_daily_water_balance(dam, weather_df, stage=stage)
+    expected = row_evaporation(weather_df, 799, 13.26, 77.51)
+    assert np.allclose(water_balance_df['Evaporation (mm/30min)'].values, expected, rtol=1e-10, equal_nan=True)
+    area = 1000 * stage.values
+    assert np.allclose(water_balance_df['Evaporation (cu.m)'].values, expected * 0.001 * area, rtol=1e-6,
+                       equal_nan=True)
+    daily_df, parameters = pipeline.daily_dam_water_balance(dam, water_balance_df, parameters=(0.05, 1.0))
+    daily_expected = pd.Series(expected * 0.001 * area, index=weather_df.index).resample('D').sum()
+    assert np.allclose(daily_df['Evaporation (cu.m)'].values, daily_expected.values, rtol=1e-6)
+
+
+def write_logger_file(csv_file, stage):
+    # odyssey logger export, raw value in mm with calibration slope 1 and intercept 0
+    lines = ['header'] * 9 + ['Scan No,Date,Time,Raw Value,Calibrated Value']
+    for i, (time, value) in enumerate(stage.items()):
+        lines.append('{0},{1},{2},{3:.0f},0'.format(i + 1, time.strftime('%d/%m/%Y'), time.strftime(' %H:%M:%S'),
+                                                      value * 1000))
+    with open(csv_file, 'w') as logger:
+        logger.write('\n'.join(lines) + '\n')
+
+
+def test_incremental_update(tmpdir):
+    days = 14
+    weather_df = weather(days=days)
+    # half of the extraterrestrial radiation, none when the sun is down
+    rext = cd.extraterrestrial_irrad(local_datetime=weather_df.index, latitude_deg=13.26, longitude_deg=77.51)
+    weather_df['Solar Radiation (Wpm2)'] = 0.5 * np.asarray(rext) * (10 ** 6) / 1800
+    rain_days = [3, 9]
+    for day in rain_days:
+        weather_df.loc[weather_df.index[48 * day + 24], pipeline.rain_column] = 20.0
+    # stage falls on dry days and rises after rain, read every 15 minutes
+    index = pd.date_range('2014-05-01 00:07', periods=96 * days - 1, freq='15min')
+    elapsed = np.asarray((index - index[0]) / pd.Timedelta(days=1))
+    stage = 1.2 - 0.04 * elapsed ** 1.1
+    for day in rain_days:
+        stage += 0.3 * (elapsed > day + 0.5)
+    stage = pd.Series(stage, index=index)
+    stage_m = np.arange(0, 2.05, 0.05)
+    stage_volume_file = str(tmpdir.join('stage_vol.csv'))
+    stage_area_file = str(tmpdir.join('cont_area.csv'))
+    pd.DataFrame({'stage_m': stage_m, 'total_vol_cu_m': 500 * stage_m ** 2}).to_csv(stage_volume_file)
+    pd.DataFrame({'stage_m': stage_m, 'total_area_sq_m': 1000 * stage_m}).to_csv(stage_area_file)
+    # first block long enough to fit infiltration, the others end in the middle of a day
+    ends = [pd.Timestamp('2014-05-08 10:00'), pd.Timestamp('2014-05-10 17:00'), pd.Timestamp('2014-05-11 02:00'),
+            index[-1] + pd.Timedelta(minutes=1)]
+    stage_files = []
+    start = index[0]
+    for i, end in enumerate(ends):
+        stage_files.append(str(tmpdir.join('block_{0}.csv'.format(i))))
+        write_logger_file(stage_files[-1], stage[(stage.index >= start) & (stage.index < end)])
+        start = end
+    dam = pipeline.dam_parameters({'name': '999', 'weather_station': 'sm', 'stage_files': stage_files,
+                                   'calibration_slope': 1.0, 'calibration_intercept': 0.0,
+                                   'stage_volume_file': stage_volume_file, 'stage_area_file': stage_area_file,
+                                   'full_stage': 1.9, 'weir_length': 0.5, 'elevation': 799, 'latitude': 13.26,
+                                   'longitude': 77.51})
+    full_dir = str(tmpdir.mkdir('full'))
+    full_state = pipeline.run_dam_from_start(dam, weather_df, full_dir)
+    update_dir = str(tmpdir.mkdir('update'))
+    dam['stage_files'] = stage_files[:1]
+    first_state = pipeline.run_dam_from_start(dam, weather_df, update_dir)
+    for i in range(2, len(stage_files) + 1):
+        dam['stage_files'] = stage_files[:i]
+        state = pipeline.update_dam(dam, weather_df, update_dir, pipeline.read_state(update_dir))
+    # half hourly rows do not depend on the infiltration fit, blocks give the rows of a single run
+    with open(os.path.join(full_dir, 'water_balance_30min.csv')) as full_csv:
+        with open(os.path.join(update_dir, 'water_balance_30min.csv')) as update_csv:
+            assert update_csv.read() == full_csv.read()
+    # infiltration parameters are those of the first run, fitted on its dry days only
+    assert pipeline.read_state(update_dir)['parameters'] == first_state['parameters'] == state['parameters']
+    assert state['parameters'] != full_state['parameters']
+    full_daily = pd.read_csv(os.path.join(full_dir, 'water_balance_daily.csv'), index_col=0)
+    update_daily = pd.read_csv(os.path.join(update_dir, 'water_balance_daily.csv'), index_col=0)
+    assert list(update_daily.index) == list(full_daily.index)
+    for column in [pipeline.rain_column, 'Evaporation (cu.m)', 'overflow(cu.m)', 'change_storage(cu.m)', 'status']:
+        assert update_daily[column].equals(full_daily[column])
+    # wet day infiltration and inflow use the frozen parameters
+    assert not np.allclose(update_daily['infiltration(cu.m)'].values, full_daily['infiltration(cu.m)'].values)
@@ -0,0 +1,166 @@
+__author__ = 'kiruba'
+"""
+Checks ArrayCheckdamChain against the dataframe loop of CheckdamChain (cumulative_impact_model.py, a script that
+reads its data on import, so the loop is repeated here), and CheckdamNetwork with per check dam overflow lags against
+the day by day routing of CheckdamChain (overflow reaches the next check dam the next day) and CheckdamChainMerge
+(overflow of both chains reaches the converging check dam the same day).
+Run from the repository root with python -m pytest tests
+"""
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+import pytest
+import checkdam.routing as routing
+
+
+class Checkdam(object):
+    def __init__(self, check_dam_name, next_check_dam, catchment_area, max_volume, evaporation):
+        self.check_dam_name = check_dam_name
+        self.next_check_dam = next_check_dam
+        self.catchment_area = catchment_area
+        self.evaporation = evaporation
+        self.infiltration_rate = 0.002
+        self.initial_volume = 0.0
+        self.own_catchment_inflow_ratio = 0.5
+        self.max_volume = max_volume
+
+    def convert_volume_to_area(self, volume):
+        return 20.0 * volume ** 0.5
+
+
+def inflow_df(days=60, seed=2):
+    rng = np.random.RandomState(seed)
+    index = pd.date_range('2014-06-01', periods=days, freq='D')
+    rain = np.where(rng.rand(days) < 0.3, rng.uniform(0.01, 0.15, days), 0.0)
+    return pd.DataFrame({'diff': rain}, index=index)
+
+
+def checkdam_routing(checkdam, inflow_catchment_area_ratio, inflow_from_overflow):
+    # one check dam, day by day as in CheckdamChain.simulate
+    no_of_days = len(inflow_catchment_area_ratio)
+    volume = np.zeros(no_of_days)
+    overflow = np.zeros(no_of_days)
+    evaporation = checkdam.evaporation.values
+    for i in range(no_of_days - 1):
+        inflow = routing.own_catchment_inflow(checkdam.catchment_area, inflow_catchment_area_ratio[i],
+                                              checkdam.own_catchment_inflow_ratio, inflow_from_overflow[i])[1]
+        surface_area = checkdam.convert_volume_to_area(volume[i])
+        current_volume = volume[i] + inflow - surface_area * (checkdam.infiltration_rate + evaporation[i] * 0.001)
+        overflow[i] = max(current_volume - checkdam.max_volume, 0.0)
+        volume[i] = volume[i + 1] = min(current_volume, checkdam.max_volume)
+    return volume, overflow
+
+
+def loop_chain(df, check_dam_chain, slope, intercept):
+    # CheckdamChain.create_output_df and simulate of cumulative_impact_model.py
+    output_df = df.copy()
+    for checkdam in check_dam_chain:
+        for column in routing.output_columns:
+            output_df['{0}_{1:d}'.format(column, checkdam.check_dam_name)] = 0.0
+        output_df.loc[output_df.index[0], 'volume_{0:d}'.format(checkdam.check_dam_name)] = checkdam.initial_volume
+    last_date = max(output_df.index)
+    for dt in output_df.index:
+        if dt < last_date:
+            for checkdam in check_dam_chain:
+                n = 1
+                convergence_ratio = 5
+                assumed_own_catchment_inflow_ratio = checkdam.own_catchment_inflow_ratio
+                while True:
+                    if (round(convergence_ratio, 2) == round(1.0, 2)) or (n > 100) or (round(convergence_ratio, 2) == round(0.00, 2)):
+                        output_df.loc[dt, 'conv_ratio_{0:d}'.format(checkdam.check_dam_name)] = convergence_ratio
+                        break
+                    inflow_from_catchment_area_ratio = (output_df.loc[dt, 'diff'] * slope) + intercept
+                    inflow_from_catchment = (checkdam.catchment_area * inflow_from_catchment_area_ratio * assumed_own_catchment_inflow_ratio)
+                    output_df.loc[dt, 'inflow_from_catchment_{0:d}'.format(checkdam.check_dam_name)] = inflow_from_catchment
+                    inflow_from_overflow = output_df.loc[dt, 'inflow_from_overflow_{0:d}'.format(checkdam.check_dam_name)]
+                    if inflow_from_catchment > 0.0:
+                        estimated_own_catchment_inflow_ratio = inflow_from_catchment / (inflow_from_catchment + inflow_from_overflow)
+                        convergence_ratio = estimated_own_catchment_inflow_ratio / assumed_own_catchment_inflow_ratio
+                        assumed_own_catchment_inflow_ratio = 0.5 * (estimated_own_catchment_inflow_ratio + assumed_own_catchment_inflow_ratio)
+                        inflow = inflow_from_catchment + inflow_from_overflow
+                        n += 1
+                    else:
+                        inflow = inflow_from_overflow
+                        convergence_ratio = 5
+                        n = 101
+                output_df.loc[dt, 'total_inflow_{0:d}'.format(checkdam.check_dam_name)] = inflow
+                surface_area = checkdam.convert_volume_to_area(output_df.loc[dt, 'volume_{0:d}'.format(checkdam.check_dam_name)])
+                evaporation = surface_area * checkdam.evaporation.loc[dt] * 0.001
+                output_df.loc[dt, 'evap_{0:d}'.format(checkdam.check_dam_name)] = evaporation
+                infiltration = surface_area * checkdam.infiltration_rate
+                output_df.loc[dt, 'infilt_{0:d}'.format(checkdam.check_dam_name)] = infiltration
+                current_volume = output_df.loc[dt, 'volume_{0:d}'.format(checkdam.check_dam_name)]
+                # CheckdamRouting
+                current_volume = (current_volume + inflow) - (infiltration + evaporation)
+                if current_volume > checkdam.max_volume:
+                    overflow = current_volume - checkdam.max_volume
+                    current_volume = checkdam.max_volume
+                else:
+                    overflow = 0.0
+                output_df.loc[[dt, dt + timedelta(days=1)], 'volume_{0:d}'.format(checkdam.check_dam_name)] = current_volume
+                if overflow > 0.0:
+                    output_df.loc[dt, 'overflow_{0:d}'.format(checkdam.check_dam_name)] = overflow
+                    if checkdam.next_check_dam is not None:
+                        output_df.loc[dt + timedelta(days=1), 'inflow_from_overflow_{0:d}'.format(checkdam.next_check_dam)] = overflow
+    return output_df
+
+
+def next_day(overflow):
+    return np.concatenate([[0.0], overflow[:-1]])
+
+
+def test_array_chain_equals_chain():
+    df = inflow_df()
+    rng = np.random.RandomState(3)
+    evaporation = pd.Series(rng.uniform(3.0, 7.0, len(df.index)), index=df.index)
+    # last check dam overflows into check dam 9 outside the chain
+    chain = [Checkdam(1, 2, 3000.0, 400.0, evaporation), Checkdam(2, 4, 2000.0, 300.0, evaporation),
+             Checkdam(4, 9, 1500.0, 250.0, evaporation)]
+    chain[1].initial_volume = 120.0
+    expected_df = loop_chain(df, chain, 1.2, 0.01)
+    output_df = routing.ArrayCheckdamChain(df.copy(), chain, slope=1.2, intercept=0.01).simulate
+    for checkdam in chain:
+        assert expected_df['overflow_{0}'.format(checkdam.check_dam_name)].sum() > 0
+        for column in ['volume', 'overflow', 'inflow_from_overflow', 'total_inflow', 'evap', 'infilt']:
+            name = '{0}_{1}'.format(column, checkdam.check_dam_name)
+            assert np.array_equal(output_df[name].values, expected_df[name].values)
+    assert np.array_equal(output_df['inflow_from_overflow_9'].values, expected_df['inflow_from_overflow_9'].values,
+                          equal_nan=True)
+
+
+def test_network_with_merge_lags():
+    df = inflow_df()
+    evaporation = pd.Series(5.0, index=df.index)
+    a1, a2 = Checkdam(1, 2, 3000.0, 400.0, evaporation), Checkdam(2, 5, 2000.0, 300.0, evaporation)
+    b1 = Checkdam(3, 5, 4000.0, 500.0, evaporation)
+    c, d = Checkdam(5, 6, 1500.0, 350.0, evaporation), Checkdam(6, 'lake', 1000.0, 250.0, evaporation)
+    ratio = df['diff'].values * 1.2
+    volume, overflow = {}, {}
+    zero = np.zeros(len(df.index))
+    volume[1], overflow[1] = checkdam_routing(a1, ratio, zero)
+    volume[2], overflow[2] = checkdam_routing(a2, ratio, next_day(overflow[1]))
+    volume[3], overflow[3] = checkdam_routing(b1, ratio, zero)
+    # converging check dam gets both chains on the same day
+    volume[5], overflow[5] = checkdam_routing(c, ratio, overflow[2] + overflow[3])
+    volume[6], overflow[6] = checkdam_routing(d, ratio, next_day(overflow[5]))
+    assert overflow[2].sum() > 0 and overflow[3].sum() > 0 and overflow[6].sum() > 0
+    network = routing.CheckdamNetwork(df, [d, c, b1, a2, a1], slope=1.2, intercept=0.0,
+                                      overflow_lag_days={2: 0, 3: 0})
+    output_df = network.simulate
+    for name in volume:
+        assert np.allclose(output_df['volume_{0}'.format(name)].values, volume[name])
+        assert np.allclose(output_df['overflow_{0}'.format(name)].values, overflow[name])
+    assert np.allclose(output_df['inflow_from_overflow_lake'].values, next_day(overflow[6]))
+    # one lag for all edges is CheckdamChain routing everywhere
+    output_df = routing.CheckdamNetwork(df, [d, c, b1, a2, a1], slope=1.2, intercept=0.0).simulate
+    assert not np.allclose(output_df['volume_5'].values, volume[5])
+
+
+def test_network_lag_check():
+    df = inflow_df()
+    checkdams = [Checkdam(1, 2, 3000.0, 400.0, pd.Series(5.0, index=df.index)),
+                 Checkdam(2, None, 3000.0, 400.0, pd.Series(5.0, index=df.index))]
+    with pytest.raises(ValueError):
+        routing.CheckdamNetwork(df, checkdams, slope=1.2, intercept=0.0, overflow_lag_days=2)
+    with pytest.raises(ValueError):
+        routing.CheckdamNetwork(df, checkdams, slope=1.2, intercept=0.0, overflow_lag_days={7: 0})
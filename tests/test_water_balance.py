@@ -0,0 +1,115 @@
+__author__ = 'kiruba'
+"""
+Checks dry_days, dry_infiltration and balance_inflow against the day by day loops of the ch_591 script they
+replaced: the first day, the two day rain window, pumping days and inflow of wet days.
+Run from the repository root with python -m pytest tests
+"""
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+import checkdam.water_balance as wb
+
+daily_format = '%Y-%m-%d'
+
+
+def daily_df(days=20, seed=5):
+    rng = np.random.RandomState(seed)
+    index = pd.date_range('2014-06-01', periods=days, freq='D')
+    rain = np.zeros(days)
+    rain[[0, 4, 5, 12]] = [3.0, 12.0, 4.0, 20.0]
+    change = -rng.uniform(5.0, 15.0, days)
+    change[[4, 12, 13]] = [150.0, 300.0, 2.0]
+    overflow = np.zeros(days)
+    overflow[12] = 40.0
+    pumping = np.zeros(days)
+    pumping[[9, 15]] = [2.0, 1.0]
+    return pd.DataFrame({'rain (mm)': rain, 'change_storage(cu.m)': change, 'overflow(cu.m)': overflow,
+                         'pumping status': pumping, 'Evaporation (cu.m)': rng.uniform(1.0, 3.0, days),
+                         'stage(m)': rng.uniform(0.3, 1.5, days)}, index=index)
+
+
+def loop_status(df):
+    status = pd.Series('Y', index=df.index)
+    initial_time_stamp = min(df.index) + timedelta(days=1)
+    for index in df.index:
+        if index > initial_time_stamp:
+            start_date = index - timedelta(days=1)
+            two_days_rain = df['rain (mm)'][start_date.strftime(daily_format):index.strftime(daily_format)]
+            if (two_days_rain.sum(axis=0) == 0) and (df['change_storage(cu.m)'][index] < 0) and \
+                    (df['overflow(cu.m)'][index] == 0) and (df['pumping status'][index] == 0):
+                status[index] = 'N'
+    return status
+
+
+def loop_infiltration(df, status):
+    infiltration = pd.Series(0.0, index=df.index)
+    for index in df.index[status.values == 'N']:
+        if index > min(df.index):
+            infiltration[index] = -1.0 * (df['change_storage(cu.m)'][index] + df['Evaporation (cu.m)'][index])
+    return infiltration
+
+
+def loop_inflow(df, status, infiltration, pumping):
+    inflow = pd.Series(0.0, index=df.index)
+    for i in df.index:
+        if i > min(df.index) and status[i] != 'N':
+            inflow[i] = (df['change_storage(cu.m)'][i] + infiltration[i] + df['Evaporation (cu.m)'][i] +
+                         df['overflow(cu.m)'][i] + pumping[i])
+    return inflow
+
+
+def test_dry_days_and_infiltration():
+    df = daily_df()
+    status = loop_status(df)
+    dry = wb.dry_days(df, 'rain (mm)', window_days=2)
+    assert list(np.where(dry.values, 'N', 'Y')) == list(status.values)
+    # first day, rain days and the day after them, overflow and pumping days are wet
+    assert not dry.values[[0, 4, 5, 6, 9, 12, 13, 15]].any()
+    assert dry.values[[2, 7, 8, 10, 14, 16]].all()
+    infiltration = wb.dry_infiltration(df, dry.values)
+    assert np.allclose(infiltration, loop_infiltration(df, status).values, rtol=1e-12)
+
+
+def test_balance_inflow():
+    df = daily_df()
+    status = loop_status(df)
+    dry = status.values == 'N'
+    infiltration = loop_infiltration(df, status).values.copy()
+    # predicted infiltration of wet days above cutoff, as in the script
+    predict = ~dry & (df['stage(m)'].values > 0.1)
+    infiltration[predict] = 0.8 * df['stage(m)'].values[predict] + 2.0
+    pumping = df['pumping status'].values * 7.5
+    wet = ~dry
+    wet[:1] = False
+    inflow = wb.balance_inflow(df, wet, infiltration, pumping)
+    expected = loop_inflow(df, status, pd.Series(infiltration, index=df.index), pd.Series(pumping, index=df.index))
+    assert np.allclose(inflow, expected.values, rtol=1e-12)
+    assert inflow[0] == 0.0 and (inflow[dry] == 0.0).all() and (inflow[wet] != 0.0).all()
+    # scalar pumping
+    assert np.allclose(wb.balance_inflow(df, wet, infiltration), loop_inflow(
+        df, status, pd.Series(infiltration, index=df.index), pd.Series(0.0, index=df.index)).values, rtol=1e-12)
+
+
+def test_daily_water_balance_pumping_days():
+    df = daily_df()
+    df['ws_area(sq.m)'] = 1000.0 * df['stage(m)']
+    daily, parameters = wb.daily_water_balance(df, 'rain (mm)', parameters=(0.01, 1.0))
+    status = loop_status(df)
+    assert list(daily['status']) == list(status.values)
+    infiltration = daily['infiltration(cu.m)'].values
+    pumped = (status.values == 'Y') & (df['pumping status'].values > 0)
+    pumped[0] = False
+    # pumped volume closes the balance of pumping days, their inflow is zero
+    expected_pumping = -1.0 * loop_inflow(df, status, daily['infiltration(cu.m)'],
+                                          pd.Series(0.0, index=df.index)).values
+    assert np.allclose(daily['pumping (cu.m)'].values[pumped], expected_pumping[pumped], rtol=1e-12)
+    assert (daily['pumping (cu.m)'].values[~pumped] == 0.0).all()
+    expected = loop_inflow(df, status, daily['infiltration(cu.m)'], daily['pumping (cu.m)'])
+    assert np.allclose(daily['Inflow (cu.m)'].values, expected.values, atol=1e-9)
+    assert np.allclose(daily['Inflow (cu.m)'].values[pumped], 0.0, atol=1e-9)
+    # wet days but the first have infiltration of the given parameters
+    predicted = status.values == 'Y'
+    predicted[0] = False
+    assert np.allclose(infiltration[predicted], 0.01 * df['stage(m)'].values[predicted] *
+                       df['ws_area(sq.m)'].values[predicted], rtol=1e-12)
+    assert infiltration[0] == 0.0
@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import itertools
+import checkdam.ksndmc as ksndmc
 import operator
 
 
@@ -31,48 +32,20 @@ df_base.columns.values[16] = 'Canopy Temperature (C)'
 ksndmc_file = '/media/kiruba/New Volume/ACCUWA_Data/weather_station/kanaswadi/KSNDMC_01-05-2014_10-09-2014_KANASAWADI.csv'
 ksndmc_df = pd.read_csv(ksndmc_file, sep=',')
 
-# drop unnecessary
-ksndmc_df.drop(['TRGCODE', 'DISTRICT', 'TALUKNAME', 'HOBLINAME', 'HOBLICODE', 'Total'], inplace=True, axis=1)
-# print ksndmc_df.head()
-data = []
-for row_no, row in ksndmc_df.iterrows():
-    # print row_no
-    date = row['Date']
-    # print row
-    for time, value in row.ix[1:, ].iteritems():
-        data.append((date, time, value))
-        # print x
-        # print y
-
-# print data
-data_df = pd.DataFrame(data, columns=['Date', 'Time', 'Rain(mm)'])
-data_df.to_csv('/media/kiruba/New Volume/ACCUWA_Data/weather_station/kanaswadi/reshaped_kanaswadi.csv')
 date_format ="%d-%b-%Y %H:%M"
-data_df['Date_Time'] = pd.to_datetime(data_df['Date'] + ' ' + data_df['Time'], format=date_format)
-data_df.set_index(data_df['Date_Time'], inplace=True)
-data_df.sort_index(inplace=True)
-data_df.drop(['Date_Time'], axis=1, inplace=True)
+# reshaped table keeps Date, Time and Rain(mm) columns
+data_df = ksndmc.melt_ksndmc(ksndmc_df, date_format=date_format, value_name='Rain(mm)', keep_columns=True)
+data_df.index.name = 'Date_Time'
+data_df.reset_index(drop=True).to_csv('/media/kiruba/New Volume/ACCUWA_Data/weather_station/kanaswadi/reshaped_kanaswadi.csv')
 fig = plt.figure(figsize=(11.69, 8.27))
 plt.title('Raw data')
 plt.plot_date(data_df.index, data_df['Rain(mm)'], '-g')
 fig.autofmt_xdate()
-data_8h_df = data_df['2014-05-01 8H30T': '2014-09-10 8H30T']
+data_8h_df = data_df['2014-05-01 8H30T': '2014-09-10 8H30T'].copy()
 # print data_8h_df.head()
 # print data_df.head()
 
-
-def pairwise(iterable):
-    """s -> (s0,s1), (s1,s2), (s2,s3), ..."""
-    a, b = itertools.tee(iterable)
-    next(b, None)
-    return itertools.izip(a, b)
-
-data_8h_df['diff'] = 0.000
-# print data_8h_df
-for d1, d2 in pairwise(data_8h_df.index):
-    # print d1, d2
-    if data_8h_df['Rain(mm)'][d2] > data_8h_df['Rain(mm)'][d1]:
-        data_8h_df['diff'][d2] = data_8h_df['Rain(mm)'][d2] - data_8h_df['Rain(mm)'][d1]
+data_8h_df['diff'] = ksndmc.cumulative_difference(data_8h_df['Rain(mm)'])
 #
 
 # print data_8h_df
@@ -5,70 +5,13 @@ import matplotlib.pyplot as plt
 from matplotlib import rc
 from datetime import timedelta
 import itertools
+import checkdam.ksndmc as ksndmc
+import checkdam.checkdam as cd
 
 plt.rc('text', usetex=True)
 plt.rc('font', family='serif', size=18)
 
 
-def pick_incorrect_value(dataframe, **param):
-    """
-    Selects a unique list of timestamp that satisfies the condition given in the param dictionary
-    :param dataframe: Pandas dataframe
-    :param param: Conditonal Dictionary, Eg.{column name: [cutoff, '>']}
-    :type param: dict
-    :return: unique list of timestamp
-    :rtype: list
-    """
-    wrong_date_time = []
-    unique_list = []
-    # first_time = pd.to_datetime('2014-05-15 18:00:00', format='%Y-%m-%d %H:%M:%S')
-    # final_time = pd.to_datetime('2014-09-09 23:00:00', format='%Y-%m-%d %H:%M:%S')
-    for key, value in param.items():
-        # print key
-        # print len(wrong_date_time)
-        if value[1] == '>':
-            wrong_df = dataframe[dataframe[key] > value[0]]
-        if value[1] == '<':
-            wrong_df = dataframe[dataframe[key] < value[0]]
-        if value[1] ==  '=':
-            wrong_df = dataframe[dataframe[key] == value[0]]
-        for wrong_time in wrong_df.index:
-            if max(dataframe.index) > wrong_time > min(dataframe.index):
-                wrong_date_time.append(wrong_time)
-            # if final_time > wrong_time > first_time:
-
-
-    for i in wrong_date_time:
-        if i not in unique_list:
-            unique_list.append(i)
-
-    return unique_list
-
-
-def day_interpolate(dataframe, column_name, wrong_date_time):
-    """
-
-    :param dataframe: Pandas dataframe
-    :param column_name: Interpolation target column name of dataframe
-    :type column_name: str
-    :param wrong_date_time: List of error timestamp
-    :type wrong_date_time: list
-    :return: Corrected dataframe
-    """
-    initial_cutoff = min(dataframe.index) + timedelta(days=1)
-    final_cutoff = max(dataframe.index) - timedelta(days=1)
-    for date_time in wrong_date_time:
-        if (date_time > initial_cutoff ) and (date_time < final_cutoff):
-            prev_date_time = date_time - timedelta(days=1)
-            next_date_time = date_time + timedelta(days=1)
-            prev_value = dataframe[column_name][prev_date_time.strftime('%Y-%m-%d %H:%M')]
-            next_value = dataframe[column_name][next_date_time.strftime('%Y-%m-%d %H:%M')]
-            average_value = 0.5*(prev_value + next_value)
-            dataframe[column_name][date_time.strftime('%Y-%m-%d %H:%M')] = average_value
-
-    return dataframe
-
-
 base_file = '/media/kiruba/New Volume/ACCUWA_Data/weather_station/smgollahalli/smgoll_01_05_14_10_1_15.csv'
 #read csv file
 df_base = pd.read_csv(base_file, header=0, sep=',')
@@ -192,11 +135,10 @@ col_cutoff_dict = {'Max Air Temperature (C)': [45, '>'],
 
 # weather_df.to_csv('/media/kiruba/New Volume/ACCUWA_Data/weather_station/smgollahalli/corrected_weather.csv')
 
-wrong_timestamps = pick_incorrect_value(df_base, **col_cutoff_dict)
-#plot weather parameters
-# print weather_df.head()
+# a value beyond cutoff in any column replaces all four columns at that time stamp with average of previous and next day
+wrong_timestamps = cd.pick_incorrect_value(df_base, **col_cutoff_dict)
 for column_name in ['Max Air Temperature (C)', 'Min Air Temperature (C)', 'Max Wind Speed (kmph)', 'Wind Speed (kmph)']:
-    day_interpolate(weather_df, column_name, wrong_timestamps)
+    cd.day_interpolate(weather_df, column_name, wrong_timestamps)
 
 
 
@@ -307,46 +249,14 @@ fig.autofmt_xdate(rotation=90)
 ksndmc_file = '/media/kiruba/New Volume/ACCUWA_Data/weather_station/kanaswadi/KSNDMC_01-05-2014_10-09-2014_KANASAWADI.csv'
 ksndmc_df = pd.read_csv(ksndmc_file, sep=',')
 
-# drop unnecessary
-ksndmc_df.drop(['TRGCODE', 'DISTRICT', 'TALUKNAME', 'HOBLINAME', 'HOBLICODE', 'Total'], inplace=True, axis=1)
-# print ksndmc_df.head()
 # reshape the dataframe
-data = []
-for row_no, row in ksndmc_df.iterrows():
-    # print row_no
-    date = row['Date']
-    # print row
-    for time, value in row.ix[1:, ].iteritems():
-        data.append((date, time, value))
-        # print x
-        # print y
-
-# print data
-# create date time index
-data_df = pd.DataFrame(data, columns=['Date', 'Time', 'Rain(mm)'])
-# print data_df.head()
 date_format = "%d-%b-%Y %H:%M"
-data_df['Date_Time'] = pd.to_datetime(data_df['Date'] + ' ' + data_df['Time'], format=date_format)
-data_df.set_index(data_df['Date_Time'], inplace=True)
-data_df.sort_index(inplace=True)
-data_df.drop(['Date_Time', 'Date', 'Time'], axis=1, inplace=True)
+data_df = ksndmc.melt_ksndmc(ksndmc_df, date_format=date_format, value_name='Rain(mm)')
 # Perform cumulative difference
-data_8h_df = data_df['2014-05-01 8H30T': '2014-09-10 8H30T']
-data_8h_df['diff'] = 0.000
+data_8h_df = data_df['2014-05-01 8H30T': '2014-09-10 8H30T'].copy()
+data_8h_df['diff'] = ksndmc.cumulative_difference(data_8h_df['Rain(mm)'])
 # print data_8h_df.head()
 
-
-def pairwise(iterable):
-    """s -> (s0,s1), (s1,s2), (s2,s3), ..."""
-    a, b = itertools.tee(iterable)
-    next(b, None)
-    return itertools.izip(a, b)
-
-for d1, d2 in pairwise(data_8h_df.index):
-    # print d1, d2
-    if data_8h_df['Rain(mm)'][d2] > data_8h_df['Rain(mm)'][d1]:
-        data_8h_df['diff'][d2] = data_8h_df['Rain(mm)'][d2] - data_8h_df['Rain(mm)'][d1]
-
 # data_8h_df.to_csv('/media/kiruba/New Volume/ACCUWA_Data/weather_station/kanaswadi/recal_kanaswadi.csv')
 # print data_8h_df.index.min(), data_8h_df.index.max(), data_8h_df.index.is_monotonic
 data_30min_df = data_8h_df.resample('30Min', how=np.sum, label='right', closed='right')
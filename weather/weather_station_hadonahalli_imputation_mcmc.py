@@ -6,13 +6,12 @@ import itertools
 from bokeh.plotting import figure, show, output_file, gridplot
 import checkdam.checkdam as cd
 import scipy.stats as stats
-import pymc as pm
-from pymc import Normal, TruncatedNormal, deterministic
 # from scipy.signal import lombscargle
 from scipy import fft, arange
 import math
 from datetime import datetime
 import checkdam.meteolib as meteo
+import checkdam.imputation as imp
 
 # half hour
 def calculate_daily_extraterrestrial_irradiation(doy, latitude):
@@ -52,16 +51,6 @@ def datesep(df):
     return date, month, year
 
 
-# no_of_iterations = 400000
-# burn = 390000
-# thin = 10
-
-# for test
-no_of_iterations = 1000
-burn = 900
-thin = 2
-
-
 def mscatter(p, x, y, marker):
     p.scatter(x, y, marker=marker, size=15,
               line_color="navy", fill_color="orange", alpha=0.5)
@@ -139,7 +128,7 @@ weather_df.loc['2014-06-28':'2014-07-26', 'Wind Speed (kmph)'] = np.nan
 weather_df.loc['2015-01-26':, 'Solar Radiation (Wpm2)'] = np.nan
 weather_df.loc['2015-01-26':'2015-02-12', 'Humidity (%)'] = np.nan
 # resample and interpolate
-weather_df = weather_df.resample('30Min', how=np.mean, label='right', closed='right')
+weather_df = weather_df.resample('30Min', label='right', closed='right').mean()
 start_time = min(weather_df.index)
 end_time = max(weather_df.index)
 new_index = pd.date_range(start=start_time, end=end_time, freq='30Min')
@@ -152,7 +141,7 @@ weather_date_format = "%Y-%m-%d %H:%M:%S"
 weather_ksndmc_df['Date_Time'] = pd.to_datetime(weather_ksndmc_df['Date_Time'], format=weather_date_format)
 weather_ksndmc_df.set_index(weather_ksndmc_df['Date_Time'], inplace=True)
 weather_ksndmc_df.sort_index(inplace=True)
-weather_ksndmc_df.resample('30Min', how=np.mean, label='right', closed='right')
+weather_ksndmc_df.resample('30Min', label='right', closed='right').mean()
 # take values from ksndmc where data is misisng
 weather_df.loc['2015-01-14 13:30:00': '2015-02-10 11:30:00', 'Air Temperature (C)'] = weather_ksndmc_df.loc['2015-01-14 13:30:00': '2015-02-10 11:30:00', 'TEMPERATURE']
 weather_df.loc[:'2015-02-09 23:30:00', 'Wind Speed (kmph)'] = weather_ksndmc_df.loc[:'2015-02-09 23:30:00', 'WIND_SPEED']*3.6   #m/s to kmph conversion
@@ -162,6 +151,17 @@ weather_df.loc[(weather_df['Air Temperature (C)'] == 50), 'Air Temperature (C)']
 weather_df.loc[(weather_df['Humidity (%)'] == 50), 'Humidity (%)'] = np.nan
 # do interpolation only where only two continous values are missing
 weather_df.interpolate(method='time', limit=2, inplace=True)
+# fill gaps up to a day from the nearest analogs, ksndmc station readings as neighbour features, longer gaps by the
+# half hourly means below. time steps without ksndmc readings were filled with 50 in every column except the
+# imputed wind speed (wind_speed_had_mcmc.py), their temperature and humidity are missing
+ksndmc_readings = weather_ksndmc_df.select_dtypes(include=[np.number]).drop('WIND_SPEED', axis=1)
+ksndmc_missing = (ksndmc_readings == 50).all(axis=1)
+neighbours_df = weather_ksndmc_df[['TEMPERATURE', 'HUMIDITY', 'WIND_SPEED']].astype(float)
+neighbours_df.loc[ksndmc_missing, ['TEMPERATURE', 'HUMIDITY']] = np.nan
+analog_imputer = imp.AnalogImputer(['Air Temperature (C)', 'Min Air Temperature (C)', 'Max Air Temperature (C)',
+                                    'Humidity (%)', 'Wind Speed (kmph)', 'Solar Radiation (Wpm2)'], max_gap_hours=24)
+weather_df, analog_filled, analog_log = analog_imputer.impute(weather_df, neighbours=neighbours_df)
+print analog_log[analog_log['filled'] > 0].to_string(index=False)
 #  fill na values when weather station is giving wrong values
 # weather_ksndmc_df.loc[weather_ksndmc_df]
 # weather_df.to_csv('/media/kiruba/New Volume/milli_watershed/cumulative impacts/tmg_lake/weather.csv')
@@ -270,8 +270,8 @@ weather_df.loc[:, 'Max Air Temperature (C)'] = max_temp_transformed
 Convert to daily values
 """
 observed_rext = (weather_df.loc[:, 'Solar Radiation (Wpm2)'] * 1800) / 10 ** 6
-observed_rext_daily = observed_rext.resample('D', how=np.sum)
-weather_df = weather_df.resample('D', how=np.mean)
+observed_rext_daily = observed_rext.resample('D').sum()
+weather_df = weather_df.resample('D').mean()
 # print weather_df.head()
 
 
@@ -366,112 +366,18 @@ raise SystemExit(0)
 # raise SystemExit(0)
 
 """
-Temperature imputation MCMC
-
-# day
-day_temp = np.where(np.isnan(day_temp), 999, day_temp)
-
-def day_t_missing_model(dataset, mu, tau, name):
-    masked_values = np.ma.masked_values(dataset, value=999)
-    temp_day = Normal(name, mu, tau, value=masked_values, observed=True)
-    return locals()
-
-M_missing_day = pm.MCMC(day_t_missing_model(dataset=day_temp, mu=mean_t_day, tau=tau_t_day, name='dtemp'))
-M_missing_day.sample(iter=no_of_iterations, burn=burn, thin=thin)
-missing_values = np.mean(np.array(M_missing_day.trace('dtemp')[-50:-1]), axis=0)
-print missing_values.dtype
-masked_values = np.ma.masked_values(day_temp, value=999)
-masked_values[masked_values.mask] = missing_values
-weather_data_day.loc[:, 'corrected_temp'] = np.array(masked_values.data.tolist()).astype(int)
-# night
-night_temp = np.where(np.isnan(night_temp), 999, night_temp)
-
-def night_t_missing_model(dataset, mu, tau, name):
-    masked_values = np.ma.masked_values(dataset, value=999)
-    temp_night = Normal(name, mu, tau, value=masked_values, observed=True)
-    return locals()
-
-M_missing_night = pm.MCMC(night_t_missing_model(dataset=night_temp, mu=mean_t_night, tau=tau_t_night, name='ntemp'))
-M_missing_night.sample(iter=no_of_iterations, burn=burn, thin=thin)
-missing_values = np.mean(np.array(M_missing_night.trace('ntemp')[-50:-1]), axis=0)
-print missing_values.dtype
-masked_values = np.ma.masked_values(night_temp, value=999)
-masked_values[masked_values.mask] = missing_values
-weather_data_night.loc[:, 'corrected_temp'] = np.array(masked_values.data.tolist()).astype(int)
-
-# combine day and night
-weather_df['Air Temperature (C)'].ix[weather_data_day.index] = weather_data_day['corrected_temp']
-weather_df['Air Temperature (C)'].ix[weather_data_night.index] = weather_data_night['corrected_temp']
-weather_df.sort_index(inplace=True)
-"""
-"""
-Wind speed imputation MCMC
-
-
-day_ws = weather_data_day['Wind Speed (kmph)']
-night_ws = weather_data_night['Wind Speed (kmph)']
-hist_ws_day, edges_ws_day = np.histogram(weather_data_day['Wind Speed (kmph)'], bins=xrange(0, 12, 2), density=True)
-hist_ws_night, edges_ws_night = np.histogram(weather_data_night['Wind Speed (kmph)'], bins=xrange(0, 12, 2), density=True)
-
-mean_ws_day = np.mean(weather_data_day['Wind Speed (kmph)'])
-sigma_ws_day = np.std(weather_data_day['Wind Speed (kmph)'])
-variance_ws_day = sigma_ws_day**2
-tau_ws_day = 1.0 / variance_ws_day
-x_ws_day = np.linspace(min(day_ws), max(day_ws), 500)
-
-mean_ws_night = np.mean(weather_data_night['Wind Speed (kmph)'])
-sigma_ws_night = np.std(weather_data_night['Wind Speed (kmph)'])
-variance_ws_night = sigma_ws_night**2
-tau_ws_night = 1.0 / variance_ws_night
-x_ws_night = np.linspace(min(night_ws), max(night_ws), 500)
-
-# day
-# day_ws = np.where(np.isnan(day_ws), 18, day_ws)
-day_ws = np.ma.masked_array(day_ws, np.isnan(day_ws))
-print np.max(day_ws)
-
-
-def day_ws_missing_model(dataset, mu, tau, name):
-    cutoff_a = 0
-    cutoff_b = 14
-    masked_values = np.ma.masked_array(dataset, np.isnan(dataset))
-    temp_day = TruncatedNormal(name, mu, tau, a=cutoff_a, b=cutoff_b, value=masked_values, observed=True)
-    return locals()
-
-M_missing_day = pm.MCMC(day_ws_missing_model(dataset=day_ws, mu=mean_ws_day, tau=tau_ws_day, name='dws'))
-M_missing_day.sample(iter=no_of_iterations, burn=burn, thin=thin)
-missing_values = np.mean(np.array(M_missing_day.trace('dws')[-50:-1]), axis=0)
-print missing_values.dtype
-# masked_values = np.ma.masked_values(day_ws, value=18)
-masked_values = np.ma.masked_array(day_ws, np.isnan(day_ws))
-masked_values[masked_values.mask] = missing_values
-weather_data_day.loc[:, 'corrected_ws'] = np.array(masked_values.data.tolist()).astype(int)
-# night
-# night_ws = np.where(np.isnan(night_ws), 18, night_ws)
-
-night_ws = np.ma.masked_array(night_ws, np.isnan(night_ws))
-
-def night_ws_missing_model(dataset, mu, tau, name):
-    cutoff_a = 0
-    cutoff_b = 14
-    print cutoff_b
-    # masked_values = np.ma.masked_values(dataset, value=18)
-    masked_values = np.ma.masked_array(dataset, np.isnan(dataset))
-    temp_night = TruncatedNormal(name, mu, tau, a=cutoff_a, b=cutoff_b, value=masked_values, observed=True)
-    return locals()
-
-M_missing_night = pm.MCMC(night_ws_missing_model(dataset=night_ws, mu=mean_ws_night, tau=tau_ws_night, name='nws'))
-M_missing_night.sample(iter=no_of_iterations, burn=burn, thin=thin)
-missing_values = np.mean(np.array(M_missing_night.trace('nws')[-50:-1]), axis=0)
-print missing_values.dtype
-# masked_values = np.ma.masked_values(night_ws, value=18)
-masked_values = np.ma.masked_array(night_ws, np.isnan(night_ws))
-masked_values[masked_values.mask] = missing_values
-weather_data_night.loc[:, 'corrected_ws'] = np.array(masked_values.data.tolist()).astype(int)
-
-# combine day and night
-weather_df.loc[weather_data_day.index, 'Wind Speed (kmph)'] = weather_data_day['corrected_ws']
-weather_df[weather_data_night.index, 'Wind Speed (kmph)'] = weather_data_night['corrected_ws']
-weather_df.sort_index(inplace=True)
+Temperature and wind speed imputation, every gap of both in one batch, mu and tau of day and night values of the
+whole record, wind speed truncated at 0 - 14 kmph
+
+imputer = imp.GapImputer(limits={'Air Temperature (C)': (-np.inf, np.inf), 'Wind Speed (kmph)': (0, 14)})
+print imputer.gaps(weather_df)
+corrected_df, filled, intervals, log = imputer.impute(weather_df, confidence=0.95)
+print filled.sum()
+# mean and 95 % interval of every filled value
+print intervals.to_string(index=False)
+# observed values, mu, sigma, interval width and wall time of every gap
+print log.to_string(index=False)
+weather_df.loc[:, 'Air Temperature (C)'] = corrected_df['Air Temperature (C)']
+weather_df.loc[:, 'Wind Speed (kmph)'] = corrected_df['Wind Speed (kmph)']
 """
 